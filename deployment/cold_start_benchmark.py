@@ -0,0 +1,175 @@
+"""
+This program measures the cold-start import cost of every Lambda entry point.
+
+Each entry point is imported in a fresh interpreter, with its own directory and the solution's
+layers on sys.path (as in the Lambda runtime), under `python -X importtime`. The wall time and the
+cumulative import time of its heaviest top-level packages are written to a diffable JSON report,
+and the program exits with 1 when an entry point exceeds its budget.
+
+    python3 ./cold_start_benchmark.py [--runs 5] [--budgets cold_start_budgets.json] [--report report.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+deployment_dir = Path(__file__).parent.absolute()
+source_dir = deployment_dir.parent / "source"
+lambda_dir = source_dir / "aws_lambda"
+
+# the entry points of the solution's Lambda functions, relative to the aws_lambda directory
+ENTRY_POINTS = [
+    "automatic_brew_job_launch/lambda_function.py",
+    "brew_run_job/lambda_function.py",
+    "step_function_call_back/lambda_function.py",
+    "custom_resource/transform/recipe_from_s3.py",
+    "custom_resource/remove_s3_object/remove_s3_object.py",
+    "custom_resource/string_tolower/string_tolower.py",
+    "custom_resource/salesforce/connector_profile.py",
+    "connectors/salesforce/connector_profile.py",
+    "connectors/salesforce/data_extension_extract.py",
+    "connectors/google_analytics/shard_flow.py",
+]
+
+# the source of the SolutionsLayer (the powertools layer is expected to be installed in the environment)
+DEFAULT_LAYER_PATHS = [
+    source_dir / "aws_lambda" / "shared" / "util",
+    source_dir / "cdk_solution_helper_py" / "helpers_common",
+]
+
+# environment the entry points read at import time
+LAMBDA_ENVIRONMENT = {
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "SOLUTION_ID": "SO0000",
+    "SOLUTION_VERSION": "v0.0.0",
+    "CONNECTOR_SECRET_ARN": "arn:aws:secretsmanager:us-east-1:111111111111:secret:benchmark",
+    "DDB_TABLE_NAME": "benchmark",
+    "POWERTOOLS_TRACE_DISABLED": "1",
+}
+
+TOP_PACKAGES = 8
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr: str, module: str) -> dict:
+    """
+    Get the cumulative import time (in microseconds) of each top-level package imported by a module from
+    `-X importtime` output
+    """
+    packages = {}
+    imported = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit():
+            continue
+        # the name follows a single space and is indented by two more for each level of nesting - an import is
+        # reported after the imports it made, so collect those of the next level until the module is reported
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.lstrip()
+        if depth == 0:
+            if name == module:
+                packages = imported
+            imported = {}
+        elif depth == 1:
+            package = name.split(".")[0]
+            imported[package] = imported.get(package, 0) + int(cumulative)
+    return packages
+
+
+def measure(entry_point: str, layer_paths: list) -> dict:
+    """
+    Import an entry point in a fresh interpreter and return its wall time and heaviest packages
+    """
+    path = lambda_dir / entry_point
+    env = {
+        **{key: value for key, value in os.environ.items() if not key.startswith("PYTHON")},
+        **LAMBDA_ENVIRONMENT,
+        "PYTHONPATH": os.pathsep.join(str(layer_path) for layer_path in layer_paths),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET.format(module=path.stem)],
+        cwd=path.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f"importing {entry_point} failed:\n{result.stderr[-2000:]}")
+
+    # the entry point itself is reported as the wall time, the packages are the ones it imports
+    packages = {
+        name: micros for name, micros in parse_importtime(result.stderr, path.stem).items()
+        if not name.startswith("_")
+    }
+    return {
+        "wall_ms": float(result.stdout.strip().splitlines()[-1]) * 1000,
+        "packages_ms": {name: micros / 1000 for name, micros in packages.items()},
+    }
+
+
+def benchmark(entry_point: str, layer_paths: list, runs: int) -> dict:
+    measurements = [measure(entry_point, layer_paths) for _ in range(runs)]
+    median = statistics.median(measurement["wall_ms"] for measurement in measurements)
+    packages = {
+        name: statistics.median(measurement["packages_ms"].get(name, 0) for measurement in measurements)
+        for name in measurements[0]["packages_ms"]
+    }
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:TOP_PACKAGES]
+    return {
+        "wall_ms": round(median, 1),
+        "packages_ms": {name: round(cumulative, 1) for name, cumulative in sorted(heaviest)},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the cold-start imports of the Lambda entry points")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point (median is reported)")
+    parser.add_argument("--budgets", type=Path, default=deployment_dir / "cold_start_budgets.json")
+    parser.add_argument("--report", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--layer-path", type=Path, action="append", dest="layer_paths",
+                        help="layer directory to put on sys.path (e.g. a built layer's python/ directory)")
+    args = parser.parse_args(argv)
+
+    budgets = json.loads(args.budgets.read_text())
+    layer_paths = args.layer_paths or DEFAULT_LAYER_PATHS
+
+    report = {}
+    over_budget = []
+    for entry_point in ENTRY_POINTS:
+        result = benchmark(entry_point, layer_paths, args.runs)
+        result["budget_ms"] = budgets.get("entry_points", {}).get(entry_point, budgets["default_ms"])
+        report[entry_point] = result
+        status = "OK" if result["wall_ms"] <= result["budget_ms"] else "OVER BUDGET"
+        if status != "OK":
+            over_budget.append(entry_point)
+        print(f"{entry_point:<55} {result['wall_ms']:>8.1f} ms / {result['budget_ms']:>6} ms  {status}")
+
+    report_json = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.report:
+        args.report.write_text(report_json)
+    else:
+        print(report_json)
+
+    if over_budget:
+        print(f"{len(over_budget)} entry point(s) exceed their cold-start import budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
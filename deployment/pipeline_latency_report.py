@@ -0,0 +1,73 @@
+"""
+This program reports the end-to-end pipeline latency of the DataBrew job runs of a deployed connector stack.
+
+Each run records, in the stack's DataBrew job token table, when its first and last files were uploaded,
+when its workflow and DataBrew job started, when the job ended and when the workflow was called back.
+The program computes the percentiles of each stage over the runs called back in a time range. Run
+records expire with the token table items, 7 days after the job started.
+
+    python3 ./pipeline_latency_report.py --stack-name <stack> [--hours 24 | --start <iso> --end <iso>] [--json]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from aws_solutions.core.helpers import get_service_client
+from shared.pipeline_latency import DEFAULT_PERCENTILES, completed_runs, parse_time, summarize
+
+# the logical id of the token table created by the async callback construct of every workflow
+TOKEN_TABLE_LOGICAL_ID = "WriteTokenToDB"
+
+
+def token_table_names(stack_name: str):
+    paginator = get_service_client("cloudformation").get_paginator("list_stack_resources")
+    return [
+        resource["PhysicalResourceId"]
+        for page in paginator.paginate(StackName=stack_name)
+        for resource in page["StackResourceSummaries"]
+        if resource["ResourceType"] == "AWS::DynamoDB::Table" and TOKEN_TABLE_LOGICAL_ID in resource["LogicalResourceId"]
+    ]
+
+
+def print_table(summary, percentiles):
+    columns = ["count"] + [f"p{pct:g}" for pct in percentiles]
+    print(f"{'stage (ms)':<28}" + "".join(f"{column:>14}" for column in columns))
+    for stage, stats in summary.items():
+        print(f"{stage:<28}" + "".join(f"{stats[column]:>14}" for column in columns))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Report the pipeline latency percentiles of a connector stack")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--stack-name", help="the connector stack to report on")
+    target.add_argument("--table-name", action="append", dest="table_names", help="a DataBrew job token table")
+    parser.add_argument("--hours", type=float, default=24, help="report on the runs called back in the last hours")
+    parser.add_argument("--start", help="report on the runs called back from this ISO 8601 time")
+    parser.add_argument("--end", help="report on the runs called back until this ISO 8601 time")
+    parser.add_argument("--percentile", type=float, action="append", dest="percentiles",
+                        help=f"a percentile to report (repeatable, defaults to {', '.join(map(str, DEFAULT_PERCENTILES))})")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    end = parse_time(args.end) or datetime.now(timezone.utc)
+    start = parse_time(args.start) or end - timedelta(hours=args.hours)
+    percentiles = args.percentiles or DEFAULT_PERCENTILES
+    table_names = args.table_names or token_table_names(args.stack_name)
+    if not table_names:
+        print(f"No DataBrew job token table found in stack {args.stack_name}", file=sys.stderr)
+        return 1
+
+    runs = [run for table_name in table_names for run in completed_runs(table_name, start, end)]
+    summary = summarize(runs, percentiles)
+    if args.json:
+        print(json.dumps({"start": start.isoformat(), "end": end.isoformat(), "runs": len(runs), "stages": summary},
+                         indent=2))
+    else:
+        print(f"{len(runs)} runs called back from {start.isoformat()} to {end.isoformat()}")
+        print_table(summary, percentiles)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
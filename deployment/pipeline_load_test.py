@@ -0,0 +1,471 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+Offline load test of the S3 push pipeline. Synthetic S3 uploads are batched the way the SQS event source
+mapping batches them and pushed through the actual automatic launch, brew job and callback Lambda handlers.
+DynamoDB runs in moto; Step Functions (the orchestrator workflow) and DataBrew are simulated on a virtual
+clock, so hours of traffic run in seconds.
+
+    cd source
+    python ../deployment/pipeline_load_test.py --pattern burst --uploads 5000 --burst-size 500
+"""
+
+import argparse
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+deployment_dir = Path(__file__).parent.absolute()
+source_dir = deployment_dir.parent / "source"
+lambda_dir = source_dir / "aws_lambda"
+
+# the handlers and the source of the SolutionsLayer (the powertools layer is expected to be installed)
+HANDLER_PATHS = [
+    lambda_dir,
+    lambda_dir / "shared" / "util",
+    source_dir / "cdk_solution_helper_py" / "helpers_common",
+]
+
+# import the handlers (and the moto they run against) as the Lambda runtime would find them
+for handler_path in HANDLER_PATHS:
+    if str(handler_path) not in sys.path:
+        sys.path.insert(0, str(handler_path))
+
+try:
+    from moto import mock_dynamodb  # noqa: E402
+except ImportError:  # pragma: no cover
+    sys.exit("the load test runs DynamoDB in moto: pip install -r source/requirements-dev.txt")
+
+from shared.pipeline_latency import format_time, percentile  # noqa: E402
+
+LAUNCH_TABLE_NAME = "load-test-InboundBucketFileUploadTimeKeeper"
+TOKEN_TABLE_NAME = "load-test-TaskTokens"
+STATE_MACHINE_ARN = "arn:aws:states:us-east-1:111111111111:stateMachine:load-test-S3TriggerDataBrewJob-Runner"
+BREW_JOB_NAME = "load-test-transform-job"
+VIRTUAL_EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+# environment the handlers read, with credentials for moto
+LAMBDA_ENVIRONMENT = {
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "SOLUTION_ID": "SO0000",
+    "SOLUTION_VERSION": "v0.0.0",
+    "POWERTOOLS_TRACE_DISABLED": "1",
+    "LOG_LEVEL": "ERROR",
+    "STATE_MACHINE_ARN": STATE_MACHINE_ARN,
+    "AUTOMATIC_DATABREW_JOB_LAUNCH": "ON",
+    "STACK_NAME": "load-test",
+    "CONNECTOR_NAME": "S3PushStack",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass(order=True)
+class Upload:
+    time: float
+    bucket: str = field(compare=False)
+    key: str = field(compare=False)
+
+
+@dataclass
+class Execution:
+    arn: str
+    input: dict
+    start: float
+    status: str = "RUNNING"
+    end: float = None
+    polls: int = 0
+
+
+@dataclass
+class Run:
+    """
+    A DataBrew job run launched by the workflow, covering the uploads up to its last upload time
+    """
+    launched: float
+    last_upload_time: str
+    execution: Execution
+
+
+def virtual_time(seconds: float) -> str:
+    return format_time(VIRTUAL_EPOCH + timedelta(seconds=seconds))
+
+
+def steady_arrivals(args) -> list:
+    return [index / args.rate for index in range(args.uploads)]
+
+
+def burst_arrivals(args) -> list:
+    return [
+        (index // args.burst_size) * args.burst_gap + (index % args.burst_size) / args.rate
+        for index in range(args.uploads)
+    ]
+
+
+def poisson_arrivals(args) -> list:
+    arrivals = itertools.accumulate(random.expovariate(args.rate) for _ in range(args.uploads))  # nosec
+    return list(arrivals)
+
+
+ARRIVAL_PATTERNS = {
+    "steady": steady_arrivals,
+    "burst": burst_arrivals,
+    "poisson": poisson_arrivals,
+}
+
+
+def generate_uploads(args) -> list:
+    """
+    Generate the uploads of an arrival pattern, spread round-robin over the buckets and prefixes
+    """
+    return [
+        Upload(arrival, f"load-test-inbound-{index % args.buckets}",
+               f"prefix-{index % args.prefixes}/object-{index}.csv")
+        for index, arrival in enumerate(ARRIVAL_PATTERNS[args.pattern](args))
+    ]
+
+
+def sqs_batches(uploads: list, batch_size: int, batch_window: float) -> list:
+    """
+    Group the uploads (one S3 notification per SQS message) into the batches the event source mapping
+    delivers: when the batch is full or when the batching window of its first message has passed
+    """
+    batches = []
+    batch = []
+    for upload in sorted(uploads):
+        if batch and upload.time - batch[0].time >= batch_window:
+            batches.append((batch[0].time + batch_window, batch))
+            batch = []
+        batch.append(upload)
+        if len(batch) == batch_size:
+            batches.append((upload.time, batch))
+            batch = []
+    if batch:
+        batches.append((batch[0].time + batch_window, batch))
+    return batches
+
+
+def sqs_event(batch: list) -> dict:
+    return {
+        "Records": [
+            {
+                "messageId": f"message-{id(upload)}",
+                "attributes": {},
+                "body": json.dumps({"Records": [{
+                    "eventTime": virtual_time(upload.time),
+                    "s3": {"bucket": {"arn": f"arn:aws:s3:::{upload.bucket}"}, "object": {"key": upload.key}},
+                }]}),
+            }
+            for upload in batch
+        ]
+    }
+
+
+class LoadTest:
+    """
+    This class runs the uploads through the handlers on a virtual clock. Events (SQS batch deliveries,
+    workflow steps and DataBrew job completions) are processed in time order, one at a time.
+    """
+
+    def __init__(self, args, handlers, dynamodb):
+        self.args = args
+        self.launch, self.brew_run_job, self.callback = handlers
+        self.dynamodb = dynamodb
+        self.now = 0.0
+        self.events = []
+        self.sequence = itertools.count()
+        self.executions = {}
+        self.executions_by_token = {}
+        self.runs = []
+        self.caller = None
+        self.dynamodb_calls = defaultdict(Counter)
+        self.metrics = Counter()
+        self.handler_latency_ms = defaultdict(list)
+        dynamodb.meta.client.meta.events.register("before-call.dynamodb", self.count_dynamodb_call)
+
+    # virtual clock
+
+    def schedule(self, at: float, action, *args) -> None:
+        heapq.heappush(self.events, (at, next(self.sequence), action, args))
+
+    def run(self, batches: list) -> None:
+        for delivered, batch in batches:
+            self.schedule(delivered, self.deliver_batch, batch)
+        while self.events:
+            self.now, _, action, args = heapq.heappop(self.events)
+            action(*args)
+
+    # instrumentation
+
+    def count_dynamodb_call(self, model, **_) -> None:
+        self.dynamodb_calls[self.caller][model.name] += 1
+
+    def invoke(self, name: str, handler, event: dict, table_name: str):
+        """
+        Invoke a handler with its environment, recording its latency and the metrics it emits
+        """
+        os.environ["DDB_TABLE_NAME"] = table_name
+        self.caller = name
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                return handler(event, None)
+        finally:
+            self.handler_latency_ms[name].append((time.perf_counter() - start) * 1000)
+            self.caller = None
+            self.record_metrics(output.getvalue())
+
+    def record_metrics(self, output: str) -> None:
+        for line in output.splitlines():
+            if not line.startswith('{"_aws"'):
+                continue
+            emf = json.loads(line)
+            for definition in emf["_aws"]["CloudWatchMetrics"]:
+                for metric in definition["Metrics"]:
+                    values = emf.get(metric["Name"], [])
+                    self.metrics[metric["Name"]] += sum(values if isinstance(values, list) else [values])
+
+    # the automatic launch Lambda function, invoked by SQS
+
+    def deliver_batch(self, batch: list) -> None:
+        self.invoke("automatic_brew_job_launch", self.launch, sqs_event(batch), LAUNCH_TABLE_NAME)
+
+    # the orchestrator workflow, as defined by WorkflowOrchestrator.chain
+
+    def get_upload_time(self, execution: Execution) -> str:
+        self.caller = "orchestrator"
+        item = self.dynamodb.Table(LAUNCH_TABLE_NAME).get_item(
+            Key={"watching_key": execution.input["watching_key"]}, ConsistentRead=True
+        ).get("Item", {})
+        self.caller = None
+        return item.get("timestamp_str", "")
+
+    def get_expected_finish_time(self, execution: Execution) -> None:
+        execution.polls += 1
+        expected_finish_time = self.get_upload_time(execution)
+        self.schedule(self.now + execution.input["waiting_time_in_seconds"],
+                      self.check_file_upload_status, execution, expected_finish_time)
+
+    def check_file_upload_status(self, execution: Execution, expected_finish_time: str) -> None:
+        last_upload_time = self.get_upload_time(execution)
+        if last_upload_time <= expected_finish_time:
+            self.launch_brew_job(execution, last_upload_time)
+        else:
+            self.get_expected_finish_time(execution)
+
+    def launch_brew_job(self, execution: Execution, last_upload_time: str) -> None:
+        task_token = f"token-{len(self.executions_by_token)}"
+        self.executions_by_token[task_token] = execution
+        self.runs.append(Run(self.now, last_upload_time, execution))
+        event = {
+            "task_token": task_token,
+            "brew_job_name": BREW_JOB_NAME,
+            "run_timing": {
+                "workflow_start_time": virtual_time(execution.start),
+                "first_upload_time": execution.input.get("first_upload_time"),
+                "last_upload_time": last_upload_time,
+            },
+            "trace_context": {
+                "execution_id": execution.arn,
+                "correlation_id": execution.input.get("trace_context", {}).get("correlation_id"),
+            },
+        }
+        self.invoke("brew_run_job", self.brew_run_job, event, TOKEN_TABLE_NAME)
+
+    def complete_job_run(self, run_id: str) -> None:
+        event = {"time": virtual_time(self.now), "detail": {"jobRunId": run_id, "state": "SUCCEEDED"}}
+        self.invoke("step_function_call_back", self.callback, event, TOKEN_TABLE_NAME)
+
+    # Step Functions and DataBrew APIs called by the handlers
+
+    def list_executions(self, stateMachineArn, statusFilter=None, **_):
+        return {"executions": [
+            {"executionArn": execution.arn, "status": execution.status}
+            for execution in self.executions.values()
+            if statusFilter in (None, execution.status)
+        ]}
+
+    def start_execution(self, stateMachineArn, input, **_):
+        arn = f"{stateMachineArn.replace(':stateMachine:', ':execution:')}:{len(self.executions)}"
+        execution = Execution(arn, json.loads(input), self.now)
+        self.executions[arn] = execution
+        self.schedule(self.now, self.get_expected_finish_time, execution)
+        return {"executionArn": arn, "startDate": VIRTUAL_EPOCH + timedelta(seconds=self.now)}
+
+    def send_task_success(self, output, taskToken):
+        self.finish_execution(taskToken, "SUCCEEDED")
+
+    def send_task_failure(self, taskToken, **_):
+        self.finish_execution(taskToken, "FAILED")
+
+    def send_task_heartbeat(self, taskToken):
+        pass
+
+    def finish_execution(self, task_token: str, status: str) -> None:
+        execution = self.executions_by_token.get(task_token)
+        if execution and execution.status == "RUNNING":
+            execution.status = status
+            execution.end = self.now
+
+    def start_job_run(self, Name):
+        run_id = f"{Name}-run-{len(self.runs)}"
+        self.schedule(self.now + self.args.job_duration, self.complete_job_run, run_id)
+        return {"RunId": run_id}
+
+    # report
+
+    def upload_to_launch_seconds(self, uploads: list) -> list:
+        """
+        Get, for each upload, the time until the launch of the first DataBrew job run that covers it
+        """
+        latencies = []
+        runs = sorted(self.runs, key=lambda run: run.launched)
+        for upload in uploads:
+            upload_time = virtual_time(upload.time)
+            covering = next((run for run in runs
+                             if run.launched >= upload.time and run.last_upload_time >= upload_time), None)
+            if covering:
+                latencies.append(covering.launched - upload.time)
+        return latencies
+
+    def report(self, uploads: list, batches: list, elapsed: float) -> dict:
+        upload_to_launch = self.upload_to_launch_seconds(uploads)
+        dynamodb_calls = {caller: dict(calls) for caller, calls in sorted(self.dynamodb_calls.items())}
+        total_dynamodb_calls = sum(sum(calls.values()) for calls in self.dynamodb_calls.values())
+        return {
+            "uploads": len(uploads),
+            "sqs_batches": len(batches),
+            "virtual_duration_s": round(self.now, 1),
+            "wall_time_s": round(elapsed, 1),
+            "workflow_launches": int(self.metrics["WorkflowLaunched"]),
+            "skipped_already_running": int(self.metrics["WorkflowSkippedAlreadyRunning"]),
+            "skipped_no_newer_event": int(self.metrics["WorkflowSkippedNoNewerEvent"]),
+            "orchestrator_polls": sum(execution.polls for execution in self.executions.values()),
+            "databrew_job_runs": len(self.runs),
+            "uploads_never_transformed": len(uploads) - len(upload_to_launch),
+            "upload_to_job_launch_s": distribution(upload_to_launch, digits=1),
+            "dynamodb_calls": dynamodb_calls,
+            "dynamodb_calls_per_upload": round(total_dynamodb_calls / max(len(uploads), 1), 3),
+            "decision_latency_ms": distribution(self.handler_latency_ms["automatic_brew_job_launch"]),
+            "handler_latency_ms": {
+                name: distribution(latencies) for name, latencies in sorted(self.handler_latency_ms.items())
+                if name != "automatic_brew_job_launch"
+            },
+            "metrics": dict(sorted(self.metrics.items())),
+        }
+
+
+def distribution(values: list, digits: int = 2) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        **{f"p{pct}": round(percentile(values, pct), digits) for pct in PERCENTILES},
+        "max": round(max(values), digits),
+    }
+
+
+def create_tables(dynamodb) -> None:
+    """
+    Create the tables with the key schemas the connector stacks deploy them with
+    """
+    for table_name, key in [(LAUNCH_TABLE_NAME, "watching_key"), (TOKEN_TABLE_NAME, "job_id")]:
+        dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+def load_test(args) -> dict:
+    from aws_solutions.core.helpers import _helpers_service_clients, _helpers_service_resources, get_service_resource
+    import automatic_brew_job_launch.lambda_function as launch
+    import brew_run_job.lambda_function as brew_run_job
+    import step_function_call_back.lambda_function as callback
+
+    uploads = generate_uploads(args)
+    batches = sqs_batches(uploads, args.batch_size, args.batch_window)
+
+    with mock_dynamodb():
+        _helpers_service_resources.clear()
+        _helpers_service_clients.clear()
+        dynamodb = get_service_resource("dynamodb")
+        create_tables(dynamodb)
+
+        test = LoadTest(args, (launch.event_handler, brew_run_job.handler, callback.handler), dynamodb)
+        _helpers_service_clients["stepfunctions"] = test
+        _helpers_service_clients["databrew"] = test
+
+        start = time.perf_counter()
+        test.run(batches)
+        return test.report(uploads, batches, time.perf_counter() - start)
+
+
+def print_report(args, report: dict) -> None:
+    print(f"{report['uploads']} uploads ({args.pattern}) in {report['sqs_batches']} SQS batches "
+          f"over {report['virtual_duration_s']}s of virtual time, run in {report['wall_time_s']}s")
+    for name in ["workflow_launches", "skipped_already_running", "skipped_no_newer_event", "orchestrator_polls",
+                 "databrew_job_runs", "uploads_never_transformed", "dynamodb_calls_per_upload"]:
+        print(f"  {name:<28} {report[name]}")
+    for name in ["upload_to_job_launch_s", "decision_latency_ms"]:
+        print(f"  {name:<28} {report[name]}")
+    for caller, calls in report["dynamodb_calls"].items():
+        print(f"  dynamodb calls by {caller:<27} {calls}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Push synthetic S3 uploads through the pipeline handlers offline")
+    parser.add_argument("--pattern", choices=sorted(ARRIVAL_PATTERNS), default="steady")
+    parser.add_argument("--uploads", type=int, default=1000, help="number of S3 object uploads")
+    parser.add_argument("--rate", type=float, default=10, help="uploads per second (within a burst for bursts)")
+    parser.add_argument("--burst-size", type=int, default=200, help="uploads per burst")
+    parser.add_argument("--burst-gap", type=float, default=900, help="seconds between the starts of bursts")
+    parser.add_argument("--buckets", type=int, default=1, help="inbound buckets the uploads are spread over")
+    parser.add_argument("--prefixes", type=int, default=1, help="key prefixes the uploads are spread over")
+    parser.add_argument("--batch-size", type=int, default=30, help="SQS event source batch size")
+    parser.add_argument("--batch-window", type=float, default=10, help="SQS maximum batching window in seconds")
+    parser.add_argument("--waiting-time", type=float, default=1,
+                        help="FileUploadCompleteWaitingTime in minutes, the workflow's quiet period before a run")
+    parser.add_argument("--job-duration", type=float, default=300, help="DataBrew job run duration in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the poisson arrivals")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    os.environ.update({**LAMBDA_ENVIRONMENT, "WAITING_TIME_IN_MINUTES": str(args.waiting_time)})
+    report = load_test(args)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(args, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -72,6 +72,11 @@ pytest --cov --cov-report term-missing --cov-report term --cov-report "xml:$cove
 # path to the corresponding project relative path. The $source_dir holds the absolute path for source directory.
 sed -i -e "s,<source>$source_dir,<source>source,g" $coverage_report_path
 
+echo "------------------------------------------------------------------------------"
+echo "[Test] Check the cold-start import budgets of the Lambda entry points"
+echo "------------------------------------------------------------------------------"
+python3 $template_dir/cold_start_benchmark.py --report $source_dir/tests/coverage-reports/cold-start.json
+
 if [ $using_test_venv == 1 ]; then
   echo "------------------------------------------------------------------------------"
   echo "[Env] Deactivating test virtual environment"
@@ -0,0 +1,196 @@
+"""
+This program measures how long `cdk synth` takes for each connector stack, and where the time goes.
+
+Each stack is synthesized offline in a fresh interpreter, three times: cold, into an empty cloud assembly (every
+Lambda asset is hashed and bundled), then warm, into the same cloud assembly (the asset bundles and file digests of
+the cold synth are reused), with the templates post-processed as for a release build. Then incremental: with
+incremental synth enabled, the stack is synthesized once more into the same cloud assembly without the release
+post-processing (which incremental synths skip), and the measured synth reuses it as its inputs are unchanged - as
+when iterating on another connector. Along with the import, construct and synth wall times, the phase timings
+recorded by the solutions constructs and synthesizer (function and layer construction, asset hashing, bundling,
+template substitution and customization, asset archiving) are written to a diffable JSON report. The program exits
+with 1 when a stack's synth time exceeds its baseline by more than the threshold.
+
+The Lambda dependencies are installed from the local wheelhouse (SOLUTIONS_WHEELHOUSE) - once a synth has primed
+it, the benchmark runs without network access.
+
+    python3 ./synth_benchmark.py [--runs 1] [--baseline synth_baseline.json] [--threshold 0.25] [--report report.json]
+    python3 ./synth_benchmark.py --update-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+deployment_dir = Path(__file__).parent.absolute()
+source_dir = deployment_dir.parent / "source"
+infrastructure_dir = source_dir / "infrastructure"
+
+STACKS = ["S3PushStack", "SalesforceMarketingCloudStack", "GoogleAnalyticsPullStack"]
+MODES = ["cold", "warm", "incremental"]
+DEFAULT_THRESHOLD = 0.25
+
+# the CDK CLI passes these to the app - a benchmark synth must not pick them up from the environment
+CDK_ENVIRONMENT = ["CDK_OUTDIR", "CDK_CONTEXT_JSON"]
+
+
+def synthesize(stack_name: str, build_dir: Path, incremental: bool) -> dict:
+    """
+    Synthesize one stack into build_dir (in this interpreter) and return its timings
+    """
+    started = time.perf_counter()
+    sys.path.insert(0, str(infrastructure_dir))
+    from aws_cdk import App, Aspects
+    from cdk_nag import AwsSolutionsChecks
+
+    import deploy
+    from aws_solutions.cdk.aws_lambda.python.bundling import BundlingScheduler
+    from aws_solutions.cdk.helpers.fingerprints import INCREMENTAL_SYNTH_CONTEXT, StackFingerprints
+    from aws_solutions.cdk.helpers.timings import SynthTimings
+    from data_connectors.app_registry import AppRegistry
+
+    imported = time.perf_counter()
+    stack_class = {stack.name: stack for stack in deploy.BUILD_STACKS}[stack_name]
+    context = {**deploy.solution.context.context, INCREMENTAL_SYNTH_CONTEXT: incremental}
+    if not incremental:
+        # as for a release build
+        context["SOLUTIONS_ASSETS_REGIONAL"] = str(build_dir / "regional-s3-assets")
+        context["SOLUTIONS_ASSETS_GLOBAL"] = str(build_dir / "global-s3-assets")
+    app = App(outdir=str(build_dir / "cdk.out"), context=context)
+    fingerprints = StackFingerprints(app.outdir, context, entrypoint=Path(deploy.__file__), shared=[AppRegistry])
+    if not fingerprints.unchanged(stack_class.name, stack_class):
+        stack = stack_class(
+            app,
+            stack_class.name,
+            description=stack_class.description,
+            template_filename=stack_class.template_filename,
+            synthesizer=deploy.synthesizer(),
+        )
+        fingerprints.add(stack, stack_class)
+        Aspects.of(app).add(AwsSolutionsChecks())
+        Aspects.of(app).add(AppRegistry(stack, f"AppRegistry-{stack_class.name}"))
+
+    constructed = time.perf_counter()
+    assembly = app.synth(validate_on_synthesis=True, skip_validation=False)
+    BundlingScheduler.wait()
+    fingerprints.save(assembly)
+    synthesized = time.perf_counter()
+
+    return {
+        "import_s": imported - started,
+        "construct_s": constructed - imported,
+        "synth_s": synthesized - constructed,
+        "total_s": synthesized - started,
+        "phases_s": {name: phase["seconds"] for name, phase in SynthTimings.snapshot().items()},
+    }
+
+
+def measure(stack_name: str, build_dir: Path, mode: str) -> dict:
+    """
+    Synthesize one stack into build_dir in a fresh interpreter, so that no in-process cache is warm
+    """
+    env = {key: value for key, value in os.environ.items() if key not in CDK_ENVIRONMENT}
+    result = subprocess.run(
+        [sys.executable, __file__, "--synthesize", stack_name, "--build-dir", str(build_dir)]
+        + (["--incremental"] if mode == "incremental" else []),
+        cwd=infrastructure_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(f"synthesizing {stack_name} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def median(measurements: list) -> dict:
+    phases = sorted({name for measurement in measurements for name in measurement["phases_s"]})
+    result = {
+        key: round(statistics.median(measurement[key] for measurement in measurements), 2)
+        for key in ("import_s", "construct_s", "synth_s", "total_s")
+    }
+    result["phases_s"] = {
+        name: round(statistics.median(measurement["phases_s"].get(name, 0) for measurement in measurements), 2)
+        for name in phases
+    }
+    return result
+
+
+def benchmark(stack_name: str, runs: int) -> dict:
+    measurements = {mode: [] for mode in MODES}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory(prefix="synth-benchmark-") as build_dir:
+            for mode in MODES:
+                if mode == "incremental":
+                    measure(stack_name, Path(build_dir), mode)
+                measurements[mode].append(measure(stack_name, Path(build_dir), mode))
+    return {mode: median(measurements[mode]) for mode in MODES}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the synth of the connector stacks")
+    parser.add_argument("--runs", type=int, default=1, help="synths per stack and mode (median is reported)")
+    parser.add_argument("--stack", choices=STACKS, action="append", dest="stacks", help="stack to benchmark")
+    parser.add_argument("--baseline", type=Path, default=deployment_dir / "synth_baseline.json")
+    parser.add_argument("--threshold", type=float, help="allowed slowdown over the baseline, e.g. 0.25 for 25%%")
+    parser.add_argument("--report", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--update-baseline", action="store_true", help="write the measured times to the baseline")
+    parser.add_argument("--synthesize", choices=STACKS, help=argparse.SUPPRESS)
+    parser.add_argument("--build-dir", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--incremental", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        print(json.dumps(synthesize(args.synthesize, args.build_dir, args.incremental)))
+        return 0
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"stacks": {}}
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", DEFAULT_THRESHOLD)
+
+    report = {}
+    regressions = []
+    for stack_name in args.stacks or STACKS:
+        report[stack_name] = benchmark(stack_name, args.runs)
+        for mode in MODES:
+            result = report[stack_name][mode]
+            baseline_s = baseline["stacks"].get(stack_name, {}).get(f"{mode}_s")
+            status = "NO BASELINE"
+            if baseline_s:
+                result["baseline_s"] = baseline_s
+                status = "OK" if result["total_s"] <= baseline_s * (1 + threshold) else "REGRESSION"
+            if status == "REGRESSION":
+                regressions.append(f"{stack_name} ({mode})")
+            phases = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in result["phases_s"].items())
+            print(
+                f"{stack_name:<32} {mode:<11} {result['total_s']:>7.1f} s / {baseline_s or '-':>6} s  {status}\n"
+                f"{'':<32} import {result['import_s']:.1f}s, construct {result['construct_s']:.1f}s, "
+                f"synth {result['synth_s']:.1f}s - {phases}"
+            )
+
+    report_json = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.report:
+        args.report.write_text(report_json)
+    else:
+        print(report_json)
+
+    if args.update_baseline:
+        for stack_name, result in report.items():
+            baseline["stacks"][stack_name] = {f"{mode}_s": result[mode]["total_s"] for mode in MODES}
+        baseline["threshold"] = threshold
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} synth(s) are more than {threshold:.0%} slower than the baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
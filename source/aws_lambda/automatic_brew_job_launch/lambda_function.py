@@ -14,8 +14,11 @@
 import json
 import os
 from botocore.exceptions import ClientError
-from aws_solutions.core.helpers import get_service_client, get_service_resource
 from aws_lambda_powertools import Logger
+from shared.clients import LazyServiceClient, LazyTable
+from shared.logs import BatchSummary, sample_debug_logs
+from shared.metrics import count, count_for_watching_key, log_metrics, timer
+from shared.tracing import CORRELATION_ID, annotate, current_trace_header, new_trace_context, root_trace_id, tracer
 
 logger = Logger(utc=True, service="sfmc-lambda-standalone")
 
@@ -26,19 +29,23 @@ AUTOMATIC_DATABREW_JOB_LAUNCH = "AUTOMATIC_DATABREW_JOB_LAUNCH"
 
 EXPECTED_FINISH_TIME_DELTA = 0
 
+# created once per container on first use, and reused by warm invocations
+dynamodb_table = LazyTable(DDB_TABLE_NAME)
+stepfunctions_client = LazyServiceClient("stepfunctions")
 
+
+@tracer.capture_lambda_handler
+@log_metrics
+@sample_debug_logs(logger)
 def event_handler(event, _):
     verify_env_setup()
+    count("SqsMessagesReceived", len(event.get("Records", [])))
+    tracer.put_metadata(key="upload_trace_ids", value=get_upload_trace_ids(event))
 
     if os.environ[AUTOMATIC_DATABREW_JOB_LAUNCH] == "OFF":
         logger.info("AutotriggerTransform is OFF")
+        count("WorkflowLaunchDisabled")
     else:
-
-        dynamodb_client = get_service_resource("dynamodb")
-        dynamodb_table = dynamodb_client.Table(os.environ[DDB_TABLE_NAME])
-
-        stepfunctions_client = get_service_client("stepfunctions")
-
         try:
             watching_key, ts_in_str = get_watching_key(event)
 
@@ -50,12 +57,15 @@ def event_handler(event, _):
 
                 running_executions = get_executions(stepfunctions_client, status_filter="RUNNING")
                 if not running_executions:
-                    response = invoke_state_machine(stepfunctions_client, watching_key)
+                    response = invoke_state_machine(stepfunctions_client, watching_key, get_first_event_time(event))
+                    count_for_watching_key("WorkflowLaunched", watching_key)
                 else:
                     logger.info("Not executing state machine: State machine is already running")
+                    count_for_watching_key("WorkflowSkippedAlreadyRunning", watching_key)
                     return
             else:
                 logger.info("Not executing state machine: There is no newer event timestamp")
+                count_for_watching_key("WorkflowSkippedNoNewerEvent", watching_key)
                 return
 
         except Exception as err:
@@ -76,18 +86,46 @@ def verify_env_setup():
 def get_watching_key(event):
     unique_watching_keys = set()
     latest_file_uploaded_timestamp = ""
+    # one summary line per batch, the uploads themselves are only logged at DEBUG level
+    uploads = BatchSummary(logger)
     for record in event['Records']:
         payload = json.loads(record["body"])
         for s3_info in payload.get("Records", {}):
             bucket_name, file_name, event_time = extract_s3_record_info(s3_info)
-            logger.info(f'Processing new file {file_name} upload to {bucket_name} at {event_time}')
+            uploads.add(bucket=bucket_name, file=file_name, event_time=event_time)
             unique_watching_keys.add(bucket_name)
             latest_file_uploaded_timestamp = max(latest_file_uploaded_timestamp, event_time)
 
+    count("S3EventsReceived", uploads.count)
     watching_key = ';'.join(sorted(unique_watching_keys))
+    uploads.log("Processing %d new file uploads to %s, the latest at %s",
+                uploads.count, watching_key, latest_file_uploaded_timestamp)
     return watching_key, latest_file_uploaded_timestamp
 
 
+def get_first_event_time(event):
+    """
+    Get the time of the earliest S3 object create event in the batch, i.e. the first upload of the run it launches
+    """
+    event_times = [
+        s3_info['eventTime']
+        for record in event['Records']
+        for s3_info in json.loads(record["body"]).get("Records", {})
+    ]
+    return min(event_times, default="")
+
+
+def get_upload_trace_ids(event):
+    """
+    Get the root trace ids the SQS messages of the batch were sent with, linking this invocation to the uploads
+    """
+    trace_ids = {
+        root_trace_id(record.get("attributes", {}).get("AWSTraceHeader", ""))
+        for record in event.get("Records", [])
+    }
+    return sorted(trace_id for trace_id in trace_ids if trace_id)
+
+
 def extract_s3_record_info(record):
     bucket_name = record['s3']['bucket']['arn']
     file_name = record['s3']['object']['key']
@@ -97,15 +135,17 @@ def extract_s3_record_info(record):
 
 def get_executions(stepfunctions_client, status_filter="RUNNING"):
     state_machine_arn = os.environ[STATE_MACHINE_ARN]
-    running_executions = stepfunctions_client.list_executions(stateMachineArn=state_machine_arn,
-                                                              statusFilter=status_filter)
+    with timer("StepFunctionsListExecutionsLatency"):
+        running_executions = stepfunctions_client.list_executions(stateMachineArn=state_machine_arn,
+                                                                  statusFilter=status_filter)
     return running_executions['executions']
 
 
 def get_timestamp(dynamodb_table, watching_key):
-    response = dynamodb_table.get_item(
-        Key={'watching_key': watching_key},
-    )
+    with timer("DynamoDBGetItemLatency"):
+        response = dynamodb_table.get_item(
+            Key={'watching_key': watching_key},
+        )
     return response.get('Item', "")
 
 
@@ -116,31 +156,41 @@ def has_newer_timestamp(ts, current_timestamp_in_dynamodb):
 
 def put_timestamp(dynamodb_table, watching_key, timestamp_str):
     try:
-        dynamodb_table.put_item(
-            Item={
-                'watching_key': watching_key,
-                'timestamp_str': timestamp_str,
-            }
-        )
-        logger.info(f"Update the latest S3 object create event time {timestamp_str} in the {dynamodb_table}")
+        with timer("DynamoDBPutItemLatency"):
+            dynamodb_table.put_item(
+                Item={
+                    'watching_key': watching_key,
+                    'timestamp_str': timestamp_str,
+                }
+            )
+        logger.info(f"Update the latest S3 object create event time {timestamp_str} in the {dynamodb_table.table_name}")
     except ClientError as error:
         logger.error(error)
         raise error
 
 
-def invoke_state_machine(stepfunctions_client, watching_key):
+def invoke_state_machine(stepfunctions_client, watching_key, first_upload_time=""):
     delayed_sec = int(60 * float(os.environ[WAITING_TIME_IN_MINUTES]))
+    trace_context = new_trace_context()
     state_machine_input = {
         "watching_key": watching_key,
         "waiting_time_in_seconds": delayed_sec,
+        # carried through the workflow into the pipeline latency record of the run
+        "first_upload_time": first_upload_time,
+        # carried through the workflow into the task token item, so the callback joins the same trace
+        "trace_context": trace_context,
     }
     state_machine_input_str = json.dumps(state_machine_input)
 
     state_machine_arn = os.environ[STATE_MACHINE_ARN]
+    annotate(trace_context[CORRELATION_ID], watching_key=watching_key)
 
     logger.info(f'Invoking automatic brew job launch workflow {state_machine_arn} with input {state_machine_input_str}')
 
-    return stepfunctions_client.start_execution(
-        stateMachineArn=state_machine_arn,
-        input=state_machine_input_str
-    )
+    start_execution_args = {"stateMachineArn": state_machine_arn, "input": state_machine_input_str}
+    trace_header = current_trace_header()
+    if trace_header:
+        start_execution_args["traceHeader"] = trace_header
+
+    with timer("StepFunctionsStartExecutionLatency"):
+        return stepfunctions_client.start_execution(**start_execution_args)
@@ -13,17 +13,25 @@
 
 import os
 import time
+import uuid
 import shared.stepfunctions as stepfunctions
 
 from datetime import datetime, timedelta
 from aws_lambda_powertools import Logger
-from aws_solutions.core.helpers import get_service_client, get_service_resource
+from shared.clients import LazyServiceClient, LazyTable
+from shared.metrics import count, log_metrics, timer
+from shared.pipeline_latency import DATABREW_START_TIME, RUN_TIMING_FIELDS, now
+from shared.tracing import CORRELATION_ID, TRACE_ID, annotate, current_trace_header, root_trace_id, tracer
 
 logger = Logger(utc=True)
 
 DDB_TABLE_NAME = "DDB_TABLE_NAME"
 TTL_EXPIRY_PERIOD = 7
 
+# created on first use and reused across warm invocations
+data_brew_client = LazyServiceClient("databrew")
+ddb_table = LazyTable(DDB_TABLE_NAME)
+
 
 def verify_env_setup():
     if not (os.environ.get(DDB_TABLE_NAME)):
@@ -33,6 +41,16 @@ def verify_env_setup():
     return True
 
 
+def get_correlation_id(event):
+    """
+    Get the correlation id of the run, falling back to the workflow execution for runs not started from an upload
+    """
+    trace_context = event.get("trace_context", {})
+    return trace_context.get(CORRELATION_ID) or trace_context.get("execution_id") or str(uuid.uuid4())
+
+
+@tracer.capture_lambda_handler
+@log_metrics
 def handler(event, _):
     task_token = event["task_token"]
     exp_time = int((timedelta(days=TTL_EXPIRY_PERIOD) + datetime.fromtimestamp(int(time.time()))).timestamp())
@@ -41,20 +59,35 @@ def handler(event, _):
         stepfunctions.send_task_failure(error, task_token)
         raise error
 
-    stepfunctions.send_heart_beat(task_token)
-
     try:
 
-        data_brew_client = get_service_client("databrew")
-        # dynamo db client
-        ddb_client = get_service_resource("dynamodb")
-        ddb_table = ddb_client.Table(os.getenv("DDB_TABLE_NAME"))
         job_name = event["brew_job_name"]
-        response = data_brew_client.start_job_run(Name=job_name)
+        correlation_id = get_correlation_id(event)
+        annotate(correlation_id, brew_job_name=job_name)
+        with timer("DataBrewStartJobRunLatency"):
+            response = data_brew_client.start_job_run(Name=job_name)
+        # only a started job run keeps the task alive - a failed start is reported with send_task_failure below
+        stepfunctions.send_heart_beat(task_token)
         job_id = response["RunId"]
-        ddb_table.put_item(Item={"job_id": job_id,
-                                 "task_token": task_token,
-                                 "exp_timestamp": exp_time})
+        item = {"job_id": job_id,
+                "task_token": task_token,
+                "exp_timestamp": exp_time,
+                DATABREW_START_TIME: now(),
+                # read by the callback to annotate its trace, so one run can be followed across the pipeline
+                CORRELATION_ID: correlation_id}
+        trace_id = root_trace_id(current_trace_header())
+        if trace_id:
+            item[TRACE_ID] = trace_id
+        # the pipeline latency record of the run, completed by the callback
+        run_timing = event.get("run_timing", {})
+        item.update({field: run_timing[field] for field in RUN_TIMING_FIELDS if run_timing.get(field)})
+        # the exact location of the data the job was launched for, when the workflow knows it
+        if event.get("input_location"):
+            item["input_location"] = event["input_location"]
+            logger.info(f"DataBrew job '{job_name}' launched for data at {event['input_location']}")
+        with timer("DynamoDBPutItemLatency"):
+            ddb_table.put_item(Item=item)
+        count("DataBrewJobsStarted")
 
         logger.info(f"Task token of the following databrew job '{job_name}' with job id '{job_id}'"
                     f" is updated in the following {DDB_TABLE_NAME}")
@@ -64,6 +97,4 @@ def handler(event, _):
         stepfunctions.send_task_failure(err, task_token)
         raise err
 
-    stepfunctions.send_heart_beat(task_token)
-
     return {"brew_job_run_id": response["RunId"]}
@@ -0,0 +1,105 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains the Lambdas that run a Google Analytics extraction as date-range shards
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from aws_lambda_powertools import Logger
+
+from shared.connectors.google_analytics.flow import GoogleAnalyticsShardFlow
+from shared.connectors.google_analytics.shards import (
+    SHARD_STATUS_IN_PROGRESS,
+    SHARD_STATUS_SUCCESSFUL,
+    DateRangeShard,
+    ShardCheckpoints,
+    period_start,
+    plan_shards,
+)
+from shared.logs import payload
+from shared.metrics import count, log_metrics
+from shared.tracing import tracer
+
+BASE_FLOW_NAME = "BASE_FLOW_NAME"
+CHECKPOINT_TABLE_NAME = "CHECKPOINT_TABLE_NAME"
+BACKFILL_START_DATE = "BACKFILL_START_DATE"
+SHARD_SIZE_IN_DAYS = "SHARD_SIZE_IN_DAYS"
+
+logger = Logger(utc=True, service="ga-shard-flow")
+
+
+@tracer.capture_lambda_handler
+@log_metrics
+def plan_shards_handler(event, _):
+    """
+    This function splits the requested date range into the shards that still have to be extracted.
+    The range defaults to the backfill start date (or the start of the period of yesterday) through yesterday,
+    the last complete day. The shards of periods that have not ended yet are extracted again by later runs.
+    """
+    logger.info(payload(event))
+    shard_size_in_days = int(os.environ[SHARD_SIZE_IN_DAYS])
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    start_date = (
+        event.get("start_date")
+        or os.environ.get(BACKFILL_START_DATE)
+        or period_start(yesterday, shard_size_in_days).isoformat()
+    )
+    end_date = event.get("end_date") or yesterday.isoformat()
+
+    shards = plan_shards(date.fromisoformat(start_date), date.fromisoformat(end_date), shard_size_in_days)
+    completed_shard_ids = ShardCheckpoints(os.environ[CHECKPOINT_TABLE_NAME]).completed_shard_ids()
+    pending_shards = [shard for shard in shards if shard.shard_id not in completed_shard_ids]
+    logger.info(f"{len(pending_shards)} of {len(shards)} shards from {start_date} to {end_date} are pending")
+    count("ShardsPending", len(pending_shards))
+
+    return {
+        "shards": [shard.to_dict() for shard in pending_shards],
+        "completed_shard_count": len(shards) - len(pending_shards),
+    }
+
+
+@tracer.capture_lambda_handler
+@log_metrics
+def start_shard_handler(event, _):
+    """
+    This function starts the flow run for a single shard and checkpoints it as in progress
+    """
+    logger.info(payload(event))
+    shard = DateRangeShard.from_dict(event)
+    flow = GoogleAnalyticsShardFlow(os.environ[BASE_FLOW_NAME], shard)
+    execution_id = flow.start()
+    ShardCheckpoints(os.environ[CHECKPOINT_TABLE_NAME]).put(shard, SHARD_STATUS_IN_PROGRESS, flow.flow_name, execution_id)
+    logger.info(f"Started flow run {execution_id} of {flow.flow_name}")
+    count("ShardFlowRunsStarted")
+
+    return {**shard.to_dict(), "flow_name": flow.flow_name, "execution_id": execution_id}
+
+
+@tracer.capture_lambda_handler
+@log_metrics
+def complete_shard_handler(event, _):
+    """
+    This function checkpoints the final status of a shard's flow run and removes the shard flow.
+    The output of a successful run replaces that of any earlier run of the shard.
+    """
+    logger.info(payload(event))
+    shard = DateRangeShard.from_dict(event)
+    flow = GoogleAnalyticsShardFlow(os.environ[BASE_FLOW_NAME], shard)
+    if event["status"] == SHARD_STATUS_SUCCESSFUL:
+        flow.remove_stale_output(event["execution_id"])
+    ShardCheckpoints(os.environ[CHECKPOINT_TABLE_NAME]).put(shard, event["status"], flow.flow_name, event["execution_id"])
+    flow.delete()
+    count(f"ShardFlowRuns{event['status']}")
+
+    return {**shard.to_dict(), "execution_id": event["execution_id"], "status": event["status"]}
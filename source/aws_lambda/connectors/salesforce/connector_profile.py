@@ -13,14 +13,17 @@
 """
 This module is the Lambda responsible for updating a Salesforce Marketing Cloud connection
 """
-import json
 import os
 from aws_lambda_powertools import Logger
-from aws_solutions.core.helpers import get_service_client
 
+import shared.secrets_manager as secrets_manager
+from shared.logs import payload
+from shared.metrics import count, log_metrics
+from shared.tracing import tracer
 from shared.connectors.salesforce.connector import SalesforceConnectorProfile
+from shared.connectors.salesforce.token import AccessTokenException
 
-CONNECTOR_SECRET_ARN = os.environ["CONNECTOR_SECRET_ARN"]
+CONNECTOR_SECRET_ARN = "CONNECTOR_SECRET_ARN"
 
 logger = Logger(utc=True, service="sfmc-lambda-standalone")
 
@@ -35,13 +38,8 @@ class ConnectorProfileFunctionException(Exception):
 
 
 def get_connector_profile():
-    # get the secret from the supplied arn
-    secretsmanager_client = get_service_client("secretsmanager")
-    connection = json.loads(
-        secretsmanager_client.get_secret_value(SecretId=CONNECTOR_SECRET_ARN)[
-            "SecretString"
-        ]
-    )
+    # get the secret from the supplied arn (cached across warm invocations)
+    connection = secrets_manager.get_secret_value(os.environ[CONNECTOR_SECRET_ARN])
     profile = SalesforceConnectorProfile(
         connection["profile_name"],
         connection["client_id"],
@@ -52,15 +50,30 @@ def get_connector_profile():
     return profile
 
 
+def with_connector_profile(action):
+    """
+    Run an action against the connector profile, retrying once with freshly read
+    credentials if the cached ones are rejected by the token endpoint
+    """
+    try:
+        return action(get_connector_profile())
+    except AccessTokenException as error:
+        logger.warning(f"Access token request failed, refreshing the connection secret and retrying: {error}")
+        secrets_manager.invalidate_secret(os.environ[CONNECTOR_SECRET_ARN])
+        count("AccessTokenRetries")
+        return action(get_connector_profile())
+
+
+@tracer.capture_lambda_handler
+@log_metrics
 def create_event_handler(event, _):
     """
     This function is the entry point for Lambda function execution
     """
     try:
-        logger.info(json.dumps(event, default=str))
+        logger.info(payload(event))
         # get the connection configuration
-        profile = get_connector_profile()
-        return profile.create()
+        return with_connector_profile(lambda profile: profile.create())
 
     except Exception as error:
         # log it and continue bubbling
@@ -68,15 +81,16 @@ def create_event_handler(event, _):
         raise error
 
 
+@tracer.capture_lambda_handler
+@log_metrics
 def update_event_handler(event, _):
     """
     This function is the entry point for Lambda function execution
     """
     try:
-        logger.info(json.dumps(event, default=str))
+        logger.info(payload(event))
         # get the connection configuration
-        profile = get_connector_profile()
-        return profile.update()
+        return with_connector_profile(lambda profile: profile.update())
 
     except Exception as error:
         # log it and continue bubbling
@@ -84,14 +98,17 @@ def update_event_handler(event, _):
         raise error
 
 
+@tracer.capture_lambda_handler
+@log_metrics
 def delete_event_handler(event, _):
     """
     This function is the entry point for Lambda function execution
     """
     try:
-        logger.info(json.dumps(event, default=str))
-        # get the connection configuration
-        profile = get_connector_profile()
+        logger.info(payload(event))
+        # deleting only needs the profile name, so no access token is set up
+        connection = secrets_manager.get_secret_value(os.environ[CONNECTOR_SECRET_ARN])
+        profile = SalesforceConnectorProfile(connection["profile_name"])
         return profile.delete()
 
     except Exception as error:
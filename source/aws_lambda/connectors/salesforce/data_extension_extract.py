@@ -0,0 +1,86 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module is the Lambda responsible for extracting a Salesforce Marketing Cloud
+data extension directly to S3, as an alternative to the AppFlow flow
+"""
+import os
+from datetime import datetime, timezone
+
+from aws_lambda_powertools import Logger
+
+import shared.secrets_manager as secrets_manager
+from shared.logs import payload
+from shared.metrics import count, log_metrics
+from shared.tracing import tracer
+from shared.connectors.salesforce.extract import (
+    DEFAULT_MAX_CONCURRENT_PAGES,
+    DEFAULT_PAGE_SIZE,
+    DataExtensionExtractor,
+    DataExtensionRows,
+    ExtractCheckpoints,
+)
+from shared.connectors.salesforce.token import AccessToken
+
+CONNECTOR_SECRET_ARN = "CONNECTOR_SECRET_ARN"
+OUTPUT_BUCKET = "OUTPUT_BUCKET"
+OUTPUT_PREFIX = "OUTPUT_PREFIX"
+CHECKPOINT_TABLE_NAME = "CHECKPOINT_TABLE_NAME"
+
+# stop fetching pages while there is still time to record the checkpoint
+REMAINING_TIME_MARGIN_IN_MILLIS = 60 * 1000
+
+logger = Logger(utc=True, service="sfmc-lambda-extract")
+
+
+@tracer.capture_lambda_handler
+@log_metrics
+def event_handler(event, context):
+    """
+    This function is the entry point for Lambda function execution.
+    Invoke it again with the same extract_id to resume an extract that returned InProgress.
+    """
+    logger.info(payload(event))
+    data_extension_key = event["data_extension_key"]
+    extract_id = event.get("extract_id") or f"{data_extension_key}-{datetime.now(timezone.utc):%Y%m%d}"
+
+    connection = secrets_manager.get_secret_value(os.environ[CONNECTOR_SECRET_ARN])
+    token_data = AccessToken(
+        connection["client_id"], connection["client_secret"], connection["token_endpoint"]
+    ).retrieve_token()
+    rows = DataExtensionRows(
+        connection["instance_url"],
+        data_extension_key,
+        token_data["access_token"],
+        page_size=int(event.get("page_size", DEFAULT_PAGE_SIZE)),
+    )
+    extractor = DataExtensionExtractor(
+        rows,
+        ExtractCheckpoints(os.environ[CHECKPOINT_TABLE_NAME]),
+        os.environ[OUTPUT_BUCKET],
+        max_concurrent_pages=int(event.get("max_concurrent_pages", DEFAULT_MAX_CONCURRENT_PAGES)),
+    )
+
+    checkpoint = extractor.extract(
+        extract_id,
+        f"{os.environ[OUTPUT_PREFIX]}{data_extension_key}/{extract_id}.json",
+        lambda: context.get_remaining_time_in_millis() > REMAINING_TIME_MARGIN_IN_MILLIS,
+    )
+    count(f"DataExtensionExtracts{checkpoint.status}")
+    return {
+        "extract_id": extract_id,
+        "status": checkpoint.status,
+        "next_page": checkpoint.next_page,
+        "page_count": checkpoint.page_count,
+        "location": f"s3://{os.environ[OUTPUT_BUCKET]}/{checkpoint.key}",
+    }
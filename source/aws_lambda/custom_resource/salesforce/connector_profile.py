@@ -18,10 +18,14 @@ working with a Salesforce Marketing Cloud connection in Appflow
 from aws_lambda_powertools import Logger
 from crhelper import CfnResource
 from shared.connectors.salesforce.connector import SalesforceConnectorProfile
+from shared.tracing import tracer
 
 logger = Logger(utc=True, service="sfmc-lambda-custom-resource")
 helper = CfnResource(log_level="ERROR", boto_level="ERROR")
 
+# properties that require new credentials for the connector profile when they change
+CREDENTIAL_PROPERTIES = ["client_id", "client_secret", "token_endpoint"]
+
 
 def connector_profile_from_event(event):
     """
@@ -38,6 +42,15 @@ def connector_profile_from_event(event):
     return (connector, properties["profile_name"])
 
 
+def credentials_changed(event):
+    """
+    Helper to tell whether a stack update changed the connection's credentials
+    """
+    old_properties = event.get("OldResourceProperties", {})
+    properties = event["ResourceProperties"]
+    return any(old_properties.get(name) != properties.get(name) for name in CREDENTIAL_PROPERTIES)
+
+
 @helper.create
 def custom_resource_create(event, _):
     """
@@ -57,7 +70,8 @@ def custom_resource_update(event, _):
     """
     # use parameters passed from the custom resource
     connector, profile_name = connector_profile_from_event(event)
-    connector.update()
+    # only changed properties are written, and the access token only when the credentials changed
+    connector.update(refresh_credentials=credentials_changed(event))
     # return the profile's name as the physical id
     return profile_name
 
@@ -77,6 +91,7 @@ def custom_resource_delete(event, _):
         logger.error(error)
 
 
+@tracer.capture_lambda_handler
 def event_handler(event, context):
     """
     This is the Lambda custom resource entry point.
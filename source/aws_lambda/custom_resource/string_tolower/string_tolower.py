@@ -16,17 +16,20 @@ This module is a custom lambda for string manipulation to lower case
 
 from aws_lambda_powertools import Logger
 from crhelper import CfnResource
+from shared.logs import payload
+from shared.tracing import tracer
 
 
 logger = Logger(utc=True, service='transform-custom-lambda')
 helper = CfnResource(log_level="ERROR", boto_level="ERROR")
 
 
+@tracer.capture_lambda_handler
 def event_handler(event, context):
     """
     This is the Lambda custom resource entry point.
     """
-    logger.info(event)
+    logger.info(payload(event))
     helper(event, context)
 
 
@@ -17,20 +17,27 @@ creating/updating/deleting DataBrew recipe and uploading sample file on create.
 
 import json
 import re
+from functools import partial
 from typing import Union
 from aws_lambda_powertools import Logger
 from crhelper import CfnResource
+from aws_solutions.core.aio import run_calls_bounded
 from aws_solutions.core.helpers import get_service_client
+from shared.logs import payload
+from shared.tracing import tracer
 
 logger = Logger(utc=True, service='transform-custom-lambda')
 helper = CfnResource(log_level="ERROR", boto_level="ERROR")
 
+MAX_CONCURRENT_VERSION_DELETES = 5
 
+
+@tracer.capture_lambda_handler
 def event_handler(event, context):
     """
     This is the Lambda custom resource entry point.
     """
-    logger.info(event)
+    logger.info(payload(event))
     helper(event, context)
 
 
@@ -80,12 +87,12 @@ def on_delete(event, _) -> None:
     )
     recipe_versions: list[str] = [recipe_item["RecipeVersion"] for recipe_item in response["Recipes"]]
 
-    # delete any previous recipe versions 
-    for version in recipe_versions:
-        databrew.delete_recipe_version(
-            Name=recipe_name,
-            RecipeVersion=version,
-        )
+    # delete any previous recipe versions, these are independent of each other
+    run_calls_bounded(
+        [partial(databrew.delete_recipe_version, Name=recipe_name, RecipeVersion=version)
+         for version in recipe_versions],
+        max_concurrency=MAX_CONCURRENT_VERSION_DELETES,
+    )
 
     # delete the latest version
     response: dict[str, str] = databrew.delete_recipe_version(
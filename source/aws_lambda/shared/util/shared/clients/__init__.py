@@ -0,0 +1,74 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains lazily initialized stand-ins for AWS clients and DynamoDB tables. They can be created
+at import time so they are reused across warm invocations, but nothing is built until a handler first uses them.
+"""
+
+import os
+import threading
+
+from aws_solutions.core.helpers import get_service_client, get_service_resource
+
+
+class LazyServiceClient:
+    """
+    This class stands in for a boto3 client that is only created on first use.
+    The client itself is memoized by aws_solutions.core.helpers, so every proxy
+    for the same service, region and config shares one client.
+    """
+
+    def __init__(self, service_name: str, region_name: str = None, config=None) -> None:
+        self.service_name = service_name
+        self.region_name = region_name
+        self.config = config
+
+    def resolve(self):
+        return get_service_client(self.service_name, region_name=self.region_name, config=self.config)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.service_name!r})"
+
+
+class LazyTable:
+    """
+    This class stands in for a DynamoDB table resource whose name is read from an
+    environment variable on first use. The table is rebuilt only if the dynamodb
+    resource or the table name changed since it was last used.
+    """
+
+    def __init__(self, table_name_variable: str) -> None:
+        self.table_name_variable = table_name_variable
+        self._lock = threading.Lock()
+        self._resource = None
+        self._table_name = None
+        self._table = None
+
+    def resolve(self):
+        resource = get_service_resource("dynamodb")
+        table_name = os.environ[self.table_name_variable]
+        with self._lock:
+            if self._table is None or self._resource is not resource or self._table_name != table_name:
+                self._table = resource.Table(table_name)
+                self._resource = resource
+                self._table_name = table_name
+            return self._table
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.table_name_variable!r})"
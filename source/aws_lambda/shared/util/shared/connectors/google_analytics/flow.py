@@ -0,0 +1,141 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains helper functions for running a Google Analytics AppFlow flow over a single date-range shard
+"""
+import copy
+from datetime import datetime, time, timezone
+from typing import Dict, List
+
+from aws_solutions.core.helpers import get_service_client
+
+from shared.connectors.google_analytics.shards import DateRangeShard
+
+DATE_RANGE_FIELD = "ga:date"
+# the shards are written below this prefix of the base flow's output, one fixed prefix per shard
+SHARD_OUTPUT_PREFIX = "shards"
+
+
+class GoogleAnalyticsShardFlow:
+    """
+    This class encapsulates the lifecycle of the on-demand AppFlow flow that extracts one shard.
+    The flow is a copy of the stack's flow with a date-range filter, so shards can run side by side.
+    Each shard is written to its own prefix, which only ever holds the output of the shard's latest flow run.
+    """
+
+    def __init__(self, base_flow_name: str, shard: DateRangeShard) -> None:
+        self.base_flow_name = base_flow_name
+        self.shard = shard
+        self.flow_name = f"{base_flow_name}-{shard.shard_id}"
+        self.output_prefix = f"{base_flow_name}/{SHARD_OUTPUT_PREFIX}/{shard.shard_id}"
+
+    def start(self) -> str:
+        """
+        This function creates (or updates) the shard flow and starts a run of it
+        :return: the execution id of the flow run
+        """
+        appflow_client = get_service_client("appflow")
+        base_flow = appflow_client.describe_flow(flowName=self.base_flow_name)
+        flow_config = {
+            "flowName": self.flow_name,
+            "description": f"{base_flow.get('description', '')} ({self.shard.start_date} to {self.shard.end_date})",
+            "triggerConfig": {"triggerType": "OnDemand"},
+            "sourceFlowConfig": base_flow["sourceFlowConfig"],
+            "destinationFlowConfigList": self.destination_flow_config_list(base_flow["destinationFlowConfigList"]),
+            "tasks": self.tasks(base_flow["tasks"]),
+        }
+
+        # a shard that is extracted again replaces the output of its earlier runs
+        self.remove_output(base_flow["destinationFlowConfigList"])
+
+        try:
+            appflow_client.describe_flow(flowName=self.flow_name)
+            appflow_client.update_flow(**flow_config)
+        except appflow_client.exceptions.ResourceNotFoundException:
+            if base_flow.get("kmsArn"):
+                flow_config["kmsArn"] = base_flow["kmsArn"]
+            appflow_client.create_flow(**flow_config)
+
+        response = appflow_client.start_flow(flowName=self.flow_name)
+        return response["executionId"]
+
+    def delete(self) -> None:
+        """
+        This function removes the shard flow once its run has ended, keeping the account under its flow quota
+        """
+        appflow_client = get_service_client("appflow")
+        try:
+            appflow_client.delete_flow(flowName=self.flow_name, forceDelete=True)
+        except appflow_client.exceptions.ResourceNotFoundException:
+            pass
+
+    def remove_stale_output(self, execution_id: str) -> None:
+        """
+        This function removes the output of the shard's other flow runs, e.g. of a run that ended after its
+        shard was started again, so that only the output of the run execution_id is left
+        """
+        base_flow = get_service_client("appflow").describe_flow(flowName=self.base_flow_name)
+        self.remove_output(base_flow["destinationFlowConfigList"], keep_execution_id=execution_id)
+
+    def remove_output(self, destination_flow_config_list: List[Dict], keep_execution_id: str = None) -> None:
+        """
+        This function deletes the objects below the shard's prefix in the S3 destinations of the flow, except
+        those written by the flow run keep_execution_id
+        """
+        s3_client = get_service_client("s3")
+        paginator = s3_client.get_paginator("list_objects_v2")
+        for destination in destination_flow_config_list:
+            s3_properties = destination.get("destinationConnectorProperties", {}).get("S3")
+            if s3_properties is None:
+                continue
+            for page in paginator.paginate(Bucket=s3_properties["bucketName"], Prefix=f"{self.output_prefix}/"):
+                objects = [
+                    {"Key": item["Key"]} for item in page.get("Contents", [])
+                    if not keep_execution_id or f"/{keep_execution_id}/" not in item["Key"]
+                ]
+                if objects:
+                    s3_client.delete_objects(
+                        Bucket=s3_properties["bucketName"], Delete={"Objects": objects, "Quiet": True}
+                    )
+
+    def destination_flow_config_list(self, destination_flow_config_list: List[Dict]) -> List[Dict]:
+        """
+        Write the shard output to the shard's prefix below the base flow's prefix, where the DataBrew dataset reads from
+        """
+        destinations = copy.deepcopy(destination_flow_config_list)
+        for destination in destinations:
+            s3_properties = destination.get("destinationConnectorProperties", {}).get("S3")
+            if s3_properties is not None:
+                s3_properties["bucketPrefix"] = self.output_prefix
+        return destinations
+
+    def tasks(self, base_tasks: List[Dict]) -> List[Dict]:
+        """
+        Replace any date-range filter of the base flow with the range of this shard
+        """
+        lower_bound = datetime.combine(self.shard.start_date, time.min, tzinfo=timezone.utc)
+        upper_bound = datetime.combine(self.shard.end_date, time.max, tzinfo=timezone.utc)
+        date_range_filter = {
+            "sourceFields": [DATE_RANGE_FIELD],
+            "connectorOperator": {"GoogleAnalytics": "BETWEEN"},
+            "taskType": "Filter",
+            "taskProperties": {
+                "DATA_TYPE": "datetime",
+                "LOWER_BOUND": str(int(lower_bound.timestamp() * 1000)),
+                "UPPER_BOUND": str(int(upper_bound.timestamp() * 1000)),
+            },
+        }
+        return [
+            task for task in base_tasks
+            if not (task["taskType"] == "Filter" and task.get("sourceFields") == [DATE_RANGE_FIELD])
+        ] + [date_range_filter]
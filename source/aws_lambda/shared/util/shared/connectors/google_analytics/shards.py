@@ -0,0 +1,138 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains helper functions for splitting a Google Analytics
+extraction into date-range shards and checkpointing their progress
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Set, Union
+
+from aws_solutions.core.helpers import get_service_resource
+
+SHARD_STATUS_IN_PROGRESS = "InProgress"
+SHARD_STATUS_SUCCESSFUL = "Successful"
+
+
+@dataclass(frozen=True)
+class DateRangeShard:
+    """
+    A date range (both ends inclusive) extracted by a single flow run. Shards are keyed by the calendar-aligned
+    period that they belong to, so a shard of a period that has not ended yet keeps its id while it grows
+    """
+
+    start_date: date
+    end_date: date
+    period_end: Union[date, None] = None
+
+    def __post_init__(self):
+        if self.period_end is None:
+            object.__setattr__(self, "period_end", self.end_date)
+
+    @property
+    def shard_id(self) -> str:
+        return f"{self.start_date:%Y%m%d}-{self.period_end:%Y%m%d}"
+
+    @property
+    def complete(self) -> bool:
+        """Whether the shard covers its period through the end - only then is it not extracted again"""
+        return self.end_date == self.period_end
+
+    def to_dict(self) -> Dict:
+        return {
+            "shard_id": self.shard_id,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "period_end": self.period_end.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, shard: Dict) -> "DateRangeShard":
+        return cls(
+            date.fromisoformat(shard["start_date"]),
+            date.fromisoformat(shard["end_date"]),
+            date.fromisoformat(shard.get("period_end") or shard["end_date"]),
+        )
+
+
+def period_start(day: date, shard_size_in_days: int) -> date:
+    """
+    This function returns the first day of the period of shard_size_in_days days that contains day.
+    Periods are counted from 0001-01-01 (a Monday), so that e.g. 7 day periods run from Monday to Sunday
+    """
+    if shard_size_in_days < 1:
+        raise ValueError("shard_size_in_days must be at least 1")
+    return date.fromordinal((day.toordinal() - 1) // shard_size_in_days * shard_size_in_days + 1)
+
+
+def plan_shards(start_date: date, end_date: date, shard_size_in_days: int) -> List[DateRangeShard]:
+    """
+    This function splits the date range from start_date to end_date (inclusive) into one shard
+    per period of shard_size_in_days days, so that the shards do not move as the range grows
+    """
+    if end_date < start_date:
+        raise ValueError(f"end date {end_date} is before start date {start_date}")
+
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        period_end = period_start(shard_start, shard_size_in_days) + timedelta(days=shard_size_in_days - 1)
+        shards.append(DateRangeShard(shard_start, min(period_end, end_date), period_end))
+        shard_start = period_end + timedelta(days=1)
+    return shards
+
+
+class ShardCheckpoints:
+    """
+    This class records the status of each shard in DynamoDB so that
+    an interrupted backfill resumes from the shards that did not complete
+    """
+
+    def __init__(self, table_name: str) -> None:
+        self.table = get_service_resource("dynamodb").Table(table_name)
+
+    def completed_shard_ids(self) -> Set[str]:
+        """
+        This function returns the ids of the shards whose flow run was successful and covered their whole period
+        """
+        scan_kwargs = {
+            "FilterExpression": "#status = :successful",
+            "ProjectionExpression": "shard_id, end_date, period_end",
+            "ExpressionAttributeNames": {"#status": "status"},
+            "ExpressionAttributeValues": {":successful": SHARD_STATUS_SUCCESSFUL},
+        }
+        shard_ids = set()
+        while True:
+            response = self.table.scan(**scan_kwargs)
+            shard_ids.update(
+                item["shard_id"]
+                for item in response.get("Items", [])
+                if item.get("period_end", item.get("end_date")) == item.get("end_date")
+            )
+            if "LastEvaluatedKey" not in response:
+                return shard_ids
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def put(self, shard: DateRangeShard, status: str, flow_name: str, execution_id: str) -> None:
+        """
+        This function records the latest status of a shard
+        """
+        self.table.put_item(
+            Item={
+                **shard.to_dict(),
+                "status": status,
+                "flow_name": flow_name,
+                "execution_id": execution_id,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            }
+        )
@@ -13,15 +13,20 @@
 """
 This module contains helper functions for working with AppFlow connector profiles
 """
+from typing import Dict, Tuple, Union
 
+from aws_lambda_powertools import Logger
 from aws_solutions.core.helpers import get_service_client
 
 from shared.connectors.salesforce.token import AccessToken
 
+logger = Logger(utc=True)
+
 
 class SalesforceConnectorProfile:
     """
-    This class encapsulates the CUD functions for AppFlow connector profiles
+    This class encapsulates the CUD functions for AppFlow connector profiles.
+    Create and update read the existing profile first and only write what differs from it.
     """
 
     def __init__(
@@ -46,75 +51,124 @@ class SalesforceConnectorProfile:
                 self.client_id, self.client_secret, self.token_endpoint
             )
 
-    def create(self):
+    def describe(self) -> Union[Dict, None]:
+        """
+        This function returns the details of the existing connector profile, or None if there is none
+        """
+        appflow_client = get_service_client("appflow")
+        response = appflow_client.describe_connector_profiles(
+            connectorProfileNames=[self.profile_name]
+        )
+        details = response.get("connectorProfileDetails", [])
+        return details[0] if details else None
+
+    def diff(self, existing: Dict) -> Dict[str, Tuple]:
         """
-        This function is responsible for creating a new AppFlow connector profile
+        This function compares the properties of an existing connector profile with the desired ones
+        :return: the (existing, desired) values of the properties that differ
         """
+        properties = existing.get("connectorProfileProperties", {}).get("CustomConnector", {})
+        current = {
+            "instance_url": properties.get("profileProperties", {}).get("instanceUrl"),
+            "token_endpoint": properties.get("oAuth2Properties", {}).get("tokenUrl"),
+            "grant_type": properties.get("oAuth2Properties", {}).get("oAuth2GrantType"),
+        }
+        desired = {
+            "instance_url": self.instance_url,
+            "token_endpoint": self.token_endpoint,
+            "grant_type": self.grant_type,
+        }
+        return {
+            name: (current[name], desired[name])
+            for name in desired
+            if current[name] != desired[name]
+        }
+
+    def connector_profile_properties(self) -> Dict:
+        return {
+            "CustomConnector": {
+                "profileProperties": {"instanceUrl": self.instance_url},
+                "oAuth2Properties": {
+                    "tokenUrl": self.token_endpoint,
+                    "oAuth2GrantType": self.grant_type,
+                },
+            }
+        }
+
+    def connector_profile_credentials(self) -> Dict:
         # retrieve a fresh access token
         token_data = self.access_token.retrieve_token()
-        # create a new connection profile with the access token
-        appflow_client = get_service_client("appflow")
-        response = appflow_client.create_connector_profile(
-            connectorProfileName=self.profile_name,
-            connectorLabel="SalesforceMarketingCloud",
-            connectionMode=self.connector_mode,
-            connectorType="CustomConnector",
-            connectorProfileConfig={
-                "connectorProfileProperties": {
-                    "CustomConnector": {
-                        "profileProperties": {"instanceUrl": self.instance_url},
-                        "oAuth2Properties": {
-                            "tokenUrl": self.token_endpoint,
-                            "oAuth2GrantType": self.grant_type,
-                        },
-                    }
+        return {
+            "CustomConnector": {
+                "authenticationType": "OAUTH2",
+                "oauth2": {
+                    "clientId": self.client_id,
+                    "clientSecret": self.client_secret,
+                    "accessToken": token_data["access_token"],
                 },
-                "connectorProfileCredentials": {
-                    "CustomConnector": {
-                        "authenticationType": "OAUTH2",
-                        "oauth2": {
-                            "clientId": self.client_id,
-                            "clientSecret": self.client_secret,
-                            "accessToken": token_data["access_token"],
-                        },
-                    }
+            }
+        }
+
+    def create(self):
+        """
+        This function is responsible for creating a new AppFlow connector profile.
+        A profile that already exists (e.g. from a retried deployment) is reconciled instead.
+        """
+        existing = self.describe()
+        if existing:
+            logger.info(f"Connector profile {self.profile_name} already exists, reconciling it")
+            return self.reconcile(existing, refresh_credentials=True)
+
+        appflow_client = get_service_client("appflow")
+        try:
+            response = appflow_client.create_connector_profile(
+                connectorProfileName=self.profile_name,
+                connectorLabel="SalesforceMarketingCloud",
+                connectionMode=self.connector_mode,
+                connectorType="CustomConnector",
+                connectorProfileConfig={
+                    "connectorProfileProperties": self.connector_profile_properties(),
+                    "connectorProfileCredentials": self.connector_profile_credentials(),
                 },
-            },
-        )
+            )
+        except appflow_client.exceptions.ConflictException:
+            logger.info(f"Connector profile {self.profile_name} was created concurrently, reconciling it")
+            return self.reconcile(self.describe(), refresh_credentials=True)
         return response["connectorProfileArn"]
 
-    def update(self):
+    def update(self, refresh_credentials=True):
         """
-        This function is used to update the token used with a connector profile
+        This function is used to update the token used with a connector profile,
+        and any of its properties that differ from the desired ones
         """
-        # retrieve a fresh access token
-        token_data = self.access_token.retrieve_token()
-        # create an existing connection profile with the access token
+        existing = self.describe()
+        if not existing:
+            logger.info(f"Connector profile {self.profile_name} does not exist, creating it")
+            return self.create()
+        return self.reconcile(existing, refresh_credentials)
+
+    def reconcile(self, existing: Dict, refresh_credentials: bool):
+        """
+        This function applies the changed properties (and fresh credentials when requested)
+        to an existing connector profile, skipping the update when there is nothing to apply
+        """
+        changes = self.diff(existing)
+        if not changes and not refresh_credentials:
+            logger.info(f"Connector profile {self.profile_name} is up to date")
+            return existing["connectorProfileArn"]
+
+        # AppFlow requires the properties in every update, even when only the credentials change
+        connector_profile_config = {"connectorProfileProperties": self.connector_profile_properties()}
+        if changes:
+            logger.info(f"Updating connector profile {self.profile_name} properties: {sorted(changes)}")
+        if refresh_credentials:
+            connector_profile_config["connectorProfileCredentials"] = self.connector_profile_credentials()
+
         appflow_client = get_service_client("appflow")
         response = appflow_client.update_connector_profile(
             connectorProfileName=self.profile_name,
             connectionMode=self.connector_mode,
-            connectorProfileConfig={
-                "connectorProfileProperties": {
-                    "CustomConnector": {
-                        "profileProperties": {"instanceUrl": self.instance_url},
-                        "oAuth2Properties": {
-                            "tokenUrl": self.token_endpoint,
-                            "oAuth2GrantType": self.grant_type,
-                        },
-                    }
-                },
-                "connectorProfileCredentials": {
-                    "CustomConnector": {
-                        "authenticationType": "OAUTH2",
-                        "oauth2": {
-                            "clientId": self.client_id,
-                            "clientSecret": self.client_secret,
-                            "accessToken": token_data["access_token"],
-                        },
-                    }
-                },
-            },
+            connectorProfileConfig=connector_profile_config,
         )
         return response["connectorProfileArn"]
 
@@ -0,0 +1,259 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains helper functions for extracting the rows of an SFMC data extension
+directly to S3 as newline delimited JSON, without going through AppFlow
+"""
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import requests
+from aws_lambda_powertools import Logger
+from aws_solutions.core.helpers import get_service_client, get_service_resource
+
+from shared.metrics import count
+
+logger = Logger(utc=True)
+
+DEFAULT_PAGE_SIZE = 2500
+DEFAULT_MAX_CONCURRENT_PAGES = 4
+DEFAULT_PART_SIZE_IN_BYTES = 8 * 1024 * 1024
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+MAX_REQUEST_ATTEMPTS = 3
+
+EXTRACT_STATUS_IN_PROGRESS = "InProgress"
+EXTRACT_STATUS_COMPLETED = "Completed"
+
+
+class DataExtensionExtractException(Exception):
+    """
+    This class is a subclass of Exception for data extension extract errors
+    """
+
+    def __init__(self, *args: object) -> None:
+        super().__init__(*args)
+
+
+class DataExtensionRows:
+    """
+    This class encapsulates the HTTP layer for paging
+    through the rows of a data extension with the SFMC REST API
+    """
+
+    def __init__(self, instance_url, data_extension_key, access_token, page_size=DEFAULT_PAGE_SIZE) -> None:
+        self.url = f"{instance_url.rstrip('/')}/data/v1/customobjectdata/key/{data_extension_key}/rowset"
+        self.headers = {"Authorization": f"Bearer {access_token}"}
+        self.page_size = page_size
+
+    def get_page(self, page: int) -> Dict:
+        """
+        This function retrieves a single (1-based) page of rows, retrying throttled and failed requests
+        """
+        for attempt in range(1, MAX_REQUEST_ATTEMPTS + 1):
+            response = requests.get(
+                self.url,
+                params={"$page": page, "$pageSize": self.page_size},
+                headers=self.headers,
+                timeout=30,
+            )
+            if response.ok:
+                return response.json()
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == MAX_REQUEST_ATTEMPTS:
+                break
+            time.sleep(2 ** attempt)
+        raise DataExtensionExtractException(f"{response.status_code} status returned from {self.url} for page {page}")
+
+    def get_rows(self, page: int) -> List[Dict]:
+        """
+        This function retrieves a page of rows, each flattened to a single record of its keys and values
+        """
+        return self.records(self.get_page(page))
+
+    @staticmethod
+    def records(page: Dict) -> List[Dict]:
+        return [{**item.get("keys", {}), **item.get("values", {})} for item in page.get("items", [])]
+
+    def page_count(self, first_page: Dict) -> int:
+        return max(1, -(-first_page.get("count", 0) // self.page_size))
+
+
+@dataclass
+class ExtractCheckpoint:
+    """
+    The progress of an extract: the multipart upload it writes to and the first page not yet uploaded
+    """
+
+    extract_id: str
+    key: str
+    upload_id: str
+    page_count: int
+    next_page: int = 1
+    parts: List[Dict] = field(default_factory=list)
+    status: str = EXTRACT_STATUS_IN_PROGRESS
+
+
+class ExtractCheckpoints:
+    """
+    This class stores extract checkpoints in DynamoDB so that an extract cut short resumes where it stopped
+    """
+
+    def __init__(self, table_name: str) -> None:
+        self.table = get_service_resource("dynamodb").Table(table_name)
+
+    def get(self, extract_id: str):
+        item = self.table.get_item(Key={"extract_id": extract_id}, ConsistentRead=True).get("Item")
+        if not item:
+            return None
+        return ExtractCheckpoint(
+            extract_id=item["extract_id"],
+            key=item["key"],
+            upload_id=item["upload_id"],
+            page_count=int(item["page_count"]),
+            next_page=int(item["next_page"]),
+            parts=[{"PartNumber": int(part["PartNumber"]), "ETag": part["ETag"]} for part in item["parts"]],
+            status=item["status"],
+        )
+
+    def put(self, checkpoint: ExtractCheckpoint) -> None:
+        self.table.put_item(Item=checkpoint.__dict__)
+
+
+class MultipartNdjsonUpload:
+    """
+    This class buffers rows as newline delimited JSON and writes them to S3 as the parts of a multipart upload
+    """
+
+    def __init__(self, bucket: str, key: str, upload_id: str, parts: List[Dict] = None) -> None:
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = upload_id
+        self.parts = list(parts or [])
+        self.buffer = io.BytesIO()
+
+    @classmethod
+    def start(cls, bucket: str, key: str) -> "MultipartNdjsonUpload":
+        response = get_service_client("s3").create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType="application/x-ndjson"
+        )
+        return cls(bucket, key, response["UploadId"])
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self.buffer.tell()
+
+    def write(self, rows: List[Dict]) -> None:
+        for row in rows:
+            self.buffer.write(json.dumps(row, default=str).encode("utf-8"))
+            self.buffer.write(b"\n")
+
+    def flush(self) -> None:
+        """
+        This function uploads the buffered rows as the next part of the upload
+        """
+        part_number = len(self.parts) + 1
+        response = get_service_client("s3").upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=self.buffer.getvalue(),
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        self.buffer = io.BytesIO()
+
+    def complete(self) -> None:
+        if self.buffered_bytes or not self.parts:
+            self.flush()
+        get_service_client("s3").complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": self.parts},
+        )
+
+
+class DataExtensionExtractor:
+    """
+    This class streams every row of a data extension into a single S3 object.
+    Pages are fetched concurrently and written in order; the checkpoint only advances
+    once a part is uploaded, so a resumed extract refetches at most one part's worth of pages.
+    """
+
+    def __init__(
+        self,
+        rows: DataExtensionRows,
+        checkpoints: ExtractCheckpoints,
+        bucket: str,
+        max_concurrent_pages: int = DEFAULT_MAX_CONCURRENT_PAGES,
+        part_size_in_bytes: int = DEFAULT_PART_SIZE_IN_BYTES,
+    ) -> None:
+        self.rows = rows
+        self.checkpoints = checkpoints
+        self.bucket = bucket
+        self.max_concurrent_pages = max_concurrent_pages
+        self.part_size_in_bytes = part_size_in_bytes
+
+    def extract(self, extract_id: str, key: str, has_time_remaining: Callable[[], bool] = lambda: True) -> ExtractCheckpoint:
+        """
+        This function extracts (or resumes extracting) the data extension to s3://bucket/key
+        :param has_time_remaining: checked before each batch of pages, the extract stops early when it returns False
+        :return: the checkpoint of the extract, with status Completed once the object is written
+        """
+        checkpoint = self.checkpoints.get(extract_id)
+        if checkpoint and checkpoint.status == EXTRACT_STATUS_COMPLETED:
+            logger.info(f"Extract {extract_id} was already completed")
+            return checkpoint
+
+        prefetched = {}
+        if not checkpoint:
+            first_page = self.rows.get_page(1)
+            upload = MultipartNdjsonUpload.start(self.bucket, key)
+            checkpoint = ExtractCheckpoint(extract_id, key, upload.upload_id, self.rows.page_count(first_page))
+            prefetched[1] = self.rows.records(first_page)
+            self.checkpoints.put(checkpoint)
+        upload = MultipartNdjsonUpload(self.bucket, checkpoint.key, checkpoint.upload_id, checkpoint.parts)
+
+        page = checkpoint.next_page
+        first_page = page
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_pages) as executor:
+            while page <= checkpoint.page_count:
+                if not has_time_remaining():
+                    logger.info(f"Extract {extract_id} stopped before page {checkpoint.next_page} of {checkpoint.page_count}")
+                    count("DataExtensionPagesExtracted", checkpoint.next_page - first_page)
+                    return checkpoint
+
+                batch = range(page, min(page + self.max_concurrent_pages, checkpoint.page_count + 1))
+                fetched = executor.map(
+                    lambda number: prefetched[number] if number in prefetched else self.rows.get_rows(number), batch
+                )
+                for page_number, page_rows in zip(batch, fetched):
+                    upload.write(page_rows)
+                    if upload.buffered_bytes >= self.part_size_in_bytes:
+                        upload.flush()
+                        checkpoint.next_page = page_number + 1
+                        checkpoint.parts = upload.parts
+                        self.checkpoints.put(checkpoint)
+                page = batch.stop
+
+        upload.complete()
+        count("DataExtensionPagesExtracted", checkpoint.page_count + 1 - first_page)
+        checkpoint.next_page = checkpoint.page_count + 1
+        checkpoint.parts = upload.parts
+        checkpoint.status = EXTRACT_STATUS_COMPLETED
+        self.checkpoints.put(checkpoint)
+        logger.info(f"Extract {extract_id} wrote {checkpoint.page_count} pages to s3://{self.bucket}/{checkpoint.key}")
+        return checkpoint
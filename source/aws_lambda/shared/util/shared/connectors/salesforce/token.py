@@ -14,7 +14,7 @@
 This module contains helper functions for obtaining
 an access token directly from SFMC
 """
-import requests
+from shared.metrics import timer
 
 
 class AccessTokenException(Exception):
@@ -48,7 +48,11 @@ class AccessToken:
         This function is responsible for retrieving a
         token over HTTP from an OIDC provider
         """
-        response = requests.post(self.token_endpoint, json=self.body, timeout=10)
+        # requests is only needed once a token is actually requested
+        import requests
+
+        with timer("AccessTokenLatency"):
+            response = requests.post(self.token_endpoint, json=self.body, timeout=10)
         if not response.ok:
             raise AccessTokenException(
                 f"{response.status_code} status returned from {self.token_endpoint}"
@@ -0,0 +1,114 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains the logging helpers shared by the Lambda functions, so that the cost of logging
+follows the number of invocations rather than the number or size of the records they process
+"""
+
+import functools
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, List
+
+# the fraction of invocations logged at DEBUG level, as for the powertools logger
+DEBUG_SAMPLE_RATE = "POWERTOOLS_LOGGER_SAMPLE_RATE"
+LOG_PAYLOAD_MAX_CHARS = "LOG_PAYLOAD_MAX_CHARS"
+DEFAULT_PAYLOAD_MAX_CHARS = 2048
+DEFAULT_MAX_SAMPLES = 5
+
+
+def payload_max_chars() -> int:
+    return int(os.environ.get(LOG_PAYLOAD_MAX_CHARS, DEFAULT_PAYLOAD_MAX_CHARS))
+
+
+def truncate(text: str, max_chars: int = None) -> str:
+    """
+    This function shortens a logged value to at most max_chars characters, noting how much was left out
+    """
+    max_chars = payload_max_chars() if max_chars is None else max_chars
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... ({len(text) - max_chars} more characters)"
+
+
+class Payload:
+    """
+    This class defers serializing and truncating a logged payload until the log record is emitted,
+    so nothing is spent on it when its level is disabled
+    """
+
+    def __init__(self, value: Any, max_chars: int = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return truncate(json.dumps(self.value, default=str), self.max_chars)
+
+
+def payload(value: Any, max_chars: int = None) -> Payload:
+    """
+    This function returns a payload to log, e.g. logger.info(payload(event))
+    """
+    return Payload(value, max_chars)
+
+
+def resample_debug_logs(logger: logging.Logger, sample_rate: float = None) -> None:
+    """
+    This function sets the logger to DEBUG level for a sampled fraction of invocations
+    and back to its configured level for the others
+    """
+    sample_rate = float(os.environ.get(DEBUG_SAMPLE_RATE, 0)) if sample_rate is None else sample_rate
+    configured_level = getattr(logger, "log_level", logging.INFO)
+    logger.setLevel(logging.DEBUG if random.random() < sample_rate else configured_level)  # nosec
+
+
+def sample_debug_logs(logger: logging.Logger):
+    """
+    This decorator samples the invocations of a handler logged at DEBUG level
+    """
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def decorate(event, context):
+            resample_debug_logs(logger)
+            return handler(event, context)
+
+        return decorate
+
+    return decorator
+
+
+class BatchSummary:
+    """
+    This class aggregates the records of a batch into one log line, which keeps a few of them as samples.
+    The records themselves are only logged at DEBUG level.
+    """
+
+    def __init__(self, logger: logging.Logger, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.logger = logger
+        self.max_samples = max_samples
+        self.count = 0
+        self.samples: List[Dict[str, Any]] = []
+
+    def add(self, **record: Any) -> None:
+        self.count += 1
+        if len(self.samples) < self.max_samples:
+            self.samples.append(record)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(payload(record))
+
+    def log(self, message: str, *args: Any, level: int = logging.INFO) -> None:
+        self.logger.log(level, message, *args, extra={"record_count": self.count, "sampled_records": self.samples},
+                        stacklevel=2)
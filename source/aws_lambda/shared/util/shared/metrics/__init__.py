@@ -0,0 +1,91 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains the pipeline metrics shared by the Lambda functions. Metrics are written to the
+function logs in CloudWatch Embedded Metric Format, so publishing them takes no extra API calls.
+"""
+
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from aws_lambda_powertools import Metrics
+from aws_lambda_powertools.metrics import MetricUnit, single_metric
+
+METRICS_NAMESPACE = "DataConnectorsForAWSCleanRooms"
+# dimension values are set on the functions by the connector stacks
+STACK_NAME = "STACK_NAME"
+CONNECTOR_NAME = "CONNECTOR_NAME"
+
+metrics = Metrics(namespace=METRICS_NAMESPACE)
+_is_cold_start = True
+
+
+def default_dimensions() -> Dict[str, str]:
+    """
+    This function returns the dimensions every pipeline metric is recorded with
+    """
+    return {
+        "stack": os.environ.get(STACK_NAME, "unknown"),
+        "connector": os.environ.get(CONNECTOR_NAME, "unknown"),
+    }
+
+
+def log_metrics(handler):
+    """
+    This decorator flushes the metrics recorded during an invocation when the handler returns or raises,
+    along with a ColdStart metric (1 on the first invocation of the execution environment, 0 afterwards)
+    """
+
+    @functools.wraps(handler)
+    def decorate(event, context):
+        global _is_cold_start
+        metrics.set_default_dimensions(**default_dimensions())
+        metrics.add_metric(name="ColdStart", unit=MetricUnit.Count, value=1 if _is_cold_start else 0)
+        _is_cold_start = False
+        return handler(event, context)
+
+    return metrics.log_metrics(decorate)
+
+
+def count(name: str, value: float = 1) -> None:
+    """
+    This function records a count metric for the current invocation
+    """
+    metrics.add_metric(name=name, unit=MetricUnit.Count, value=value)
+
+
+def count_for_watching_key(name: str, watching_key: str, value: float = 1) -> None:
+    """
+    This function records a count metric with the watching key as an extra dimension. It is published
+    on its own, so the watching key does not become a dimension of the other metrics of the invocation
+    """
+    with single_metric(name=name, unit=MetricUnit.Count, value=value, namespace=METRICS_NAMESPACE) as metric:
+        for dimension, dimension_value in default_dimensions().items():
+            metric.add_dimension(name=dimension, value=dimension_value)
+        # CloudWatch dimension values are limited to 1024 characters
+        metric.add_dimension(name="watching_key", value=watching_key[:1024] or "none")
+
+
+@contextmanager
+def timer(name: str):
+    """
+    This context manager records how long its block took, in milliseconds, whether or not it raised
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_metric(name=name, unit=MetricUnit.Milliseconds, value=(time.perf_counter() - start) * 1000)
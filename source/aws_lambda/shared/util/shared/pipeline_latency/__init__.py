@@ -0,0 +1,148 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains the per-run pipeline latency record: the times at which the data of a DataBrew
+job run moved through the pipeline, the latency of each stage, and percentile summaries over many runs
+"""
+
+import math
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Union
+
+from aws_lambda_powertools.metrics import MetricUnit
+from aws_solutions.core.helpers import get_service_resource
+
+from shared.metrics import metrics
+
+FIRST_UPLOAD_TIME = "first_upload_time"
+LAST_UPLOAD_TIME = "last_upload_time"
+WORKFLOW_START_TIME = "workflow_start_time"
+DATABREW_START_TIME = "databrew_start_time"
+DATABREW_END_TIME = "databrew_end_time"
+CALLBACK_TIME = "callback_time"
+
+# the times the workflow passes along to the DataBrew job launch
+RUN_TIMING_FIELDS = (FIRST_UPLOAD_TIME, LAST_UPLOAD_TIME, WORKFLOW_START_TIME)
+
+# each stage runs from its start time to its end time
+STAGES = {
+    "UploadWindow": (FIRST_UPLOAD_TIME, LAST_UPLOAD_TIME),
+    "UploadToWorkflowStart": (FIRST_UPLOAD_TIME, WORKFLOW_START_TIME),
+    "WorkflowToDataBrewStart": (WORKFLOW_START_TIME, DATABREW_START_TIME),
+    "DataBrewRun": (DATABREW_START_TIME, DATABREW_END_TIME),
+    "DataBrewEndToCallback": (DATABREW_END_TIME, CALLBACK_TIME),
+    "LastUploadToCallback": (LAST_UPLOAD_TIME, CALLBACK_TIME),
+    "EndToEnd": (FIRST_UPLOAD_TIME, CALLBACK_TIME),
+}
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def format_time(value: datetime) -> str:
+    """
+    This function formats a time the way S3 event notifications do, so the recorded times sort as strings
+    """
+    return value.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def parse_time(value: Union[str, None]) -> Union[datetime, None]:
+    """
+    This function parses an ISO 8601 time from an S3 event, a Step Functions context object or an EventBridge event
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def now() -> str:
+    """
+    This function returns the current time, formatted like the other recorded times
+    """
+    return format_time(datetime.now(timezone.utc))
+
+
+def stage_durations(record: Dict) -> Dict[str, float]:
+    """
+    This function returns the latency in milliseconds of each stage whose start and end times are both recorded
+    """
+    durations = {}
+    for stage, (start_field, end_field) in STAGES.items():
+        start, end = parse_time(record.get(start_field)), parse_time(record.get(end_field))
+        if start and end and end >= start:
+            durations[stage] = (end - start).total_seconds() * 1000
+    return durations
+
+
+def record_stage_metrics(durations: Dict[str, float]) -> None:
+    """
+    This function adds the stage latencies of a run to the metrics of the current invocation
+    """
+    for stage, duration in durations.items():
+        metrics.add_metric(name=f"{stage}Latency", unit=MetricUnit.Milliseconds, value=duration)
+
+
+def as_item_durations(durations: Dict[str, float]) -> Dict[str, Decimal]:
+    # DynamoDB does not take floats
+    return {stage: Decimal(str(round(duration))) for stage, duration in durations.items()}
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    This function returns the pct-th percentile of the values, interpolating linearly between the closest ranks
+    """
+    if not values:
+        raise ValueError("no values to compute a percentile of")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(records: Iterable[Dict], percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict]:
+    """
+    This function computes the count and the percentiles of the latency of each stage over the runs
+    """
+    by_stage: Dict[str, List[float]] = {}
+    for record in records:
+        for stage, duration in stage_durations(record).items():
+            by_stage.setdefault(stage, []).append(duration)
+
+    return {
+        stage: {
+            "count": len(by_stage[stage]),
+            **{f"p{pct:g}": round(percentile(by_stage[stage], pct), 1) for pct in percentiles},
+        }
+        for stage in STAGES
+        if stage in by_stage
+    }
+
+
+def completed_runs(table_name: str, start: datetime, end: datetime) -> List[Dict]:
+    """
+    This function returns the run records of the token table whose callback happened between start and end
+    """
+    table = get_service_resource("dynamodb").Table(table_name)
+    scan_kwargs = {
+        "FilterExpression": "#callback_time BETWEEN :start AND :end",
+        "ExpressionAttributeNames": {"#callback_time": CALLBACK_TIME},
+        "ExpressionAttributeValues": {":start": format_time(start), ":end": format_time(end)},
+    }
+    runs = []
+    while True:
+        response = table.scan(**scan_kwargs)
+        runs.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return runs
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
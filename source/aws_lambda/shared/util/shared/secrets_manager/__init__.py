@@ -11,18 +11,27 @@
 #   the specific language governing permissions and limitations under the License.                                     #
 # ######################################################################################################################
 
-import botocore
 from aws_lambda_powertools import Logger
-from aws_solutions.core.helpers import get_service_client
 from botocore.exceptions import ClientError
 
+from shared.secrets_manager.cache import SecretCache, DEFAULT_VERSION_STAGE
+
 logger = Logger(utc=True)
 
+# module scoped so that cached secrets are reused across warm invocations
+secret_cache = SecretCache()
+
 
-def get_secret_value(secret_name):
-    service_client = get_service_client("secretsmanager")
+def get_secret_value(secret_name, version_stage=DEFAULT_VERSION_STAGE):
+    """Method to get the parsed value of a secret, served from the secret cache when possible"""
     try:
-        service_client.get_secret_value(SecretId=secret_name)
+        return secret_cache.get(secret_name, version_stage)
     except ClientError as error:
         logger.error(f"Error occured when trying secret: {secret_name}. Following error occured: {str(error)}")
         raise error
+
+
+def invalidate_secret(secret_name=None):
+    """Method to force the next read of a secret (or of all secrets) to go to Secrets Manager"""
+    logger.debug(f"Invalidating cached secret: {secret_name or 'all'}")
+    secret_cache.invalidate(secret_name)
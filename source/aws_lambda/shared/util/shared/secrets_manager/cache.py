@@ -0,0 +1,114 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#   Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#   on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#   the specific language governing permissions and limitations under the License.                                     #
+# ######################################################################################################################
+"""
+This module contains an in-memory cache for Secrets Manager secrets that lives
+for the lifetime of the Lambda execution environment
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple, Union
+
+import botocore
+from aws_lambda_powertools import Logger
+from aws_solutions.core.helpers import get_service_client
+
+logger = Logger(utc=True)
+
+DEFAULT_TTL_IN_SECONDS = 300
+DEFAULT_VERSION_STAGE = "AWSCURRENT"
+
+
+@dataclass
+class CachedSecret:
+    """
+    A parsed secret value along with the version it was read from
+    """
+
+    value: Any
+    version_id: str
+    expires_at: float
+
+
+class SecretCache:
+    """
+    This class caches parsed secret values by secret id and version stage.
+    Once an entry is older than the TTL, the version currently attached to its
+    version stage is checked and the value is only fetched again if it changed.
+    """
+
+    def __init__(self, ttl_in_seconds: int = DEFAULT_TTL_IN_SECONDS,
+                 service_client: botocore.client.BaseClient = None) -> None:
+        self.ttl_in_seconds = ttl_in_seconds
+        self._service_client = service_client
+        self._secrets: Dict[Tuple[str, str], CachedSecret] = {}
+
+    @property
+    def service_client(self) -> botocore.client.BaseClient:
+        if not self._service_client:
+            self._service_client = get_service_client("secretsmanager")
+        return self._service_client
+
+    def get(self, secret_id: str, version_stage: str = DEFAULT_VERSION_STAGE) -> Any:
+        """
+        Get the parsed value of a secret, calling Secrets Manager only when the cached entry is missing or stale
+        """
+        key = (secret_id, version_stage)
+        cached = self._secrets.get(key)
+        now = time.monotonic()
+
+        if cached and now < cached.expires_at:
+            return cached.value
+
+        if cached and self._staged_version_id(secret_id, version_stage) == cached.version_id:
+            logger.debug(f"Secret {secret_id} ({version_stage}) is unchanged, extending its cache entry")
+            cached.expires_at = now + self.ttl_in_seconds
+            return cached.value
+
+        response = self.service_client.get_secret_value(SecretId=secret_id, VersionStage=version_stage)
+        self._secrets[key] = CachedSecret(
+            value=self._parse(response),
+            version_id=response.get("VersionId", ""),
+            expires_at=now + self.ttl_in_seconds,
+        )
+        return self._secrets[key].value
+
+    def invalidate(self, secret_id: str = None) -> None:
+        """
+        Drop the cached entries for a secret (or every secret when no id is passed),
+        e.g. after the secret was rejected by the system it authenticates against
+        """
+        if secret_id is None:
+            self._secrets.clear()
+            return
+        for key in [key for key in self._secrets if key[0] == secret_id]:
+            del self._secrets[key]
+
+    def _staged_version_id(self, secret_id: str, version_stage: str) -> Union[str, None]:
+        versions = self.service_client.describe_secret(SecretId=secret_id).get("VersionIdsToStages", {})
+        for version_id, stages in versions.items():
+            if version_stage in stages:
+                return version_id
+        return None
+
+    @staticmethod
+    def _parse(response: Dict) -> Any:
+        if "SecretString" not in response:
+            return response.get("SecretBinary")
+
+        secret_string = response["SecretString"]
+        try:
+            return json.loads(secret_string)
+        except ValueError:
+            return secret_string
@@ -0,0 +1,71 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+"""
+This module contains the tracer shared by the Lambda functions and the trace context carried through
+the pipeline (in the state machine input and the task token item), so that the traces of one run can
+be found together in X-Ray by their correlation_id annotation
+"""
+
+import os
+import uuid
+from typing import Dict
+
+from aws_lambda_powertools import Tracer
+
+# set by the Lambda runtime for every invocation, e.g. Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1
+TRACE_HEADER = "_X_AMZN_TRACE_ID"
+CORRELATION_ID = "correlation_id"
+TRACE_ID = "trace_id"
+
+# boto3 and requests are patched, so every AWS and HTTP call is recorded as a subsegment
+tracer = Tracer()
+
+
+def current_trace_header() -> str:
+    """
+    This function returns the X-Ray trace header of the current invocation, or an empty string when it is not traced
+    """
+    return os.environ.get(TRACE_HEADER, "")
+
+
+def root_trace_id(trace_header: str) -> str:
+    """
+    This function returns the root trace id of an X-Ray trace header
+    """
+    for part in trace_header.split(";"):
+        key, _, value = part.partition("=")
+        if key.strip() == "Root":
+            return value.strip()
+    return ""
+
+
+def new_trace_context() -> Dict[str, str]:
+    """
+    This function starts the trace context of a new run from the current invocation
+    """
+    return {
+        CORRELATION_ID: str(uuid.uuid4()),
+        TRACE_ID: root_trace_id(current_trace_header()),
+    }
+
+
+def annotate(correlation_id: str, **annotations: str) -> None:
+    """
+    This function annotates the trace of the current invocation so it can be found by
+    correlation id (and any other annotation) with an X-Ray filter expression
+    """
+    if correlation_id:
+        tracer.put_annotation(key=CORRELATION_ID, value=correlation_id)
+    for key, value in annotations.items():
+        if value:
+            tracer.put_annotation(key=key, value=value)
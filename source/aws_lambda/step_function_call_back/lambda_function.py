@@ -18,11 +18,24 @@ import shared.stepfunctions as stepfunctions
 
 from aws_lambda_powertools import Logger
 from boto3.dynamodb.conditions import Key
-from aws_solutions.core.helpers import get_service_resource
+from shared.clients import LazyTable
+from shared.metrics import count, log_metrics, timer
+from shared.pipeline_latency import (
+    CALLBACK_TIME,
+    DATABREW_END_TIME,
+    as_item_durations,
+    now,
+    record_stage_metrics,
+    stage_durations,
+)
+from shared.tracing import CORRELATION_ID, TRACE_ID, annotate, tracer
 
 logger = Logger(utc=True)
 DDB_TABLE_NAME = "DDB_TABLE_NAME"
 
+# created on first use and reused across warm invocations
+ddb_table = LazyTable(DDB_TABLE_NAME)
+
 
 def verify_env_setup():
     if not (os.environ.get(DDB_TABLE_NAME)):
@@ -31,6 +44,8 @@ def verify_env_setup():
         raise ValueError(err_msg)
 
 
+@tracer.capture_lambda_handler
+@log_metrics
 def handler(event, _):
     verify_env_setup()
 
@@ -39,11 +54,14 @@ def handler(event, _):
         logger.info(
             f"Querying the dynamodb table {DDB_TABLE_NAME} to retrieve the token for the following job {job_id}")
 
-        ddb_client = get_service_resource('dynamodb')
-        ddb_table = ddb_client.Table(os.environ["DDB_TABLE_NAME"])
-        response = ddb_table.query(KeyConditionExpression=Key("job_id"). \
-                                   eq(job_id))
-        task_token = response["Items"][0]["task_token"]
+        with timer("DynamoDBQueryLatency"):
+            response = ddb_table.query(KeyConditionExpression=Key("job_id"). \
+                                       eq(job_id))
+        item = response["Items"][0]
+        task_token = item["task_token"]
+        # join the trace of the run the job was started by
+        annotate(item.get(CORRELATION_ID), originating_trace_id=item.get(TRACE_ID), job_run_id=job_id)
+        logger.append_keys(correlation_id=item.get(CORRELATION_ID))
     except Exception as err:
         logger.error(f"The following error were found while querying database to "
                      f"retrieve the task_token ==>> {err}")
@@ -51,5 +69,25 @@ def handler(event, _):
         raise err
 
     logger.info("The Token is found and retrieved. Communicating with step function to continue...")
-    stepfunctions.send_task_success(json.dumps({"status": "Success",
-                                                "job_run_id": job_id}), task_token)
+    with timer("StepFunctionsSendTaskSuccessLatency"):
+        stepfunctions.send_task_success(json.dumps({"status": "Success",
+                                                    "job_run_id": job_id}), task_token)
+    count("CallbacksSent")
+    record_run_latency(item, event)
+
+
+def record_run_latency(item, event):
+    """
+    Complete the pipeline latency record of the run and publish its stage latencies.
+    The workflow was already called back, so a failure here is only logged.
+    """
+    try:
+        item[DATABREW_END_TIME] = event.get("time", "")
+        item[CALLBACK_TIME] = now()
+        item["databrew_state"] = event["detail"].get("state", "")
+        durations = stage_durations(item)
+        item["stage_latencies_ms"] = as_item_durations(durations)
+        record_stage_metrics(durations)
+        ddb_table.put_item(Item=item)
+    except Exception as err:
+        logger.error(f"The pipeline latency of job run {item.get('job_id')} could not be recorded: {err}")
@@ -12,24 +12,39 @@
 # #####################################################################################################################
 
 import importlib.util
+import json
 import logging
 import os
 import platform
+import shutil
 import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Union
+from typing import Dict, List, Set, Tuple, Union
 
 import jsii
 from aws_cdk import ILocalBundling, BundlingOptions
 from aws_cdk.aws_lambda import Runtime
 
+from aws_solutions.cdk.aws_lambda.python.slimming import BundleProfile, size_report
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import BundlingTarget, Wheelhouse, out_of_tree_requirements
 from aws_solutions.cdk.helpers import copytree
+from aws_solutions.cdk.helpers.timings import SynthTimings
 
 DEFAULT_RUNTIME = Runtime.PYTHON_3_7
 BUNDLER_DEPENDENCIES_CACHE = "/var/dependencies"
 REQUIREMENTS_TXT_FILE = "requirements.txt"
 REQUIREMENTS_PIPENV_FILE = "Pipfile"
 REQUIREMENTS_POETRY_FILE = "pyproject.toml"
+# part of the content hash of bundled assets - change it whenever a change to this bundler changes its output
+BUNDLER_VERSION = "2"
+BUNDLING_WORKERS = "SOLUTIONS_BUNDLING_WORKERS"
+INCOMPLETE_BUNDLE_MARKER = ".solutions-bundling-incomplete"
+# the size breakdown of the assets bundled into a cloud assembly
+BUNDLE_SIZES_FILE = "solutions-bundle-sizes.json"
+# bytecode is compiled for the build interpreter and stamped with build times - Lambda compiles its own
+BUNDLE_EXCLUDES = ["__pycache__", "*.pyc"]
 
 
 logger = logging.getLogger("cdk-helper")
@@ -39,14 +54,133 @@ class SolutionsPythonBundlingException(Exception):
     pass
 
 
+class BundlingScheduler:
+    """
+    Runs the local bundling of Lambda functions and layers in the background. Bundling an asset only schedules it,
+    so the pip (or pipenv/poetry) installs of all assets run in parallel while the app is constructed. Identical
+    bundles (the same source, libraries and install path) are built once and copied to the other assets, across
+    constructs, stacks and apps. Call wait() before the bundled assets are used.
+    """
+
+    _lock = threading.Lock()
+    _executor: Union[ThreadPoolExecutor, None] = None
+    _bundles: Dict[Tuple, Tuple[Future, Path]] = {}
+    _pending: List[Tuple[Future, Path]] = []
+    _scheduled: Set[Path] = set()
+    _sizes: Dict[Path, Dict] = {}
+
+    @classmethod
+    def submit(cls, bundling: "SolutionsPythonBundling", output_dir: Union[str, Path]) -> None:
+        output_dir = Path(output_dir).absolute()
+        # CDK requires the bundle directory to have content once bundling returns
+        (output_dir / INCOMPLETE_BUNDLE_MARKER).touch()
+
+        with cls._lock:
+            cls._scheduled.add(output_dir)
+            original = cls._bundles.get(bundling.key)
+            if original:
+                future = cls._get_executor().submit(cls._copy_bundle, *original, output_dir)
+            else:
+                future = cls._get_executor().submit(cls._bundle, bundling, output_dir)
+                cls._bundles[bundling.key] = (future, output_dir)
+            cls._pending.append((future, output_dir))
+
+    @classmethod
+    def wait(cls) -> None:
+        """Wait for all scheduled bundles, raising if any of them failed"""
+        with cls._lock:
+            pending, cls._pending = cls._pending, []
+
+        errors = []
+        for future, output_dir in pending:
+            try:
+                future.result()
+            except Exception as exc:
+                errors.append(f"{output_dir}: {exc}")
+        if errors:
+            raise SolutionsPythonBundlingException(
+                f"local bundling failed for {len(errors)} asset(s) - {'; '.join(errors)}"
+            )
+        cls._save_sizes()
+
+    @classmethod
+    def discard_incomplete(cls, outdir: Union[str, Path, None]) -> None:
+        """
+        Remove the asset bundles left incomplete by an interrupted synth, so CDK bundles them again instead of using
+        them. CDK stages bundled assets by a hash of their asset hash and bundling options, so every staged asset of
+        the cloud assembly is checked for the marker - call this before the assets are created.
+        """
+        if not outdir:
+            return
+
+        for marker in sorted(Path(outdir).absolute().glob(f"asset.*/{INCOMPLETE_BUNDLE_MARKER}")):
+            bundle_dir = marker.parent
+            with cls._lock:
+                if bundle_dir in cls._scheduled:
+                    continue
+            logger.warning("removing incomplete bundle %s" % bundle_dir)
+            shutil.rmtree(bundle_dir, ignore_errors=True)
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        # the bundling work happens in subprocesses (copying aside), so threads are enough to run them in parallel
+        if not cls._executor:
+            workers = int(os.environ.get(BUNDLING_WORKERS, os.cpu_count() or 1))
+            cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bundling")
+        return cls._executor
+
+    @classmethod
+    def _save_sizes(cls) -> None:
+        """Add the size breakdown of the assets bundled since the last wait to their cloud assemblies"""
+        with cls._lock:
+            sizes, cls._sizes = cls._sizes, {}
+
+        for outdir in sorted({output_dir.parent for output_dir in sizes}):
+            report_file = outdir / BUNDLE_SIZES_FILE
+            report = json.loads(report_file.read_text()) if report_file.exists() else {}
+            report.update({path.name: size for (path, size) in sizes.items() if path.parent == outdir})
+            report_file.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+    @classmethod
+    @SynthTimings.timed("bundling")
+    def _bundle(cls, bundling: "SolutionsPythonBundling", output_dir: Path) -> None:
+        try:
+            cls._sizes[output_dir] = bundling.bundle(output_dir)
+        except BaseException:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+        (output_dir / INCOMPLETE_BUNDLE_MARKER).unlink()
+
+    @classmethod
+    @SynthTimings.timed("bundling")
+    def _copy_bundle(cls, original: Future, original_dir: Path, output_dir: Path) -> None:
+        try:
+            original.result()
+            copytree(original_dir, output_dir)
+        except BaseException:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+        (output_dir / INCOMPLETE_BUNDLE_MARKER).unlink()
+        cls._sizes[output_dir] = cls._sizes.get(original_dir)
+
+
 @jsii.implements(ILocalBundling)
 class SolutionsPythonBundling:
     """This interface allows AWS Solutions to package lambda functions without the use of Docker"""
 
-    def __init__(self, to_bundle, libraries, install_path=""):
+    def __init__(
+        self,
+        to_bundle,
+        libraries,
+        install_path="",
+        target: Union[BundlingTarget, None] = None,
+        profile: Union[BundleProfile, None] = None,
+    ):
         self.to_bundle = to_bundle
         self.libraries = libraries
         self.install_path = install_path
+        self.target = target
+        self.profile = profile or BundleProfile.named(None)
 
     @property
     def platform_supports_bundling(self):
@@ -58,22 +192,38 @@ class SolutionsPythonBundling:
         )
         return os_platform_can_bundle
 
+    @property
+    def key(self) -> Tuple:
+        """Bundles with the same key have the same content"""
+        return (
+            Path(self.to_bundle).resolve(),
+            tuple(Path(lib).resolve() for lib in self.libraries),
+            self.install_path,
+            self.target,
+            self.profile,
+        )
+
     def try_bundle(self, output_dir: str, options: BundlingOptions) -> bool:
         if not self.platform_supports_bundling:
             raise SolutionsPythonBundlingException(
                 "this platform does not support bundling"
             )
 
+        BundlingScheduler.submit(self, output_dir)
+        return True
+
+    def bundle(self, output_dir: Union[str, Path]) -> Dict:
+        """Bundle into output_dir, returning the size breakdown of the bundle"""
         source = Path(self.to_bundle).absolute()
 
         # copy source
-        copytree(source, output_dir)
+        copytree(source, output_dir, ignore=list(BUNDLE_EXCLUDES))
 
         # copy libraries
         for lib in self.libraries:
             lib_source = Path(lib).absolute()
             lib_dest = Path(output_dir).joinpath(lib.name)
-            copytree(lib_source, lib_dest)
+            copytree(lib_source, lib_dest, ignore=list(BUNDLE_EXCLUDES))
 
         try:
             self._local_bundle_with_poetry(output_dir)
@@ -84,7 +234,29 @@ class SolutionsPythonBundling:
                 f"local bundling was tried but failed: {cpe}"
             )
 
-        return True
+        # strip the installed requirements as configured by the bundle profile
+        bundle_dir = Path(output_dir)
+        install_dir = bundle_dir.joinpath(self.install_path)
+        if not install_dir.is_dir():
+            install_dir = bundle_dir
+        removed = self.profile.slim(
+            bundle_dir,
+            install_dir,
+            sources=[entry.name for entry in source.iterdir()] + [lib.name for lib in self.libraries],
+            python_version=self.target.python_version if self.target else None,
+        )
+        sizes = size_report(bundle_dir, install_dir, self.profile, removed, ignore=[INCOMPLETE_BUNDLE_MARKER])
+        logger.info(
+            "%s: %.1f MiB in %d files (%s profile removed %.1f MiB)"
+            % (
+                Path(self.to_bundle).name,
+                sizes["bytes"] / 2 ** 20,
+                sizes["files"],
+                self.profile.name,
+                sum(removed.values()) / 2 ** 20,
+            )
+        )
+        return sizes
 
     def _invoke_local_command(
         self,
@@ -157,16 +329,42 @@ class SolutionsPythonBundling:
         self._required_package_exists("pip")
         self.validate_requirements_file(output_dir)
 
+        requirements_file = Path(output_dir) / REQUIREMENTS_TXT_FILE
         requirements_build_path = Path(output_dir).joinpath(self.install_path)
-        command = [
-            "pip",
-            "install",
-            "-t",
-            str(requirements_build_path),
-            "-r",
-            str(Path(output_dir) / REQUIREMENTS_TXT_FILE),
-        ]
-        self._invoke_local_command("pip", command, cwd=self.to_bundle)
+        wheelhouse = Wheelhouse()
+        target = self.target
+        try:
+            wheels = wheelhouse.wheels(
+                requirements_file, target, cwd=self.to_bundle, run=self._invoke_local_command
+            )
+        except subprocess.CalledProcessError:
+            if not target:
+                raise
+            logger.warning(
+                "%s: not all requirements have wheels for %s - installing them for the build platform"
+                % (self.to_bundle.name, target)
+            )
+            target = None
+            wheels = wheelhouse.wheels(
+                requirements_file, target, cwd=self.to_bundle, run=self._invoke_local_command
+            )
+
+        # local (path) requirements are built from copies, outside of the source tree
+        with out_of_tree_requirements(requirements_file, cwd=self.to_bundle) as build_requirements_file:
+            command = [
+                "pip",
+                "install",
+                "--no-index",
+                "--find-links",
+                str(wheels),
+                "--no-compile",
+                *(target.pip_arguments if target else []),
+                "-t",
+                str(requirements_build_path),
+                "-r",
+                str(build_requirements_file),
+            ]
+            self._invoke_local_command("pip", command, cwd=self.to_bundle)
 
     def _local_bundle_with_pipenv(self, output_dir):
         if not self._source_file_exists(REQUIREMENTS_PIPENV_FILE, output_dir):
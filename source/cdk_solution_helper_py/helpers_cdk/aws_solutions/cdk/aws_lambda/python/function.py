@@ -11,10 +11,13 @@
 #  the specific language governing permissions and limitations under the License.                                     #
 # #####################################################################################################################
 
+import fnmatch
 import hashlib
+import json
+import logging
 import os
 from pathlib import Path
-from typing import List, Union
+from typing import Dict, List, Union
 
 import aws_cdk.aws_iam as iam
 from aws_cdk import (
@@ -22,54 +25,146 @@ from aws_cdk import (
     BundlingOptions,
     DockerImage,
     Aws,
+    Stage,
 )
-from aws_cdk.aws_lambda import Function, Runtime, RuntimeFamily, Code
+from aws_cdk.aws_lambda import Architecture, Function, Runtime, RuntimeFamily, Code
 from constructs import Construct
 
-from aws_solutions.cdk.aws_lambda.python.bundling import SolutionsPythonBundling
+from aws_solutions.cdk.aws_lambda.python.bundling import (
+    BundlingScheduler,
+    SolutionsPythonBundling,
+)
+from aws_solutions.cdk.aws_lambda.python.slimming import BUNDLE_PROFILE_CONTEXT, BundleProfile
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import BundlingTarget
+from aws_solutions.cdk.helpers.timings import SynthTimings
 
 DEFAULT_RUNTIME = Runtime.PYTHON_3_7
 DEPENDENCY_EXCLUDES = ["*.pyc"]
+DIRECTORY_HASH_IGNORE = ["__pycache__", "*.pyc", ".pytest_cache", ".DS_Store"]
+DIRECTORY_HASH_CACHE_FILE = "solutions-file-digests.json"
+HASH_BLOCK_SIZE = 2 ** 20
+
+logger = logging.getLogger("cdk-helper")
+
+
+class FileDigestCache:
+    """
+    File digests keyed by path, size and modification time. The cache is persisted in the cloud assembly
+    directory (cdk.out), so files left unchanged since the previous synth are not read again.
+    """
+
+    _loaded: Dict[Path, "FileDigestCache"] = {}
+
+    def __init__(self, path: Union[Path, None] = None):
+        self.path = path
+        self.entries: Dict[str, List] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, directory: Union[str, Path, None]) -> "FileDigestCache":
+        if not directory:
+            return cls()
+
+        path = Path(directory).absolute() / DIRECTORY_HASH_CACHE_FILE
+        if path not in cls._loaded:
+            cache = cls(path)
+            try:
+                cache.entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                logger.info("no file digest cache found at %s" % path)
+            cls._loaded[path] = cache
+        return cls._loaded[path]
+
+    def digest(self, file: Path) -> str:
+        stat = file.stat()
+        key = str(file)
+        entry = self.entries.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        # NOSONAR - safe to hash; side-effect of collision is to create new bundle
+        file_hash = hashlib.sha1()  # nosec
+        with file.open("rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                file_hash.update(block)
+
+        self.entries[key] = [stat.st_size, stat.st_mtime_ns, file_hash.hexdigest()]
+        self.dirty = True
+        return self.entries[key][2]
+
+    def save(self) -> None:
+        if not self.path or not self.dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+        temporary_path.write_text(json.dumps(self.entries))
+        os.replace(temporary_path, self.path)
+        self.dirty = False
 
 
 class DirectoryHash:
-    # fmt: off
-    # NOSONAR - safe to hash; side-effect of collision is to create new bundle
-    _hash = hashlib.sha1()  # nosec
-    # fmt: on
+    """
+    Hash the files of directories (their paths relative to each directory and their contents) in sorted order,
+    skipping names that match the ignore globs. Each call uses its own hasher.
+    """
+
+    def __init__(
+        self,
+        ignore: Union[List[str], None] = None,
+        cache_dir: Union[str, Path, None] = None,
+    ):
+        self.ignore = DIRECTORY_HASH_IGNORE if ignore is None else ignore
+        self.cache = FileDigestCache.load(cache_dir)
+        # NOSONAR - safe to hash; side-effect of collision is to create new bundle
+        self._hash = hashlib.sha1()  # nosec
 
     @classmethod
-    def hash(cls, *directories: Path):
-        # NOSONAR - safe to hash; see above
-        DirectoryHash._hash = hashlib.sha1()  # nosec
-        if isinstance(directories, Path):
-            directories = [directories]
+    def hash(
+        cls,
+        *directories: Path,
+        ignore: Union[List[str], None] = None,
+        cache_dir: Union[str, Path, None] = None,
+    ) -> str:
+        directory_hash = cls(ignore=ignore, cache_dir=cache_dir)
         for directory in sorted(directories):
-            DirectoryHash._hash_dir(str(directory.absolute()))
-        return DirectoryHash._hash.hexdigest()
+            directory_hash.update(directory)
+        directory_hash.cache.save()
+        return directory_hash.hexdigest()
 
-    @classmethod
-    def _hash_dir(cls, directory: Path):
-        for path, dirs, files in os.walk(directory):
-            for file in sorted(files):
-                DirectoryHash._hash_file(Path(path) / file)
-            for directory in sorted(dirs):
-                DirectoryHash._hash_dir(str((Path(path) / directory).absolute()))
-            break
+    def update(self, directory: Path) -> None:
+        root = directory.absolute()
+        self._update_name(root.name)
+        for path, dirs, files in os.walk(root):
+            dirs[:] = sorted(name for name in dirs if not self._ignored(name))
+            for name in sorted(files):
+                if self._ignored(name):
+                    continue
+                file = Path(path) / name
+                self._update_name(file.relative_to(root).as_posix())
+                self._hash.update(self.cache.digest(file).encode("utf-8"))
 
-    @classmethod
-    def _hash_file(cls, file: Path):
-        with file.open("rb") as f:
-            while True:
-                block = f.read(2 ** 10)
-                if not block:
-                    break
-                DirectoryHash._hash.update(block)
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+    def _update_name(self, name: str) -> None:
+        self._hash.update(name.encode("utf-8"))
+        self._hash.update(b"\0")
+
+    def _ignored(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.ignore)
+
+
+def assembly_dir(scope: Construct) -> Union[str, None]:
+    """Get the cloud assembly directory (e.g. cdk.out) the app of this scope synthesizes to"""
+    stage = Stage.of(scope)
+    return stage.outdir if stage else None
 
 
 class SolutionsPythonFunction(Function):
     """This is similar to aws-cdk/aws-lambda-python, however it handles local bundling"""
 
+    @SynthTimings.timed("function_construct")
     def __init__(
         self,  # NOSONAR (python:S107) - allow large number of method parameters
         scope: Construct,
@@ -77,6 +172,7 @@ class SolutionsPythonFunction(Function):
         entrypoint: Path,
         function: str,
         libraries: Union[List[Path], Path, None] = None,
+        bundle_profile: Union[str, None] = None,
         **kwargs,
     ):
         self.scope = scope
@@ -131,6 +227,10 @@ class SolutionsPythonFunction(Function):
         bundling = SolutionsPythonBundling(
             self.source_path,
             self.libraries,
+            target=BundlingTarget.for_lambda(
+                [kwargs["runtime"]], [kwargs.get("architecture") or Architecture.X86_64]
+            ),
+            profile=BundleProfile.named(bundle_profile or scope.node.try_get_context(BUNDLE_PROFILE_CONTEXT)),
         )
 
         kwargs["code"] = self._get_code(bundling, runtime=kwargs["runtime"])
@@ -140,10 +240,22 @@ class SolutionsPythonFunction(Function):
 
     def _get_code(self, bundling: SolutionsPythonBundling, runtime: Runtime) -> Code:
         # try to create the code locally - if this fails, try using Docker
+        with SynthTimings.phase("asset_hashing"):
+            asset_hash = DirectoryHash.hash(
+                self.source_path, *self.libraries, cache_dir=assembly_dir(self.scope)
+            )
+        # the same sources bundle different dependencies for each target, and different content for each profile
+        variant = [str(bundling.target)] if bundling.target else []
+        if not bundling.profile.is_default:
+            variant.append(bundling.profile.name)
+        if variant:
+            # NOSONAR - safe to hash; side-effect of collision is to create new bundle
+            asset_hash = hashlib.sha1(f"{asset_hash}-{'-'.join(variant)}".encode("utf-8")).hexdigest()  # nosec
+        BundlingScheduler.discard_incomplete(assembly_dir(self.scope))
         code_parameters = {
             "path": str(self.source_path),
             "asset_hash_type": AssetHashType.CUSTOM,
-            "asset_hash": DirectoryHash.hash(self.source_path, *self.libraries),
+            "asset_hash": asset_hash,
             "exclude": DEPENDENCY_EXCLUDES,
         }
 
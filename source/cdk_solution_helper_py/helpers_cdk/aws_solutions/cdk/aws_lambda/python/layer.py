@@ -11,28 +11,131 @@
 #  the specific language governing permissions and limitations under the License.                                     #
 # #####################################################################################################################
 
+import hashlib
+import importlib.metadata
+import platform
+import sys
 from pathlib import Path
-from typing import Union, List
-from uuid import uuid4
+from typing import Callable, Union, List
 
 from aws_cdk import BundlingOptions, DockerImage, AssetHashType
 from aws_cdk.aws_lambda import LayerVersion, Code
 from constructs import Construct
 
-from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonBundling
+from aws_solutions.cdk.aws_lambda.python.bundling import (
+    BUNDLER_VERSION,
+    REQUIREMENTS_TXT_FILE,
+    BundlingScheduler,
+)
+from aws_solutions.cdk.aws_lambda.python.function import (
+    DirectoryHash,
+    SolutionsPythonBundling,
+    assembly_dir,
+)
+from aws_solutions.cdk.aws_lambda.python.slimming import BUNDLE_PROFILE_CONTEXT, BundleProfile
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import (
+    BundlingTarget,
+    Wheelhouse,
+    local_requirements,
+    pinned_requirements,
+    run_command,
+)
+from aws_solutions.cdk.helpers.timings import SynthTimings
 
 DEPENDENCY_EXCLUDES = ["*.pyc"]
+# build output left in local source trees (e.g. by pip installing them) is not part of the layer content
+LAYER_HASH_EXCLUDES = ["__pycache__", "*.pyc", "*.egg-info", "build", "dist", ".pytest_cache"]
+BUNDLER_TOOLS = ["pip", "pipenv", "poetry"]
+
+
+class LayerHash:
+    """
+    Content-addressed hash of a layer version asset, so an unchanged layer is served from the CDK asset cache
+    instead of being bundled again. It covers the requirements files and the versions they resolve to (see
+    Wheelhouse.resolve), the local source trees they (and the libraries) point to, the target runtimes and
+    architectures, the bundle profile, and the interpreter and bundler that install them. Requirements that are not
+    pinned and cannot be resolved are not content-addressed.
+    """
+
+    def __init__(self):
+        # NOSONAR - safe to hash; side-effect of collision is to create new bundle
+        self._hash = hashlib.sha256()
+
+    @classmethod
+    def hash(
+        cls,
+        requirements_path: Path,
+        libraries: List[Path],
+        compatible_runtimes: Union[List, None] = None,
+        compatible_architectures: Union[List, None] = None,
+        cache_dir: Union[str, Path, None] = None,
+        bundle_profile: Union[BundleProfile, None] = None,
+        run: Callable = run_command,
+    ) -> Union[str, None]:
+        """
+        Get the hash of a layer version asset
+        :return: the hash, or None when the requirements are not pinned and cannot be resolved
+        """
+        layer_hash = cls()
+        requirements_file = requirements_path / REQUIREMENTS_TXT_FILE
+        if requirements_file.is_file():
+            target = BundlingTarget.for_lambda(compatible_runtimes, compatible_architectures)
+            resolved = Wheelhouse().resolve(requirements_file, target, cwd=requirements_path, run=run)
+            if resolved is None and not pinned_requirements(requirements_file, cwd=requirements_path):
+                return None
+            layer_hash._update("resolved", *(resolved or []))
+        layer_hash._update("bundler", BUNDLER_VERSION, *cls._bundler_tool_versions())
+        if bundle_profile and not bundle_profile.is_default:
+            layer_hash._update("profile", bundle_profile.name)
+        layer_hash._update(
+            "interpreter",
+            f"{sys.version_info.major}.{sys.version_info.minor}",
+            platform.system(),
+            platform.machine(),
+        )
+        layer_hash._update("runtimes", *sorted(runtime.name for runtime in compatible_runtimes or []))
+        layer_hash._update(
+            "architectures", *sorted(architecture.name for architecture in compatible_architectures or [])
+        )
+        layer_hash._update(
+            "sources",
+            DirectoryHash.hash(
+                requirements_path,
+                *local_requirements(requirements_path / REQUIREMENTS_TXT_FILE, cwd=requirements_path),
+                *libraries,
+                ignore=LAYER_HASH_EXCLUDES,
+                cache_dir=cache_dir,
+            ),
+        )
+        return layer_hash._hash.hexdigest()
+
+    @staticmethod
+    def _bundler_tool_versions() -> List[str]:
+        versions = []
+        for tool in BUNDLER_TOOLS:
+            try:
+                versions.append(f"{tool}=={importlib.metadata.version(tool)}")
+            except importlib.metadata.PackageNotFoundError:
+                versions.append(f"{tool} not installed")
+        return versions
+
+    def _update(self, *values: str) -> None:
+        for value in values:
+            self._hash.update(value.encode("utf-8"))
+            self._hash.update(b"\0")
 
 
 class SolutionsPythonLayerVersion(LayerVersion):
     """Handle local packaging of layer versions"""
 
+    @SynthTimings.timed("layer_construct")
     def __init__(
         self,
         scope: Construct,
         construct_id: str,
         requirements_path: Path,
         libraries: Union[List[Path], None] = None,
+        bundle_profile: Union[str, None] = None,
         **kwargs,
     ):  # NOSONAR
         self.scope = scope
@@ -52,23 +155,44 @@ class SolutionsPythonLayerVersion(LayerVersion):
                     f"library {lib} must not be a file, but rather a directory"
                 )
 
+        self.libraries = libraries
         bundling = SolutionsPythonBundling(
-            self.requirements_path, libraries=libraries, install_path="python"
+            self.requirements_path,
+            libraries=libraries,
+            install_path="python",
+            target=BundlingTarget.for_lambda(
+                kwargs.get("compatible_runtimes"), kwargs.get("compatible_architectures")
+            ),
+            profile=BundleProfile.named(bundle_profile or scope.node.try_get_context(BUNDLE_PROFILE_CONTEXT)),
         )
 
-        kwargs["code"] = self._get_code(bundling)
+        with SynthTimings.phase("asset_hashing"):
+            asset_hash = LayerHash.hash(
+                self.requirements_path,
+                libraries,
+                compatible_runtimes=kwargs.get("compatible_runtimes"),
+                compatible_architectures=kwargs.get("compatible_architectures"),
+                cache_dir=assembly_dir(scope),
+                bundle_profile=bundling.profile,
+            )
+        kwargs["code"] = self._get_code(bundling, asset_hash=asset_hash)
 
         # initialize the LayerVersion
         super().__init__(scope, construct_id, **kwargs)
 
-    def _get_code(self, bundling: SolutionsPythonBundling) -> Code:
-        # create the layer version locally
+    def _get_code(self, bundling: SolutionsPythonBundling, asset_hash: Union[str, None]) -> Code:
+        # create the layer version locally - unless an asset with the same content hash was already bundled
+        BundlingScheduler.discard_incomplete(assembly_dir(self.scope))
         code_parameters = {
             "path": str(self.requirements_path),
             "asset_hash_type": AssetHashType.CUSTOM,
-            "asset_hash": uuid4().hex,
+            "asset_hash": asset_hash,
             "exclude": DEPENDENCY_EXCLUDES,
         }
+        if asset_hash is None:
+            # the layer's content is only known once it is bundled
+            code_parameters["asset_hash_type"] = AssetHashType.OUTPUT
+            del code_parameters["asset_hash"]
 
         code = Code.from_asset(
             bundling=BundlingOptions(
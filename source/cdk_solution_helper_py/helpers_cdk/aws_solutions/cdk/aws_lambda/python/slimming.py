@@ -0,0 +1,235 @@
+# #####################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                 #
+#                                                                                                                     #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance     #
+#  with the License. You may obtain a copy of the License at                                                          #
+#                                                                                                                     #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                        #
+#                                                                                                                     #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#  the specific language governing permissions and limitations under the License.                                     #
+# #####################################################################################################################
+
+import compileall
+import fnmatch
+import logging
+import os
+import py_compile
+import re
+import shutil
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Union
+
+logger = logging.getLogger("cdk-helper")
+
+BUNDLE_PROFILE_CONTEXT = "SOLUTIONS_BUNDLE_PROFILE"
+DEFAULT_BUNDLE_PROFILE = "default"
+REQUIREMENTS_TXT_FILE = "requirements.txt"
+
+# the AWS SDK (and its dependencies) that every Lambda Python runtime provides
+RUNTIME_PACKAGES = ["boto3", "botocore", "s3transfer", "jmespath", "dateutil", "six.py"]
+RUNTIME_DISTRIBUTIONS = ["boto3", "botocore", "s3transfer", "jmespath", "python_dateutil", "six"]
+# installers pulled in as dependencies, and the console scripts of the installed packages
+BUILD_TOOL_PACKAGES = ["pip", "setuptools", "wheel", "pkg_resources", "_distutils_hack", "distutils-precedence.pth", "bin"]
+BUILD_TOOL_DISTRIBUTIONS = ["pip", "setuptools", "wheel"]
+TEST_PATTERNS = ["tests", "conftest.py"]
+DOC_PATTERNS = ["docs", "doc", "examples", "*.md", "*.rst"]
+TYPE_STUB_PATTERNS = ["*.pyi", "*-stubs"]
+# importlib.metadata reads METADATA (and entry_points.txt) - the license files are kept for attribution
+DIST_INFO_KEEP = ["METADATA", "entry_points.txt", "LICENSE*", "LICENCE*", "COPYING*", "NOTICE*", "AUTHORS*", "licenses"]
+SIZE_REPORT_TOP_ENTRIES = 8
+
+
+@dataclass(frozen=True)
+class BundleProfile:
+    """What is stripped from a function or layer bundle once its requirements are installed"""
+
+    name: str
+    runtime_packages: bool = False
+    build_tools: bool = False
+    tests: bool = False
+    docs: bool = False
+    type_stubs: bool = False
+    dist_info: bool = False
+    precompile: bool = False
+
+    @classmethod
+    def named(cls, name: Union[str, None]) -> "BundleProfile":
+        name = name or DEFAULT_BUNDLE_PROFILE
+        try:
+            return BUNDLE_PROFILES[name]
+        except KeyError:
+            raise ValueError(f"unknown bundle profile {name} - use one of {', '.join(BUNDLE_PROFILES)}")
+
+    @property
+    def is_default(self) -> bool:
+        return self.name == DEFAULT_BUNDLE_PROFILE
+
+    def slim(
+        self, bundle_dir: Path, install_dir: Path, sources: Iterable[str], python_version: Union[str, None]
+    ) -> Dict[str, int]:
+        """
+        Strip the installed requirements of a bundle (the entries of install_dir that are not in sources) and
+        precompile it as configured. Returns the bytes removed by category.
+        """
+        removed = {}
+        sources = set(sources)
+        installed = [entry for entry in sorted(install_dir.iterdir()) if entry.name not in sources]
+
+        def remove(category: str, paths: Iterable[Path]) -> None:
+            for path in paths:
+                if not path.exists():
+                    continue
+                removed[category] = removed.get(category, 0) + directory_size(path)
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+
+        # a bundle that asks for the AWS SDK itself keeps the version it installed instead of the runtime's
+        requested_runtime_distributions = requested_distributions(bundle_dir / REQUIREMENTS_TXT_FILE).intersection(
+            RUNTIME_DISTRIBUTIONS
+        )
+        if self.runtime_packages and requested_runtime_distributions:
+            logger.info(
+                "%s: keeping the AWS SDK, as its requirements name %s"
+                % (bundle_dir.name, ", ".join(sorted(requested_runtime_distributions)))
+            )
+        elif self.runtime_packages:
+            remove("runtime_packages", matching_distributions(installed, RUNTIME_PACKAGES, RUNTIME_DISTRIBUTIONS))
+        if self.build_tools:
+            remove("build_tools", matching_distributions(installed, BUILD_TOOL_PACKAGES, BUILD_TOOL_DISTRIBUTIONS))
+        installed = [entry for entry in installed if entry.exists()]
+        if self.tests:
+            remove("tests", matching(installed, TEST_PATTERNS))
+        if self.docs:
+            # documentation packages (e.g. botocore.docs) are imported at runtime
+            remove("docs", [
+                path
+                for path in matching(installed, DOC_PATTERNS)
+                if ".dist-info" not in str(path) and not (path / "__init__.py").exists()
+            ])
+        if self.type_stubs:
+            remove("type_stubs", matching(installed, TYPE_STUB_PATTERNS))
+        if self.dist_info:
+            remove("dist_info", [
+                path
+                for dist_info in installed if dist_info.name.endswith(".dist-info")
+                for path in sorted(dist_info.iterdir())
+                if not any(fnmatch.fnmatch(path.name, keep) for keep in DIST_INFO_KEEP)
+            ])
+        if self.precompile:
+            precompile(bundle_dir, python_version)
+        return removed
+
+
+BUNDLE_PROFILES = {
+    # the bundle as installed
+    "default": BundleProfile("default"),
+    # only what the function needs at runtime
+    "slim": BundleProfile(
+        "slim", runtime_packages=True, build_tools=True, tests=True, docs=True, type_stubs=True, dist_info=True
+    ),
+    # as slim, with bytecode compiled ahead of time (Lambda cannot write it to the read-only code directory)
+    "slim-precompiled": BundleProfile(
+        "slim-precompiled",
+        runtime_packages=True,
+        build_tools=True,
+        tests=True,
+        docs=True,
+        type_stubs=True,
+        dist_info=True,
+        precompile=True,
+    ),
+}
+
+
+def distribution_name(dist_info: str) -> str:
+    return dist_info.split("-")[0].lower().replace(".", "_")
+
+
+def requested_distributions(requirements_file: Path) -> Set[str]:
+    """Get the (normalized) names of the distributions that a requirements.txt file names"""
+    if not requirements_file.is_file():
+        return set()
+    names = set()
+    for line in requirements_file.read_text().splitlines():
+        requirement = re.match(r"^[A-Za-z0-9][A-Za-z0-9._-]*", line.split("#", 1)[0].strip())
+        if requirement:
+            names.add(re.sub(r"[-.]+", "_", requirement.group(0)).lower())
+    return names
+
+
+def matching_distributions(entries: List[Path], packages: List[str], distributions: List[str]) -> List[Path]:
+    """Get the top-level packages (and their .dist-info) of the given distributions"""
+    return [
+        entry for entry in entries
+        if entry.name in packages
+        or (entry.name.endswith(".dist-info") and distribution_name(entry.name) in distributions)
+    ]
+
+
+def matching(entries: List[Path], patterns: List[str]) -> List[Path]:
+    """Get the files and directories under entries whose name matches a pattern (but not their own descendants)"""
+    matches = []
+    for entry in entries:
+        if any(fnmatch.fnmatch(entry.name, pattern) for pattern in patterns):
+            matches.append(entry)
+            continue
+        if not entry.is_dir():
+            continue
+        for path, dirs, files in os.walk(entry):
+            for name in sorted(dirs) + sorted(files):
+                if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                    matches.append(Path(path) / name)
+            dirs[:] = [name for name in dirs if not any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    return matches
+
+
+def precompile(bundle_dir: Path, python_version: Union[str, None]) -> None:
+    """
+    Compile the bundle to bytecode. Unchecked hash based .pyc files are used without checking the timestamps of their
+    sources (which are not preserved in the asset zip) and are themselves reproducible.
+    """
+    build_version = "%d.%d" % sys.version_info[:2]
+    if python_version and python_version != build_version:
+        logger.warning(
+            "%s: not precompiling for Python %s with Python %s" % (bundle_dir.name, python_version, build_version)
+        )
+        return
+    compileall.compile_dir(
+        str(bundle_dir),
+        quiet=1,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+
+
+def directory_size(path: Path) -> int:
+    if not path.is_dir():
+        return path.stat().st_size
+    return sum((Path(root) / name).stat().st_size for root, _, files in os.walk(path) for name in files)
+
+
+def file_count(path: Path) -> int:
+    if not path.is_dir():
+        return 1
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+def size_report(
+    bundle_dir: Path, install_dir: Path, profile: BundleProfile, removed: Dict[str, int], ignore: Iterable[str] = ()
+) -> Dict:
+    """Get the size of a bundle (less its ignored top-level entries), its largest entries and what its profile removed"""
+    entries = [entry for entry in bundle_dir.iterdir() if entry.name not in ignore]
+    installed = {entry.name: directory_size(entry) for entry in install_dir.iterdir() if entry.name not in ignore}
+    largest = sorted(installed.items(), key=lambda entry: entry[1], reverse=True)[:SIZE_REPORT_TOP_ENTRIES]
+    return {
+        "profile": profile.name,
+        "bytes": sum(directory_size(entry) for entry in entries),
+        "files": sum(file_count(entry) for entry in entries),
+        "largest": dict(largest),
+        "removed": removed,
+    }
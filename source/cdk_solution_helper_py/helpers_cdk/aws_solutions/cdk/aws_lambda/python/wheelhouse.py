@@ -0,0 +1,278 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, List, Union
+
+logger = logging.getLogger("cdk-helper")
+
+WHEELHOUSE_PATH = "SOLUTIONS_WHEELHOUSE"
+DEFAULT_WHEELHOUSE_PATH = Path.home() / ".cache" / "aws-solutions" / "wheelhouse"
+# the files of a local (path) requirement that declare its dependencies
+LOCAL_REQUIREMENT_METADATA = ["setup.py", "setup.cfg", "pyproject.toml", "requirements.txt"]
+# what building a local requirement leaves in its source tree
+LOCAL_BUILD_OUTPUTS = ["build", "dist", "*.egg-info", "__pycache__", "*.pyc"]
+# requirements are resolved again once their resolution is older than this, so that new releases are picked up
+RESOLUTION_MAX_AGE_IN_SECONDS = 24 * 60 * 60
+# a requirement pinned to an exact version (e.g. requests==2.31.0)
+PINNED_REQUIREMENT = re.compile(r"^[A-Za-z0-9._-]+(\[[A-Za-z0-9._,-]+\])?\s*===?\s*[^\s*,;]+$")
+LAMBDA_PLATFORMS = {
+    "arm64": "manylinux2014_aarch64",
+    "x86_64": "manylinux2014_x86_64",
+}
+
+
+def local_requirements(requirements_file: Path, cwd: Path) -> List[Path]:
+    """Get the local directories installed by a requirements.txt file (e.g. ../../shared/util), relative to cwd"""
+    if not requirements_file.is_file():
+        return []
+
+    directories = set()
+    for line in requirements_file.read_text().splitlines():
+        requirement = line.split("#", 1)[0].strip()
+        if requirement.startswith("file:"):
+            requirement = requirement[len("file:"):]
+        if not requirement or requirement.startswith("-"):
+            continue
+        directory = (Path(cwd) / requirement).resolve()
+        if directory.is_dir():
+            directories.add(directory)
+    return sorted(directories)
+
+
+def pinned_requirements(requirements_file: Path, cwd: Path) -> bool:
+    """Whether every requirement of a requirements.txt file is either a local directory or pinned to an exact version"""
+    local_directories = local_requirements(requirements_file, cwd)
+    for line in requirements_file.read_text().splitlines():
+        requirement = line.split("#", 1)[0].strip()
+        if requirement.startswith("file:"):
+            requirement = requirement[len("file:"):]
+        if not requirement or (Path(cwd) / requirement).resolve() in local_directories:
+            continue
+        if not PINNED_REQUIREMENT.match(requirement):
+            return False
+    return True
+
+
+def run_command(name: str, command: List[str], cwd: Union[str, Path, None] = None) -> None:
+    """Run a command, raising subprocess.CalledProcessError (with its output) when it fails"""
+    result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=False)
+    if result.returncode:
+        raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+
+
+@contextmanager
+def out_of_tree_requirements(requirements_file: Path, cwd: Path) -> Iterator[Path]:
+    """
+    Get a copy of a requirements.txt file whose local directories (relative to cwd) are replaced by copies in a
+    temporary directory, so that building them leaves no build output in the source tree (or stale copies of it in
+    later builds). The files next to a local directory are copied with it, as its setup.py may read them (e.g. the
+    CHANGELOG.md of cdk_solution_helper_py)
+    """
+    with tempfile.TemporaryDirectory(prefix="solutions-requirements-") as build_dir:
+        lines = []
+        for index, line in enumerate(requirements_file.read_text().splitlines()):
+            requirement = line.split("#", 1)[0].strip()
+            if requirement.startswith("file:"):
+                requirement = requirement[len("file:"):]
+            directory = (Path(cwd) / requirement).resolve() if requirement and not requirement.startswith("-") else None
+            if directory and directory.is_dir():
+                parent = Path(build_dir) / str(index) / directory.parent.name
+                parent.mkdir(parents=True)
+                for sibling in directory.parent.iterdir():
+                    if sibling.is_file():
+                        shutil.copy2(sibling, parent / sibling.name)
+                copy = parent / directory.name
+                shutil.copytree(directory, copy, ignore=shutil.ignore_patterns(*LOCAL_BUILD_OUTPUTS))
+                line = str(copy)
+            lines.append(line)
+        build_requirements_file = Path(build_dir) / requirements_file.name
+        build_requirements_file.write_text("\n".join(lines) + "\n")
+        yield build_requirements_file
+
+
+@dataclass(frozen=True)
+class BundlingTarget:
+    """The Lambda platform that the dependencies of a function or layer are installed for"""
+
+    platform: str
+    python_version: str
+
+    @classmethod
+    def for_lambda(cls, runtimes: Union[List, None], architectures: Union[List, None]) -> Union["BundlingTarget", None]:
+        """Get the target of a single runtime and architecture - or None to install for the build platform"""
+        if len(runtimes or []) != 1 or len(architectures or []) != 1:
+            return None
+
+        runtime, architecture = runtimes[0].name, architectures[0].name
+        if not runtime.startswith("python") or architecture not in LAMBDA_PLATFORMS:
+            return None
+        return cls(platform=LAMBDA_PLATFORMS[architecture], python_version=runtime[len("python"):])
+
+    @property
+    def pip_arguments(self) -> List[str]:
+        return [
+            "--platform",
+            self.platform,
+            "--python-version",
+            self.python_version,
+            "--implementation",
+            "cp",
+            "--only-binary=:all:",
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.platform}-py{self.python_version}"
+
+
+class Wheelhouse:
+    """
+    A local cache of the wheels that requirements resolve to, keyed by the resolved versions and the target
+    platform. Bundles install from a warm wheelhouse with --no-index, so they do not resolve and download the same
+    wheels again, and build without network access once primed. The requirements are resolved again once a day, so
+    new releases of requirements that are not pinned get a new key; without network access the last resolution is
+    used.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        self.path = Path(path or os.environ.get(WHEELHOUSE_PATH) or DEFAULT_WHEELHOUSE_PATH)
+
+    def key(
+        self,
+        requirements_file: Path,
+        target: Union[BundlingTarget, None],
+        cwd: Path,
+        run: Callable = run_command,
+    ) -> str:
+        # NOSONAR - safe to hash; side-effect of collision is to download the wheels again
+        key = hashlib.sha256()
+        key.update(self.requirements_key(requirements_file, target, cwd).encode("utf-8"))
+        for requirement in self.resolve(requirements_file, target, cwd, run=run) or []:
+            key.update(b"\0")
+            key.update(requirement.encode("utf-8"))
+        return key.hexdigest()
+
+    def requirements_key(self, requirements_file: Path, target: Union[BundlingTarget, None], cwd: Path) -> str:
+        """Get the key of the requirements as written, and of the files declaring the dependencies of local ones"""
+        # NOSONAR - safe to hash; side-effect of collision is to resolve the requirements again
+        key = hashlib.sha256()
+        key.update(str(target or "build-platform").encode("utf-8"))
+        for line in sorted(requirements_file.read_text().splitlines()):
+            key.update(line.split("#", 1)[0].strip().encode("utf-8"))
+            key.update(b"\0")
+        for directory in local_requirements(requirements_file, cwd):
+            key.update(str(directory).encode("utf-8"))
+            for name in LOCAL_REQUIREMENT_METADATA:
+                if (directory / name).is_file():
+                    key.update((directory / name).read_bytes())
+        return key.hexdigest()
+
+    def resolve(
+        self,
+        requirements_file: Path,
+        target: Union[BundlingTarget, None],
+        cwd: Path,
+        run: Callable = run_command,
+    ) -> Union[List[str], None]:
+        """
+        Get the versions (name==version) that the requirements resolve to for the target, resolving them with pip
+        (and the `run(name, command, cwd=cwd)` command runner) when their last resolution is older than a day.
+        :return: the resolved versions, or None when the requirements were never resolved and cannot be now
+        """
+        resolution_file = self.path / "resolutions" / f"{self.requirements_key(requirements_file, target, cwd)}.json"
+        resolution = None
+        if resolution_file.is_file():
+            resolution = json.loads(resolution_file.read_text())
+            if time.time() - resolution["resolved_at"] < RESOLUTION_MAX_AGE_IN_SECONDS:
+                return resolution["requirements"]
+
+        try:
+            requirements = self._resolve(requirements_file, target, cwd, run)
+        except (subprocess.CalledProcessError, OSError, ValueError, KeyError) as err:
+            if resolution is None:
+                logger.warning("could not resolve %s for %s: %s" % (requirements_file, target or "build-platform", err))
+                return None
+            logger.warning(
+                "could not resolve %s for %s again - using its last resolution: %s"
+                % (requirements_file, target or "build-platform", err)
+            )
+            return resolution["requirements"]
+
+        resolution_file.parent.mkdir(parents=True, exist_ok=True)
+        # the resolution only becomes visible when it is completely written
+        with tempfile.NamedTemporaryFile(
+            "w", dir=resolution_file.parent, prefix=f"{resolution_file.name}.", delete=False
+        ) as pending:
+            json.dump({"resolved_at": time.time(), "requirements": requirements}, pending)
+        os.replace(pending.name, resolution_file)
+        return requirements
+
+    @staticmethod
+    def _resolve(requirements_file: Path, target: Union[BundlingTarget, None], cwd: Path, run: Callable) -> List[str]:
+        with tempfile.TemporaryDirectory(prefix="solutions-resolution-") as resolution_dir:
+            report = Path(resolution_dir) / "report.json"
+            with out_of_tree_requirements(requirements_file, cwd) as build_requirements_file:
+                command = ["pip", "install", "--dry-run", "--ignore-installed", "--report", str(report)]
+                # platform options are only accepted with a target directory, which a dry run leaves untouched
+                command += ["--target", str(Path(resolution_dir) / "target"), *target.pip_arguments] if target else []
+                command += ["-r", str(build_requirements_file)]
+                run("pip resolve", command, cwd=cwd)
+            return sorted(
+                f"{re.sub(r'[-_.]+', '-', package['metadata']['name']).lower()}=={package['metadata']['version']}"
+                for package in json.loads(report.read_text())["install"]
+            )
+
+    def wheels(
+        self,
+        requirements_file: Path,
+        target: Union[BundlingTarget, None],
+        cwd: Path,
+        run: Callable,
+    ) -> Path:
+        """
+        Get the directory holding the wheels of the requirements for the target, downloading them (with the
+        `run(name, command, cwd=cwd)` command runner) when the wheelhouse does not have them yet
+        """
+        wheels = self.path / str(target or "build-platform") / self.key(requirements_file, target, cwd, run=run)
+        if wheels.is_dir():
+            logger.info("wheelhouse %s is warm for %s" % (wheels, requirements_file))
+            return wheels
+
+        wheels.parent.mkdir(parents=True, exist_ok=True)
+        download_dir = Path(tempfile.mkdtemp(prefix=f"{wheels.name}.", dir=wheels.parent))
+        try:
+            with out_of_tree_requirements(requirements_file, cwd) as build_requirements_file:
+                command = ["pip", "download", "--dest", str(download_dir)]
+                command += target.pip_arguments if target else []
+                command += ["-r", str(build_requirements_file)]
+                run("pip download", command, cwd=cwd)
+            # the wheels only become visible when they are all downloaded
+            os.replace(download_dir, wheels)
+        except OSError:
+            if not wheels.is_dir():
+                raise
+            logger.info("wheelhouse %s was primed concurrently" % wheels)
+        finally:
+            shutil.rmtree(download_dir, ignore_errors=True)
+        return wheels
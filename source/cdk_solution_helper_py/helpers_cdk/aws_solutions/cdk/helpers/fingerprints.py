@@ -0,0 +1,325 @@
+# #####################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                 #
+#                                                                                                                     #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance     #
+#  with the License. You may obtain a copy of the License at                                                          #
+#                                                                                                                     #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                        #
+#                                                                                                                     #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#  the specific language governing permissions and limitations under the License.                                     #
+# #####################################################################################################################
+
+import ast
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import site
+import sys
+import sysconfig
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from aws_cdk import AssetStaging, Stack, cx_api
+
+from aws_solutions.cdk.aws_lambda.python.bundling import REQUIREMENTS_TXT_FILE
+from aws_solutions.cdk.aws_lambda.python.function import (
+    DIRECTORY_HASH_IGNORE,
+    DirectoryHash,
+    FileDigestCache,
+    SolutionsPythonFunction,
+)
+from aws_solutions.cdk.aws_lambda.python.layer import LAYER_HASH_EXCLUDES, SolutionsPythonLayerVersion
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import local_requirements
+
+logger = logging.getLogger("cdk-helper")
+
+FINGERPRINTS_FILE = "solutions-stack-fingerprints.json"
+FINGERPRINTS_VERSION = "1"
+MANIFEST_FILE = "manifest.json"
+ASSET_MANIFEST_ARTIFACT = "cdk:asset-manifest"
+# set to false to synthesize every stack, e.g. to refresh the construct tree of the cloud assembly
+INCREMENTAL_SYNTH_CONTEXT = "SOLUTIONS_INCREMENTAL_SYNTH"
+# release builds post-process the templates and assets of every stack into these directories
+RELEASE_ASSETS_CONTEXT = ["SOLUTIONS_ASSETS_REGIONAL", "SOLUTIONS_ASSETS_GLOBAL"]
+# the CDK CLI passes the context and environment of the app in these (e.g. CDK_CONTEXT_JSON, CDK_DEFAULT_REGION)
+CDK_ENVIRONMENT_PREFIX = "CDK_"
+CHANGES_LOGGED = 5
+
+
+class SourceModules:
+    """
+    Digests of the modules a stack is defined by: the module of its class and every module it imports, followed
+    statically through their import statements. Source modules are identified by their content. Modules of installed
+    distributions are not followed - each is identified by the size and modification time of its file, which change
+    when the distribution is upgraded. The standard library is identified by the interpreter version.
+    """
+
+    def __init__(self, cache: FileDigestCache):
+        self.cache = cache
+        self._imports: Dict[str, Set[str]] = {}
+        self._installed = tuple(
+            str(Path(path).resolve())
+            for path in [
+                sysconfig.get_path("purelib"),
+                sysconfig.get_path("platlib"),
+                *site.getsitepackages(),
+                site.getusersitepackages(),
+            ]
+            if path
+        )
+        self._stdlib = tuple(
+            str(Path(sysconfig.get_path(name)).resolve()) for name in ("stdlib", "platstdlib")
+        )
+
+    def digests(self, *objects) -> Dict[str, str]:
+        """Get the digests of the modules the given classes (or modules) depend on, by module name"""
+        digests = {}
+        pending = [getattr(obj, "__module__", None) or obj.__name__ for obj in objects]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+
+            file = self._file(name)
+            if not file:
+                continue
+            if str(file).startswith(self._installed):
+                stat = file.stat()
+                digests[name] = f"installed:{stat.st_size}:{stat.st_mtime_ns}"
+                continue
+            if str(file).startswith(self._stdlib):
+                continue
+
+            digests[name] = self.cache.digest(file)
+            pending.extend(self._module_imports(name, file))
+        return digests
+
+    @staticmethod
+    def _file(name: str) -> Union[Path, None]:
+        file = getattr(sys.modules.get(name), "__file__", None)
+        return Path(file).resolve() if file else None
+
+    def _module_imports(self, name: str, file: Path) -> Set[str]:
+        """Get the imported modules (that are loaded) of a source module"""
+        if name in self._imports:
+            return self._imports[name]
+
+        package = name if file.name == "__init__.py" else name.rpartition(".")[0]
+        imported = set()
+        for node in ast.walk(ast.parse(file.read_bytes(), filename=str(file))):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    base = importlib.util.resolve_name("." * node.level + base, package)
+                names = [base] + [f"{base}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for imported_name in names:
+                parts = imported_name.split(".")
+                imported.update(".".join(parts[: i + 1]) for i in range(len(parts)))
+
+        self._imports[name] = {imported_name for imported_name in imported if imported_name in sys.modules}
+        return self._imports[name]
+
+
+class StackFingerprints:
+    """
+    Incremental synth: fingerprints the inputs of each stack of an app - the modules defining it, the sources of its
+    Lambda (and other) assets and the app context - in its cloud assembly. When the fingerprint of a stack matches the
+    one recorded by the previous synth to the same cloud assembly, the stack is not constructed again: its template,
+    asset manifest and assets are reused from that synth, and its artifacts are merged back into the manifest.
+
+        fingerprints = StackFingerprints(app.outdir, context, entrypoint=Path(__file__))
+        for stack_class in stacks:
+            if not fingerprints.unchanged(stack_class.name, stack_class):
+                fingerprints.add(stack_class(app, stack_class.name), stack_class)
+        return fingerprints.save(app.synth())
+    """
+
+    def __init__(
+        self,
+        outdir: Union[str, Path],
+        context: Dict,
+        entrypoint: Union[Path, None] = None,
+        shared: Iterable = (),
+    ):
+        self.outdir = Path(outdir).absolute()
+        self.context_digest = self._context_digest(context)
+        self.entrypoint = Path(entrypoint).resolve() if entrypoint else None
+        self.shared = list(shared)
+        self.enabled = context.get(INCREMENTAL_SYNTH_CONTEXT) not in (False, "false", "False") and not any(
+            context.get(name) for name in RELEASE_ASSETS_CONTEXT
+        )
+        self.cache = FileDigestCache.load(self.outdir)
+        self.modules = SourceModules(self.cache)
+
+        self.previous = self._load(self.outdir / FINGERPRINTS_FILE).get("stacks", {})
+        self.previous_manifest = self._load(self.outdir / MANIFEST_FILE)
+        self.reused: Dict[str, Dict] = {}
+        self.added: Dict[str, Tuple[Stack, type]] = {}
+
+    def unchanged(self, stack_id: str, stack_class) -> bool:
+        """Check if a stack can be reused from the previous synth, instead of being constructed"""
+        if not self.enabled:
+            return False
+
+        record = self.previous.get(stack_id)
+        if not record or record.get("version") != FINGERPRINTS_VERSION:
+            logger.info("%s: synthesizing (no fingerprint from a previous synth)" % stack_id)
+            return False
+        if not self._assembled(stack_id):
+            logger.info("%s: synthesizing (the previous synth of the stack is incomplete)" % stack_id)
+            return False
+
+        changes = self._changes(record, self._fingerprint(stack_class, record["assets"]))
+        if changes:
+            logger.info("%s: synthesizing (changed: %s)" % (stack_id, ", ".join(changes[:CHANGES_LOGGED])))
+            return False
+
+        logger.info("%s: reusing the previous synth (fingerprint unchanged)" % stack_id)
+        self.reused[stack_id] = record
+        return True
+
+    def add(self, stack: Stack, stack_class) -> None:
+        """Add a stack constructed for this synth, to fingerprint once it is synthesized"""
+        self.added[stack.node.id] = (stack, stack_class)
+
+    def save(self, assembly: cx_api.CloudAssembly) -> cx_api.CloudAssembly:
+        """
+        Merge the artifacts of the reused stacks into the manifest of the cloud assembly and record the fingerprints
+        of its stacks. Call this once the app is synthesized and its assets are bundled.
+        """
+        stacks = dict(self.reused)
+        for stack_id, (stack, stack_class) in self.added.items():
+            stacks[stack_id] = self._fingerprint(stack_class, self._asset_sources(stack))
+
+        self.cache.save()
+        (self.outdir / FINGERPRINTS_FILE).write_text(
+            json.dumps({"version": FINGERPRINTS_VERSION, "stacks": stacks}, indent=2, sort_keys=True)
+        )
+        if not self.reused:
+            return assembly
+
+        manifest = self._load(self.outdir / MANIFEST_FILE)
+        previous_artifacts = self.previous_manifest["artifacts"]
+        for stack_id in self.reused:
+            for artifact_id in self._artifact_ids(stack_id):
+                manifest["artifacts"][artifact_id] = previous_artifacts[artifact_id]
+        (self.outdir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+        return cx_api.CloudAssembly(str(self.outdir))
+
+    def _fingerprint(self, stack_class, asset_sources: List[Dict]) -> Dict:
+        modules = self.modules.digests(stack_class, *self.shared)
+        if self.entrypoint:
+            modules[self.entrypoint.name] = self.cache.digest(self.entrypoint)
+        return {
+            "version": FINGERPRINTS_VERSION,
+            "interpreter": "%d.%d" % sys.version_info[:2],
+            "context": self.context_digest,
+            "modules": modules,
+            "assets": [dict(sources, digest=self._asset_digest(sources)) for sources in asset_sources],
+        }
+
+    @staticmethod
+    def _changes(previous: Dict, current: Dict) -> List[str]:
+        changes = [key for key in ("interpreter", "context") if previous[key] != current[key]]
+        modules = set(previous["modules"]) | set(current["modules"])
+        changes.extend(
+            sorted(name for name in modules if previous["modules"].get(name) != current["modules"].get(name))
+        )
+        for sources, current_sources in zip(previous["assets"], current["assets"]):
+            if sources["digest"] != current_sources["digest"]:
+                changes.extend(path for path in sources["paths"] if path not in changes)
+        return changes
+
+    @staticmethod
+    def _asset_sources(stack: Stack) -> List[Dict]:
+        """Get the source paths of the assets of a stack (with the names ignored when hashing them)"""
+        sources = []
+        staged = set()
+        for construct in stack.node.find_all():
+            if isinstance(construct, SolutionsPythonLayerVersion):
+                paths = [
+                    construct.requirements_path,
+                    *local_requirements(
+                        construct.requirements_path / REQUIREMENTS_TXT_FILE, cwd=construct.requirements_path
+                    ),
+                    *construct.libraries,
+                ]
+                sources.append({"paths": paths, "ignore": LAYER_HASH_EXCLUDES})
+            elif isinstance(construct, SolutionsPythonFunction):
+                paths = [construct.source_path, *construct.libraries]
+                sources.append({"paths": paths, "ignore": DIRECTORY_HASH_IGNORE})
+            elif isinstance(construct, AssetStaging):
+                staged.add(Path(construct.source_path))
+        sources.extend(
+            {"paths": [path], "ignore": DIRECTORY_HASH_IGNORE}
+            for path in sorted(staged - {Path(path) for source in sources for path in source["paths"]})
+            # the assets of the CDK libraries are extracted for each process - they are fingerprinted by their package
+            if "node_modules" not in path.parts
+        )
+        return [
+            {"paths": sorted(str(Path(path).resolve()) for path in source["paths"]), "ignore": list(source["ignore"])}
+            for source in sources
+        ]
+
+    def _asset_digest(self, sources: Dict) -> Union[str, None]:
+        paths = [Path(path) for path in sources["paths"]]
+        if not all(path.exists() for path in paths):
+            return None
+        directories = [path for path in paths if path.is_dir()]
+        files = [self.cache.digest(path) for path in paths if not path.is_dir()]
+        return "-".join([DirectoryHash.hash(*directories, ignore=sources["ignore"], cache_dir=self.outdir), *files])
+
+    def _artifact_ids(self, stack_id: str) -> List[str]:
+        """Get the artifacts of a stack in the previous manifest - the stack and the artifacts it depends on"""
+        artifacts = self.previous_manifest.get("artifacts", {})
+        artifact_ids = []
+        pending = [stack_id]
+        while pending:
+            artifact_id = pending.pop()
+            if artifact_id in artifact_ids:
+                continue
+            artifact_ids.append(artifact_id)
+            pending.extend(artifacts.get(artifact_id, {}).get("dependencies", []))
+        return artifact_ids
+
+    def _assembled(self, stack_id: str) -> bool:
+        """Check that the artifacts of a stack, and the files and assets they refer to, are in the cloud assembly"""
+        artifacts = self.previous_manifest.get("artifacts", {})
+        for artifact_id in self._artifact_ids(stack_id):
+            artifact = artifacts.get(artifact_id)
+            if not artifact:
+                return False
+            properties = artifact.get("properties", {})
+            for name in ("templateFile", "file"):
+                if name in properties and not (self.outdir / properties[name]).exists():
+                    return False
+            if artifact["type"] == ASSET_MANIFEST_ARTIFACT:
+                asset_manifest = self._load(self.outdir / properties["file"])
+                for asset in asset_manifest.get("files", {}).values():
+                    if not (self.outdir / asset["source"]["path"]).exists():
+                        return False
+        return True
+
+    @staticmethod
+    def _context_digest(context: Dict) -> str:
+        context = {name: value for name, value in context.items() if name != INCREMENTAL_SYNTH_CONTEXT}
+        environment = {name: value for name, value in os.environ.items() if name.startswith(CDK_ENVIRONMENT_PREFIX)}
+        values = json.dumps({"context": context, "environment": environment}, sort_keys=True, default=str)
+        return hashlib.sha256(values.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _load(path: Path) -> Dict:
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,195 @@
+# #####################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                 #
+#                                                                                                                     #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance     #
+#  with the License. You may obtain a copy of the License at                                                          #
+#                                                                                                                     #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                        #
+#                                                                                                                     #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#  the specific language governing permissions and limitations under the License.                                     #
+# #####################################################################################################################
+
+import hashlib
+import logging
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from s3transfer.utils import ChunksizeAdjuster
+
+logger = logging.getLogger("cdk-helper")
+
+MiB = 2 ** 20
+DEFAULT_CONCURRENCY = 10
+DEFAULT_MULTIPART_THRESHOLD = 8 * MiB
+DEFAULT_MULTIPART_CHUNKSIZE = 8 * MiB
+# the user metadata every uploaded object carries its content hash in - the ETag is not a content hash for every
+# object (e.g. SSE-KMS encrypted objects, or multipart uploads with a different part size)
+SHA256_METADATA = "sha256"
+READ_BLOCK_SIZE = MiB
+
+
+@dataclass(frozen=True)
+class FileDigest:
+    """The hashes of a local file: its sha256, and the ETag S3 computes for it when uploaded with our part size"""
+
+    size: int
+    sha256: str
+    etag: str
+
+
+@dataclass
+class SyncReport:
+    """What a sync transferred"""
+
+    destination: str
+    uploaded: int = 0
+    uploaded_bytes: int = 0
+    skipped: int = 0
+    skipped_bytes: int = 0
+    failed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.destination}: {self.uploaded} uploaded ({self.uploaded_bytes / MiB:.1f} MiB), "
+            f"{self.skipped} unchanged ({self.skipped_bytes / MiB:.1f} MiB), "
+            f"{len(self.failed)} failed in {self.seconds:.1f}s"
+        )
+
+
+def split_s3_path(s3_path: str) -> Tuple[str, str]:
+    """Split s3://bucket/prefix into its bucket and key prefix"""
+    bucket, _, prefix = s3_path[len("s3://"):].partition("/")
+    return bucket, prefix.strip("/")
+
+
+class S3Sync:
+    """
+    Uploads a local directory to an S3 prefix with the boto3 transfer manager, skipping the objects whose
+    content is already there. Like `aws s3 sync`, objects are never deleted from the destination.
+    """
+
+    # local digests by file and part size, so that syncing the same files to several buckets hashes them once
+    _digests: Dict[Tuple[Path, int, int, bool, int], FileDigest] = {}
+
+    def __init__(
+        self,
+        s3_client=None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        multipart_chunksize: int = DEFAULT_MULTIPART_CHUNKSIZE,
+    ):
+        self.s3_client = s3_client or boto3.client("s3")
+        self.concurrency = concurrency
+        self.transfer_config = TransferConfig(
+            max_concurrency=concurrency,
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+        )
+
+    def digest(self, path: Path) -> FileDigest:
+        """Get the sha256 and the expected S3 ETag of a local file, read once"""
+        stat = path.stat()
+        multipart = stat.st_size >= self.transfer_config.multipart_threshold
+        chunksize = ChunksizeAdjuster().adjust_chunksize(self.transfer_config.multipart_chunksize, stat.st_size)
+        key = (path.resolve(), stat.st_size, stat.st_mtime_ns, multipart, chunksize)
+        if key in S3Sync._digests:
+            return S3Sync._digests[key]
+
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()  # NOSONAR (python:S4790) - S3 ETags are md5 based
+        part_md5s = []
+        with path.open("rb") as f:
+            for part in iter(lambda: f.read(chunksize if multipart else READ_BLOCK_SIZE), b""):
+                sha256.update(part)
+                if multipart:
+                    part_md5s.append(hashlib.md5(part).digest())  # NOSONAR (python:S4790)
+                else:
+                    md5.update(part)
+
+        if multipart:
+            etag = f"{hashlib.md5(b''.join(part_md5s)).hexdigest()}-{len(part_md5s)}"  # NOSONAR (python:S4790)
+        else:
+            etag = md5.hexdigest()
+
+        S3Sync._digests[key] = FileDigest(size=stat.st_size, sha256=sha256.hexdigest(), etag=etag)
+        return S3Sync._digests[key]
+
+    def remote_objects(self, bucket: str, prefix: str) -> Dict[str, Dict]:
+        """List the objects under a prefix by key"""
+        objects = {}
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=f"{prefix}/" if prefix else ""):
+            for remote in page.get("Contents", []):
+                objects[remote["Key"]] = remote
+        return objects
+
+    def unchanged(self, bucket: str, key: str, digest: FileDigest, remote: Dict) -> bool:
+        """Check if a remote object has the content of a local file, by its ETag or (failing that) its sha256 metadata"""
+        if not remote or remote["Size"] != digest.size:
+            return False
+        if remote["ETag"].strip('"') == digest.etag:
+            return True
+        metadata = self.s3_client.head_object(Bucket=bucket, Key=key).get("Metadata", {})
+        return metadata.get(SHA256_METADATA) == digest.sha256
+
+    def sync(self, local_path: Path, s3_path: str) -> SyncReport:
+        """Upload the files of local_path that are missing or changed under s3_path"""
+        started = time.perf_counter()
+        report = SyncReport(destination=s3_path)
+        bucket, prefix = split_s3_path(s3_path)
+
+        local_path = Path(local_path)
+        files = sorted(path for path in local_path.rglob("*") if path.is_file())
+        keys = ["/".join(filter(None, [prefix, path.relative_to(local_path).as_posix()])) for path in files]
+        remote = self.remote_objects(bucket, prefix)
+
+        # hashing (which releases the GIL) and the checks against the remote objects run in parallel
+        def to_upload(item) -> bool:
+            path, key = item
+            return not self.unchanged(bucket, key, self.digest(path), remote.get(key))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s3-sync") as executor:
+            changed = list(executor.map(to_upload, zip(files, keys)))
+
+        uploads = []
+        with create_transfer_manager(self.s3_client, self.transfer_config) as manager:
+            for path, key, upload in zip(files, keys, changed):
+                digest = self.digest(path)
+                if not upload:
+                    logger.debug("s3 sync: %s unchanged" % key)
+                    report.skipped += 1
+                    report.skipped_bytes += digest.size
+                    continue
+
+                extra_args = {
+                    "ACL": "bucket-owner-full-control",
+                    "Metadata": {SHA256_METADATA: digest.sha256},
+                }
+                content_type, _ = mimetypes.guess_type(path.name)
+                if content_type:
+                    extra_args["ContentType"] = content_type
+                future = manager.upload(str(path), bucket, key, extra_args=extra_args)
+                uploads.append((future, path, key, digest))
+
+            for future, path, key, digest in uploads:
+                try:
+                    future.result()
+                except Exception as exc:  # NOSONAR (python:S5754) - every failure is reported
+                    logger.error("s3 sync: upload of %s to s3://%s/%s failed: %s" % (path, bucket, key, exc))
+                    report.failed.append(key)
+                    continue
+                logger.info("s3 sync: upload: %s to s3://%s/%s" % (path, bucket, key))
+                report.uploaded += 1
+                report.uploaded_bytes += digest.size
+
+        report.seconds = time.perf_counter() - started
+        return report
@@ -0,0 +1,72 @@
+# #####################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                 #
+#                                                                                                                     #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance     #
+#  with the License. You may obtain a copy of the License at                                                          #
+#                                                                                                                     #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                        #
+#                                                                                                                     #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#  the specific language governing permissions and limitations under the License.                                     #
+# #####################################################################################################################
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+
+class SynthTimings:
+    """
+    Records the wall time spent in each phase of a synth (constructing the Lambda functions and layers, hashing and
+    bundling their assets, post-processing the templates), from hooks in the solutions constructs and synthesizer.
+    Phases are timed independently - they can nest (a function's construction includes hashing its asset), and
+    phases run in background threads (bundling) add up their time across threads.
+    """
+
+    _lock = threading.Lock()
+    _seconds: Dict[str, float] = {}
+    _counts: Dict[str, int] = {}
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with cls._lock:
+                cls._seconds[name] = cls._seconds.get(name, 0.0) + elapsed
+                cls._counts[name] = cls._counts.get(name, 0) + 1
+
+    @classmethod
+    def timed(cls, name: str) -> Callable:
+        """Decorate a function to time its calls as a phase"""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with cls.phase(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict]:
+        """Get the total seconds and the number of times each phase ran"""
+        with cls._lock:
+            return {
+                name: {"seconds": cls._seconds[name], "count": cls._counts[name]}
+                for name in sorted(cls._seconds)
+            }
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._seconds.clear()
+            cls._counts.clear()
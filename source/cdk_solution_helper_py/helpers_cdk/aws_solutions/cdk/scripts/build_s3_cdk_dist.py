@@ -16,7 +16,6 @@
 import os
 import re
 import shutil
-import subprocess
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -27,6 +26,12 @@ import click
 from aws_solutions.cdk.helpers import copytree
 from aws_solutions.cdk.helpers.loader import load_cdk_app
 from aws_solutions.cdk.helpers.logger import Logger
+from aws_solutions.cdk.helpers.s3_sync import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MULTIPART_THRESHOLD,
+    MiB,
+    S3Sync,
+)
 from aws_solutions.cdk.tools import Cleaner
 
 logger = Logger.get_logger("cdk-helper")
@@ -102,7 +107,7 @@ class BaseAssetPackager:
     local_asset_path = None
     s3_asset_path = None
 
-    def sync(self):
+    def sync(self, s3_sync: S3Sync = None):
         """Sync the assets packaged"""
         if not self.local_asset_path:
             raise ValueError("missing local asset path for sync")
@@ -110,32 +115,12 @@ class BaseAssetPackager:
             raise ValueError("missing s3 asset path for sync")
 
         self.check_bucket()
-        try:
-            with subprocess.Popen(
-                [
-                    "aws",
-                    "s3",
-                    "sync",
-                    self.local_asset_path,
-                    self.s3_asset_path,
-                    "--no-progress",
-                    "--acl",
-                    "bucket-owner-full-control",
-                ],
-                shell=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-            ) as p:
-                for line in p.stdout:
-                    logger.info("s3 sync: %s" % line.strip())
-                for line in p.stderr:
-                    logger.error("s3 sync: %s" % line.strip())
-        except FileNotFoundError:
-            logger.error("awscli is missing")
-            raise click.ClickException("--sync requires awscli to be installed")
-        if p.returncode != 0:
+        s3_sync = s3_sync or S3Sync()
+        report = s3_sync.sync(Path(self.local_asset_path), self.s3_asset_path)
+        logger.info("s3 sync: %s" % report)
+        if report.failed:
             raise click.ClickException("--sync failed")
+        return report
 
     def check_bucket(self) -> bool:
         """Checks bucket ownership before sync"""
@@ -164,6 +149,7 @@ class RegionalAssetPackager(BaseAssetPackager):
 
     def __init__(self, build_env: BuildEnvironment, region="us-east-1"):
         self.build_env = build_env
+        self.region = region
         self.local_asset_path = build_env.build_dist_dir
         self.s3_asset_path = f"s3://{build_env.source_bucket_name}-{region}/{build_env.solution_name}/{build_env.version_code}"
 
@@ -341,8 +327,21 @@ def source_code_package(ctx, ignore, solution_name):
 )
 @click.option(
     "--region",
-    help="Use this flag to control which regional bucket to push your assets to",
-    default="us-east-1",
+    help="Use this flag to control which regional bucket to push your assets to. Repeat it to push to several regions",
+    default=["us-east-1"],
+    multiple=True,
+)
+@click.option(
+    "--sync-concurrency",
+    help="The number of concurrent uploads (and upload parts) used by --sync",
+    default=DEFAULT_CONCURRENCY,
+    type=click.IntRange(min=1),
+)
+@click.option(
+    "--multipart-threshold",
+    help="The size in MiB from which --sync uploads files in parts (of this size)",
+    default=DEFAULT_MULTIPART_THRESHOLD // MiB,
+    type=click.IntRange(min=5),
 )
 def deploy(
     ctx,  # NOSONAR (python:S107) - allow large number of method parameters
@@ -353,6 +352,8 @@ def deploy(
     cdk_app_entrypoint,
     sync,
     region,
+    sync_concurrency,
+    multipart_threshold,
 ):
     """Runs the CDK build of the project, uploading assets as required."""
 
@@ -384,17 +385,24 @@ def deploy(
     )
 
     # run regional asset packaging
-    rap = RegionalAssetPackager(env, region=region)
-    rap.package()
+    raps = [RegionalAssetPackager(env, region=name) for name in region]
+    for rap in raps:
+        rap.package()
 
     # run global asset packaging
     gap = GlobalAssetPackager(env)
     gap.package()
 
-    # sync as required
+    # sync as required - the assets are hashed once and only the changed ones are uploaded to each bucket
     if sync:
-        rap.sync()
-        gap.sync()
+        transfer = dict(
+            concurrency=sync_concurrency,
+            multipart_threshold=multipart_threshold * MiB,
+            multipart_chunksize=multipart_threshold * MiB,
+        )
+        for rap in raps:
+            rap.sync(S3Sync(boto3.client("s3", region_name=rap.region), **transfer))
+        gap.sync(S3Sync(**transfer))
 
 
 if __name__ == "__main__":
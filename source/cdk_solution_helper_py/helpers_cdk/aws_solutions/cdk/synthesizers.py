@@ -10,22 +10,60 @@
 #  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
 #  the specific language governing permissions and limitations under the License.                                     #
 # #####################################################################################################################
+import hashlib
 import json
 import logging
 import os
 import re
 import shutil
+import stat
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
 from dataclasses import field, dataclass
-from fileinput import FileInput
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Set, Tuple
 
 import jsii
 from aws_cdk import IStackSynthesizer, DefaultStackSynthesizer, ISynthesisSession
 
+from aws_solutions.cdk.aws_lambda.python.bundling import BundlingScheduler
+from aws_solutions.cdk.helpers.timings import SynthTimings
+
 logger = logging.getLogger("cdk-helper")
 
+# the earliest date a zip file can hold - every entry gets it, so archives of the same content are byte-identical
+ARCHIVE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_BLOCK_SIZE = 2 ** 20
+# template parameters to substitute from the CDK context, e.g. %%SOLUTION_VERSION%%
+SUBSTITUTION_RE = re.compile("%%[a-zA-Z-_][a-zA-Z-_]+%%")
+
+
+def archive_directory(directory: Path, archive: Path) -> None:
+    """Zip a directory reproducibly: sorted entries, fixed timestamps and normalized permissions"""
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for path, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                file = Path(path) / name
+                file_stat = file.stat()
+                mode = 0o755 if file_stat.st_mode & stat.S_IXUSR else 0o644
+                info = zipfile.ZipInfo(file.relative_to(directory).as_posix(), date_time=ARCHIVE_DATE_TIME)
+                info.external_attr = (stat.S_IFREG | mode) << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.file_size = file_stat.st_size
+                with file.open("rb") as source, zip_file.open(info, "w") as target:
+                    shutil.copyfileobj(source, target, ARCHIVE_BLOCK_SIZE)
+
+
+def content_hash(file: Path) -> str:
+    file_hash = hashlib.sha256()
+    with file.open("rb") as f:
+        for block in iter(lambda: f.read(ARCHIVE_BLOCK_SIZE), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
 
 @dataclass
 class CloudFormationTemplate:
@@ -39,6 +77,9 @@ class CloudFormationTemplate:
     assets_global: List[Path] = field(repr=False, default_factory=list, init=False)
     assets_regional: List[Path] = field(repr=False, default_factory=list, init=False)
     global_asset_name: str = field(repr=False, init=False)
+    substitutions: int = field(repr=False, default=0, init=False)
+    # archives of the asset sources already packaged, shared by the templates of a synth
+    _archive_cache = {}
 
     def __post_init__(self):
         self.cloud_assembly_path = self.path.parent
@@ -53,6 +94,30 @@ class CloudFormationTemplate:
                 "for nested stack support, you must provide a filename to TemplateOptions for each stack"
             )
 
+    def substitute(self, context: Callable[[str], Any]) -> Set[str]:
+        """Substitute the %%PLACEHOLDER%% parameters in the template keys and values, returning those without a value"""
+        missing = set()
+
+        def replace(match: re.Match) -> str:
+            placeholder = match.group(0).replace("%", "")
+            if replacement := context(placeholder):
+                self.substitutions += 1
+                return str(replacement)
+            missing.add(placeholder)
+            return match.group(0)
+
+        def walk(value):
+            if isinstance(value, str):
+                return SUBSTITUTION_RE.sub(replace, value) if "%%" in value else value
+            if isinstance(value, dict):
+                return {walk(key): walk(item) for (key, item) in value.items()}
+            if isinstance(value, list):
+                return [walk(item) for item in value]
+            return value
+
+        self.contents = walk(self.contents)
+        return missing
+
     def delete_bootstrap_parameters(self):
         """Remove the CDK bootstrap parameters, since this stack will not be bootstrapped"""
         with suppress(KeyError):
@@ -126,6 +191,7 @@ class CloudFormationTemplate:
 
     def patch_lambda(self):
         """Patch the lambda functions for S3 deployment compatibility"""
+        resources = []
         for (resource_name, resource) in self.contents.get("Resources", {}).items():
             resource_type = resource.get("Type")
             if resource_type in ["AWS::Lambda::Function", "AWS::Lambda::LayerVersion"]:
@@ -149,59 +215,83 @@ class CloudFormationTemplate:
                     continue
 
                 asset = self.assets["files"][resource_id]
-                asset_source_path = self.path.parent.joinpath(asset["source"]["path"])
-                asset_packaging = asset["source"]["packaging"]
-
-                # CDK does not zip assets prior to deployment - we do it here if a zip asset is detected
-                if asset_packaging == "zip":
-                    # create archive if necessary
-                    logger.info(f"{resource_name} packaging into .zip file")
-                    archive = shutil.make_archive(
-                        base_name=asset_source_path,
-                        format="zip",
-                        root_dir=str(asset_source_path),
-                    )
-                elif asset_packaging == "file":
-                    archive = self.cloud_assembly_path.joinpath(asset["source"]["path"])
-                else:
-                    raise ValueError(
-                        f"Unsupported asset packaging format: {asset_packaging}"
-                    )
-
-                # rename archive to match the resource name it was generated for
-                archive_name = f"{resource_name}.zip"
-                archive_path = self.cloud_assembly_path.joinpath(archive_name)
-                shutil.move(src=archive, dst=archive_path)
-
-                # update CloudFormation resource properties for S3Bucket and S3Key
-                # fmt: off
-                resource["Properties"][content_key]["S3Bucket"] = {
-                    "Fn::Join": [ # NOSONAR (python:S1192) - string for clarity
-                        "-",
-                        [
-                            {
-                                "Fn::FindInMap": ["SourceCode", "General", "S3Bucket"]  # NOSONAR (python:S1192) - string for clarity
-                            },
-                            {"Ref": "AWS::Region"},
-                        ],
-                    ]
-                }
-                resource["Properties"][content_key]["S3Key"] = {
-                    "Fn::Join": [  # NOSONAR (python:S1192) - string for clarity
-                        "/",
-                        [
-                            {
-                                "Fn::FindInMap": ["SourceCode", "General", "KeyPrefix"]  # NOSONAR (python:S1192) - string for clarity
-                            },
-                            archive_name,
-                        ],
-                    ]
-                }
-                # fmt: on
+                resources.append((resource, content_key, self._archive_source(asset)))
+
+        archives = self._archives(source for (_, _, source) in resources)
+        for (resource, content_key, source) in resources:
+            archive_path = archives[source]
+
+            # update CloudFormation resource properties for S3Bucket and S3Key
+            # fmt: off
+            resource["Properties"][content_key]["S3Bucket"] = {
+                "Fn::Join": [ # NOSONAR (python:S1192) - string for clarity
+                    "-",
+                    [
+                        {
+                            "Fn::FindInMap": ["SourceCode", "General", "S3Bucket"]  # NOSONAR (python:S1192) - string for clarity
+                        },
+                        {"Ref": "AWS::Region"},
+                    ],
+                ]
+            }
+            resource["Properties"][content_key]["S3Key"] = {
+                "Fn::Join": [  # NOSONAR (python:S1192) - string for clarity
+                    "/",
+                    [
+                        {
+                            "Fn::FindInMap": ["SourceCode", "General", "KeyPrefix"]  # NOSONAR (python:S1192) - string for clarity
+                        },
+                        archive_path.name,
+                    ],
+                ]
+            }
+            # fmt: on
 
-                # add resource to the list of regional assets
+            # add resource to the list of regional assets
+            if archive_path not in self.assets_regional:
                 self.assets_regional.append(archive_path)
 
+    def _archive_source(self, asset: Dict) -> Tuple[Path, str]:
+        asset_source_path = self.cloud_assembly_path.joinpath(asset["source"]["path"])
+        asset_packaging = asset["source"]["packaging"]
+        if asset_packaging not in ["zip", "file"]:
+            raise ValueError(f"Unsupported asset packaging format: {asset_packaging}")
+        return asset_source_path, asset_packaging
+
+    @SynthTimings.timed("asset_archiving")
+    def _archives(self, sources) -> Dict[Tuple[Path, str], Path]:
+        """
+        Get the content-addressed archive of each asset source. Each unique asset is archived once per synth
+        (even when it is used by several resources or stacks) and the archives are compressed in parallel
+        """
+        to_archive = {
+            source for source in sources
+            if not CloudFormationTemplate._archive_cache.get(source, Path()).is_file()
+        }
+        with ThreadPoolExecutor(thread_name_prefix="archive") as executor:
+            for source, archive_path in zip(to_archive, executor.map(self._archive, to_archive)):
+                CloudFormationTemplate._archive_cache[source] = archive_path
+        return CloudFormationTemplate._archive_cache
+
+    def _archive(self, source: Tuple[Path, str]) -> Path:
+        asset_source_path, asset_packaging = source
+
+        # CDK does not zip assets prior to deployment - we do it here if a zip asset is detected
+        if asset_packaging == "zip":
+            logger.info(f"{asset_source_path.name} packaging into .zip file")
+            archive = asset_source_path.with_name(f"{asset_source_path.name}.zip")
+            archive_directory(asset_source_path, archive)
+        else:
+            archive = asset_source_path
+
+        # name the archive by its content, so identical assets share one regional asset
+        archive_path = self.cloud_assembly_path.joinpath(f"{content_hash(archive)}.zip")
+        if asset_packaging == "zip":
+            shutil.move(src=archive, dst=archive_path)
+        else:
+            shutil.copy(src=archive, dst=archive_path)
+        return archive_path
+
     def _build_asset_path(self, asset_path):
         asset_output_path = self.cloud_assembly_path.joinpath(asset_path)
         asset_output_path.mkdir(parents=True, exist_ok=True)
@@ -232,7 +322,7 @@ class SolutionStackSubstitions(DefaultStackSynthesizer):
     """Used to handle AWS Solutions template substitutions and sanitization"""
 
     substitutions = None
-    substitution_re = re.compile("%%[a-zA-Z-_][a-zA-Z-_]+%%")
+    substitution_re = SUBSTITUTION_RE
 
     def _template_names(self, session: ISynthesisSession) -> List[Path]:
         assembly_output_path = Path(session.assembly.outdir)
@@ -257,7 +347,8 @@ class SolutionStackSubstitions(DefaultStackSynthesizer):
     def synthesize(self, session: ISynthesisSession):
         # when called with `cdk deploy` this outputs to cdk.out
         # when called from python directly, this outputs to a temporary directory
-        result = DefaultStackSynthesizer.synthesize(self, session)
+        with SynthTimings.phase("stack_synthesis"):
+            result = DefaultStackSynthesizer.synthesize(self, session)
 
         asset_path_regional =  self._bound_stack.node.try_get_context("SOLUTIONS_ASSETS_REGIONAL")
         asset_path_global =  self._bound_stack.node.try_get_context("SOLUTIONS_ASSETS_GLOBAL")
@@ -265,41 +356,45 @@ class SolutionStackSubstitions(DefaultStackSynthesizer):
         logger.info(
             f"solutions parameter substitution in {session.assembly.outdir} started"
         )
-        for template in self._template_names(session):
-            logger.info(f"substutiting parameters in {str(template)}")
-            with FileInput(template, inplace=True) as template_lines:
-                for line in template_lines:
-                    # handle all template subsitutions in the line
-                    for match in SolutionStackSubstitions.substitution_re.findall(line):
-                        placeholder = match.replace("%", "")
-                        if replacement := self._bound_stack.node.try_get_context(placeholder):
-                            line = line.replace(match, replacement)
-                        else:
-                            raise ValueError(
-                                f"Please provide a parameter substitution for {placeholder} via environment variable or CDK context"
-                            )
-
-                    # print the (now substituted) line in the context of template_lines
-                    print(line, end="")
-            logger.info(f"substituting parameters in {str(template)} completed")
+        with SynthTimings.phase("template_substitution"):
+            # each template is parsed once, substituted and customized in memory, then written once
+            templates = list(self._templates(session))
+            context = lru_cache(maxsize=None)(self._bound_stack.node.try_get_context)
+            missing = set()
+            for template in templates:
+                logger.info(f"substituting parameters in {str(template.path)}")
+                missing |= template.substitute(context)
+        if missing:
+            raise ValueError(
+                f"Please provide a parameter substitution for {', '.join(sorted(missing))} via environment variable or CDK context"
+            )
         logger.info("solutions parameter substitution completed")
 
         # do not perform solution resource/ template cleanup if asset paths not passed
         if not asset_path_global or not asset_path_regional:
-            return
+            with SynthTimings.phase("template_customization"):
+                for template in templates:
+                    if template.substitutions:
+                        template.save()
+            return result
+
+        # the lambda assets are packaged below, so their (background) bundling must be complete
+        with SynthTimings.phase("bundling_wait"):
+            BundlingScheduler.wait()
 
         logger.info(
             f"solutions template customization in {session.assembly.outdir} started"
         )
-        for template in self._templates(session):
-            template.patch_lambda()
-            template.patch_nested()
-            template.delete_bootstrap_parameters()
-            template.delete_cdk_helpers()
-            template.save(
-                asset_path_global=asset_path_global,
-                asset_path_regional=asset_path_regional,
-            )
+        with SynthTimings.phase("template_customization"):
+            for template in templates:
+                template.patch_lambda()
+                template.patch_nested()
+                template.delete_bootstrap_parameters()
+                template.delete_cdk_helpers()
+                template.save(
+                    asset_path_global=asset_path_global,
+                    asset_path_regional=asset_path_regional,
+                )
         logger.info("solutions template customization completed")
 
         return result
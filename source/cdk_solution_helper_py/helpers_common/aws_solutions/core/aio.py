@@ -0,0 +1,95 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, List
+
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+async def gather_bounded(
+    awaitables: Iterable[Awaitable], max_concurrency: int = DEFAULT_MAX_CONCURRENCY, return_exceptions: bool = False
+) -> List:
+    """
+    Await at most max_concurrency of the awaitables at a time
+    :param awaitables: the awaitables to run
+    :param max_concurrency: the maximum number of awaitables in flight
+    :param return_exceptions: return exceptions as results instead of raising the first one
+    :return: the results, in the order of the awaitables
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(awaitable):
+        try:
+            async with semaphore:
+                return await awaitable
+        finally:
+            # coroutines cancelled before they got a slot were never started
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+
+    return await asyncio.gather(*(bounded(awaitable) for awaitable in awaitables), return_exceptions=return_exceptions)
+
+
+def _run(coroutine: Awaitable):
+    """
+    Run a coroutine to completion from synchronous code. asyncio.run cannot be called from a thread that already runs
+    an event loop (e.g. code called from a notebook or an async framework), so there it runs on a thread of its own.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def run_bounded(
+    awaitables: Iterable[Awaitable], max_concurrency: int = DEFAULT_MAX_CONCURRENCY, return_exceptions: bool = False
+) -> List:
+    """
+    Run awaitables with bounded concurrency from synchronous code (e.g. a Lambda handler). The awaitables must not be
+    bound to another event loop (e.g. coroutines, not tasks or futures)
+    :param awaitables: the awaitables to run
+    :param max_concurrency: the maximum number of awaitables in flight
+    :param return_exceptions: return exceptions as results instead of raising the first one
+    :return: the results, in the order of the awaitables
+    """
+    return _run(gather_bounded(awaitables, max_concurrency, return_exceptions))
+
+
+def run_calls_bounded(
+    calls: Iterable[Callable], max_concurrency: int = DEFAULT_MAX_CONCURRENCY, return_exceptions: bool = False
+) -> List:
+    """
+    Run blocking calls (e.g. calls on the thread safe clients from get_service_client) on at most max_concurrency
+    threads from synchronous code, so that independent I/O overlaps
+    :param calls: the zero-argument callables to run
+    :param max_concurrency: the maximum number of calls in flight
+    :param return_exceptions: return exceptions as results instead of raising the first one
+    :return: the results, in the order of the calls
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+
+    async def run_calls(executor):
+        loop = asyncio.get_running_loop()
+        return await gather_bounded(
+            (loop.run_in_executor(executor, call) for call in calls), max_concurrency, return_exceptions
+        )
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(calls))) as executor:
+        return _run(run_calls(executor))
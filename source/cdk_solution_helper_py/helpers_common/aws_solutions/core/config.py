@@ -13,7 +13,7 @@
 
 import os
 import re
-from typing import Dict
+from typing import Dict, Optional
 
 import botocore.config
 
@@ -28,19 +28,28 @@ SOLUTION_VERSION_RE = re.compile(
 )
 
 
+NUMBER_RE = re.compile(r"^\d+$")
+RETRY_MODE_RE = re.compile(r"^(legacy|standard|adaptive)$")
+BOOLEAN_RE = re.compile(r"^(true|false)$", re.IGNORECASE)
+
+
 class SolutionConfigEnv:
-    def __init__(self, env_var, default: str = "", regex: re.Pattern = None):
+    def __init__(self, env_var, default: str = "", regex: re.Pattern = None, optional: bool = False):
         self._env_var = env_var
         self._regex = regex
         self._value = default
+        self._optional = optional
 
     def _get_value_or_default(self) -> str:
         if self._value:
             return self._value
         return os.environ.get(self._env_var)
 
-    def __get__(self, instance, owner) -> str:
-        value = str(self._get_value_or_default())
+    def __get__(self, instance, owner) -> Optional[str]:
+        value = self._get_value_or_default()
+        if value is None and self._optional:
+            return None
+        value = str(value)
         if self._regex and not self._regex.match(value):
             raise ValueError(
                 f"`{value}` received, but environment variable {self._env_var} (or default) must be set and match the pattern {self._regex.pattern}"
@@ -56,7 +65,18 @@ class Config:
 
     id = SolutionConfigEnv("SOLUTION_ID", regex=SOLUTION_ID_RE)
     version = SolutionConfigEnv("SOLUTION_VERSION", regex=SOLUTION_VERSION_RE)
+
+    # botocore client settings, tunable per workload through the environment - botocore's defaults apply when unset
+    max_pool_connections = SolutionConfigEnv("AWS_SOLUTIONS_MAX_POOL_CONNECTIONS", regex=NUMBER_RE, optional=True)
+    retry_mode = SolutionConfigEnv("AWS_SOLUTIONS_RETRY_MODE", regex=RETRY_MODE_RE, optional=True)
+    max_attempts = SolutionConfigEnv("AWS_SOLUTIONS_MAX_ATTEMPTS", regex=NUMBER_RE, optional=True)
+    connect_timeout = SolutionConfigEnv("AWS_SOLUTIONS_CONNECT_TIMEOUT", regex=NUMBER_RE, optional=True)
+    read_timeout = SolutionConfigEnv("AWS_SOLUTIONS_READ_TIMEOUT", regex=NUMBER_RE, optional=True)
+    tcp_keepalive = SolutionConfigEnv("AWS_SOLUTIONS_TCP_KEEPALIVE", regex=BOOLEAN_RE, optional=True)
+
     _botocore_config = None
+    # incremented whenever the botocore config changes, so that clients built with an older one are rebuilt
+    botocore_config_version = 0
 
     @property
     def botocore_config(self) -> botocore.config.Config:
@@ -69,7 +89,24 @@ class Config:
     @botocore_config.setter
     def botocore_config(self, other_config: botocore.config.Config):
         self._botocore_config = self.botocore_config.merge(other_config)
+        self.botocore_config_version += 1
 
     @property
     def _botocore_config_defaults(self) -> Dict:
-        return {"user_agent_extra": f"AwsSolution/{self.id}/{self.version}"}
+        defaults = {"user_agent_extra": f"AwsSolution/{self.id}/{self.version}"}
+
+        retries = {}
+        if self.retry_mode is not None:
+            retries["mode"] = self.retry_mode
+        if self.max_attempts is not None:
+            retries["total_max_attempts"] = int(self.max_attempts)
+        if retries:
+            defaults["retries"] = retries
+
+        for name in ("max_pool_connections", "connect_timeout", "read_timeout"):
+            value = getattr(self, name)
+            if value is not None:
+                defaults[name] = int(value)
+        if self.tcp_keepalive is not None:
+            defaults["tcp_keepalive"] = self.tcp_keepalive.lower() == "true"
+        return defaults
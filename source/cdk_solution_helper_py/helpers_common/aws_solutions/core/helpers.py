@@ -12,11 +12,19 @@
 # #####################################################################################################################
 
 import os
+import threading
+from typing import Hashable
+
 import boto3
+import botocore.config
 import aws_solutions.core.config
 
+# clients and resources for the caller's region and the solution's botocore config are keyed by service name,
+# those created for another region or with a config override by (service name, region, the override's options)
 _helpers_service_clients = {}
 _helpers_service_resources = {}
+_helpers_botocore_config_version = 0
+_helpers_lock = threading.RLock()
 _session = None
 
 class EnvironmentVariableError(Exception):
@@ -53,32 +61,83 @@ def get_aws_partition():
 def get_session():
     global _session
     if not _session:
-        _session = boto3.session.Session()
+        with _helpers_lock:
+            if not _session:
+                _session = boto3.session.Session()
     return _session
 
 
-def get_service_client(service_name):
-    global _helpers_service_clients
-    config = aws_solutions.core.config.botocore_config
-    session = get_session()
+def _drop_stale_services(config_version: int) -> None:
+    """
+    Drop the cached clients and resources when the solution's botocore config has changed since they were built
+    """
+    global _helpers_botocore_config_version
+    if config_version == _helpers_botocore_config_version:
+        return
+    with _helpers_lock:
+        if config_version != _helpers_botocore_config_version:
+            _helpers_service_clients.clear()
+            _helpers_service_resources.clear()
+            _helpers_botocore_config_version = config_version
 
-    if service_name not in _helpers_service_clients:
-        _helpers_service_clients[service_name] = session.client(
-            service_name, config=config, region_name=get_aws_region()
-        )
-    return _helpers_service_clients[service_name]
 
+def _config_key(config: botocore.config.Config = None) -> str:
+    """
+    Get a cache key for the options of a botocore config, read through its public attributes
+    """
+    if not config:
+        return ""
+    return repr([(name, getattr(config, name, None)) for name in sorted(config.OPTION_DEFAULTS)])
+
+
+def _get_service(cache: dict, factory: str, service_name: str, region_name: str = None,
+                 config: botocore.config.Config = None):
+    solution_config = aws_solutions.core.config
+    solution_botocore_config = solution_config.botocore_config
+    _drop_stale_services(solution_config.botocore_config_version)
+
+    default_region_name = get_aws_region()
+    region_name = region_name or default_region_name
+    effective_config = solution_botocore_config.merge(config) if config else solution_botocore_config
+
+    key: Hashable = service_name
+    if region_name != default_region_name or config:
+        # the solution's config is covered by the config version, so only the caller's options distinguish the key
+        key = (service_name, region_name, _config_key(config))
+
+    service = cache.get(key)
+    if service is None:
+        # boto3 sessions are not thread safe, so clients and resources are only created under the lock
+        with _helpers_lock:
+            service = cache.get(key)
+            if service is None:
+                service = getattr(get_session(), factory)(
+                    service_name, config=effective_config, region_name=region_name
+                )
+                cache[key] = service
+    return service
+
+
+def get_service_client(service_name, region_name: str = None, config: botocore.config.Config = None):
+    """
+    Get a (cached, thread safe) client for an AWS service
+    :param service_name: the name of the AWS service (e.g. s3)
+    :param region_name: the region of the client, defaults to the caller's AWS region
+    :param config: botocore config merged over the solution's botocore config
+    :return: the client
+    """
+    return _get_service(_helpers_service_clients, "client", service_name, region_name, config)
 
-def get_service_resource(service_name):
-    global _helpers_service_resources
-    config = aws_solutions.core.config.botocore_config
-    session = get_session()
 
-    if service_name not in _helpers_service_resources:
-        _helpers_service_resources[service_name] = session.resource(
-            service_name, config=config, region_name=get_aws_region()
-        )
-    return _helpers_service_resources[service_name]
+def get_service_resource(service_name, region_name: str = None, config: botocore.config.Config = None):
+    """
+    Get a (cached) resource for an AWS service
+    :param service_name: the name of the AWS service (e.g. dynamodb)
+    :param region_name: the region of the resource, defaults to the caller's AWS region
+    :param config: botocore config merged over the solution's botocore config
+    :return: the resource
+    """
+    return _get_service(_helpers_service_resources, "resource", service_name, region_name, config)
 
 
 def get_aws_account() -> str:
@@ -40,7 +40,7 @@ setuptools.setup(
     author="Amazon Web Services",
     url="https://aws.amazon.com/solutions/implementations",
     license="Apache License 2.0",
-    packages=setuptools.find_namespace_packages(exclude=("build",)),
+    packages=setuptools.find_namespace_packages(exclude=("build", "build.*")),
     install_requires=[
         "boto3>=1.17.52",
         "pip>=22.3",
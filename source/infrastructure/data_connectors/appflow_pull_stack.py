@@ -23,4 +23,16 @@ class AppFlowPullStack(BaseConnectorStack):
     This class represents the base AppFlow pull connectors stack
     """
 
-    pass
+    def create_workflow(self):
+        """
+        This method is overridden and empty to prevent creation
+        of the workflow before other dependencies are available
+        """
+        pass
+
+    def create_s3_push_trigger_resource(self):
+        """
+        This method is overridden and empty: the AppFlow launch workflow launches the
+        transform as soon as the flow run completes, so S3 notifications are not debounced
+        """
+        pass
@@ -28,6 +28,27 @@ from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonFunction
 from aws_solutions.cdk.aws_lambda.layers.aws_lambda_powertools import PowertoolsLayer
 from data_connectors.aws_lambda.layers.aws_solutions.layer import SolutionsLayer
 from data_connectors.aws_lambda import LAMBDA_PATH
+from data_connectors.aws_lambda.tracing import tracing_nag_suppression
+
+
+def create_automatic_transform_parameter(stack) -> CfnParameter:
+    """
+    This function creates the parameter that turns the automatic launch of the databrew transform job on or off
+    """
+    allowed_values = ["OFF", "ON"]
+    parameter = CfnParameter(
+        stack,
+        "AutotriggerTransform",
+        description="Automatically launch databrew transform job",
+        allowed_values=allowed_values,
+        default=allowed_values[0]
+    )
+    stack.solutions_template_options.add_parameter(
+        parameter,
+        label="Automatic transform trigger",
+        group="Transform",
+    )
+    return parameter
 
 
 @dataclass
@@ -56,20 +77,8 @@ class AutomaticDatabrewJobLaunch:
         self.add_lambda_event_source_sqs()
 
     def create_template_parameters(self, stack):
-        allowed_values = ["OFF", "ON"]
         group_name = "Transform"
-        self.automatic_brew_job_launch = CfnParameter(
-            stack,
-            "AutotriggerTransform",
-            description="Automatically launch databrew transform job",
-            allowed_values=allowed_values,
-            default=allowed_values[0]
-        )
-        stack.solutions_template_options.add_parameter(
-            self.automatic_brew_job_launch,
-            label="Automatic transform trigger",
-            group=group_name,
-        )
+        self.automatic_brew_job_launch = create_automatic_transform_parameter(stack)
 
         self.file_upload_complete_waiting_time_in_minutes = CfnParameter(
             stack,
@@ -107,6 +116,7 @@ class AutomaticDatabrewJobLaunch:
             timeout=Duration.minutes(1),
             memory_size=256,
             architecture=lambda_.Architecture.ARM_64,
+            tracing=lambda_.Tracing.ACTIVE,
             layers=[PowertoolsLayer.get_or_create(stack),
                     SolutionsLayer.get_or_create(stack)],
         )
@@ -138,6 +148,7 @@ class AutomaticDatabrewJobLaunch:
                 },
             ]
         )
+        tracing_nag_suppression(self.lambda_process_s3_notification)
 
     def create_s3_notifications_queue(self, stack):
         self.s3_notifications_queue = sqs.Queue(
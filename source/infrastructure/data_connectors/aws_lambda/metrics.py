@@ -0,0 +1,37 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import jsii
+from aws_cdk import Aws, IAspect
+from aws_cdk import aws_lambda as lambda_
+from constructs import IConstruct
+
+# the environment variables the shared metrics helper reads its dimensions from
+STACK_NAME = "STACK_NAME"
+CONNECTOR_NAME = "CONNECTOR_NAME"
+
+
+@jsii.implements(IAspect)
+class LambdaMetricsDimensions:
+    """
+    This aspect sets the stack and connector dimensions of the pipeline metrics
+    on every Lambda function of a connector stack
+    """
+
+    def __init__(self, connector_name: str):
+        self.connector_name = connector_name
+
+    def visit(self, node: IConstruct) -> None:
+        if isinstance(node, lambda_.Function):
+            node.add_environment(STACK_NAME, Aws.STACK_NAME)
+            node.add_environment(CONNECTOR_NAME, self.connector_name)
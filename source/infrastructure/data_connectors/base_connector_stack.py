@@ -16,14 +16,17 @@ This module is responsible as the main stack generation entry point.
 # ######################################################################################################################
 
 from constructs import Construct
-from aws_cdk import CfnParameter, Aws, RemovalPolicy
+from aws_cdk import Aspects, CfnParameter, Aws, RemovalPolicy
+from aws_cdk import aws_iam as iam
 from aws_cdk import aws_kms as kms
 import aws_cdk.aws_sns as sns
 import aws_cdk.aws_dynamodb as dynamodb
 from aws_cdk.aws_sns_subscriptions import EmailSubscription
 from cdk_nag import NagSuppressions
 from aws_solutions.cdk.stack import SolutionStack
+from data_connectors.aws_lambda.metrics import LambdaMetricsDimensions
 from data_connectors.connector_buckets import ConnectorBuckets
+from data_connectors.monitoring.pipeline_dashboard import PipelineDashboard
 from data_connectors.transform.databrew_transform import DataBrewTransform
 from data_connectors.automatic_databrew_job_launch import AutomaticDatabrewJobLaunch
 from data_connectors.orchestration.stepfunctions.workflow_orchestrator import WorkflowOrchestrator
@@ -66,7 +69,7 @@ class BaseConnectorStack(SolutionStack):
         """
         This function creates the automatic databrew job launch construct
         """
-        AutomaticDatabrewJobLaunch(
+        return AutomaticDatabrewJobLaunch(
             self,
             schema_provider_parameter=self.schema_provider_parameter
         )
@@ -89,9 +92,36 @@ class BaseConnectorStack(SolutionStack):
             email_param, "Email to send the notification to", "Notification Configuration"
         )
 
-        key_from_alias = kms.Alias.from_alias_name(self, "SnsManagedKey", "alias/aws/sns")
-        
-        sns_topic = sns.Topic(self, "SnsNotifyTopic", master_key=key_from_alias)
+        # CloudWatch alarms cannot publish to a topic encrypted with the AWS managed key of SNS, so the topic key
+        # allows CloudWatch, and (as the AWS managed key does) the principals of the account publishing through SNS
+        sns_key = kms.Key(
+            self,
+            "SnsNotifyTopicKey",
+            description="Encrypts the pipeline notifications and alarms",
+            enable_key_rotation=True,
+        )
+        sns_key.add_to_resource_policy(
+            iam.PolicyStatement(
+                principals=[iam.AnyPrincipal()],
+                actions=["kms:Decrypt", "kms:GenerateDataKey*"],
+                resources=["*"],
+                conditions={
+                    "StringEquals": {
+                        "kms:CallerAccount": Aws.ACCOUNT_ID,
+                        "kms:ViaService": f"sns.{Aws.REGION}.amazonaws.com",
+                    }
+                },
+            )
+        )
+        sns_key.add_to_resource_policy(
+            iam.PolicyStatement(
+                principals=[iam.ServicePrincipal("cloudwatch.amazonaws.com")],
+                actions=["kms:Decrypt", "kms:GenerateDataKey*"],
+                resources=["*"],
+            )
+        )
+
+        sns_topic = sns.Topic(self, "SnsNotifyTopic", master_key=sns_key)
         sns_topic.add_subscription(EmailSubscription(email_param.value_as_string))
 
         NagSuppressions.add_resource_suppressions(
@@ -137,6 +167,48 @@ class BaseConnectorStack(SolutionStack):
             self.transform.recipe_lambda_custom_resource,
         )
 
+    def create_slo_parameter(self, parameter_id, description, label, default):
+        """
+        This function creates a parameter for a pipeline SLO alarm threshold in minutes
+        """
+        parameter = CfnParameter(
+            self,
+            parameter_id,
+            description=description,
+            default=default,
+            min_value=1,
+            type="Number",
+        )
+        self.solutions_template_options.add_parameter(parameter, label=label, group="Monitoring")
+        return parameter
+
+    def create_pipeline_dashboard(self, s3_push_trigger):
+        """
+        This function creates the pipeline dashboard and its SLO alarms
+        """
+        run_duration_slo = self.create_slo_parameter(
+            "RunDurationAlarmThreshold",
+            "DataBrew transform job run duration in minutes that raises an alarm",
+            "DataBrew run duration SLO in minutes",
+            60,
+        )
+        queue = s3_push_trigger.s3_notifications_queue if s3_push_trigger else None
+        queue_age_slo = self.create_slo_parameter(
+            "QueueAgeAlarmThreshold",
+            "Age in minutes of the oldest queued S3 object create notification that raises an alarm",
+            "S3 notification queue age SLO in minutes",
+            30,
+        ) if queue else None
+        return PipelineDashboard(
+            self,
+            "PipelineDashboard",
+            connector_name=getattr(self, "name", self.node.id),
+            run_duration_slo_in_minutes=run_duration_slo.value_as_number,
+            queue=queue,
+            queue_age_slo_in_minutes=queue_age_slo.value_as_number if queue_age_slo else None,
+            alarm_topic=self.sns_topic,
+        )
+
     def __init__(self, scope: Construct, construct_id: str, *args, **kwargs) -> None:
         super().__init__(scope, construct_id, *args, **kwargs)
 
@@ -144,6 +216,9 @@ class BaseConnectorStack(SolutionStack):
         # stack parameters provided by this class
         #
 
+        # every function reports its pipeline metrics with the stack and connector as dimensions
+        Aspects.of(self).add(LambdaMetricsDimensions(getattr(self, "name", construct_id)))
+
         self.schema_provider_parameter = self.create_schema_provider_parameter()
         self.sns_topic = self.sns_notification_object()
         self.dynamodb_table = self.create_dynamodb_table()
@@ -163,4 +238,6 @@ class BaseConnectorStack(SolutionStack):
             # create the orchestration workflow
             self.workflow = self.create_workflow()
             # create resource for automatic brew job launch workflow
-            self.create_s3_push_trigger_resource()
+            s3_push_trigger = self.create_s3_push_trigger_resource()
+            # the dashboard picks up the functions and state machines created by the connector stacks
+            self.pipeline_dashboard = self.create_pipeline_dashboard(s3_push_trigger)
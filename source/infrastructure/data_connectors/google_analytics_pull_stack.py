@@ -1,4 +1,4 @@
-# pylint: disable=line-too-long
+# pylint: disable=line-too-long,too-many-instance-attributes
 """
 This module is responsible as the main stack generation entry point.
 """
@@ -15,8 +15,22 @@ This module is responsible as the main stack generation entry point.
 #  the specific language governing permissions and limitations under the License.                                      #
 # ######################################################################################################################
 
-from aws_cdk import CfnParameter
+from constructs import Construct
+from aws_cdk import CfnParameter, Duration, CfnOutput, Aws, RemovalPolicy
+from aws_cdk import aws_iam, aws_appflow, aws_lambda, aws_dynamodb
+
+from cdk_nag import NagSuppressions
+
+from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonFunction
+from aws_solutions.cdk.aws_lambda.layers.aws_lambda_powertools import PowertoolsLayer
+from data_connectors.automatic_databrew_job_launch import create_automatic_transform_parameter
+
+from data_connectors.aws_lambda import LAMBDA_PATH
+from data_connectors.aws_lambda.layers.aws_solutions.layer import SolutionsLayer
+
 from data_connectors.appflow_pull_stack import AppFlowPullStack
+from data_connectors.orchestration.stepfunctions.workflows.google_analytics_workflow import GoogleAnalyticsWorkflow
+from data_connectors.transform.databrew_transform import SHARD_OUTPUT_PREFIX
 
 
 class GoogleAnalyticsPullStack(AppFlowPullStack):
@@ -28,6 +42,8 @@ class GoogleAnalyticsPullStack(AppFlowPullStack):
     description = "Deploy and use a connector for Google Analytics data"
     template_filename = "google-analytics-connector.template"
 
+    shard_flow = LAMBDA_PATH / "connectors" / "google_analytics" / "shard_flow.py"
+
     def create_schema_provider_parameter(self):
         """
         This function is responsible for creating the schema provider parameter
@@ -39,3 +55,371 @@ class GoogleAnalyticsPullStack(AppFlowPullStack):
             allowed_values=["Google Analytics"],
             default="Google Analytics",
         )
+
+    def create_client_id_parameter(self):
+        """
+        This function creates the client_id parameter
+        """
+        parameter = CfnParameter(
+            self,
+            "ClientId",
+            description="The Client Id of the Google Cloud OAuth client",
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="The Client Id of the Google Cloud OAuth client",
+            group="Connection",
+        )
+        return parameter
+
+    def create_client_secret_parameter(self):
+        """
+        This function creates the client_secret parameter
+        """
+        parameter = CfnParameter(
+            self,
+            "ClientSecret",
+            description="The Client Secret of the Google Cloud OAuth client",
+            no_echo=True,
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="The Client Secret of the Google Cloud OAuth client",
+            group="Connection",
+        )
+        return parameter
+
+    def create_refresh_token_parameter(self):
+        """
+        This function creates the refresh_token parameter
+        """
+        parameter = CfnParameter(
+            self,
+            "RefreshToken",
+            description="The OAuth refresh token granting read access to Google Analytics",
+            no_echo=True,
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="The OAuth refresh token granting read access to Google Analytics",
+            group="Connection",
+        )
+        return parameter
+
+    def create_google_analytics_object_parameter(self):
+        """
+        This function creates the data object parameter used to specify what data to pull from Google Analytics
+        """
+        parameter = CfnParameter(
+            self,
+            "GoogleAnalyticsObjectName",
+            description="The Google Analytics object (report of a view) to pull",
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="The Google Analytics object to pull",
+            group="Data",
+        )
+        return parameter
+
+    def create_backfill_start_date_parameter(self):
+        """
+        This function creates the parameter for the first day extracted when no date range is requested
+        """
+        parameter = CfnParameter(
+            self,
+            "BackfillStartDate",
+            description="First day (YYYY-MM-DD) to extract when no start date is passed to the workflow. Leave blank to extract yesterday only",
+            default="",
+            allowed_pattern=r"^(\d{4}-\d{2}-\d{2})?$",
+            constraint_description="Must be a date in the YYYY-MM-DD format or blank",
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="Backfill start date - Optional",
+            group="Data",
+        )
+        return parameter
+
+    def create_shard_size_parameter(self):
+        """
+        This function creates the parameter for the number of days extracted by each flow run
+        """
+        parameter = CfnParameter(
+            self,
+            "ShardSizeInDays",
+            type="Number",
+            description="Number of days extracted by each flow run. Longer date ranges are split into shards of this size",
+            default=30,
+            min_value=1,
+            max_value=366,
+        )
+        self.solutions_template_options.add_parameter(
+            parameter,
+            label="Days per flow run",
+            group="Data",
+        )
+        return parameter
+
+    def update_inbound_bucket_policy(self):
+        """
+        This function is responsible for updating the inbound data bucket policy
+        with permission for AppFlow to read/write the bucket
+        """
+        dest_bucket = self.connector_buckets.inbound_bucket
+        dest_bucket_policy = aws_iam.PolicyStatement(
+            principals=[aws_iam.ServicePrincipal("appflow.amazonaws.com")],
+            actions=[
+                "s3:putobject",
+                "s3:getbucketacl",
+                "s3:putobjectacl",
+                "s3:abortmultipartupload",
+                "s3:listmultipartuploadparts",
+                "s3:listbucketmultipartuploads",
+            ],
+            resources=[
+                f"{dest_bucket.bucket_arn}", f"{dest_bucket.bucket_arn}/*"
+            ],
+        )
+        dest_bucket.add_to_resource_policy(dest_bucket_policy)
+
+    def create_shard_checkpoint_table(self):
+        """
+        This function creates the dynamodb table recording the status of each date-range shard
+        """
+        return aws_dynamodb.Table(
+            self,
+            "ShardCheckpointTable",
+            table_name=f"{Aws.STACK_NAME}-ShardCheckpoints",
+            partition_key=aws_dynamodb.Attribute(name="shard_id", type=aws_dynamodb.AttributeType.STRING),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+    def create_lambda_appflow_policies(self) -> list[aws_iam.PolicyStatement]:
+        """
+        This function is responsible for defining a policy to allow
+        the shard lambdas to copy the stack's flow into shard flows and run them
+        """
+        flow_arn_prefix = f"arn:{Aws.PARTITION}:appflow:{Aws.REGION}:{Aws.ACCOUNT_ID}:flow/{self.appflow_flow.flow_name}"
+        return [
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=["appflow:DescribeFlow"],
+                resources=[flow_arn_prefix, f"{flow_arn_prefix}-*"],
+            ),
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=[
+                    "appflow:CreateFlow",
+                    "appflow:UpdateFlow",
+                    "appflow:StartFlow",
+                    "appflow:DeleteFlow",
+                ],
+                resources=[f"{flow_arn_prefix}-*"],
+            ),
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=["appflow:UseConnectorProfile"],
+                resources=[
+                    f"arn:{Aws.PARTITION}:appflow:{Aws.REGION}:{Aws.ACCOUNT_ID}:connectorprofile/{self.profile_name}"
+                ],
+            ),
+        ]
+
+    def create_shard_function(self, construct_id: str, handler: str, description: str):
+        """
+        This function is responsible for creating the Python function resources
+        used by the orchestration workflow to plan, start and complete shards
+        """
+        shard_function = SolutionsPythonFunction(
+            self,
+            construct_id,
+            self.shard_flow,
+            handler,
+            runtime=aws_lambda.Runtime.PYTHON_3_9,
+            description=description,
+            timeout=Duration.minutes(5),
+            memory_size=256,
+            architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
+            layers=[
+                PowertoolsLayer.get_or_create(self),
+                SolutionsLayer.get_or_create(self)
+            ],
+        )
+        shard_function.add_environment("SOLUTION_ID", self.solution_id)
+        shard_function.add_environment("SOLUTION_VERSION", self.solution_version)
+        shard_function.add_environment("BASE_FLOW_NAME", self.appflow_flow.flow_name)
+        shard_function.add_environment("CHECKPOINT_TABLE_NAME", self.shard_checkpoint_table.table_name)
+        shard_function.add_environment("BACKFILL_START_DATE", self.backfill_start_date_parameter.value_as_string)
+        shard_function.add_environment("SHARD_SIZE_IN_DAYS", self.shard_size_parameter.value_as_string)
+        self.shard_checkpoint_table.grant_read_write_data(shard_function)
+        # the output of a shard's earlier flow runs is removed when the shard is extracted again
+        shard_function.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=["s3:ListBucket"],
+                resources=[self.connector_buckets.inbound_bucket.bucket_arn],
+                conditions={"StringLike": {"s3:prefix": f"{self.appflow_flow.flow_name}/{SHARD_OUTPUT_PREFIX}/*"}},
+            )
+        )
+        shard_function.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=["s3:DeleteObject"],
+                resources=[
+                    f"{self.connector_buckets.inbound_bucket.bucket_arn}/{self.appflow_flow.flow_name}/{SHARD_OUTPUT_PREFIX}/*"
+                ],
+            )
+        )
+        for policy in self.lambda_appflow_policies:
+            shard_function.add_to_role_policy(policy)
+        return shard_function
+
+    def create_connector_profile(self):
+        """
+        This function is responsible for creating the AppFlow connector profile for Google Analytics
+        """
+        return aws_appflow.CfnConnectorProfile(
+            self,
+            "GoogleAnalyticsConnectorProfile",
+            connector_profile_name=self.profile_name,
+            connector_type="Googleanalytics",
+            connection_mode="Public",
+            connector_profile_config=aws_appflow.CfnConnectorProfile.ConnectorProfileConfigProperty(
+                connector_profile_credentials=aws_appflow.CfnConnectorProfile.ConnectorProfileCredentialsProperty(
+                    google_analytics=aws_appflow.CfnConnectorProfile.GoogleAnalyticsConnectorProfileCredentialsProperty(
+                        client_id=self.client_id_parameter.value_as_string,
+                        client_secret=self.client_secret_parameter.value_as_string,
+                        refresh_token=self.refresh_token_parameter.value_as_string,
+                    )
+                )
+            ),
+        )
+
+    def create_appflow_resource(self):
+        """
+        This function is responsible for creating the AppFlow flow
+        resource with a Google Analytics source and S3 destination.
+        The shard flows run by the workflow are copies of this flow.
+        """
+        appflow_resource = aws_appflow.CfnFlow(
+            self,
+            "GoogleAnalyticsAppFlow",
+            destination_flow_config_list=[
+                aws_appflow.CfnFlow.DestinationFlowConfigProperty(
+                    connector_type="S3",
+                    destination_connector_properties=aws_appflow.CfnFlow.DestinationConnectorPropertiesProperty(
+                        s3=aws_appflow.CfnFlow.S3DestinationPropertiesProperty(
+                            bucket_name=self.connector_buckets.inbound_bucket.bucket_name,
+                            s3_output_format_config=aws_appflow.CfnFlow.S3OutputFormatConfigProperty(
+                                aggregation_config=aws_appflow.CfnFlow.AggregationConfigProperty(
+                                    aggregation_type="SingleFile"),
+                                file_type="JSON",
+                                preserve_source_data_typing=False,
+                            ),
+                        )),
+                )
+            ],
+            flow_name=f"{Aws.STACK_NAME}-flow",
+            source_flow_config=aws_appflow.CfnFlow.SourceFlowConfigProperty(
+                connector_profile_name=self.profile_name,
+                connector_type="Googleanalytics",
+                source_connector_properties=aws_appflow.CfnFlow.SourceConnectorPropertiesProperty(
+                    google_analytics=aws_appflow.CfnFlow.GoogleAnalyticsSourcePropertiesProperty(
+                        object=self.google_analytics_object_parameter.value_as_string,
+                    )),
+            ),
+            tasks=[
+                aws_appflow.CfnFlow.TaskProperty(source_fields=[], task_type="Map_all")
+            ],
+            trigger_config=aws_appflow.CfnFlow.TriggerConfigProperty(trigger_type="OnDemand"),
+            description="Google Analytics to S3 flow",
+        )
+        appflow_resource.node.add_dependency(self.connector_profile)
+        return appflow_resource
+
+    def add_cdk_nag_suppressions(self):
+        nag_suppression_reason_for_wildcard_permissions = "The IAM entity contains wildcard permissions"
+        # lambda functions
+        for shard_function in [self.plan_shards_function, self.start_shard_function, self.complete_shard_function]:
+            NagSuppressions.add_resource_suppressions(
+                shard_function.role,
+                [
+                    {
+                        "id": "AwsSolutions-IAM5",
+                        "reason": nag_suppression_reason_for_wildcard_permissions,
+                    },
+                ],
+                apply_to_children=True,
+            )
+
+    def create_stack_outputs(self):
+        CfnOutput(self,
+                  "AppFlow",
+                  value=f"https://{Aws.REGION}.console.aws.amazon.com/appflow/home?region={Aws.REGION}#/details/{self.appflow_flow.flow_name}",
+                  )
+        CfnOutput(
+            self,
+            "AppFlowLaunch-StateMachine",
+            value=f"https://{Aws.REGION}.console.aws.amazon.com/states/home?region={Aws.REGION}#/statemachines/view/arn:aws:states:{Aws.REGION}:{Aws.ACCOUNT_ID}:stateMachine:{self.appflow_launch_state_machine_name}")
+
+    def create_workflow_deferred(self):
+        self.appflow_launch_state_machine_name = f"{Aws.STACK_NAME}-AppflowLaunch"
+        return GoogleAnalyticsWorkflow(
+            self, "GoogleAnalyticsWorkflow",
+            self.plan_shards_function,
+            self.start_shard_function,
+            self.complete_shard_function,
+            self.appflow_flow,
+            self.appflow_launch_state_machine_name,
+            self.automatic_transform_parameter,
+            self.transform.recipe_name,
+            self.connector_buckets.inbound_bucket.bucket_name,
+            self.transform.dataset_name,
+            self.transform.transform_recipe_file_location_parameter.value_as_string,
+            self.transform.recipe_job_name,
+            self.sns_topic,
+            self.dynamodb_table,
+            self.transform.recipe_lambda_custom_resource_function,
+        )
+
+    def __init__(self, scope: Construct, construct_id: str, *args,
+                 **kwargs) -> None:
+        # parent constructor
+        super().__init__(scope, construct_id, *args, **kwargs)
+        self.synthesizer.bind(self)
+
+        # local parameters
+        self.google_analytics_object_parameter = self.create_google_analytics_object_parameter()
+        self.backfill_start_date_parameter = self.create_backfill_start_date_parameter()
+        self.shard_size_parameter = self.create_shard_size_parameter()
+        self.client_id_parameter = self.create_client_id_parameter()
+        self.client_secret_parameter = self.create_client_secret_parameter()
+        self.refresh_token_parameter = self.create_refresh_token_parameter()
+        self.profile_name = f"{Aws.STACK_NAME}-connector"
+
+        # update destination bucket policy for appflow
+        self.update_inbound_bucket_policy()
+
+        self.connector_profile = self.create_connector_profile()
+        self.appflow_flow = self.create_appflow_resource()
+
+        # create lambda functions used by orchestration to extract date-range shards
+        self.shard_checkpoint_table = self.create_shard_checkpoint_table()
+        self.lambda_appflow_policies = self.create_lambda_appflow_policies()
+        self.plan_shards_function = self.create_shard_function(
+            "PlanShardsFunction", "plan_shards_handler", "Lambda function for planning date-range shards")
+        self.start_shard_function = self.create_shard_function(
+            "StartShardFunction", "start_shard_handler", "Lambda function for starting a date-range shard flow")
+        self.complete_shard_function = self.create_shard_function(
+            "CompleteShardFunction", "complete_shard_handler", "Lambda function for completing a date-range shard flow")
+
+        if self.node.try_get_context("SYNTH_ORCHESTRATION"):
+            self.automatic_transform_parameter = create_automatic_transform_parameter(self)
+            self.workflow = self.create_workflow_deferred()
+
+        self.add_cdk_nag_suppressions()
+
+        self.create_stack_outputs()
@@ -0,0 +1,232 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from typing import List, Optional, Union
+
+import jsii
+from aws_cdk import Aspects, Aws, CfnOutput, Duration, IAspect
+from aws_cdk import aws_cloudwatch as cloudwatch
+from aws_cdk import aws_cloudwatch_actions as cloudwatch_actions
+from aws_cdk import aws_lambda as lambda_
+from aws_cdk import aws_sns as sns
+from aws_cdk import aws_sqs as sqs
+from aws_cdk import aws_stepfunctions as sfn
+from constructs import Construct, IConstruct
+
+# the namespace and dimensions the Lambda functions publish their pipeline metrics with
+METRICS_NAMESPACE = "DataConnectorsForAWSCleanRooms"
+# the stages the DataBrew job callback records a latency metric for, e.g. DataBrewRunLatency
+PIPELINE_STAGES = [
+    "UploadWindow",
+    "UploadToWorkflowStart",
+    "WorkflowToDataBrewStart",
+    "DataBrewRun",
+    "DataBrewEndToCallback",
+    "LastUploadToCallback",
+    "EndToEnd",
+]
+
+WIDGET_HEIGHT = 6
+FULL_WIDTH = 24
+PERIOD = Duration.minutes(5)
+
+
+class PipelineDashboard(Construct):
+    """
+    This construct creates the CloudWatch dashboard of a connector pipeline, along with alarms on the age of
+    the oldest queued S3 notification and on the DataBrew run duration, which notify the alarm topic. The Lambda
+    functions and state machines of the stack are added to the dashboard when it is synthesized, so those created
+    after it are included.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        connector_name: str,
+        run_duration_slo_in_minutes: Union[int, float],
+        queue: Optional[sqs.IQueue] = None,
+        queue_age_slo_in_minutes: Optional[Union[int, float]] = None,
+        alarm_topic: Optional[sns.ITopic] = None,
+    ) -> None:
+        super().__init__(scope, construct_id)
+        self.connector_name = connector_name
+        self.alarms: List[cloudwatch.Alarm] = []
+
+        self.dashboard = cloudwatch.Dashboard(
+            self,
+            "Dashboard",
+            dashboard_name=f"{Aws.STACK_NAME}-pipeline",
+            start="-PT12H",
+        )
+
+        if queue:
+            self.alarms.append(self.create_queue_age_alarm(queue, queue_age_slo_in_minutes))
+        self.alarms.append(self.create_run_duration_alarm(run_duration_slo_in_minutes))
+        if alarm_topic:
+            for alarm in self.alarms:
+                alarm.add_alarm_action(cloudwatch_actions.SnsAction(alarm_topic))
+
+        self.create_widgets(queue)
+        Aspects.of(scope).add(PipelineDashboardResources(self))
+
+        CfnOutput(
+            scope,
+            "PipelineDashboardUrl",
+            value=f"https://{Aws.REGION}.console.aws.amazon.com/cloudwatch/home?region={Aws.REGION}#dashboards:name={Aws.STACK_NAME}-pipeline",
+        )
+
+    def pipeline_metric(self, metric_name: str, statistic: str = "p90",
+                        label: Optional[str] = None) -> cloudwatch.Metric:
+        """
+        This function returns a metric published by the Lambda functions of this stack
+        """
+        return cloudwatch.Metric(
+            namespace=METRICS_NAMESPACE,
+            metric_name=metric_name,
+            dimensions_map={"stack": Aws.STACK_NAME, "connector": self.connector_name},
+            statistic=statistic,
+            period=PERIOD,
+            label=label,
+        )
+
+    def create_queue_age_alarm(self, queue: sqs.IQueue,
+                               slo_in_minutes: Union[int, float]) -> cloudwatch.Alarm:
+        oldest_message_age = cloudwatch.MathExpression(
+            expression="age / 60",
+            using_metrics={"age": queue.metric_approximate_age_of_oldest_message(statistic="Maximum", period=PERIOD)},
+            label="Oldest S3 notification age (minutes)",
+            period=PERIOD,
+        )
+        return cloudwatch.Alarm(
+            self,
+            "QueueAgeAlarm",
+            alarm_description="S3 notifications are waiting longer than the queue age SLO to launch a transform",
+            metric=oldest_message_age,
+            threshold=slo_in_minutes,
+            evaluation_periods=2,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+        )
+
+    def create_run_duration_alarm(self, slo_in_minutes: Union[int, float]) -> cloudwatch.Alarm:
+        run_duration = cloudwatch.MathExpression(
+            expression="run / 60000",
+            using_metrics={"run": self.pipeline_metric("DataBrewRunLatency", statistic="Maximum")},
+            label="DataBrew run duration (minutes)",
+            period=PERIOD,
+        )
+        return cloudwatch.Alarm(
+            self,
+            "RunDurationAlarm",
+            alarm_description="A DataBrew transform job run took longer than the run duration SLO",
+            metric=run_duration,
+            threshold=slo_in_minutes,
+            evaluation_periods=1,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+        )
+
+    def graph(self, title: str, width: int, left: List[cloudwatch.IMetric] = None) -> cloudwatch.GraphWidget:
+        return cloudwatch.GraphWidget(title=title, width=width, height=WIDGET_HEIGHT, left=left or [])
+
+    def create_widgets(self, queue: Optional[sqs.IQueue]) -> None:
+        self.dashboard.add_widgets(
+            cloudwatch.AlarmStatusWidget(title="Pipeline SLOs", alarms=self.alarms, width=FULL_WIDTH, height=3)
+        )
+
+        if queue:
+            self.dashboard.add_widgets(
+                self.graph("S3 notification queue age (seconds)", FULL_WIDTH // 2, [
+                    queue.metric_approximate_age_of_oldest_message(statistic="Maximum", period=PERIOD),
+                ]),
+                self.graph("S3 notification queue depth", FULL_WIDTH // 2, [
+                    queue.metric_approximate_number_of_messages_visible(statistic="Maximum", period=PERIOD),
+                    queue.metric_approximate_number_of_messages_not_visible(statistic="Maximum", period=PERIOD),
+                ]),
+            )
+
+        # one line per function, added by PipelineDashboardResources
+        self.lambda_duration = self.graph("Lambda duration p90 (ms)", FULL_WIDTH // 4)
+        self.lambda_errors = self.graph("Lambda errors", FULL_WIDTH // 4)
+        self.lambda_throttles = self.graph("Lambda throttles", FULL_WIDTH // 4)
+        self.lambda_concurrency = self.graph("Lambda concurrent executions", FULL_WIDTH // 4)
+        self.dashboard.add_widgets(self.lambda_duration, self.lambda_errors, self.lambda_throttles,
+                                   self.lambda_concurrency)
+
+        # one line per state machine, added by PipelineDashboardResources
+        self.execution_time = self.graph("Workflow execution duration p90 (ms)", FULL_WIDTH // 2)
+        self.execution_failures = self.graph("Workflow executions failed, timed out or aborted", FULL_WIDTH // 2)
+        self.dashboard.add_widgets(self.execution_time, self.execution_failures)
+
+        self.dashboard.add_widgets(
+            self.graph("DataBrew run duration (ms)", FULL_WIDTH // 2, [
+                self.pipeline_metric("DataBrewRunLatency", statistic="p50", label="p50"),
+                self.pipeline_metric("DataBrewRunLatency", statistic="p90", label="p90"),
+                self.pipeline_metric("DataBrewRunLatency", statistic="Maximum", label="max"),
+            ]),
+            self.graph("DataBrew job runs", FULL_WIDTH // 2, [
+                self.pipeline_metric("DataBrewJobsStarted", statistic="Sum"),
+                self.pipeline_metric("CallbacksSent", statistic="Sum"),
+            ]),
+        )
+
+        self.dashboard.add_widgets(
+            self.graph("Pipeline stage latency p90 (ms)", FULL_WIDTH, [
+                self.pipeline_metric(f"{stage}Latency", label=stage) for stage in PIPELINE_STAGES
+            ]),
+        )
+
+    def add_function(self, function: lambda_.Function) -> None:
+        """
+        This function adds a line for a Lambda function to each of the Lambda graphs
+        """
+        label = function.node.id
+        self.lambda_duration.add_left_metric(function.metric_duration(statistic="p90", period=PERIOD, label=label))
+        self.lambda_errors.add_left_metric(function.metric_errors(period=PERIOD, label=label))
+        self.lambda_throttles.add_left_metric(function.metric_throttles(period=PERIOD, label=label))
+        self.lambda_concurrency.add_left_metric(
+            function.metric("ConcurrentExecutions", statistic="Maximum", period=PERIOD, label=label)
+        )
+
+    def add_state_machine(self, state_machine: sfn.StateMachine) -> None:
+        """
+        This function adds the lines for a state machine to the workflow graphs
+        """
+        label = state_machine.node.id
+        self.execution_time.add_left_metric(state_machine.metric_time(statistic="p90", period=PERIOD, label=label))
+        self.execution_failures.add_left_metric(
+            state_machine.metric_failed(period=PERIOD, label=f"{label} failed")
+        )
+        self.execution_failures.add_left_metric(
+            state_machine.metric_timed_out(period=PERIOD, label=f"{label} timed out")
+        )
+        self.execution_failures.add_left_metric(
+            state_machine.metric_aborted(period=PERIOD, label=f"{label} aborted")
+        )
+
+
+@jsii.implements(IAspect)
+class PipelineDashboardResources:
+    """
+    This aspect adds the Lambda functions and state machines of a stack to its pipeline dashboard
+    """
+
+    def __init__(self, dashboard: PipelineDashboard):
+        self.dashboard = dashboard
+
+    def visit(self, node: IConstruct) -> None:
+        if isinstance(node, lambda_.Function):
+            self.dashboard.add_function(node)
+        elif isinstance(node, sfn.StateMachine):
+            self.dashboard.add_state_machine(node)
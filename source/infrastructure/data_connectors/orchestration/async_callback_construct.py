@@ -24,6 +24,7 @@ from cdk_nag import NagSuppressions
 from constructs import Construct
 from data_connectors.aws_lambda import LAMBDA_PATH
 from data_connectors.aws_lambda.layers.aws_solutions.layer import SolutionsLayer
+from data_connectors.aws_lambda.tracing import tracing_nag_suppression
 
 
 class AsyncCallbackConstruct(Construct):
@@ -52,6 +53,7 @@ class AsyncCallbackConstruct(Construct):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=lambda_.Architecture.ARM_64,
+            tracing=lambda_.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self),
@@ -68,6 +70,7 @@ class AsyncCallbackConstruct(Construct):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=lambda_.Architecture.ARM_64,
+            tracing=lambda_.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self),
@@ -100,6 +103,8 @@ class AsyncCallbackConstruct(Construct):
                          existing_lambda_obj=self.callback_lambda_function,
                          table_permissions="Read"
                          )
+        # the callback completes the pipeline latency record of the run
+        self.dynamo_table.grant(self.callback_lambda_function, "dynamodb:PutItem")
 
         EventbridgeToLambda(
             self,
@@ -175,6 +180,7 @@ class AsyncCallbackConstruct(Construct):
         self.lambda_callback_policy.attach_to_role(self.callback_lambda_function.role)
 
     def cdk_nag_suppressions(self):
+        tracing_nag_suppression(self.brew_run_job_lambda, self.callback_lambda_function)
 
         list_of_cdk_nags_to_suppress = [
             {
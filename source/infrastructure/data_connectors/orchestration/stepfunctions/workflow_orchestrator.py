@@ -56,7 +56,7 @@ class WorkflowOrchestrator(Construct):
         self.dynamodb_table = dynamodb_table
         self.recipe_lambda_custom_resource = recipe_lambda_custom_resource
 
-        self.base_state_machine_name = f"{Aws.STACK_NAME}-S3TriggerDataBrewJob-Runner"
+        self.base_state_machine_name = self.get_state_machine_name()
 
         super().__init__(scope, id)
 
@@ -72,6 +72,9 @@ class WorkflowOrchestrator(Construct):
 
         self.cdk_nag_suppression()
 
+    def get_state_machine_name(self) -> str:
+        return f"{Aws.STACK_NAME}-S3TriggerDataBrewJob-Runner"
+
     def create_base_workflow(self):
         log_group_name = f"/aws/vendedlogs/states/{Aws.STACK_NAME}-{Fn.select(2, Fn.split('/', Aws.STACK_ID))}"
 
@@ -114,7 +117,11 @@ class WorkflowOrchestrator(Construct):
 
         file_uploading_pass = sfn.Pass(self, "File Uploading").next(dynamodb_get_file_expected_finish_time)
 
-        brew_job_launch = self.invoke_lambda_run_brew_jobs().next(self.publish_brew_job_done_notification())
+        brew_job_launch = self.invoke_lambda_run_brew_jobs(
+            first_upload_time=sfn.JsonPath.string_at("$.first_upload_time"),
+            last_upload_time=sfn.JsonPath.string_at("$.dynamodb_last_file_uploaded_time.Item.timestamp_str.S"),
+            correlation_id=sfn.JsonPath.string_at("$.trace_context.correlation_id"),
+        ).next(self.publish_brew_job_done_notification())
 
         choice = sfn.Choice(self, "Check File Upload Status").when(
             sfn.Condition.timestamp_less_than_equals_json_path(
@@ -124,26 +131,70 @@ class WorkflowOrchestrator(Construct):
             brew_job_launch
         ).otherwise(file_uploading_pass)
 
-        state_machine_definition = dynamodb_get_file_expected_finish_time.next(wait).next(
-            dynamodb_get_last_file_uploaded_time).next(choice)
+        dynamodb_get_file_expected_finish_time.next(wait).next(dynamodb_get_last_file_uploaded_time).next(choice)
+
+        # executions not started by the automatic brew job launch lambda (e.g. by hand) may not have the upload time
+        # or the trace context of the run - the brew job lambda leaves the empty defaults out of the run record
+        check_correlation_id = self.default_if_missing(
+            "Correlation Id", "$.trace_context.correlation_id", dynamodb_get_file_expected_finish_time
+        )
+        check_first_upload_time = self.default_if_missing(
+            "First Upload Time", "$.first_upload_time", check_correlation_id
+        )
 
-        return state_machine_definition
+        return sfn.Chain.start(check_first_upload_time)
 
-    def invoke_lambda_run_brew_jobs(self):
+    def default_if_missing(self, name: str, path: str, next_state: sfn.IChainable) -> sfn.Choice:
+        """
+        Set the value at path to an empty string when the workflow input does not have it, then go to next_state
+        :param name: the name of the value in the state names, e.g. "First Upload Time"
+        """
+        set_default = sfn.Pass(
+            self, f"Default {name}",
+            result=sfn.Result.from_string(""),
+            result_path=path,
+        ).next(next_state)
+
+        return sfn.Choice(self, f"Check {name}").when(
+            sfn.Condition.not_(sfn.Condition.is_present(path)),
+            set_default
+        ).otherwise(next_state)
+
+    def invoke_lambda_run_brew_jobs(self, input_location: str = None, first_upload_time: str = None,
+                                    last_upload_time: str = None, correlation_id: str = None):
         """
         Function to invoke the brew job lambda and run it subsequently
+        :param input_location: the S3 location of the data the job is launched for, when known
+        :param first_upload_time: the time of the first upload of the run, when the workflow knows it
+        :param last_upload_time: the time of the last upload of the run, when the workflow knows it
+        :param correlation_id: the correlation id the run was started with, when the workflow knows it
         """
+        payload = {
+            "task_token": sfn.JsonPath.string_at("$$.Task.Token"),
+            "brew_job_name": self.recipe_job_name
+        }
+        if input_location:
+            payload["input_location"] = input_location
+
+        # the times recorded by the brew job lambda in the pipeline latency record of the run
+        run_timing = {"workflow_start_time": sfn.JsonPath.string_at("$$.Execution.StartTime")}
+        if first_upload_time:
+            run_timing["first_upload_time"] = first_upload_time
+        if last_upload_time:
+            run_timing["last_upload_time"] = last_upload_time
+        payload["run_timing"] = run_timing
+
+        # the ids the brew job lambda stores with the task token, so the callback joins the trace of the run
+        trace_context = {"execution_id": sfn.JsonPath.string_at("$$.Execution.Id")}
+        if correlation_id:
+            trace_context["correlation_id"] = correlation_id
+        payload["trace_context"] = trace_context
 
         return tasks.LambdaInvoke(
             self, 'Launch DataBrew Job',
             lambda_function=self.async_callback_construct.brew_run_job_lambda,
             integration_pattern=sfn.IntegrationPattern.WAIT_FOR_TASK_TOKEN,
-            payload=sfn.TaskInput.from_object(
-                {
-                    "task_token": sfn.JsonPath.string_at("$$.Task.Token"),
-                    "brew_job_name": self.recipe_job_name
-                }
-            )
+            payload=sfn.TaskInput.from_object(payload)
         ).add_catch(
             errors=["States.TaskFailed"],
             handler=self.databrew_job_failure_handler()
@@ -0,0 +1,150 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from typing import List
+
+from aws_cdk import (
+    Duration,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks
+)
+from constructs import Construct
+
+FLOW_RUN_POLL_INTERVAL_IN_SECONDS = 30
+# give up on a flow run that has not ended after this many polls (2 hours)
+MAX_FLOW_RUN_POLL_ATTEMPTS = 240
+# the number of the latest flow runs searched for the run started by the workflow
+FLOW_RUN_RECORDS = 5
+FLOW_RUN_FAILED_STATUSES = ["Error", "Canceled"]
+
+
+class FlowRunPolling:
+    """
+    The states that wait for the end of an AppFlow flow run started by a workflow. The run is looked up by its
+    execution id among the latest runs of the flow (other runs of the flow may have started since), and polling
+    fails the workflow once it has run out of attempts. The matched run is at $.flow_run.execution.
+    """
+
+    def __init__(
+            self,
+            scope: Construct,
+            label: str,
+            flow_name: str,
+            execution_id_path: str,
+            iam_resources: List[str],
+    ):
+        """
+        :param scope: the workflow the states are created in
+        :param label: the name of the flow run in the state names, e.g. "Flow Run"
+        :param flow_name: the name of the flow, or a JsonPath to it
+        :param execution_id_path: the JsonPath to the execution id returned by StartFlow
+        :param iam_resources: the flows the workflow may describe the runs of
+        """
+        self.scope = scope
+        self.label = label
+        self.flow_name = flow_name
+        self.execution_id_path = execution_id_path
+        self.iam_resources = iam_resources
+
+    def chain(self, on_successful: sfn.IChainable, on_failed: sfn.IChainable) -> sfn.Chain:
+        """
+        Get the Chain of steps that polls the flow run until it has ended
+        :param on_successful: the state to continue with once the flow run was successful
+        :param on_failed: the state to continue with once the flow run has failed
+        :return: the Chain of steps
+        """
+        start_polling = sfn.Pass(
+            self.scope, f"Start Polling {self.label}",
+            result=sfn.Result.from_object({"attempts": 0}),
+            result_path="$.flow_run_poll",
+        )
+
+        count_attempt = sfn.Pass(
+            self.scope, f"Count {self.label} Poll",
+            parameters={
+                "attempts": sfn.JsonPath.math_add(sfn.JsonPath.number_at("$.flow_run_poll.attempts"), 1),
+            },
+            result_path="$.flow_run_poll",
+        )
+
+        timed_out = sfn.Fail(
+            self.scope, f"{self.label} Timed Out",
+            error="FlowRunTimedOut",
+            cause=f"The flow run did not end after {MAX_FLOW_RUN_POLL_ATTEMPTS} polls",
+        )
+
+        check_attempts = sfn.Choice(self.scope, f"Check {self.label} Poll Attempts").when(
+            sfn.Condition.number_greater_than_equals("$.flow_run_poll.attempts", MAX_FLOW_RUN_POLL_ATTEMPTS),
+            timed_out
+        ).otherwise(count_attempt)
+
+        wait_for_flow_run = sfn.Wait(
+            self.scope, f"Wait For {self.label}",
+            time=sfn.WaitTime.duration(Duration.seconds(FLOW_RUN_POLL_INTERVAL_IN_SECONDS)),
+        )
+
+        describe_flow_run = tasks.CallAwsService(
+            self.scope, f"Describe {self.label}",
+            service="appflow",
+            action="describeFlowExecutionRecords",
+            parameters={
+                "FlowName": self.flow_name,
+                "MaxResults": FLOW_RUN_RECORDS,
+            },
+            iam_resources=self.iam_resources,
+            result_selector={
+                "executions": sfn.JsonPath.list_at("$.FlowExecutions"),
+            },
+            result_path="$.flow_run",
+        )
+
+        check_status = self.check_flow_run_status(on_successful, on_failed, check_attempts)
+
+        # AppFlow can take a moment to report a run that was just started - keep polling until it does
+        find_flow_run = sfn.Choice(self.scope, f"Find {self.label}")
+        for index in range(FLOW_RUN_RECORDS):
+            execution = f"$.flow_run.executions[{index}]"
+            find_flow_run.when(
+                sfn.Condition.and_(
+                    sfn.Condition.is_present(execution),
+                    sfn.Condition.string_equals_json_path(f"{execution}.ExecutionId", self.execution_id_path),
+                ),
+                sfn.Pass(
+                    self.scope, f"Select {self.label} {index}",
+                    input_path=execution,
+                    result_path="$.flow_run.execution",
+                ).next(check_status)
+            )
+        find_flow_run.otherwise(check_attempts)
+
+        count_attempt.next(wait_for_flow_run).next(describe_flow_run).next(find_flow_run)
+        return sfn.Chain.start(start_polling).next(check_attempts)
+
+    def check_flow_run_status(
+            self, on_successful: sfn.IChainable, on_failed: sfn.IChainable, keep_polling: sfn.IChainable
+    ) -> sfn.Choice:
+        """
+        Route the workflow on the status of the matched flow run
+        """
+        status = "$.flow_run.execution.ExecutionStatus"
+
+        return sfn.Choice(self.scope, f"Check {self.label} Status").when(
+            sfn.Condition.string_equals(status, "Successful"),
+            on_successful
+        ).when(
+            sfn.Condition.or_(*[
+                sfn.Condition.string_equals(status, failed_status)
+                for failed_status in FLOW_RUN_FAILED_STATUSES
+            ]),
+            on_failed
+        ).otherwise(keep_polling)
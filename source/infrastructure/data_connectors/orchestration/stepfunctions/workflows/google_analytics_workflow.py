@@ -0,0 +1,260 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#   Unless required by applicable law or agreed to in writing, software distributed under the License is distributed   #
+#   on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for  #
+#   the specific language governing permissions and limitations under the License.                                     #
+# ######################################################################################################################
+
+from aws_cdk import (
+    Aws,
+    CfnParameter,
+    Fn,
+    aws_stepfunctions as sfn,
+    aws_stepfunctions_tasks as tasks
+)
+from aws_cdk.aws_logs import LogGroup
+from cdk_nag import NagSuppressions
+from constructs import Construct
+
+from data_connectors.orchestration.stepfunctions.workflow_orchestrator import WorkflowOrchestrator
+from data_connectors.orchestration.stepfunctions.workflows.flow_run_polling import FlowRunPolling
+from data_connectors.transform.databrew_transform import SHARD_OUTPUT_PREFIX
+
+# AppFlow limits the number of concurrent flow runs per account, so only this many shards are extracted at a time
+MAX_CONCURRENT_SHARD_FLOW_RUNS = 5
+
+
+class GoogleAnalyticsWorkflow(WorkflowOrchestrator):
+    """
+    Pulls Google Analytics data into S3 with AppFlow, one flow run per date-range shard,
+    and launches the DataBrew job once every shard has been extracted
+    """
+
+    def __init__(
+            self,
+            scope: Construct,
+            id: str,
+            plan_shards_lambda,
+            start_shard_lambda,
+            complete_shard_lambda,
+            appflow_resource,
+            appflow_launch_state_machine_name,
+            automatic_transform_parameter: CfnParameter,
+            *args
+    ):
+        self.plan_shards_lambda = plan_shards_lambda
+        self.start_shard_lambda = start_shard_lambda
+        self.complete_shard_lambda = complete_shard_lambda
+        self.appflow_resource = appflow_resource
+        self.appflow_launch_state_machine_name = appflow_launch_state_machine_name
+        self.automatic_transform_parameter = automatic_transform_parameter
+        super().__init__(scope, id, *args)
+
+        self.appflow_launch_state_machine = self.state_machine
+
+        self.google_analytics_workflow_cdk_nag_suppression()
+
+    def get_state_machine_name(self) -> str:
+        return self.appflow_launch_state_machine_name
+
+    def create_base_workflow(self):
+        log_group_name = f"/aws/vendedlogs/states/{Aws.STACK_NAME}-Appflow-{Fn.select(2, Fn.split('/', Aws.STACK_ID))}"
+
+        return sfn.StateMachine(
+            self,
+            "GoogleAnalyticsAppflowLaunch",
+            tracing_enabled=True,
+            state_machine_name=self.appflow_launch_state_machine_name,
+            definition=self.chain,
+            logs=sfn.LogOptions(
+                level=sfn.LogLevel.ALL,
+                destination=LogGroup(self, 'SFNGoogleAnalyticsAppflowLaunchLogGroup', log_group_name=log_group_name))
+        )
+
+    @property
+    def chain(self) -> sfn.Chain:
+        """
+        Get the Chain of steps that plans the date-range shards still to be extracted, runs a bounded
+        number of shard flows in parallel and launches the brew job once all of them have completed
+        :return: the Chain of steps
+        """
+        load_settings = sfn.Pass(
+            self, "Load Settings",
+            parameters={
+                "automatic_transform": self.automatic_transform_parameter.value_as_string,
+            },
+            result_path="$.settings",
+        )
+
+        plan_shards = tasks.LambdaInvoke(
+            self, "Plan Shards",
+            lambda_function=self.plan_shards_lambda,
+            payload_response_only=True,
+            result_path="$.plan",
+        )
+
+        run_shards = sfn.Map(
+            self, "Run Shards",
+            items_path="$.plan.shards",
+            max_concurrency=MAX_CONCURRENT_SHARD_FLOW_RUNS,
+            result_path="$.shard_results",
+        ).iterator(self.shard_chain)
+
+        find_failed_shards = sfn.Pass(
+            self, "Find Failed Shards",
+            parameters={
+                "shards.$": "$.shard_results[?(@.status != 'Successful')]",
+            },
+            result_path="$.failed",
+        )
+
+        check_shard_results = sfn.Choice(self, "Check Shard Results").when(
+            sfn.Condition.is_present("$.failed.shards[0]"),
+            self.publish_shard_fail_notification()
+        ).otherwise(self.check_automatic_transform())
+
+        return sfn.Chain.start(load_settings) \
+            .next(plan_shards) \
+            .next(run_shards) \
+            .next(find_failed_shards) \
+            .next(check_shard_results)
+
+    @property
+    def shard_chain(self) -> sfn.Chain:
+        """
+        Get the Chain of steps run for each shard: start its flow, wait for the flow run to end and checkpoint it.
+        A shard whose steps fail (or whose flow run does not end in time) has its flow deleted and is reported
+        as failed, and it is retried by the next execution.
+        """
+        shard_flow_arn = f"arn:{Aws.PARTITION}:appflow:{Aws.REGION}:{Aws.ACCOUNT_ID}:flow/{self.appflow_resource.flow_name}-*"
+
+        start_shard = tasks.LambdaInvoke(
+            self, "Start Shard Flow",
+            lambda_function=self.start_shard_lambda,
+            payload_response_only=True,
+        )
+
+        complete_shard = tasks.LambdaInvoke(
+            self, "Complete Shard",
+            lambda_function=self.complete_shard_lambda,
+            payload=sfn.TaskInput.from_object({
+                "shard_id": sfn.JsonPath.string_at("$.shard_id"),
+                "start_date": sfn.JsonPath.string_at("$.start_date"),
+                "end_date": sfn.JsonPath.string_at("$.end_date"),
+                "period_end": sfn.JsonPath.string_at("$.period_end"),
+                "execution_id": sfn.JsonPath.string_at("$.execution_id"),
+                "status": sfn.JsonPath.string_at("$.flow_run.execution.ExecutionStatus"),
+            }),
+            payload_response_only=True,
+        )
+
+        flow_run_polling = FlowRunPolling(
+            self, "Shard Flow Run",
+            flow_name=sfn.JsonPath.string_at("$.flow_name"),
+            execution_id_path="$.execution_id",
+            iam_resources=[shard_flow_arn],
+        )
+
+        run_shard = sfn.Parallel(self, "Run Shard").branch(
+            sfn.Chain.start(start_shard)
+            .next(flow_run_polling.chain(on_successful=complete_shard, on_failed=complete_shard))
+        ).add_catch(
+            self.shard_failure_handler(shard_flow_arn),
+            errors=["States.ALL"],
+            result_path="$.error",
+        )
+
+        shard_result = sfn.Pass(self, "Shard Result", input_path="$[0]")
+
+        return sfn.Chain.start(run_shard).next(shard_result)
+
+    def shard_failure_handler(self, shard_flow_arn: str) -> sfn.Chain:
+        """
+        Delete the flow of a shard whose steps failed and report the shard as failed
+        """
+        shard_failed = sfn.Pass(
+            self, "Shard Failed",
+            parameters={
+                "shard_id": sfn.JsonPath.string_at("$.shard_id"),
+                "start_date": sfn.JsonPath.string_at("$.start_date"),
+                "end_date": sfn.JsonPath.string_at("$.end_date"),
+                "period_end": sfn.JsonPath.string_at("$.period_end"),
+                "status": "Failed",
+                "error": sfn.JsonPath.string_at("$.error.Error"),
+            },
+        )
+
+        # the flow may not have been created, or may have been deleted already
+        delete_shard_flow = tasks.CallAwsService(
+            self, "Delete Failed Shard Flow",
+            service="appflow",
+            action="deleteFlow",
+            parameters={
+                "FlowName": sfn.JsonPath.format("{}-{}", self.appflow_resource.flow_name,
+                                                sfn.JsonPath.string_at("$.shard_id")),
+                "ForceDelete": True,
+            },
+            iam_resources=[shard_flow_arn],
+            result_path=sfn.JsonPath.DISCARD,
+        ).add_catch(shard_failed, errors=["States.ALL"], result_path=sfn.JsonPath.DISCARD)
+
+        return sfn.Chain.start(delete_shard_flow).next(shard_failed)
+
+    def check_automatic_transform(self) -> sfn.Choice:
+        """
+        Launch the brew job for the data written by the shard flows when the automatic transform is enabled
+        """
+        input_location = f"s3://{self.s3_bucket_name}/{self.appflow_resource.flow_name}/{SHARD_OUTPUT_PREFIX}/"
+        brew_job_launch = self.invoke_lambda_run_brew_jobs(input_location=input_location) \
+            .next(self.publish_brew_job_done_notification())
+
+        return sfn.Choice(self, "Check Automatic Transform").when(
+            sfn.Condition.string_equals("$.settings.automatic_transform", "ON"),
+            brew_job_launch
+        ).otherwise(sfn.Succeed(self, "Shards Completed"))
+
+    def publish_shard_fail_notification(self):
+        shard_fail_message = sfn.JsonPath.format(
+            "AppFlow flow runs did not succeed for shards {}, they are retried by the next execution",
+            sfn.JsonPath.json_to_string(sfn.JsonPath.list_at("$.failed.shards"))
+        )
+        message_attributes = self.create_message_attributes('AppFlow', "Shard flow runs failed", "Fail")
+        return tasks.SnsPublish(
+            self,
+            "AppFlow Shard Flow Run Fail Notification",
+            topic=self.sns_topic,
+            integration_pattern=sfn.IntegrationPattern.REQUEST_RESPONSE,
+            message=sfn.TaskInput.from_text(shard_fail_message),
+            message_attributes=message_attributes,
+            subject="Data Connectors for AWS Clean Rooms Notifications: Pipeline result [Fail]"
+        )
+
+    def google_analytics_workflow_cdk_nag_suppression(self):
+        NagSuppressions.add_resource_suppressions(
+            self.appflow_launch_state_machine.role.node.try_find_child("DefaultPolicy").node.find_child("Resource"),
+            [
+                {
+                    "id": 'AwsSolutions-IAM5',
+                    "reason": 'Shard flows are created at run time, so flow runs are described by name prefix',
+                    "appliesTo": [
+                        'Resource::arn:<AWS::Partition>:appflow:<AWS::Region>:<AWS::AccountId>:flow/<AWS::StackName>-flow-*',
+                    ]
+                },
+                {
+                    "id": 'AwsSolutions-IAM5',
+                    "reason": '* Resources will be suppressed by cdk nag and it has to be not suppressed',
+                    "appliesTo": [
+                        'Resource::<PlanShardsFunctionFAC16A63.Arn>:*',
+                        'Resource::<StartShardFunction0904E3F1.Arn>:*',
+                        'Resource::<CompleteShardFunction98C72174.Arn>:*',
+                        'Resource::<GoogleAnalyticsWorkflowWorkflowOrchestrationBrewRunJob15776E0F.Arn>:*',
+                    ]
+                },
+            ],
+        )
@@ -13,6 +13,7 @@
 
 from aws_cdk import (
     Aws,
+    CfnParameter,
     Fn,
     aws_stepfunctions as sfn,
     aws_stepfunctions_tasks as tasks
@@ -22,10 +23,14 @@ from cdk_nag import NagSuppressions
 from constructs import Construct
 
 from data_connectors.orchestration.stepfunctions.workflow_orchestrator import WorkflowOrchestrator
+from data_connectors.orchestration.stepfunctions.workflows.flow_run_polling import FlowRunPolling
 
 
 class SalesforceWorkflow(WorkflowOrchestrator):
-    """Ingests reddit records into S3"""
+    """
+    Pulls Salesforce Marketing Cloud records into S3 with AppFlow and launches the DataBrew job
+    as soon as the flow run completes, instead of debouncing the S3 object create notifications
+    """
 
     def __init__(
             self,
@@ -34,34 +39,52 @@ class SalesforceWorkflow(WorkflowOrchestrator):
             connector_update_lambda,
             appflow_resource,
             appflow_launch_state_machine_name,
+            automatic_transform_parameter: CfnParameter,
             *args
     ):
         self.connector_update_lambda = connector_update_lambda
         self.appflow_resource = appflow_resource
         self.appflow_launch_state_machine_name = appflow_launch_state_machine_name
+        self.automatic_transform_parameter = automatic_transform_parameter
         super().__init__(scope, id, *args)
 
+        self.appflow_launch_state_machine = self.state_machine
+
+        self.salesforce_workflow_cdk_nag_suppression()
+
+    def get_state_machine_name(self) -> str:
+        return self.appflow_launch_state_machine_name
+
+    def create_base_workflow(self):
         log_group_name = f"/aws/vendedlogs/states/{Aws.STACK_NAME}-Appflow-{Fn.select(2, Fn.split('/', Aws.STACK_ID))}"
 
-        self.appflow_launch_state_machine = sfn.StateMachine(
+        return sfn.StateMachine(
             self,
             "SalesforceAppflowLaunch",
             tracing_enabled=True,
-            state_machine_name=appflow_launch_state_machine_name,
-            definition=self.appflow_launch_definitions,
+            state_machine_name=self.appflow_launch_state_machine_name,
+            definition=self.chain,
             logs=sfn.LogOptions(
                 level=sfn.LogLevel.ALL,
                 destination=LogGroup(self, 'SFNSalesforceAppflowLaunchLogGroup', log_group_name=log_group_name))
         )
 
-        self.salesforce_workflow_cdk_nag_suppression()
-
     @property
-    def appflow_launch_definitions(self) -> sfn.Chain:
+    def chain(self) -> sfn.Chain:
         """
-        Get the Chain of steps that will accommodate the reddit ingestion
+        Get the Chain of steps that refreshes the connector, runs the flow, waits for the flow run
+        to complete and launches the brew job for the data written by that flow run
         :return: the Chain of steps
         """
+        flow_arn = f"arn:{Aws.PARTITION}:appflow:{Aws.REGION}:{Aws.ACCOUNT_ID}:flow/{self.appflow_resource.flow_name}"
+
+        load_settings = sfn.Pass(
+            self, "Load Settings",
+            parameters={
+                "automatic_transform": self.automatic_transform_parameter.value_as_string,
+            },
+        )
+
         start_appflow = tasks.CallAwsService(
             self, "StartAppflow",
             service="appflow",
@@ -69,17 +92,67 @@ class SalesforceWorkflow(WorkflowOrchestrator):
             parameters={
                 "FlowName": self.appflow_resource.flow_name,
             },
-            iam_resources=[
-                f"arn:{Aws.PARTITION}:appflow:{Aws.REGION}:{Aws.ACCOUNT_ID}:flow/{self.appflow_resource.flow_name}",
-            ],
+            iam_resources=[flow_arn],
+            result_selector={
+                "execution_id": sfn.JsonPath.string_at("$.ExecutionId"),
+            },
+            result_path="$.appflow",
+        )
+
+        flow_run_polling = FlowRunPolling(
+            self, "Flow Run",
+            flow_name=self.appflow_resource.flow_name,
+            execution_id_path="$.appflow.execution_id",
+            iam_resources=[flow_arn],
+        )
+
+        return sfn.Chain.start(load_settings) \
+            .next(self.invoke_connector_update_lambda()) \
+            .next(start_appflow) \
+            .next(flow_run_polling.chain(
+                on_successful=self.check_automatic_transform(),
+                on_failed=self.publish_flow_run_fail_notification(),
+            ))
+
+    def check_automatic_transform(self) -> sfn.Choice:
+        """
+        Launch the brew job for the data written by the flow run when the automatic transform is enabled
+        """
+        input_location = sfn.JsonPath.format(
+            f"s3://{self.s3_bucket_name}/{self.appflow_resource.flow_name}/{{}}/",
+            sfn.JsonPath.string_at("$.appflow.execution_id")
         )
+        brew_job_launch = self.invoke_lambda_run_brew_jobs(input_location=input_location) \
+            .next(self.publish_brew_job_done_notification())
+
+        return sfn.Choice(self, "Check Automatic Transform").when(
+            sfn.Condition.string_equals("$.automatic_transform", "ON"),
+            brew_job_launch
+        ).otherwise(sfn.Succeed(self, "Flow Run Completed"))
 
-        return sfn.Chain.start(self.invoke_connector_update_lambda().next(start_appflow))
+    def publish_flow_run_fail_notification(self):
+        flow_run_status = sfn.JsonPath.string_at("$.flow_run.execution.ExecutionStatus")
+        flow_run_fail_message = sfn.JsonPath.format(
+            "AppFlow flow run {} ended with status {}",
+            sfn.JsonPath.string_at("$.appflow.execution_id"),
+            flow_run_status
+        )
+        message_attributes = self.create_message_attributes('AppFlow', flow_run_status, "Fail")
+        return tasks.SnsPublish(
+            self,
+            "AppFlow Flow Run Fail Notification",
+            topic=self.sns_topic,
+            integration_pattern=sfn.IntegrationPattern.REQUEST_RESPONSE,
+            message=sfn.TaskInput.from_text(flow_run_fail_message),
+            message_attributes=message_attributes,
+            subject="Data Connectors for AWS Clean Rooms Notifications: Pipeline result [Fail]"
+        )
 
     def invoke_connector_update_lambda(self):
         return tasks.LambdaInvoke(self, 'ConnectorUpdate',
                                   lambda_function=self.connector_update_lambda,
-                                  payload=sfn.TaskInput.from_object({}))
+                                  payload=sfn.TaskInput.from_object({}),
+                                  result_path=sfn.JsonPath.DISCARD)
 
     def salesforce_workflow_cdk_nag_suppression(self):
         NagSuppressions.add_resource_suppressions(
@@ -16,14 +16,14 @@ This module is responsible as the main stack generation entry point.
 # ######################################################################################################################
 
 from constructs import Construct
-from aws_cdk import CfnParameter, Duration, CustomResource, Fn, SecretValue, CfnOutput, Aws
-from aws_cdk import aws_iam, aws_appflow, aws_lambda, aws_secretsmanager
+from aws_cdk import CfnParameter, Duration, CustomResource, Fn, SecretValue, CfnOutput, Aws, RemovalPolicy
+from aws_cdk import aws_iam, aws_appflow, aws_lambda, aws_secretsmanager, aws_dynamodb
 
 from cdk_nag import NagSuppressions
 
 from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonFunction
 from aws_solutions.cdk.aws_lambda.layers.aws_lambda_powertools import PowertoolsLayer
-from data_connectors.automatic_databrew_job_launch import AutomaticDatabrewJobLaunch
+from data_connectors.automatic_databrew_job_launch import create_automatic_transform_parameter
 
 from data_connectors.aws_lambda import LAMBDA_PATH
 from data_connectors.aws_lambda.layers.aws_solutions.layer import SolutionsLayer
@@ -224,6 +224,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
                     "secretsManager:PutResourcePolicy",
                     "secretsmanager:PutSecretValue",
                     "secretsmanager:GetSecretValue",
+                    "secretsmanager:DescribeSecret",
                 ],
                 resources=[
                     f"arn:{Aws.PARTITION}:secretsmanager:{Aws.REGION}:{Aws.ACCOUNT_ID}:secret:appflow!*",
@@ -264,6 +265,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self)
@@ -290,6 +292,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self)
@@ -317,6 +320,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self)
@@ -345,6 +349,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             timeout=Duration.minutes(5),
             memory_size=256,
             architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
             layers=[
                 PowertoolsLayer.get_or_create(self),
                 SolutionsLayer.get_or_create(self)
@@ -354,6 +359,68 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             "CONNECTOR_SECRET_ARN", self.appflow_connection_secret.secret_arn)
         return connector_function
 
+    def create_extract_checkpoint_table(self):
+        """
+        This function creates the dynamodb table recording the progress of data extension extracts
+        """
+        return aws_dynamodb.Table(
+            self,
+            "ExtractCheckpointTable",
+            table_name=f"{Aws.STACK_NAME}-ExtractCheckpoints",
+            partition_key=aws_dynamodb.Attribute(name="extract_id", type=aws_dynamodb.AttributeType.STRING),
+            billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
+    def create_data_extension_extract_function(self):
+        """
+        This function is responsible for creating the Python function resource
+        that extracts data extensions directly to the inbound bucket, as an alternative to AppFlow
+        """
+        extract_function = SolutionsPythonFunction(
+            self,
+            "DataExtensionExtractFunction",
+            LAMBDA_PATH / "connectors" / "salesforce" / "data_extension_extract.py",
+            "event_handler",
+            runtime=aws_lambda.Runtime.PYTHON_3_9,
+            description="Lambda function for extracting data extensions directly to S3",
+            timeout=Duration.minutes(15),
+            memory_size=1024,
+            architecture=aws_lambda.Architecture.ARM_64,
+            tracing=aws_lambda.Tracing.ACTIVE,
+            layers=[
+                PowertoolsLayer.get_or_create(self),
+                SolutionsLayer.get_or_create(self)
+            ],
+        )
+        extract_function.add_environment("SOLUTION_ID", self.solution_id)
+        extract_function.add_environment("SOLUTION_VERSION", self.solution_version)
+        extract_function.add_environment(
+            "CONNECTOR_SECRET_ARN", self.appflow_connection_secret.secret_arn)
+        extract_function.add_environment(
+            "OUTPUT_BUCKET", self.connector_buckets.inbound_bucket.bucket_name)
+        extract_function.add_environment(
+            "OUTPUT_PREFIX", self.connector_buckets.inbound_bucket_prefix)
+        extract_function.add_environment(
+            "CHECKPOINT_TABLE_NAME", self.extract_checkpoint_table.table_name)
+
+        self.appflow_connection_secret.grant_read(extract_function)
+        self.extract_checkpoint_table.grant_read_write_data(extract_function)
+        extract_function.add_to_role_policy(
+            aws_iam.PolicyStatement(
+                effect=aws_iam.Effect.ALLOW,
+                actions=[
+                    "s3:PutObject",
+                    "s3:AbortMultipartUpload",
+                    "s3:ListMultipartUploadParts",
+                ],
+                resources=[
+                    f"{self.connector_buckets.inbound_bucket.bucket_arn}/{self.connector_buckets.inbound_bucket_prefix}*"
+                ],
+            )
+        )
+        return extract_function
+
     def create_connector_profile_custom_resource(self):
         """
         This function creates the custom resource used to create new connector profiles
@@ -467,26 +534,13 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
 
     def add_cdk_nag_suppressions(self):
         nag_suppression_reason_for_wildcard_permissions = "The IAM entity contains wildcard permissions"
-        for path in [
-            "/SalesforceMarketingCloudStack/BucketNotificationsHandler050a0587b7544547bf325f094a3db834/Role/Resource",
-        ]:
-            NagSuppressions.add_resource_suppressions_by_path(
-                self,
-                path,
-                [
-                    {
-                        "id": "AwsSolutions-IAM4",
-                        "reason": "The IAM user, role, or group uses AWS managed policies",
-                    },
-                ],
-            )
-
         # lambda functions
         for path in [
             "/SalesforceMarketingCloudStack/ConnectorCustomResourceFunction-Role/Resource",
             "/SalesforceMarketingCloudStack/ConnectorCreateFunction-Role/Resource",
             "/SalesforceMarketingCloudStack/ConnectorUpdateFunction-Role/Resource",
             "/SalesforceMarketingCloudStack/ConnectorDeleteFunction-Role/Resource",
+            "/SalesforceMarketingCloudStack/DataExtensionExtractFunction-Role/Resource",
         ]:
             NagSuppressions.add_resource_suppressions_by_path(
                 self,
@@ -503,7 +557,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             "/SalesforceMarketingCloudStack/ConnectorCreateFunction-Role/DefaultPolicy/Resource",
             "/SalesforceMarketingCloudStack/ConnectorUpdateFunction-Role/DefaultPolicy/Resource",
             "/SalesforceMarketingCloudStack/ConnectorDeleteFunction-Role/DefaultPolicy/Resource",
-            "/SalesforceMarketingCloudStack/BucketNotificationsHandler050a0587b7544547bf325f094a3db834/Role/DefaultPolicy/Resource",
+            "/SalesforceMarketingCloudStack/DataExtensionExtractFunction-Role/DefaultPolicy/Resource",
         ]:
             NagSuppressions.add_resource_suppressions_by_path(
                 self,
@@ -528,42 +582,6 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             ],
         )
 
-        # Sqs
-        NagSuppressions.add_resource_suppressions_by_path(
-            self,
-            "/SalesforceMarketingCloudStack/SqsBatching/Resource",
-            [
-                {
-                    "id": "AwsSolutions-SQS2",
-                    "reason": "The SQS Queue does not have server-side encryption enabled."
-                },
-                {
-                    "id": "AwsSolutions-SQS3",
-                    "reason": "The SQS queue does not have a dead-letter queue (DLQ) enabled or have a cdk-nag rule suppression indicating it is a DLQ."
-                },
-                {
-                    "id": "AwsSolutions-SQS4",
-                    "reason": "The SQS queue does not require requests to use SSL."
-                },
-            ]
-        )
-
-        NagSuppressions.add_resource_suppressions_by_path(
-            self,
-            "/SalesforceMarketingCloudStack/ProcessS3NotificationsLambdaIamPolicy/Resource",
-            [
-                {
-                    "id": "AwsSolutions-IAM5",
-                    "reason": nag_suppression_reason_for_wildcard_permissions,
-                    "appliesTo": [
-                        "Resource::arn:aws:states:*:<AWS::AccountId>:activity:<SalesforceWorkflowS3TriggerDataBrewRunner632E7DE9.Name>:*",
-                        "Resource::arn:aws:states:*:<AWS::AccountId>:stateMachine:<SalesforceWorkflowS3TriggerDataBrewRunner632E7DE9.Name>",
-                        "Resource::arn:aws:states:*:<AWS::AccountId>:execution:<SalesforceWorkflowS3TriggerDataBrewRunner632E7DE9.Name>:*"
-                    ]
-                }
-            ],
-        )
-
     def create_stack_outputs(self):
         CfnOutput(self,
                   "AppFlow",
@@ -573,26 +591,10 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             self,
             "AppFlowLaunch-StateMachine",
             value=f"https://{Aws.REGION}.console.aws.amazon.com/states/home?region={Aws.REGION}#/statemachines/view/arn:aws:states:{Aws.REGION}:{Aws.ACCOUNT_ID}:stateMachine:{self.appflow_launch_state_machine_name}")
-
-    def create_workflow(self):
-        """
-        This method is overridden and empty to prevent creation
-        of the workflow before other dependencies are available
-        """
-        pass
-
-    def create_s3_push_trigger_resource(self):
-        """
-        This method is overridden and empty to prevent creation
-        of the resource before other dependencies are available
-        """
-        pass
-
-    def create_s3_push_trigger_resource_deferred(self):
-        AutomaticDatabrewJobLaunch(
+        CfnOutput(
             self,
-            schema_provider_parameter=self.schema_provider_parameter
-        )
+            "DataExtensionExtractFunctionName",
+            value=self.data_extension_extract_function.function_name)
 
     def create_workflow_deferred(self):
         self.appflow_launch_state_machine_name = f"{Aws.STACK_NAME}-AppflowLaunch"
@@ -601,6 +603,7 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
             self.connector_update_function,
             self.appflow_flow,
             self.appflow_launch_state_machine_name,
+            self.automatic_transform_parameter,
             self.transform.recipe_name,
             self.connector_buckets.inbound_bucket.bucket_name,
             self.transform.dataset_name, self.transform.
@@ -658,9 +661,13 @@ class SalesforceMarketingCloudStack(AppFlowPullStack):
 
         self.appflow_flow = self.create_appflow_resource()
 
+        # create the optional direct-to-S3 extractor for data extensions
+        self.extract_checkpoint_table = self.create_extract_checkpoint_table()
+        self.data_extension_extract_function = self.create_data_extension_extract_function()
+
         if self.node.try_get_context("SYNTH_ORCHESTRATION"):
+            self.automatic_transform_parameter = create_automatic_transform_parameter(self)
             self.workflow = self.create_workflow_deferred()
-            self.create_s3_push_trigger_resource_deferred()
 
         self.add_cdk_nag_suppressions()
 
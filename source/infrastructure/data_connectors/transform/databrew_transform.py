@@ -29,9 +29,12 @@ from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonFunction
 from cdk_nag import NagSuppressions
 from data_connectors.aws_lambda import LAMBDA_PATH
 from data_connectors.aws_lambda.layers.aws_solutions.layer import SolutionsLayer
+from data_connectors.aws_lambda.tracing import tracing_nag_suppression
 
 DATABREW_CUSTOM_SECRETS_PREFIX = "AwsGlueDataBrew-transform-secret"
 IAM_WILDCARD_SUPRESSION_MSG = "IAM entity contains wildcard permissions"
+# the prefix of the flow output that the Google Analytics date-range shards are written below (see shard_flow.py)
+SHARD_OUTPUT_PREFIX = "shards"
 
 
 class InboundDataUploadType(Enum):
@@ -97,6 +100,11 @@ class DataBrewTransform:
             self.recipe_lambda_custom_resource_function, 
             self.object_remove_lambda_custom_resource_function
         )
+        tracing_nag_suppression(
+            self.string_lambda_custom_resource_function,
+            self.recipe_lambda_custom_resource_function,
+            self.object_remove_lambda_custom_resource_function
+        )
 
         create_stack_outputs(self, stack)
 
@@ -206,6 +214,7 @@ def create_string_lambda_custom_function(self, stack):
         timeout=Duration.minutes(1),
         memory_size=256,
         architecture=lambdaf.Architecture.ARM_64,
+        tracing=lambdaf.Tracing.ACTIVE,
         layers=[PowertoolsLayer.get_or_create(stack),
                 SolutionsLayer.get_or_create(stack)],
     )
@@ -270,6 +279,7 @@ def object_remove_lambda_custom_function(self, stack, object_remove_lambda_iam_p
         timeout=Duration.minutes(1),
         memory_size=256,
         architecture=lambdaf.Architecture.ARM_64,
+        tracing=lambdaf.Tracing.ACTIVE,
         layers=[PowertoolsLayer.get_or_create(stack),
                 SolutionsLayer.get_or_create(stack)],
     )
@@ -316,6 +326,9 @@ def create_transform_template_parameters(self, stack) -> None:
     stack_specific_allowed_values = [e.name for e in InboundDataUploadType]
     if f"{stack.stack_name}" == "SalesforceMarketingCloudStack":
         stack_specific_allowed_values = [InboundDataUploadType.Bulk.name]
+    elif f"{stack.stack_name}" == "GoogleAnalyticsPullStack":
+        # the date-range shards are written side by side and are all read by the dataset
+        stack_specific_allowed_values = [InboundDataUploadType.Incremental.name]
     elif f"{stack.stack_name}" == "S3PushStack":
         stack_specific_allowed_values = [
             InboundDataUploadType.Bulk.name,
@@ -335,7 +348,7 @@ def create_transform_template_parameters(self, stack) -> None:
     )
 
     stack_specific_allowed_values = [e.name for e in InboundDataFileFormat]
-    if f"{stack.stack_name}" == "SalesforceMarketingCloudStack":
+    if f"{stack.stack_name}" in ["SalesforceMarketingCloudStack", "GoogleAnalyticsPullStack"]:
         stack_specific_allowed_values = [InboundDataFileFormat.JSONMultiLine.name]
     elif f"{stack.stack_name}" == "S3PushStack":
         stack_specific_allowed_values = [
@@ -455,6 +468,9 @@ def create_dataset_for_transform(self, stack, inbound_bucket_name, inbound_bucke
     path_expression_object=Fn.condition_if(inbound_datafile_type_condition.logical_id, path_object, json.loads("{}"))
 
     bucket_suffix = Fn.condition_if(inbound_datafile_type_condition.logical_id, "", "<.*>").to_string()
+    if f"{stack.stack_name}" == "GoogleAnalyticsPullStack":
+        # each shard prefix only holds the output of the shard's latest flow run, so every shard is read once
+        bucket_suffix = f"{SHARD_OUTPUT_PREFIX}/<.*>"
 
     self.cfn_dataset = CfnResource(
         stack,
@@ -695,6 +711,7 @@ def create_recipe_lambda_custom_function(self, stack, recipe_lambda_policy):
         timeout=Duration.minutes(5),
         memory_size=256,
         architecture=lambdaf.Architecture.ARM_64,
+        tracing=lambdaf.Tracing.ACTIVE,
         layers=[PowertoolsLayer.get_or_create(stack),
                 SolutionsLayer.get_or_create(stack)],
     )
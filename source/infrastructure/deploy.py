@@ -19,9 +19,12 @@ from pathlib import Path
 from aws_cdk import App, Aspects
 
 from aws_solutions.cdk import CDKSolution
+from aws_solutions.cdk.aws_lambda.python.bundling import BundlingScheduler
+from aws_solutions.cdk.helpers.fingerprints import StackFingerprints
 from cdk_nag import AwsSolutionsChecks
 from data_connectors.salesforce_pull_stack import SalesforceMarketingCloudStack
 from data_connectors.s3_push_stack import S3PushStack
+from data_connectors.google_analytics_pull_stack import GoogleAnalyticsPullStack
 from data_connectors.app_registry import AppRegistry
 
 solution = CDKSolution(cdk_json_path=Path(__file__).parent.absolute() / "cdk.json")
@@ -35,7 +38,7 @@ def synthesizer():
     ).synthesizer
 
 
-BUILD_STACKS = [SalesforceMarketingCloudStack, S3PushStack]
+BUILD_STACKS = [SalesforceMarketingCloudStack, S3PushStack, GoogleAnalyticsPullStack]
 
 
 @solution.context.requires("SOLUTION_NAME")
@@ -44,7 +47,11 @@ BUILD_STACKS = [SalesforceMarketingCloudStack, S3PushStack]
 @solution.context.requires("BUCKET_NAME")
 def build_app(context):
     app = App(context=context)
+    # stacks whose inputs are unchanged since the previous synth to this cloud assembly are reused from it
+    fingerprints = StackFingerprints(app.outdir, context, entrypoint=Path(__file__), shared=[AppRegistry])
     for stack in BUILD_STACKS:
+        if fingerprints.unchanged(stack.name, stack):
+            continue
         stk = stack(
             app,
             stack.name,
@@ -52,9 +59,13 @@ def build_app(context):
             template_filename=stack.template_filename,
             synthesizer=synthesizer(),
         )
+        fingerprints.add(stk, stack)
         Aspects.of(app).add(AwsSolutionsChecks())
         Aspects.of(app).add(AppRegistry(stk, f'AppRegistry-{stack.name}'))
-    return app.synth(validate_on_synthesis=True, skip_validation=False)
+    assembly = app.synth(validate_on_synthesis=True, skip_validation=False)
+    # the CDK CLI packages the assets once this app exits, so their (background) bundling must be complete
+    BundlingScheduler.wait()
+    return fingerprints.save(assembly)
 
 
 if __name__ == "__main__":
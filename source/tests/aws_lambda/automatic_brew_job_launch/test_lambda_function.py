@@ -11,6 +11,7 @@
 #  the specific language governing permissions and limitations under the License.                                      #
 # ######################################################################################################################
 
+import json
 import os
 import boto3
 import pytest
@@ -118,3 +119,53 @@ def test_handler_success(lambda_event, mock_dynamodb_and_stepfunctions, dynamodb
 def test_handler_failure(lambda_event, mock_dynamodb_and_stepfunctions, dynamodb_client):
     with pytest.raises(KeyError, match=r's3'):
         event_handler(lambda_event, None)
+
+
+def test_handler_passes_first_upload_time(mock_dynamodb_and_stepfunctions, dynamodb_client):
+    body = ("{\"Records\": ["
+            "{\"eventTime\": \"2022-11-17T16:21:18.000Z\", \"s3\": {\"bucket\": {\"arn\": \"s3_bucket_arn\"}, \"object\": {\"key\": \"file_2\"}}}, "
+            "{\"eventTime\": \"2022-11-17T16:21:16.974Z\", \"s3\": {\"bucket\": {\"arn\": \"s3_bucket_arn\"}, \"object\": {\"key\": \"file_1\"}}}"
+            "]}")
+    event_handler({"Records": [{"body": body}]}, None)
+
+    start_execution = _helpers_service_clients["stepfunctions"].start_execution
+    state_machine_input = json.loads(start_execution.call_args.kwargs["input"])
+    assert state_machine_input["first_upload_time"] == "2022-11-17T16:21:16.974Z"
+
+
+def test_handler_propagates_trace_context(mock_dynamodb_and_stepfunctions, dynamodb_client, monkeypatch):
+    monkeypatch.setenv("_X_AMZN_TRACE_ID", "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1")
+    body = ("{\"Records\": ["
+            "{\"eventTime\": \"2022-11-17T16:21:16.974Z\", \"s3\": {\"bucket\": {\"arn\": \"s3_bucket_arn\"}, \"object\": {\"key\": \"file_1\"}}}"
+            "]}")
+    event_handler({"Records": [{"body": body}]}, None)
+
+    start_execution = _helpers_service_clients["stepfunctions"].start_execution
+    state_machine_input = json.loads(start_execution.call_args.kwargs["input"])
+    assert state_machine_input["trace_context"]["correlation_id"]
+    assert state_machine_input["trace_context"]["trace_id"] == "1-5759e988-bd862e3fe1be46a994272793"
+    assert start_execution.call_args.kwargs["traceHeader"].startswith("Root=1-5759e988")
+
+
+def test_handler_logs_one_summary_per_batch(caplog, mock_dynamodb_and_stepfunctions, dynamodb_client):
+    s3_record = ("{\"eventTime\": \"2022-11-17T16:21:16.974Z\", \"s3\": {\"bucket\": {\"arn\": \"s3_bucket_arn\"}, "
+                 "\"object\": {\"key\": \"file\"}}}")
+    body = "{\"Records\": [" + ", ".join([s3_record] * 20) + "]}"
+    event_handler({"Records": [{"body": body}] * 30}, None)
+
+    summaries = [record for record in caplog.records if record.getMessage().startswith("Processing")]
+    assert len(summaries) == 1
+    assert summaries[0].getMessage() == "Processing 600 new file uploads to s3_bucket_arn, the latest at 2022-11-17T16:21:16.974Z"
+
+
+def test_handler_reuses_table_and_client_across_invocations(mock_dynamodb_and_stepfunctions, dynamodb_client, mocker):
+    table = mocker.spy(dynamodb_client, "Table")
+    for event_time in ["2022-11-17T16:21:16.974Z", "2022-11-17T16:22:16.974Z"]:
+        body = json.dumps({"Records": [
+            {"eventTime": event_time, "s3": {"bucket": {"arn": "s3_bucket_arn"}, "object": {"key": "file_1"}}}
+        ]})
+        event_handler({"Records": [{"body": body}]}, None)
+
+    assert _helpers_service_clients["stepfunctions"].start_execution.call_count == 2
+    # the table is built by the first invocation only
+    table.assert_called_once_with(os.environ["DDB_TABLE_NAME"])
@@ -93,7 +93,28 @@ def test_handler_success(lambda_event, mock_databrew_and_stepfunctions, dynamodb
     token = table.query(KeyConditionExpression=Key("job_id").eq("ids"))["Items"][0]["task_token"]
     assert token == "faketoken"
     _helpers_service_clients["databrew"].start_job_run.assert_called_once()
-    stepfunctions.send_heart_beat.assert_has_calls([call('faketoken'), call('faketoken')])
+    stepfunctions.send_heart_beat.assert_called_once_with('faketoken')
+
+
+def test_heartbeat_follows_started_job_run(mock_databrew_and_stepfunctions, dynamodb_client):
+    calls = Mock()
+    calls.attach_mock(_helpers_service_clients["databrew"].start_job_run, "start_job_run")
+    calls.attach_mock(stepfunctions.send_heart_beat, "send_heart_beat")
+
+    handler({"task_token": "faketoken", "brew_job_name": "Job-Name"}, None)
+
+    assert calls.mock_calls[:2] == [call.start_job_run(Name="Job-Name"), call.send_heart_beat("faketoken")]
+
+
+def test_no_heartbeat_when_job_run_fails_to_start(mock_databrew_and_stepfunctions, dynamodb_client):
+    error = RuntimeError("the job is already running")
+    _helpers_service_clients["databrew"].start_job_run.side_effect = error
+
+    with pytest.raises(RuntimeError):
+        handler({"task_token": "faketoken", "brew_job_name": "Job-Name"}, None)
+
+    stepfunctions.send_heart_beat.assert_not_called()
+    stepfunctions.send_task_failure.assert_called_once_with(error, "faketoken")
 
 
 @pytest.mark.parametrize(
@@ -126,3 +147,52 @@ def test_handler_failure(lambda_event, mock_databrew_and_stepfunctions, dynamodb
     with pytest.raises(KeyError, match=r'brew_job_name'):
         handler(lambda_event, None)
     stepfunctions.send_task_failure.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "lambda_event",
+    [
+        {
+            "task_token": "faketoken",
+            "brew_job_name": "Job-Name",
+            "input_location": "s3://inbound-bucket/stack-flow/execution-id/",
+        }
+    ],
+)
+def test_handler_records_input_location(lambda_event, mock_databrew_and_stepfunctions, dynamodb_client):
+    handler(lambda_event, None)
+    table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    item = table.query(KeyConditionExpression=Key("job_id").eq("ids"))["Items"][0]
+    assert item["input_location"] == "s3://inbound-bucket/stack-flow/execution-id/"
+
+
+def test_handler_records_run_timing(mock_databrew_and_stepfunctions, dynamodb_client):
+    run_timing = {
+        "first_upload_time": "2022-11-17T16:21:16.974Z",
+        "last_upload_time": "2022-11-17T16:23:02.120Z",
+        "workflow_start_time": "2022-11-17T16:21:17.501Z",
+    }
+    handler({"task_token": "faketoken", "brew_job_name": "Job-Name", "run_timing": run_timing}, None)
+    table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    item = table.query(KeyConditionExpression=Key("job_id").eq("ids"))["Items"][0]
+    assert {field: item[field] for field in run_timing} == run_timing
+    assert item["databrew_start_time"].endswith("Z")
+
+
+
+def test_handler_records_correlation_id(mock_databrew_and_stepfunctions, dynamodb_client, monkeypatch):
+    monkeypatch.setenv("_X_AMZN_TRACE_ID", "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1")
+    trace_context = {"execution_id": "execution-arn", "correlation_id": "run-correlation-id"}
+    handler({"task_token": "faketoken", "brew_job_name": "Job-Name", "trace_context": trace_context}, None)
+    table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    item = table.query(KeyConditionExpression=Key("job_id").eq("ids"))["Items"][0]
+    assert item["correlation_id"] == "run-correlation-id"
+    assert item["trace_id"] == "1-5759e988-bd862e3fe1be46a994272793"
+
+
+def test_handler_falls_back_to_execution_id(mock_databrew_and_stepfunctions, dynamodb_client):
+    handler({"task_token": "faketoken", "brew_job_name": "Job-Name",
+             "trace_context": {"execution_id": "execution-arn"}}, None)
+    table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    item = table.query(KeyConditionExpression=Key("job_id").eq("ids"))["Items"][0]
+    assert item["correlation_id"] == "execution-arn"
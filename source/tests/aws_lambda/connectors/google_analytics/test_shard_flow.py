@@ -0,0 +1,222 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import os
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from moto import mock_dynamodb, mock_s3
+
+from aws_solutions.core.helpers import _helpers_service_clients, _helpers_service_resources
+from shared.connectors.google_analytics.flow import DATE_RANGE_FIELD, GoogleAnalyticsShardFlow
+from shared.connectors.google_analytics.shards import (
+    DateRangeShard,
+    ShardCheckpoints,
+    period_start,
+    plan_shards,
+)
+
+BASE_FLOW = {
+    "flowName": "ga-stack-flow",
+    "description": "Google Analytics to S3 flow",
+    "sourceFlowConfig": {"connectorType": "Googleanalytics"},
+    "destinationFlowConfigList": [
+        {"connectorType": "S3", "destinationConnectorProperties": {"S3": {"bucketName": "inbound"}}}
+    ],
+    "tasks": [{"sourceFields": [], "taskType": "Map_all"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def mock_env_variables():
+    os.environ["BASE_FLOW_NAME"] = "ga-stack-flow"
+    os.environ["CHECKPOINT_TABLE_NAME"] = "ShardCheckpoints"
+    os.environ["SHARD_SIZE_IN_DAYS"] = "30"
+    os.environ["BACKFILL_START_DATE"] = ""
+
+
+@pytest.fixture()
+def checkpoint_table(monkeypatch):
+    with mock_dynamodb():
+        ddb = boto3.resource("dynamodb", "us-east-1")
+        ddb.create_table(AttributeDefinitions=[{"AttributeName": "shard_id", "AttributeType": "S"}],
+                         TableName=os.environ["CHECKPOINT_TABLE_NAME"],
+                         KeySchema=[{"AttributeName": "shard_id", "KeyType": "HASH"}],
+                         BillingMode="PAY_PER_REQUEST")
+        monkeypatch.setitem(_helpers_service_resources, "dynamodb", ddb)
+        yield ddb.Table(os.environ["CHECKPOINT_TABLE_NAME"])
+
+
+@pytest.fixture()
+def inbound_bucket(monkeypatch):
+    with mock_s3():
+        s3 = boto3.client("s3", "us-east-1")
+        s3.create_bucket(Bucket="inbound")
+        monkeypatch.setitem(_helpers_service_clients, "s3", s3)
+        yield s3
+
+
+def output_keys(s3):
+    return sorted(item["Key"] for item in s3.list_objects_v2(Bucket="inbound").get("Contents", []))
+
+
+@pytest.fixture()
+def mock_appflow_client(monkeypatch):
+    client = MagicMock()
+    client.exceptions.ResourceNotFoundException = type("ResourceNotFoundException", (Exception,), {})
+
+    def describe_flow(flowName):
+        if flowName != BASE_FLOW["flowName"]:
+            raise client.exceptions.ResourceNotFoundException()
+        return BASE_FLOW
+
+    client.describe_flow.side_effect = describe_flow
+    client.start_flow.return_value = {"executionId": "execution-id"}
+    monkeypatch.setitem(_helpers_service_clients, "appflow", client)
+    return client
+
+
+def test_plan_shards():
+    shards = plan_shards(date(2023, 1, 1), date(2023, 3, 5), 30)
+    assert [shard.shard_id for shard in shards] == ["20230101-20230120", "20230121-20230219", "20230220-20230321"]
+    assert [shard.end_date for shard in shards] == [date(2023, 1, 20), date(2023, 2, 19), date(2023, 3, 5)]
+    assert [shard.complete for shard in shards] == [True, True, False]
+    assert plan_shards(date(2023, 1, 1), date(2023, 1, 1), 30) == [
+        DateRangeShard(date(2023, 1, 1), date(2023, 1, 1), date(2023, 1, 20))
+    ]
+    # weekly shards run from Monday to Sunday
+    assert period_start(date(2023, 1, 4), 7) == date(2023, 1, 2)
+
+
+@pytest.mark.parametrize("start_date,end_date,shard_size_in_days", [
+    (date(2023, 1, 2), date(2023, 1, 1), 30),
+    (date(2023, 1, 1), date(2023, 1, 2), 0),
+])
+def test_plan_shards_invalid_range(start_date, end_date, shard_size_in_days):
+    with pytest.raises(ValueError):
+        plan_shards(start_date, end_date, shard_size_in_days)
+
+
+def test_plan_shards_handler_skips_completed_shards(checkpoint_table):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    ShardCheckpoints(checkpoint_table.name).put(
+        DateRangeShard(date(2023, 1, 1), date(2023, 1, 20)), "Successful", "ga-stack-flow-20230101-20230120", "1")
+    ShardCheckpoints(checkpoint_table.name).put(
+        DateRangeShard(date(2023, 1, 21), date(2023, 2, 19)), "Error", "ga-stack-flow-20230121-20230219", "2")
+
+    response = shard_flow.plan_shards_handler({"start_date": "2023-01-01", "end_date": "2023-03-05"}, None)
+
+    assert [shard["shard_id"] for shard in response["shards"]] == ["20230121-20230219", "20230220-20230321"]
+    assert response["completed_shard_count"] == 1
+
+
+def test_plan_shards_handler_shards_are_stable_across_days(checkpoint_table, mocker):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    os.environ["BACKFILL_START_DATE"] = "2023-01-01"
+    clock = mocker.patch.object(shard_flow, "datetime", wraps=datetime)
+
+    clock.now.return_value = datetime(2023, 3, 5, 8, tzinfo=timezone.utc)
+    first_day = shard_flow.plan_shards_handler({}, None)["shards"]
+    for shard in first_day:
+        # the shard of the current period succeeds too, but it is extracted again until the period has ended
+        ShardCheckpoints(checkpoint_table.name).put(DateRangeShard.from_dict(shard), "Successful", "flow", "1")
+
+    clock.now.return_value = datetime(2023, 3, 6, 8, tzinfo=timezone.utc)
+    second_day = shard_flow.plan_shards_handler({}, None)
+
+    assert [shard["shard_id"] for shard in first_day] == [
+        "20230101-20230120",
+        "20230121-20230219",
+        "20230220-20230321",
+    ]
+    assert first_day[-1]["end_date"] == "2023-03-04"
+    assert second_day["shards"] == [
+        DateRangeShard(date(2023, 2, 20), date(2023, 3, 5), date(2023, 3, 21)).to_dict()
+    ]
+    assert second_day["completed_shard_count"] == 2
+
+
+def test_plan_shards_handler_defaults_to_the_current_period(checkpoint_table, mocker):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    os.environ["SHARD_SIZE_IN_DAYS"] = "7"
+    clock = mocker.patch.object(shard_flow, "datetime", wraps=datetime)
+    clock.now.return_value = datetime(2023, 1, 5, tzinfo=timezone.utc)
+
+    shards = shard_flow.plan_shards_handler({}, None)["shards"]
+
+    assert shards == [DateRangeShard(date(2023, 1, 2), date(2023, 1, 4), date(2023, 1, 8)).to_dict()]
+    assert shards[0]["shard_id"] == "20230102-20230108"
+
+
+def test_start_shard_handler_creates_shard_flow(checkpoint_table, mock_appflow_client, inbound_bucket):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    shard = DateRangeShard(date(2023, 1, 1), date(2023, 1, 30))
+    # the output of an earlier run of the shard, and of another shard
+    inbound_bucket.put_object(Bucket="inbound", Key="ga-stack-flow/shards/20230101-20230130/flow/earlier/part", Body=b"")
+    inbound_bucket.put_object(Bucket="inbound", Key="ga-stack-flow/shards/20230131-20230301/flow/other/part", Body=b"")
+
+    response = shard_flow.start_shard_handler(shard.to_dict(), None)
+
+    assert response["flow_name"] == "ga-stack-flow-20230101-20230130"
+    assert response["execution_id"] == "execution-id"
+    created_flow = mock_appflow_client.create_flow.call_args.kwargs
+    assert created_flow["flowName"] == "ga-stack-flow-20230101-20230130"
+    assert created_flow["destinationFlowConfigList"][0]["destinationConnectorProperties"]["S3"]["bucketPrefix"] == \
+        "ga-stack-flow/shards/20230101-20230130"
+    assert output_keys(inbound_bucket) == ["ga-stack-flow/shards/20230131-20230301/flow/other/part"]
+    assert created_flow["tasks"][-1]["sourceFields"] == [DATE_RANGE_FIELD]
+    assert created_flow["tasks"][-1]["taskProperties"]["LOWER_BOUND"] == "1672531200000"
+    mock_appflow_client.update_flow.assert_not_called()
+    assert "bucketPrefix" not in BASE_FLOW["destinationFlowConfigList"][0]["destinationConnectorProperties"]["S3"]
+    assert checkpoint_table.get_item(Key={"shard_id": shard.shard_id})["Item"]["status"] == "InProgress"
+
+
+def test_shard_flow_replaces_date_range_filter():
+    flow = GoogleAnalyticsShardFlow("ga-stack-flow", DateRangeShard(date(2023, 1, 1), date(2023, 1, 1)))
+    stale_filter = {"sourceFields": [DATE_RANGE_FIELD], "taskType": "Filter", "taskProperties": {}}
+
+    tasks = flow.tasks([{"sourceFields": [], "taskType": "Map_all"}, stale_filter])
+
+    assert [task["taskType"] for task in tasks] == ["Map_all", "Filter"]
+    assert tasks[-1]["taskProperties"]["UPPER_BOUND"] == "1672617599999"
+
+
+def test_complete_shard_handler(checkpoint_table, mock_appflow_client, inbound_bucket):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    shard = DateRangeShard(date(2023, 1, 1), date(2023, 1, 30))
+    # a run of the shard that ended after the shard was started again
+    prefix = "ga-stack-flow/shards/20230101-20230130/ga-stack-flow-20230101-20230130"
+    inbound_bucket.put_object(Bucket="inbound", Key=f"{prefix}/late-execution-id/part", Body=b"")
+    inbound_bucket.put_object(Bucket="inbound", Key=f"{prefix}/execution-id/part", Body=b"")
+
+    response = shard_flow.complete_shard_handler(
+        {**shard.to_dict(), "execution_id": "execution-id", "status": "Successful"}, None)
+
+    assert response["status"] == "Successful"
+    mock_appflow_client.delete_flow.assert_called_once_with(flowName="ga-stack-flow-20230101-20230130", forceDelete=True)
+    assert ShardCheckpoints(checkpoint_table.name).completed_shard_ids() == {shard.shard_id}
+    assert output_keys(inbound_bucket) == [f"{prefix}/execution-id/part"]
+
+
+def test_complete_shard_handler_keeps_output_of_failed_run(checkpoint_table, mock_appflow_client, inbound_bucket):
+    from aws_lambda.connectors.google_analytics import shard_flow
+    shard = DateRangeShard(date(2023, 1, 1), date(2023, 1, 30))
+    key = "ga-stack-flow/shards/20230101-20230130/ga-stack-flow-20230101-20230130/earlier/part"
+    inbound_bucket.put_object(Bucket="inbound", Key=key, Body=b"")
+
+    shard_flow.complete_shard_handler({**shard.to_dict(), "execution_id": "execution-id", "status": "Error"}, None)
+
+    assert output_keys(inbound_bucket) == [key]
+    assert ShardCheckpoints(checkpoint_table.name).completed_shard_ids() == set()
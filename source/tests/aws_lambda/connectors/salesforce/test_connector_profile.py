@@ -11,19 +11,15 @@
 #  the specific language governing permissions and limitations under the License.                                      #
 # ######################################################################################################################
 
-import json
 import os
 from unittest.mock import patch, Mock, MagicMock
 
 SECRET_VALUE = {
-    'SecretString':
-    json.dumps({
-        "profile_name": "profile_name",
-        "client_id": "client_id",
-        "client_secret": "client_secret",
-        "token_endpoint": "token_endpoint",
-        "instance_url": "instance_url",
-    }),
+    "profile_name": "profile_name",
+    "client_id": "client_id",
+    "client_secret": "client_secret",
+    "token_endpoint": "token_endpoint",
+    "instance_url": "instance_url",
 }
 
 
@@ -39,10 +35,6 @@ def mock_environ():
     }
 
 
-class MockSecretsManager:
-    get_secret_value = MagicMock(return_value=SECRET_VALUE)
-
-
 class MockConnectorProfile:
     create = MagicMock()
     update = MagicMock()
@@ -51,13 +43,28 @@ class MockConnectorProfile:
 
 @patch('os.environ', new=mock_environ())
 @patch('aws_lambda_powertools.Logger', new=MagicMock())
-@patch('aws_solutions.core.helpers.get_service_client',
-       new=MagicMock(return_value=MockSecretsManager))
+@patch('shared.secrets_manager.get_secret_value',
+       new=MagicMock(return_value=SECRET_VALUE))
 def test_get_connector_profile():
     from aws_lambda.connectors.salesforce import connector_profile
     sf_connectorprofile = connector_profile.get_connector_profile()
     assert sf_connectorprofile.connector_type == "CustomConnector"
     assert sf_connectorprofile.grant_type == "CLIENT_CREDENTIALS"
+    assert sf_connectorprofile.instance_url == "instance_url"
+
+
+@patch('os.environ', new=mock_environ())
+@patch('aws_lambda_powertools.Logger', new=MagicMock())
+@patch('shared.secrets_manager.invalidate_secret')
+def test_with_connector_profile_refreshes_secret_on_auth_failure(mock_invalidate_secret):
+    from aws_lambda.connectors.salesforce import connector_profile
+    from shared.connectors.salesforce.token import AccessTokenException
+    action = MagicMock(side_effect=[AccessTokenException("401 status returned"), "connectorProfileArn"])
+    with patch('aws_lambda.connectors.salesforce.connector_profile.get_connector_profile',
+               new=MagicMock(return_value=MockConnectorProfile)):
+        assert connector_profile.with_connector_profile(action) == "connectorProfileArn"
+    mock_invalidate_secret.assert_called_once_with("MockSecretARN")
+    assert action.call_count == 2
 
 @patch.dict(os.environ, { "CONNECTOR_SECRET_ARN": "MockSecretARN"}, clear=True)
 @patch('os.environ', new=mock_environ())
@@ -82,10 +89,21 @@ def test_update_event_handler():
 
 @patch('os.environ', new=mock_environ())
 @patch('aws_lambda_powertools.Logger', new=Mock())
-@patch('aws_lambda.connectors.salesforce.connector_profile.get_connector_profile',
-    new=MagicMock(return_value=MockConnectorProfile))
+@patch('shared.secrets_manager.get_secret_value',
+       new=MagicMock(return_value=SECRET_VALUE))
 def test_delete_event_handler():
     from aws_lambda.connectors.salesforce import connector_profile
-    sf_connector_handler = connector_profile.delete_event_handler({}, {})
+    with patch('aws_lambda.connectors.salesforce.connector_profile.SalesforceConnectorProfile') as profile:
+        sf_connector_handler = connector_profile.delete_event_handler({}, {})
     assert sf_connector_handler
+    # deleting a profile never sets up an access token
+    profile.assert_called_once_with("profile_name")
+
+
+@patch.dict(os.environ, {}, clear=True)
+def test_import_does_not_read_connector_secret_arn():
+    import importlib
+    from aws_lambda.connectors.salesforce import connector_profile
+    importlib.reload(connector_profile)
+    assert connector_profile.CONNECTOR_SECRET_ARN == "CONNECTOR_SECRET_ARN"
    
@@ -0,0 +1,174 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+from botocore.config import Config
+from moto import mock_dynamodb, mock_s3
+
+from aws_solutions.core.helpers import _helpers_service_clients, _helpers_service_resources
+from shared.connectors.salesforce.extract import (
+    DataExtensionExtractor,
+    DataExtensionRows,
+    ExtractCheckpoints,
+)
+
+DATA_EXTENSION_KEY = "Subscribers"
+ROW_COUNT = 1000
+PAGE_SIZE = 100
+# large enough rows for the extract to span more than one 5 MiB part
+PADDING = "x" * 10 * 1024
+BUCKET = "inbound"
+
+
+class SalesforceMarketingCloudStub(BaseHTTPRequestHandler):
+    """
+    A local stand-in for the SFMC token and data extension rowset endpoints
+    """
+
+    requested_pages = []
+
+    def do_POST(self):
+        self.respond(200, {"access_token": "access_token", "expires_in": 1200})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != f"/data/v1/customobjectdata/key/{DATA_EXTENSION_KEY}/rowset":
+            return self.respond(404, {"message": "not found"})
+        if self.headers.get("Authorization") != "Bearer access_token":
+            return self.respond(401, {"message": "unauthorized"})
+
+        query = parse_qs(url.query)
+        page, page_size = int(query["$page"][0]), int(query["$pageSize"][0])
+        self.requested_pages.append(page)
+        rows = range((page - 1) * page_size, min(page * page_size, ROW_COUNT))
+        self.respond(200, {
+            "page": page,
+            "pageSize": page_size,
+            "count": ROW_COUNT,
+            "items": [{"keys": {"id": row}, "values": {"padding": PADDING}} for row in rows],
+        })
+
+    def respond(self, status, body):
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def sfmc_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SalesforceMarketingCloudStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    SalesforceMarketingCloudStub.requested_pages = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture()
+def aws(monkeypatch):
+    os.environ["CHECKPOINT_TABLE_NAME"] = "ExtractCheckpoints"
+    os.environ["OUTPUT_BUCKET"] = BUCKET
+    os.environ["OUTPUT_PREFIX"] = "stack-flow/"
+    os.environ["CONNECTOR_SECRET_ARN"] = "MockSecretARN"
+    with mock_s3(), mock_dynamodb():
+        # the mocked multipart upload does not decode checksum trailers
+        s3 = boto3.client("s3", "us-east-1", config=Config(request_checksum_calculation="when_required"))
+        s3.create_bucket(Bucket=BUCKET)
+        ddb = boto3.resource("dynamodb", "us-east-1")
+        ddb.create_table(AttributeDefinitions=[{"AttributeName": "extract_id", "AttributeType": "S"}],
+                         TableName=os.environ["CHECKPOINT_TABLE_NAME"],
+                         KeySchema=[{"AttributeName": "extract_id", "KeyType": "HASH"}],
+                         BillingMode="PAY_PER_REQUEST")
+        monkeypatch.setitem(_helpers_service_clients, "s3", s3)
+        monkeypatch.setitem(_helpers_service_resources, "dynamodb", ddb)
+        yield s3
+
+
+def read_rows(s3, key):
+    body = s3.get_object(Bucket=BUCKET, Key=key)["Body"].read().decode("utf-8")
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_extract_writes_every_row_once(sfmc_stub, aws):
+    extractor = DataExtensionExtractor(
+        DataExtensionRows(sfmc_stub, DATA_EXTENSION_KEY, "access_token", page_size=PAGE_SIZE),
+        ExtractCheckpoints(os.environ["CHECKPOINT_TABLE_NAME"]),
+        BUCKET,
+        part_size_in_bytes=5 * 1024 * 1024,
+    )
+
+    checkpoint = extractor.extract("extract", "stack-flow/Subscribers/extract.json")
+
+    assert checkpoint.status == "Completed"
+    assert len(checkpoint.parts) == 2
+    assert [row["id"] for row in read_rows(aws, checkpoint.key)] == list(range(ROW_COUNT))
+    assert sorted(SalesforceMarketingCloudStub.requested_pages) == list(range(1, 11))
+
+
+def test_extract_resumes_from_checkpoint(sfmc_stub, aws):
+    checkpoints = ExtractCheckpoints(os.environ["CHECKPOINT_TABLE_NAME"])
+    extractor = DataExtensionExtractor(
+        DataExtensionRows(sfmc_stub, DATA_EXTENSION_KEY, "access_token", page_size=PAGE_SIZE),
+        checkpoints,
+        BUCKET,
+        max_concurrent_pages=2,
+        part_size_in_bytes=5 * 1024 * 1024,
+    )
+    batches = iter([True, True, True, True, False])
+
+    checkpoint = extractor.extract("extract", "stack-flow/Subscribers/extract.json", lambda: next(batches))
+    assert checkpoint.status == "InProgress"
+    assert checkpoint.next_page == 7
+    assert checkpoints.get("extract").parts == checkpoint.parts
+
+    SalesforceMarketingCloudStub.requested_pages = []
+    checkpoint = extractor.extract("extract", "stack-flow/Subscribers/extract.json")
+
+    assert checkpoint.status == "Completed"
+    assert sorted(SalesforceMarketingCloudStub.requested_pages) == list(range(7, 11))
+    assert [row["id"] for row in read_rows(aws, checkpoint.key)] == list(range(ROW_COUNT))
+
+
+@patch('aws_lambda_powertools.Logger', new=MagicMock())
+def test_event_handler(sfmc_stub, aws):
+    from aws_lambda.connectors.salesforce import data_extension_extract
+    connection = {
+        "client_id": "client_id",
+        "client_secret": "client_secret",
+        "token_endpoint": f"{sfmc_stub}/v2/token",
+        "instance_url": sfmc_stub,
+    }
+    context = MagicMock()
+    context.get_remaining_time_in_millis.return_value = 900 * 1000
+
+    with patch('shared.secrets_manager.get_secret_value', new=MagicMock(return_value=connection)):
+        response = data_extension_extract.event_handler(
+            {"data_extension_key": DATA_EXTENSION_KEY, "extract_id": "extract", "page_size": PAGE_SIZE}, context)
+
+    assert response["status"] == "Completed"
+    assert response["location"] == f"s3://{BUCKET}/stack-flow/{DATA_EXTENSION_KEY}/extract.json"
+    assert len(read_rows(aws, f"stack-flow/{DATA_EXTENSION_KEY}/extract.json")) == ROW_COUNT
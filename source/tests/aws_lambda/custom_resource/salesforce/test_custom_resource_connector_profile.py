@@ -76,3 +76,12 @@ def test_custom_resource_delete():
             new=MagicMock(return_value=(MockConnectorProfile, PROFILE_DICT))):
         from aws_lambda.custom_resource.salesforce.connector_profile import custom_resource_delete
         custom_resource_delete(get_mock_event(), None)
+
+
+def test_credentials_changed():
+    from aws_lambda.custom_resource.salesforce.connector_profile import credentials_changed
+    event = get_mock_event()
+    event["OldResourceProperties"] = dict(event["ResourceProperties"], instance_url="old_instance_url")
+    assert not credentials_changed(event)
+    event["OldResourceProperties"]["client_secret"] = "old_client_secret"
+    assert credentials_changed(event)
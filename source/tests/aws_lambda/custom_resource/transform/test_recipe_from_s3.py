@@ -118,3 +118,16 @@ def test_on_delete(lambda_event, mock_databrew_and_s3):
     on_delete(lambda_event, None)
     _helpers_service_clients["databrew"].list_recipe_versions.assert_called_once()
     _helpers_service_clients["databrew"].delete_recipe_version.assert_called()
+
+
+def test_on_delete_deletes_every_version(mock_databrew_and_s3):
+    databrew = _helpers_service_clients["databrew"]
+    databrew.list_recipe_versions.return_value = {
+        "Recipes": [{"RecipeVersion": f"{version}.0"} for version in range(1, 8)]
+    }
+    on_delete({"ResourceProperties": {"recipe_name": "recipe.json"}, "PhysicalResourceId": "01"}, None)
+
+    deleted = sorted(call.kwargs["RecipeVersion"] for call in databrew.delete_recipe_version.call_args_list)
+    assert deleted == sorted([f"{version}.0" for version in range(1, 8)] + ["LATEST_WORKING"])
+    # the latest working version is only deleted once the previous versions are gone
+    assert databrew.delete_recipe_version.call_args_list[-1].kwargs["RecipeVersion"] == "LATEST_WORKING"
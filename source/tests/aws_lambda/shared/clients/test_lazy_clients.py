@@ -0,0 +1,65 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from aws_solutions.core.helpers import _helpers_service_clients, _helpers_service_resources
+from shared.clients import LazyServiceClient, LazyTable
+
+
+@pytest.fixture()
+def dynamodb_resource(monkeypatch):
+    resource = MagicMock()
+    monkeypatch.setitem(_helpers_service_resources, "dynamodb", resource)
+    monkeypatch.setenv("DDB_TABLE_NAME", "TokenTable")
+    return resource
+
+
+def test_lazy_service_client_is_created_on_first_use(monkeypatch):
+    client = MagicMock()
+    proxy = LazyServiceClient("databrew")
+    monkeypatch.setitem(_helpers_service_clients, "databrew", client)
+
+    proxy.start_job_run(Name="job")
+
+    client.start_job_run.assert_called_once_with(Name="job")
+    assert proxy.resolve() is client
+
+
+def test_lazy_table_is_reused_across_invocations(dynamodb_resource):
+    table = LazyTable("DDB_TABLE_NAME")
+
+    table.put_item(Item={"job_id": "1"})
+    table.put_item(Item={"job_id": "2"})
+
+    dynamodb_resource.Table.assert_called_once_with("TokenTable")
+    assert dynamodb_resource.Table.return_value.put_item.call_count == 2
+
+
+def test_lazy_table_follows_table_name_changes(dynamodb_resource, monkeypatch):
+    table = LazyTable("DDB_TABLE_NAME")
+    table.resolve()
+    monkeypatch.setenv("DDB_TABLE_NAME", "OtherTable")
+    table.resolve()
+
+    assert [call.args for call in dynamodb_resource.Table.call_args_list] == [("TokenTable",), ("OtherTable",)]
+
+
+def test_lazy_table_does_nothing_until_used(monkeypatch):
+    monkeypatch.delenv("DDB_TABLE_NAME", raising=False)
+    table = LazyTable("DDB_TABLE_NAME")
+    assert repr(table) == "LazyTable('DDB_TABLE_NAME')"
+    with pytest.raises(KeyError):
+        table.resolve()
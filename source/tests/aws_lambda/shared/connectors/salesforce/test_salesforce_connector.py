@@ -0,0 +1,144 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from aws_solutions.core.helpers import _helpers_service_clients
+from shared.connectors.salesforce.connector import SalesforceConnectorProfile
+
+PROFILE_ARN = "arn:aws:appflow:us-east-1:111111111111:connectorprofile/profile_name"
+
+
+def existing_profile(instance_url="instance_url", token_endpoint="token_endpoint"):
+    return {
+        "connectorProfileArn": PROFILE_ARN,
+        "connectorProfileName": "profile_name",
+        "connectorProfileProperties": {
+            "CustomConnector": {
+                "profileProperties": {"instanceUrl": instance_url},
+                "oAuth2Properties": {"tokenUrl": token_endpoint, "oAuth2GrantType": "CLIENT_CREDENTIALS"},
+            }
+        },
+    }
+
+
+@pytest.fixture()
+def mock_appflow_client(monkeypatch):
+    client = MagicMock()
+    client.exceptions.ConflictException = type("ConflictException", (Exception,), {})
+    client.create_connector_profile.return_value = {"connectorProfileArn": PROFILE_ARN}
+    client.update_connector_profile.return_value = {"connectorProfileArn": PROFILE_ARN}
+    monkeypatch.setitem(_helpers_service_clients, "appflow", client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def mock_retrieve_token():
+    with patch("shared.connectors.salesforce.token.AccessToken.retrieve_token",
+               return_value={"access_token": "access_token", "expires_in": 1200}) as retrieve_token:
+        yield retrieve_token
+
+
+@pytest.fixture()
+def profile():
+    return SalesforceConnectorProfile("profile_name", "client_id", "client_secret", "token_endpoint", "instance_url")
+
+
+def test_create_new_profile(profile, mock_appflow_client):
+    mock_appflow_client.describe_connector_profiles.return_value = {"connectorProfileDetails": []}
+
+    assert profile.create() == PROFILE_ARN
+
+    config = mock_appflow_client.create_connector_profile.call_args.kwargs["connectorProfileConfig"]
+    assert config["connectorProfileCredentials"]["CustomConnector"]["oauth2"]["accessToken"] == "access_token"
+    mock_appflow_client.update_connector_profile.assert_not_called()
+
+
+def test_create_existing_profile_refreshes_credentials(profile, mock_appflow_client, mock_retrieve_token):
+    mock_appflow_client.describe_connector_profiles.return_value = {"connectorProfileDetails": [existing_profile()]}
+
+    assert profile.create() == PROFILE_ARN
+
+    mock_appflow_client.create_connector_profile.assert_not_called()
+    mock_retrieve_token.assert_called_once()
+    config = mock_appflow_client.update_connector_profile.call_args.kwargs["connectorProfileConfig"]
+    assert config["connectorProfileProperties"] == profile.connector_profile_properties()
+    assert config["connectorProfileCredentials"]["CustomConnector"]["oauth2"]["accessToken"] == "access_token"
+
+
+def test_create_conflict_reconciles_profile(profile, mock_appflow_client):
+    mock_appflow_client.describe_connector_profiles.side_effect = [
+        {"connectorProfileDetails": []},
+        {"connectorProfileDetails": [existing_profile(instance_url="old_instance_url")]},
+    ]
+    mock_appflow_client.create_connector_profile.side_effect = mock_appflow_client.exceptions.ConflictException()
+
+    assert profile.create() == PROFILE_ARN
+
+    config = mock_appflow_client.update_connector_profile.call_args.kwargs["connectorProfileConfig"]
+    assert config["connectorProfileProperties"] == profile.connector_profile_properties()
+    assert config["connectorProfileCredentials"]["CustomConnector"]["oauth2"]["accessToken"] == "access_token"
+
+
+def test_diff(profile):
+    assert profile.diff(existing_profile()) == {}
+    assert profile.diff(existing_profile(instance_url="old_instance_url")) == {
+        "instance_url": ("old_instance_url", "instance_url")
+    }
+
+
+def test_update_refreshes_credentials_only(profile, monkeypatch):
+    # a real client, so that the update is validated against the AppFlow API model
+    client = boto3.client("appflow", region_name="us-east-1")
+    monkeypatch.setitem(_helpers_service_clients, "appflow", client)
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            "describe_connector_profiles",
+            {"connectorProfileDetails": [existing_profile()]},
+            {"connectorProfileNames": ["profile_name"]},
+        )
+        stubber.add_response(
+            "update_connector_profile",
+            {"connectorProfileArn": PROFILE_ARN},
+            {
+                "connectorProfileName": "profile_name",
+                "connectionMode": "Public",
+                "connectorProfileConfig": {
+                    "connectorProfileProperties": profile.connector_profile_properties(),
+                    "connectorProfileCredentials": profile.connector_profile_credentials(),
+                },
+            },
+        )
+
+        assert profile.update() == PROFILE_ARN
+        stubber.assert_no_pending_responses()
+
+
+def test_update_without_changes_is_skipped(profile, mock_appflow_client):
+    mock_appflow_client.describe_connector_profiles.return_value = {"connectorProfileDetails": [existing_profile()]}
+
+    assert profile.update(refresh_credentials=False) == PROFILE_ARN
+
+    mock_appflow_client.update_connector_profile.assert_not_called()
+
+
+def test_update_missing_profile_creates_it(profile, mock_appflow_client):
+    mock_appflow_client.describe_connector_profiles.return_value = {"connectorProfileDetails": []}
+
+    assert profile.update() == PROFILE_ARN
+
+    mock_appflow_client.create_connector_profile.assert_called_once()
@@ -0,0 +1,85 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import io
+import logging
+from unittest.mock import Mock
+
+import pytest
+from aws_lambda_powertools import Logger
+
+import shared.logs as logs
+
+
+@pytest.fixture
+def logger():
+    return Logger(service="unit-test-logs", level="INFO")
+
+
+def test_truncate():
+    assert logs.truncate("short", max_chars=10) == "short"
+    assert logs.truncate("x" * 15, max_chars=10) == "xxxxxxxxxx... (5 more characters)"
+
+
+def test_truncate_default_from_environment(monkeypatch):
+    monkeypatch.setenv(logs.LOG_PAYLOAD_MAX_CHARS, "4")
+    assert logs.truncate("abcdefgh") == "abcd... (4 more characters)"
+
+
+def test_payload_is_formatted_lazily(logger, monkeypatch):
+    dumps = Mock(return_value="{}")
+    monkeypatch.setattr(logs.json, "dumps", dumps)
+    logger.debug(logs.payload({"Records": []}))
+    dumps.assert_not_called()
+    assert str(logs.payload({"Records": []})) == "{}"
+
+
+def test_payload_serializes_and_truncates():
+    assert str(logs.payload({"key": "value"}, max_chars=100)) == '{"key": "value"}'
+    assert str(logs.payload({"key": "value"}, max_chars=5)) == '{"key... (11 more characters)'
+
+
+@pytest.mark.parametrize("sample_rate,expected_level", [(1, logging.DEBUG), (0, logging.INFO)])
+def test_resample_debug_logs(logger, sample_rate, expected_level):
+    logger.setLevel(logging.WARNING)
+    logs.resample_debug_logs(logger, sample_rate)
+    assert logger.isEnabledFor(logging.DEBUG) == (expected_level == logging.DEBUG)
+    assert logger.isEnabledFor(logging.INFO)
+
+
+def test_sample_debug_logs_per_invocation(logger, monkeypatch):
+    monkeypatch.setenv(logs.DEBUG_SAMPLE_RATE, "0.5")
+    levels = []
+
+    @logs.sample_debug_logs(logger)
+    def handler(event, _):
+        levels.append(logger.isEnabledFor(logging.DEBUG))
+
+    monkeypatch.setattr(logs.random, "random", Mock(side_effect=[0.1, 0.9]))
+    handler({}, None)
+    handler({}, None)
+    assert levels == [True, False]
+
+
+def test_batch_summary():
+    stream = io.StringIO()
+    summary = logs.BatchSummary(Logger(service="unit-test-batch-summary", stream=stream), max_samples=2)
+    for index in range(30):
+        summary.add(file=f"file_{index}")
+    summary.log("Processed %d files", summary.count)
+
+    lines = stream.getvalue().strip().splitlines()
+    assert len(lines) == 1
+    assert '"message":"Processed 30 files"' in lines[0]
+    assert '"record_count":30' in lines[0]
+    assert '"sampled_records":[{"file":"file_0"},{"file":"file_1"}]' in lines[0]
@@ -0,0 +1,76 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+
+import pytest
+
+import shared.metrics as pipeline_metrics
+
+
+@pytest.fixture(autouse=True)
+def metrics_dimensions(monkeypatch):
+    monkeypatch.setenv("STACK_NAME", "UnitTestStack")
+    monkeypatch.setenv("CONNECTOR_NAME", "UnitTestConnector")
+    pipeline_metrics.metrics.clear_metrics()
+    yield
+    pipeline_metrics.metrics.clear_metrics()
+
+
+def emitted_metrics(output: str):
+    blobs = [json.loads(line) for line in output.splitlines() if line.startswith("{") and "_aws" in line]
+    return blobs
+
+
+def test_log_metrics_flushes_with_dimensions_and_cold_start(capsys, monkeypatch):
+    monkeypatch.setattr(pipeline_metrics, "_is_cold_start", True)
+
+    @pipeline_metrics.log_metrics
+    def handler(event, _):
+        pipeline_metrics.count("EventsReceived", 3)
+        with pipeline_metrics.timer("CallLatency"):
+            pass
+        return "done"
+
+    assert handler({}, None) == "done"
+    assert handler({}, None) == "done"
+
+    first, second = emitted_metrics(capsys.readouterr().out)
+    assert first["stack"] == "UnitTestStack"
+    assert first["connector"] == "UnitTestConnector"
+    assert first["EventsReceived"] == [3.0]
+    assert first["CallLatency"][0] >= 0
+    assert first["ColdStart"] == [1.0]
+    assert second["ColdStart"] == [0.0]
+    assert first["_aws"]["CloudWatchMetrics"][0]["Namespace"] == pipeline_metrics.METRICS_NAMESPACE
+
+
+def test_log_metrics_flushes_when_the_handler_raises(capsys):
+    @pipeline_metrics.log_metrics
+    def handler(event, _):
+        with pipeline_metrics.timer("CallLatency"):
+            raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        handler({}, None)
+    (blob,) = emitted_metrics(capsys.readouterr().out)
+    assert "CallLatency" in blob
+
+
+def test_count_for_watching_key_is_published_on_its_own(capsys):
+    pipeline_metrics.count_for_watching_key("WorkflowLaunched", "arn:aws:s3:::inbound")
+
+    (blob,) = emitted_metrics(capsys.readouterr().out)
+    assert blob["watching_key"] == "arn:aws:s3:::inbound"
+    assert blob["connector"] == "UnitTestConnector"
+    assert not pipeline_metrics.metrics.metric_set
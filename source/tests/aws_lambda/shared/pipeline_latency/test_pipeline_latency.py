@@ -0,0 +1,77 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from datetime import datetime, timezone
+
+import boto3
+import pytest
+from moto import mock_dynamodb
+
+from aws_solutions.core.helpers import _helpers_service_resources
+from shared.pipeline_latency import completed_runs, parse_time, percentile, stage_durations, summarize
+
+RUN = {
+    "first_upload_time": "2022-11-17T16:21:16.974Z",
+    "last_upload_time": "2022-11-17T16:23:16.974Z",
+    "workflow_start_time": "2022-11-17T16:21:17.974Z",
+    "databrew_start_time": "2022-11-17T16:24:16.974Z",
+    "databrew_end_time": "2022-11-17T16:30:16Z",
+    "callback_time": "2022-11-17T16:30:17.974Z",
+}
+
+
+def test_stage_durations():
+    durations = stage_durations(RUN)
+    assert durations["UploadWindow"] == 120000
+    assert durations["UploadToWorkflowStart"] == 1000
+    assert durations["DataBrewRun"] == 359026
+    assert durations["EndToEnd"] == 541000
+
+
+def test_stage_durations_skip_unknown_times():
+    durations = stage_durations({"workflow_start_time": RUN["workflow_start_time"],
+                                 "databrew_start_time": RUN["databrew_start_time"]})
+    assert list(durations) == ["WorkflowToDataBrewStart"]
+
+
+def test_percentile_interpolates_between_ranks():
+    assert percentile([4, 1, 3, 2], 50) == 2.5
+    assert percentile([1, 2, 3, 4], 100) == 4
+    assert percentile([7], 99) == 7
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_summarize():
+    runs = [RUN, {**RUN, "callback_time": "2022-11-17T16:31:16.974Z"}]
+    summary = summarize(runs, percentiles=(50, 90))
+    assert summary["EndToEnd"] == {"count": 2, "p50": 570500.0, "p90": 594100.0}
+    assert summary["UploadWindow"]["count"] == 2
+
+
+def test_completed_runs_filters_on_callback_time(monkeypatch):
+    with mock_dynamodb():
+        ddb = boto3.resource("dynamodb", "us-east-1")
+        table = ddb.create_table(TableName="TokenTable",
+                                 AttributeDefinitions=[{"AttributeName": "job_id", "AttributeType": "S"}],
+                                 KeySchema=[{"AttributeName": "job_id", "KeyType": "HASH"}],
+                                 BillingMode="PAY_PER_REQUEST")
+        monkeypatch.setitem(_helpers_service_resources, "dynamodb", ddb)
+        table.put_item(Item={"job_id": "in-range", **RUN})
+        table.put_item(Item={"job_id": "too-late", **RUN, "callback_time": "2022-11-18T16:30:17.974Z"})
+        table.put_item(Item={"job_id": "in-flight", "databrew_start_time": RUN["databrew_start_time"]})
+
+        runs = completed_runs("TokenTable",
+                              datetime(2022, 11, 17, tzinfo=timezone.utc),
+                              parse_time("2022-11-18T00:00:00Z"))
+    assert [run["job_id"] for run in runs] == ["in-range"]
@@ -0,0 +1,78 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_secretsmanager
+
+from shared.secrets_manager.cache import SecretCache
+
+SECRET_NAME = "AppFlowConnectionSecret"
+SECRET_VALUE = {"profile_name": "profile_name", "client_id": "client_id"}
+
+
+@pytest.fixture()
+def secretsmanager_client():
+    with mock_secretsmanager():
+        client = boto3.client("secretsmanager", "us-east-1")
+        client.create_secret(Name=SECRET_NAME, SecretString=json.dumps(SECRET_VALUE))
+        yield client
+
+
+@pytest.fixture()
+def secret_cache(secretsmanager_client):
+    return SecretCache(ttl_in_seconds=60, service_client=secretsmanager_client)
+
+
+def test_get_returns_parsed_secret(secret_cache):
+    assert secret_cache.get(SECRET_NAME) == SECRET_VALUE
+
+
+def test_get_returns_plain_string_secret(secretsmanager_client, secret_cache):
+    secretsmanager_client.create_secret(Name="PlainSecret", SecretString="not-json")
+    assert secret_cache.get("PlainSecret") == "not-json"
+
+
+def test_get_is_served_from_cache_within_ttl(secretsmanager_client, secret_cache):
+    secret_cache.get(SECRET_NAME)
+    with patch.object(secretsmanager_client, "get_secret_value") as mock_get_secret_value:
+        assert secret_cache.get(SECRET_NAME) == SECRET_VALUE
+        mock_get_secret_value.assert_not_called()
+
+
+def test_get_after_ttl_keeps_unchanged_version(secretsmanager_client, secret_cache):
+    secret_cache.get(SECRET_NAME)
+    with patch("shared.secrets_manager.cache.time.monotonic", return_value=float("inf")), \
+            patch.object(secretsmanager_client, "get_secret_value") as mock_get_secret_value:
+        assert secret_cache.get(SECRET_NAME) == SECRET_VALUE
+        mock_get_secret_value.assert_not_called()
+
+
+def test_get_after_ttl_refreshes_changed_version(secretsmanager_client, secret_cache):
+    secret_cache.get(SECRET_NAME)
+    rotated_value = {**SECRET_VALUE, "client_id": "rotated_client_id"}
+    secretsmanager_client.put_secret_value(SecretId=SECRET_NAME, SecretString=json.dumps(rotated_value))
+    assert secret_cache.get(SECRET_NAME) == SECRET_VALUE
+    with patch("shared.secrets_manager.cache.time.monotonic", return_value=float("inf")):
+        assert secret_cache.get(SECRET_NAME) == rotated_value
+
+
+def test_invalidate_forces_refresh(secretsmanager_client, secret_cache):
+    secret_cache.get(SECRET_NAME)
+    rotated_value = {**SECRET_VALUE, "client_id": "rotated_client_id"}
+    secretsmanager_client.put_secret_value(SecretId=SECRET_NAME, SecretString=json.dumps(rotated_value))
+    secret_cache.invalidate(SECRET_NAME)
+    assert secret_cache.get(SECRET_NAME) == rotated_value
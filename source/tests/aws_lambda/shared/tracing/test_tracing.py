@@ -0,0 +1,55 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from unittest.mock import Mock
+
+import pytest
+
+import shared.tracing as tracing
+
+TRACE_HEADER = "Root=1-5759e988-bd862e3fe1be46a994272793;Parent=53995c3f42cd8ad8;Sampled=1"
+
+
+@pytest.mark.parametrize(
+    "trace_header,expected",
+    [
+        (TRACE_HEADER, "1-5759e988-bd862e3fe1be46a994272793"),
+        ("Sampled=0;Root=1-5759e988-bd862e3fe1be46a994272793", "1-5759e988-bd862e3fe1be46a994272793"),
+        ("", ""),
+        ("Parent=53995c3f42cd8ad8", ""),
+    ],
+)
+def test_root_trace_id(trace_header, expected):
+    assert tracing.root_trace_id(trace_header) == expected
+
+
+def test_new_trace_context(monkeypatch):
+    monkeypatch.setenv(tracing.TRACE_HEADER, TRACE_HEADER)
+    first = tracing.new_trace_context()
+    second = tracing.new_trace_context()
+    assert first[tracing.TRACE_ID] == "1-5759e988-bd862e3fe1be46a994272793"
+    assert first[tracing.CORRELATION_ID] != second[tracing.CORRELATION_ID]
+
+
+def test_new_trace_context_untraced(monkeypatch):
+    monkeypatch.delenv(tracing.TRACE_HEADER, raising=False)
+    assert tracing.new_trace_context()[tracing.TRACE_ID] == ""
+
+
+def test_annotate_skips_empty_values(monkeypatch):
+    put_annotation = Mock()
+    monkeypatch.setattr(tracing.tracer, "put_annotation", put_annotation)
+    tracing.annotate("run-correlation-id", job_run_id="ids", originating_trace_id=None)
+    assert put_annotation.call_count == 2
+    put_annotation.assert_any_call(key="correlation_id", value="run-correlation-id")
+    put_annotation.assert_any_call(key="job_run_id", value="ids")
@@ -78,3 +78,33 @@ def test_handler(caplog, lambda_event, mock_stepfunctions, dynamodb_client):
     handler(lambda_event, None)
     assert "Token is found" in caplog.text
     stepfunctions.send_task_success.assert_called_once_with('{"status": "Success", "job_run_id": "ids"}', 'task_token')
+
+
+def test_handler_completes_run_latency_record(mock_stepfunctions, dynamodb_client):
+    ddb_table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    ddb_table.put_item(Item={"job_id": "ids",
+                             "task_token": "task_token",
+                             "first_upload_time": "2022-11-17T16:21:16.974Z",
+                             "workflow_start_time": "2022-11-17T16:21:17.501Z",
+                             "databrew_start_time": "2022-11-17T16:24:00.000Z"})
+    handler({"time": "2022-11-17T16:30:00Z", "detail": {"jobRunId": "ids", "state": "SUCCEEDED"}}, None)
+
+    item = ddb_table.get_item(Key={"job_id": "ids", "task_token": "task_token"})["Item"]
+    assert item["databrew_end_time"] == "2022-11-17T16:30:00Z"
+    assert item["databrew_state"] == "SUCCEEDED"
+    assert item["stage_latencies_ms"]["DataBrewRun"] == 360000
+    assert item["stage_latencies_ms"]["WorkflowToDataBrewStart"] == 162499
+    assert "EndToEnd" in item["stage_latencies_ms"]
+    stepfunctions.send_task_success.assert_called_once()
+
+
+
+def test_handler_logs_correlation_id(mock_stepfunctions, dynamodb_client):
+    ddb_table = dynamodb_client.Table(os.environ["DDB_TABLE_NAME"])
+    ddb_table.put_item(Item={"job_id": "ids",
+                             "task_token": "task_token",
+                             "correlation_id": "run-correlation-id",
+                             "trace_id": "1-5759e988-bd862e3fe1be46a994272793"})
+    handler({"detail": {"jobRunId": "ids"}}, None)
+    assert lambda_function_logger.registered_formatter.log_format["correlation_id"] == "run-correlation-id"
+    stepfunctions.send_task_success.assert_called_once()
@@ -0,0 +1,154 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from aws_solutions.cdk.aws_lambda.python.bundling import BUNDLE_SIZES_FILE, BundlingScheduler, SolutionsPythonBundling
+from aws_solutions.cdk.aws_lambda.python.slimming import BundleProfile, precompile
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    monkeypatch.setattr(BundlingScheduler, "_bundles", {})
+    monkeypatch.setattr(BundlingScheduler, "_pending", [])
+    monkeypatch.setattr(BundlingScheduler, "_scheduled", set())
+    monkeypatch.setattr(BundlingScheduler, "_sizes", {})
+    yield BundlingScheduler
+    BundlingScheduler.wait()
+
+
+def write(path: Path, content: str = "") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def installed(tmp_path) -> Path:
+    """A layer bundle as pip leaves it"""
+    bundle_dir = tmp_path / "asset.1"
+    write(bundle_dir / "requirements.txt", "crhelper")
+    install_dir = bundle_dir / "python"
+    for path in [
+        "crhelper/__init__.py",
+        "crhelper/py.typed.pyi",
+        "crhelper-2.0.6.dist-info/METADATA",
+        "crhelper-2.0.6.dist-info/RECORD",
+        "crhelper-2.0.6.dist-info/LICENSE",
+        "tests/test_crhelper.py",
+        "certifi/core.py",
+        "certifi/tests/test_certify.py",
+        "certifi/README.md",
+        "certifi/docs/__init__.py",
+        "boto3/__init__.py",
+        "boto3-1.28.0.dist-info/METADATA",
+        "botocore/data/s3/service-2.json",
+        "python_dateutil-2.8.2.dist-info/METADATA",
+        "dateutil/parser.py",
+        "pip/__init__.py",
+        "bin/normalizer",
+        "urllib3-stubs/__init__.pyi",
+    ]:
+        write(install_dir / path, "x" * 100)
+    return bundle_dir
+
+
+def contents(directory: Path) -> list:
+    return sorted(path.relative_to(directory).as_posix() for path in directory.rglob("*") if path.is_file())
+
+
+def test_default_profile_keeps_bundle(installed):
+    before = contents(installed)
+    assert BundleProfile.named(None).slim(installed, installed / "python", ["requirements.txt"], None) == {}
+    assert contents(installed) == before
+
+
+def test_slim_profile_strips_bundle(installed):
+    removed = BundleProfile.named("slim").slim(installed, installed / "python", ["requirements.txt"], None)
+
+    assert contents(installed) == [
+        "python/certifi/core.py",
+        "python/certifi/docs/__init__.py",
+        "python/crhelper-2.0.6.dist-info/LICENSE",
+        "python/crhelper-2.0.6.dist-info/METADATA",
+        "python/crhelper/__init__.py",
+        "requirements.txt",
+    ]
+    assert removed == {
+        "runtime_packages": 500,
+        "build_tools": 200,
+        "tests": 200,
+        "docs": 100,
+        "type_stubs": 200,
+        "dist_info": 100,
+    }
+
+
+def test_slim_profile_keeps_requested_aws_sdk(installed):
+    # e.g. a function that needs a newer boto3 than the runtime provides
+    write(installed / "requirements.txt", "crhelper\nboto3>=1.28.0  # for the latest APIs\n")
+    removed = BundleProfile.named("slim").slim(installed, installed / "python", ["requirements.txt"], None)
+
+    assert "runtime_packages" not in removed
+    for kept in ["python/boto3/__init__.py", "python/botocore/data/s3/service-2.json", "python/dateutil/parser.py"]:
+        assert kept in contents(installed)
+
+
+def test_slim_profile_keeps_sources(tmp_path):
+    bundle_dir = tmp_path / "asset.1"
+    write(bundle_dir / "handler.py")
+    write(bundle_dir / "tests" / "test_handler.py")
+    write(bundle_dir / "docs" / "handler.md")
+    write(bundle_dir / "six.py")
+
+    BundleProfile.named("slim").slim(bundle_dir, bundle_dir, ["handler.py", "tests", "docs"], None)
+    assert contents(bundle_dir) == ["docs/handler.md", "handler.py", "tests/test_handler.py"]
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="unknown bundle profile fat"):
+        BundleProfile.named("fat")
+
+
+def test_precompile(tmp_path):
+    write(tmp_path / "handler.py", "def handler(event, context): pass")
+    build_version = "%d.%d" % sys.version_info[:2]
+
+    precompile(tmp_path, "2.7")
+    assert not list(tmp_path.rglob("*.pyc"))
+
+    precompile(tmp_path, build_version)
+    assert len(list(tmp_path.rglob("*.pyc"))) == 1
+
+
+def test_bundle_sizes_are_reported(tmp_path):
+    source = tmp_path / "function"
+    write(source / "handler.py", "x" * 10)
+    write(source / "tests" / "test_handler.py", "x" * 10)
+    bundling = SolutionsPythonBundling(source, [], profile=BundleProfile.named("slim"))
+    for name in ("asset.1", "asset.2"):
+        output_dir = tmp_path / "cdk.out" / name
+        output_dir.mkdir(parents=True)
+        bundling.try_bundle(str(output_dir), None)
+    BundlingScheduler.wait()
+
+    sizes = json.loads((tmp_path / "cdk.out" / BUNDLE_SIZES_FILE).read_text())
+    assert sorted(sizes) == ["asset.1", "asset.2"]
+    assert sizes["asset.1"] == sizes["asset.2"]
+    assert sizes["asset.1"]["profile"] == "slim"
+    assert sizes["asset.1"]["bytes"] == 20
+    assert sizes["asset.1"]["largest"] == {"handler.py": 10, "tests": 10}
@@ -0,0 +1,127 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from aws_cdk import App, AssetStaging, Stack
+
+from aws_solutions.cdk.aws_lambda.python.bundling import (
+    INCOMPLETE_BUNDLE_MARKER,
+    BundlingScheduler,
+    SolutionsPythonBundling,
+    SolutionsPythonBundlingException,
+)
+from aws_solutions.cdk.aws_lambda.python.function import SolutionsPythonFunction
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    monkeypatch.setattr(BundlingScheduler, "_bundles", {})
+    monkeypatch.setattr(BundlingScheduler, "_pending", [])
+    monkeypatch.setattr(BundlingScheduler, "_scheduled", set())
+    monkeypatch.setattr(BundlingScheduler, "_sizes", {})
+    yield BundlingScheduler
+    BundlingScheduler.wait()
+
+
+@pytest.fixture
+def bundling(tmp_path) -> SolutionsPythonBundling:
+    source = tmp_path / "function"
+    source.mkdir()
+    (source / "handler.py").write_text("def handler(event, context): pass")
+    library = tmp_path / "library"
+    library.mkdir()
+    (library / "module.py").write_text("")
+    return SolutionsPythonBundling(source, [library])
+
+
+def output(tmp_path: Path, name: str) -> Path:
+    output_dir = tmp_path / "cdk.out" / name
+    output_dir.mkdir(parents=True)
+    return output_dir
+
+
+def test_try_bundle_schedules_bundle(scheduler, bundling, tmp_path):
+    output_dir = output(tmp_path, "asset.1")
+    assert bundling.try_bundle(str(output_dir), None)
+    scheduler.wait()
+
+    assert sorted(path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*")) == [
+        "handler.py",
+        "library",
+        "library/module.py",
+    ]
+
+
+def test_identical_bundles_are_built_once(scheduler, bundling, tmp_path, mocker):
+    bundle = mocker.spy(bundling, "bundle")
+    duplicate = SolutionsPythonBundling(bundling.to_bundle, bundling.libraries)
+    bundling.try_bundle(str(output(tmp_path, "asset.1")), None)
+    duplicate.try_bundle(str(output(tmp_path, "asset.2")), None)
+    scheduler.wait()
+
+    bundle.assert_called_once()
+    assert (tmp_path / "cdk.out" / "asset.2" / "library" / "module.py").exists()
+    assert not (tmp_path / "cdk.out" / "asset.2" / INCOMPLETE_BUNDLE_MARKER).exists()
+
+
+def test_failed_bundle_is_reported_and_removed(scheduler, bundling, tmp_path, mocker):
+    (bundling.to_bundle / "requirements.txt").write_text("requests")
+    mocker.patch.object(bundling, "_local_bundle_with_pip", side_effect=subprocess.CalledProcessError(1, "pip"))
+    output_dir = output(tmp_path, "asset.1")
+    bundling.try_bundle(str(output_dir), None)
+
+    with pytest.raises(SolutionsPythonBundlingException, match="1 asset"):
+        scheduler.wait()
+    assert not output_dir.exists()
+
+
+def synth_function(cdk_out: Path, source: Path) -> None:
+    app = App(outdir=str(cdk_out))
+    SolutionsPythonFunction(Stack(app, "Stack"), "Function", source / "handler.py", "handler")
+
+
+@pytest.mark.no_cdk_lambda_mock
+def test_incomplete_bundle_is_rebuilt_by_next_synth(scheduler, bundling, tmp_path, monkeypatch):
+    cdk_out = tmp_path / "cdk.out"
+
+    # a synth interrupted before its bundles were built leaves their staged assets with only the marker
+    bundle = BundlingScheduler._bundle
+    monkeypatch.setattr(BundlingScheduler, "_bundle", lambda *args: None)
+    synth_function(cdk_out, bundling.to_bundle)
+    scheduler.wait()
+    (staged,) = cdk_out.glob("asset.*")
+    assert [path.name for path in staged.iterdir()] == [INCOMPLETE_BUNDLE_MARKER]
+    assert len(staged.name) == len("asset.") + 64  # staged by CDK by the hash of the custom asset hash
+
+    # the next synth (a new process) bundles it again instead of shipping it empty
+    monkeypatch.setattr(BundlingScheduler, "_bundle", bundle)
+    monkeypatch.setattr(BundlingScheduler, "_bundles", {})
+    monkeypatch.setattr(BundlingScheduler, "_scheduled", set())
+    AssetStaging.clear_asset_hash_cache()
+    synth_function(cdk_out, bundling.to_bundle)
+    scheduler.wait()
+    assert (staged / "handler.py").exists()
+    assert not (staged / INCOMPLETE_BUNDLE_MARKER).exists()
+
+
+def test_discard_incomplete_keeps_scheduled_bundles(scheduler, bundling, tmp_path):
+    cdk_out = tmp_path / "cdk.out"
+
+    # bundles scheduled by this synth are still being built
+    bundling.try_bundle(str(output(tmp_path, "asset.scheduled")), None)
+    scheduler.discard_incomplete(cdk_out)
+    scheduler.wait()
+    assert (cdk_out / "asset.scheduled" / "handler.py").exists()
@@ -0,0 +1,86 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+from pathlib import Path
+
+import pytest
+
+from aws_solutions.cdk.aws_lambda.python.function import (
+    DIRECTORY_HASH_CACHE_FILE,
+    DirectoryHash,
+    FileDigestCache,
+)
+
+
+@pytest.fixture
+def source(tmp_path) -> Path:
+    source = tmp_path / "source"
+    (source / "package").mkdir(parents=True)
+    (source / "handler.py").write_text("def handler(event, context): pass")
+    (source / "package" / "__init__.py").write_text("VALUE = 1")
+    return source
+
+
+@pytest.fixture
+def cdk_out(tmp_path) -> Path:
+    yield tmp_path / "cdk.out"
+    FileDigestCache._loaded.clear()
+
+
+def test_directory_hash_calls_are_independent(source, tmp_path):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "module.py").write_text("")
+
+    first = DirectoryHash.hash(source)
+    DirectoryHash.hash(other)
+    assert DirectoryHash.hash(source) == first
+    assert DirectoryHash.hash(source, other) == DirectoryHash.hash(other, source)
+
+
+def test_directory_hash_covers_names_and_contents(source):
+    before = DirectoryHash.hash(source)
+    (source / "package" / "__init__.py").rename(source / "package" / "module.py")
+    renamed = DirectoryHash.hash(source)
+    (source / "package" / "module.py").write_text("VALUE = 2")
+    assert len({before, renamed, DirectoryHash.hash(source)}) == 3
+
+
+def test_directory_hash_ignore_globs(source):
+    before = DirectoryHash.hash(source)
+    (source / "package" / "__pycache__").mkdir()
+    (source / "package" / "__pycache__" / "__init__.cpython-39.pyc").write_bytes(b"\x00")
+    assert DirectoryHash.hash(source) == before
+
+    (source / "notes.txt").write_text("")
+    assert DirectoryHash.hash(source, ignore=["__pycache__", "*.txt"]) == before
+
+
+def test_directory_hash_cache_is_persisted(source, cdk_out, mocker):
+    expected = DirectoryHash.hash(source, cache_dir=cdk_out)
+    entries = json.loads((cdk_out / DIRECTORY_HASH_CACHE_FILE).read_text())
+    assert sorted(entries) == sorted(str(file) for file in source.rglob("*.py"))
+
+    # a new synth reads the cache instead of the unchanged files
+    FileDigestCache._loaded.clear()
+    read = mocker.spy(Path, "open")
+    assert DirectoryHash.hash(source, cache_dir=cdk_out) == expected
+    assert not [call for call in read.call_args_list if source in call.args[0].parents]
+
+
+def test_directory_hash_cache_reads_changed_files(source, cdk_out):
+    before = DirectoryHash.hash(source, cache_dir=cdk_out)
+    (source / "handler.py").write_text("def handler(event, context): return 1")
+    assert DirectoryHash.hash(source, cache_dir=cdk_out) != before
+    assert DirectoryHash.hash(source, cache_dir=cdk_out) == DirectoryHash.hash(source)
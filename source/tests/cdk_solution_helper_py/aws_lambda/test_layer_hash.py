@@ -0,0 +1,128 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from aws_cdk.aws_lambda import Architecture, Runtime
+
+from aws_solutions.cdk.aws_lambda.python.layer import LayerHash
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import Wheelhouse, local_requirements
+
+
+@pytest.fixture(autouse=True)
+def resolved(mocker, tmp_path, monkeypatch):
+    """The versions the requirements resolve to"""
+    monkeypatch.setenv("SOLUTIONS_WHEELHOUSE", str(tmp_path / "wheelhouse"))
+    return mocker.patch.object(Wheelhouse, "resolve", return_value=["requests==2.31.0"])
+
+
+@pytest.fixture
+def layer_source(tmp_path) -> Path:
+    library = tmp_path / "library"
+    (library / "package").mkdir(parents=True)
+    (library / "package" / "__init__.py").write_text("VALUE = 1")
+    requirements = tmp_path / "requirements"
+    requirements.mkdir()
+    (requirements / "requirements.txt").write_text("requests==2.31.0\n../library  # installed from source\n")
+    return tmp_path
+
+
+def test_layer_hash_is_stable(layer_source):
+    requirements = layer_source / "requirements"
+    assert LayerHash.hash(requirements, []) == LayerHash.hash(requirements, [])
+
+
+def test_layer_hash_resolves_local_requirements(layer_source):
+    requirements = layer_source / "requirements"
+    assert local_requirements(requirements / "requirements.txt", cwd=requirements) == [
+        (layer_source / "library").resolve()
+    ]
+
+    before = LayerHash.hash(requirements, [])
+    (layer_source / "library" / "package" / "__init__.py").write_text("VALUE = 2")
+    assert LayerHash.hash(requirements, []) != before
+
+
+def test_layer_hash_changes_with_requirements(layer_source):
+    requirements = layer_source / "requirements"
+    before = LayerHash.hash(requirements, [])
+    (requirements / "requirements.txt").write_text("requests==2.31.1\n../library\n")
+    assert LayerHash.hash(requirements, []) != before
+
+
+def test_layer_hash_ignores_build_output(layer_source):
+    requirements = layer_source / "requirements"
+    before = LayerHash.hash(requirements, [])
+    (layer_source / "library" / "build" / "lib").mkdir(parents=True)
+    (layer_source / "library" / "build" / "lib" / "module.py").write_text("")
+    (layer_source / "library" / "package" / "__pycache__").mkdir()
+    (layer_source / "library" / "package" / "__pycache__" / "__init__.cpython-39.pyc").write_bytes(b"\x00")
+    assert LayerHash.hash(requirements, []) == before
+
+
+def test_layer_hash_covers_libraries(layer_source):
+    requirements = layer_source / "requirements"
+    other = layer_source / "other"
+    other.mkdir()
+    (other / "module.py").write_text("")
+    assert LayerHash.hash(requirements, [other]) != LayerHash.hash(requirements, [])
+
+
+def test_layer_hash_covers_runtime_and_architecture(layer_source):
+    requirements = layer_source / "requirements"
+    hashes = {
+        LayerHash.hash(requirements, []),
+        LayerHash.hash(requirements, [], compatible_runtimes=[Runtime.PYTHON_3_9]),
+        LayerHash.hash(requirements, [], compatible_architectures=[Architecture.ARM_64]),
+    }
+    assert len(hashes) == 3
+
+
+def test_layer_hash_covers_resolved_versions(layer_source, resolved):
+    requirements = layer_source / "requirements"
+    (requirements / "requirements.txt").write_text("requests>=2.31.0\n")
+    before = LayerHash.hash(requirements, [])
+
+    # a new release of an unpinned requirement is a new layer
+    resolved.return_value = ["requests==2.32.0"]
+    assert LayerHash.hash(requirements, []) != before
+
+
+def test_layer_hash_resolves_for_the_lambda_platform(layer_source, resolved):
+    requirements = layer_source / "requirements"
+    LayerHash.hash(requirements, [], compatible_runtimes=[Runtime.PYTHON_3_9],
+                   compatible_architectures=[Architecture.ARM_64])
+    assert str(resolved.call_args.args[1]) == "manylinux2014_aarch64-py3.9"
+
+
+def test_layer_hash_of_unresolvable_requirements(layer_source, resolved):
+    requirements = layer_source / "requirements"
+    resolved.return_value = None
+    # pinned requirements are content-addressed by their text
+    assert LayerHash.hash(requirements, []) is not None
+
+    # but a layer whose requirements may resolve to other versions is not content-addressed
+    (requirements / "requirements.txt").write_text("requests>=2.31.0\n../library\n")
+    assert LayerHash.hash(requirements, []) is None
+
+
+def test_layer_hash_resolves_with_pip(layer_source, mocker):
+    mocker.stopall()
+    requirements = layer_source / "requirements"
+    (requirements / "requirements.txt").write_text("requests>=2.31.0\n")
+    run = mocker.Mock(side_effect=subprocess.CalledProcessError(1, "pip"))
+
+    assert LayerHash.hash(requirements, [], run=run) is None
+    assert run.call_args.args[1][:3] == ["pip", "install", "--dry-run"]
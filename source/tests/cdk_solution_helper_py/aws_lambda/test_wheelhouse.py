@@ -0,0 +1,200 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+from aws_cdk.aws_lambda import Architecture, Runtime
+
+from aws_solutions.cdk.aws_lambda.python.bundling import SolutionsPythonBundling
+from aws_solutions.cdk.aws_lambda.python.wheelhouse import (
+    RESOLUTION_MAX_AGE_IN_SECONDS,
+    BundlingTarget,
+    Wheelhouse,
+    out_of_tree_requirements,
+    pinned_requirements,
+)
+
+ARM_64 = BundlingTarget(platform="manylinux2014_aarch64", python_version="3.9")
+
+
+@pytest.fixture
+def requirements(tmp_path) -> Path:
+    library = tmp_path / "library"
+    library.mkdir()
+    (library / "setup.py").write_text("setup(install_requires=['boto3'])")
+    (library / "module.py").write_text("")
+    requirements = tmp_path / "function" / "requirements.txt"
+    requirements.parent.mkdir()
+    requirements.write_text("requests==2.31.0\n../library\n")
+    return requirements
+
+
+@pytest.fixture
+def wheelhouse(tmp_path) -> Wheelhouse:
+    return Wheelhouse(tmp_path / "wheelhouse")
+
+
+def resolver(*versions):
+    """Get a command runner that resolves requirements to the versions (name, version) with a pip report"""
+    def resolve(name, command, cwd=None):
+        assert command[:4] == ["pip", "install", "--dry-run", "--ignore-installed"]
+        report = {"install": [{"metadata": {"name": name, "version": version}} for name, version in versions]}
+        Path(command[command.index("--report") + 1]).write_text(json.dumps(report))
+    return resolve
+
+
+def download(name, command, cwd=None):
+    if "--dry-run" in command:
+        return resolver(("requests", "2.31.0"))(name, command, cwd)
+    dest = Path(command[command.index("--dest") + 1])
+    (dest / "requests-2.31.0-py3-none-any.whl").write_text("")
+
+
+def offline(name, command, cwd=None):
+    raise subprocess.CalledProcessError(1, command)
+
+
+def test_bundling_target_for_lambda():
+    assert BundlingTarget.for_lambda([Runtime.PYTHON_3_9], [Architecture.ARM_64]) == ARM_64
+    assert str(BundlingTarget.for_lambda([Runtime.PYTHON_3_7], [Architecture.X86_64])) == "manylinux2014_x86_64-py3.7"
+    assert BundlingTarget.for_lambda([Runtime.PYTHON_3_9], None) is None
+    assert BundlingTarget.for_lambda([Runtime.PYTHON_3_8, Runtime.PYTHON_3_9], [Architecture.ARM_64]) is None
+
+
+def test_wheelhouse_key(wheelhouse, requirements):
+    cwd = requirements.parent
+    run = resolver(("requests", "2.31.0"))
+    key = wheelhouse.key(requirements, ARM_64, cwd, run=run)
+    assert wheelhouse.key(requirements, None, cwd, run=run) != key
+
+    # the source of local requirements is not part of the key, only the files declaring their dependencies
+    (cwd.parent / "library" / "module.py").write_text("VALUE = 1")
+    assert wheelhouse.key(requirements, ARM_64, cwd, run=run) == key
+    (cwd.parent / "library" / "setup.py").write_text("setup(install_requires=['boto3', 'requests'])")
+    assert wheelhouse.key(requirements, ARM_64, cwd, run=run) != key
+
+    requirements.write_text("requests==2.31.1\n../library\n")
+    assert wheelhouse.key(requirements, ARM_64, cwd, run=run) != wheelhouse.key(requirements, None, cwd, run=run)
+
+
+def test_wheelhouse_key_follows_new_releases(wheelhouse, requirements, mocker):
+    requirements.write_text("requests>=2.31.0\n")
+    cwd = requirements.parent
+    key = wheelhouse.key(requirements, ARM_64, cwd, run=resolver(("requests", "2.31.0")))
+
+    # the resolution is reused for a day
+    run = mocker.Mock(side_effect=resolver(("requests", "2.32.0")))
+    assert wheelhouse.key(requirements, ARM_64, cwd, run=run) == key
+    run.assert_not_called()
+
+    # and then resolved again, picking up the new release
+    mocker.patch("time.time", return_value=time.time() + RESOLUTION_MAX_AGE_IN_SECONDS + 1)
+    assert wheelhouse.key(requirements, ARM_64, cwd, run=run) != key
+    assert wheelhouse.resolve(requirements, ARM_64, cwd, run=run) == ["requests==2.32.0"]
+    # the platform options are passed with a target directory, as pip requires
+    command = run.call_args.args[1]
+    assert "--target" in command and "manylinux2014_aarch64" in command
+
+
+def test_wheelhouse_resolution_without_network(wheelhouse, requirements, mocker):
+    requirements.write_text("requests>=2.31.0\n")
+    cwd = requirements.parent
+    assert wheelhouse.resolve(requirements, ARM_64, cwd, run=offline) is None
+
+    wheelhouse.resolve(requirements, ARM_64, cwd, run=resolver(("requests", "2.31.0")))
+    mocker.patch("time.time", return_value=time.time() + RESOLUTION_MAX_AGE_IN_SECONDS + 1)
+    # the last resolution is used until the requirements can be resolved again
+    assert wheelhouse.resolve(requirements, ARM_64, cwd, run=offline) == ["requests==2.31.0"]
+
+
+def test_pinned_requirements(requirements):
+    cwd = requirements.parent
+    assert pinned_requirements(requirements, cwd)
+    for unpinned in ["requests", "requests>=2.31.0", "requests==2.*", "requests==2.31.0,<3"]:
+        requirements.write_text(f"{unpinned}\n../library\n")
+        assert not pinned_requirements(requirements, cwd), unpinned
+    requirements.write_text("# comment\nrequests[socks]==2.31.0  # pinned\nfile:../library\n")
+    assert pinned_requirements(requirements, cwd)
+
+
+def test_out_of_tree_requirements(requirements):
+    library = requirements.parent.parent / "library"
+    (library / "build" / "lib").mkdir(parents=True)
+    (library / "build" / "lib" / "stale.py").write_text("")
+    (library / "library.egg-info").mkdir()
+    (library.parent / "CHANGELOG.md").write_text("## [1.0.0]")
+
+    with out_of_tree_requirements(requirements, cwd=requirements.parent) as build_requirements:
+        remote, local = build_requirements.read_text().splitlines()
+        assert remote == "requests==2.31.0"
+        copy = Path(local)
+        assert copy.is_relative_to(build_requirements.parent)
+        assert sorted(path.name for path in copy.iterdir()) == ["module.py", "setup.py"]
+        assert (copy.parent / "CHANGELOG.md").read_text() == "## [1.0.0]"
+    assert not copy.exists()
+
+
+def test_wheelhouse_downloads_when_cold(wheelhouse, requirements, mocker):
+    run = mocker.Mock(side_effect=download)
+    wheels = wheelhouse.wheels(requirements, ARM_64, cwd=requirements.parent, run=run)
+
+    assert wheels.parent == wheelhouse.path / str(ARM_64)
+    assert wheels.name == wheelhouse.key(requirements, ARM_64, requirements.parent, run=run)
+    assert [wheel.name for wheel in wheels.iterdir()] == ["requests-2.31.0-py3-none-any.whl"]
+    command = run.call_args.args[1]
+    assert command[:2] == ["pip", "download"]
+    assert "--only-binary=:all:" in command and "manylinux2014_aarch64" in command
+
+    # warm
+    run.reset_mock()
+    assert wheelhouse.wheels(requirements, ARM_64, cwd=requirements.parent, run=run) == wheels
+    run.assert_not_called()
+
+
+def test_wheelhouse_failed_download(wheelhouse, requirements, mocker):
+    run = mocker.Mock(side_effect=subprocess.CalledProcessError(1, "pip"))
+    with pytest.raises(subprocess.CalledProcessError):
+        wheelhouse.wheels(requirements, ARM_64, cwd=requirements.parent, run=run)
+    assert not list((wheelhouse.path / str(ARM_64)).iterdir())
+
+
+def test_bundle_installs_from_wheelhouse(tmp_path, requirements, monkeypatch, mocker):
+    monkeypatch.setenv("SOLUTIONS_WHEELHOUSE", str(tmp_path / "wheelhouse"))
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    (output_dir / "requirements.txt").write_text(requirements.read_text())
+    bundling = SolutionsPythonBundling(requirements.parent, [], target=ARM_64)
+    commands = []
+
+    def run(name, command, cwd=None, **kwargs):
+        commands.append(command)
+        if "--platform" in command:
+            raise subprocess.CalledProcessError(1, command)
+        if "download" in command or "--dry-run" in command:
+            download(name, command)
+
+    mocker.patch.object(bundling, "_invoke_local_command", side_effect=run)
+    bundling._local_bundle_with_pip(output_dir)
+
+    # no wheels for the target: the requirements are installed for the build platform
+    install = commands[-1]
+    assert install[:4] == ["pip", "install", "--no-index", "--find-links"]
+    assert Path(install[4]).parent == tmp_path / "wheelhouse" / "build-platform"
+    assert "--platform" not in install
+    # the local requirement is installed from a copy outside of the source tree
+    installed = Path(install[install.index("-r") + 1])
+    assert installed.parent != requirements.parent
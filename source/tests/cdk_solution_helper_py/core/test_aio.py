@@ -0,0 +1,130 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from aws_solutions.core.aio import gather_bounded, run_bounded, run_calls_bounded
+
+
+class InFlight:
+    """Counts the calls in flight, and the most that were in flight at once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.most = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.most = max(self.most, self.current)
+
+    def __exit__(self, *args):
+        with self.lock:
+            self.current -= 1
+
+
+def test_run_bounded_results_are_ordered():
+    in_flight = InFlight()
+
+    async def sleep_and_return(value):
+        with in_flight:
+            # the first awaitables finish last
+            await asyncio.sleep(0.01 * (5 - value))
+            return value
+
+    assert run_bounded((sleep_and_return(value) for value in range(5)), max_concurrency=2) == [0, 1, 2, 3, 4]
+    assert in_flight.most == 2
+
+
+def test_run_calls_bounded_results_are_ordered():
+    in_flight = InFlight()
+
+    def sleep_and_return(value):
+        with in_flight:
+            time.sleep(0.01 * (5 - value))
+            return value
+
+    calls = [lambda value=value: sleep_and_return(value) for value in range(5)]
+    assert run_calls_bounded(calls, max_concurrency=3) == [0, 1, 2, 3, 4]
+    assert in_flight.most <= 3
+    assert run_calls_bounded([]) == []
+
+
+def test_run_bounded_raises_first_exception():
+    async def fail():
+        raise ValueError("failed")
+
+    async def succeed():
+        return "succeeded"
+
+    with pytest.raises(ValueError, match="failed"):
+        run_bounded([succeed(), fail()])
+
+    results = run_bounded([succeed(), fail()], return_exceptions=True)
+    assert results[0] == "succeeded"
+    assert isinstance(results[1], ValueError)
+
+
+def test_run_calls_bounded_raises_first_exception():
+    def fail():
+        raise KeyError("failed")
+
+    with pytest.raises(KeyError):
+        run_calls_bounded([lambda: 1, fail])
+
+    results = run_calls_bounded([lambda: 1, fail], return_exceptions=True)
+    assert results[0] == 1
+    assert isinstance(results[1], KeyError)
+
+
+def test_gather_bounded_closes_coroutines_that_did_not_start():
+    started = []
+
+    async def fail():
+        raise ValueError("failed")
+
+    async def record(value):
+        started.append(value)
+
+    async def gather():
+        pending = [record(value) for value in range(3)]
+        with pytest.raises(ValueError):
+            await gather_bounded([fail(), *pending], max_concurrency=1)
+        return pending
+
+    # no "coroutine was never awaited" warnings: the coroutines cancelled before they got a slot are closed
+    for coroutine in asyncio.run(gather()):
+        assert coroutine.cr_frame is None
+
+
+def test_run_inside_running_event_loop():
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    async def handler():
+        # synchronous code called from a coroutine, e.g. a handler run by an async framework
+        loop_thread = threading.get_ident()
+        assert run_bounded([double(1), double(2)]) == [2, 4]
+        assert run_calls_bounded([lambda: threading.get_ident() != loop_thread]) == [True]
+        with pytest.raises(ValueError):
+            run_calls_bounded([lambda: int("not a number")])
+        return "done"
+
+    assert asyncio.run(handler()) == "done"
+
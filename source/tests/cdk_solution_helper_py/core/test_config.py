@@ -0,0 +1,80 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import botocore.config
+import pytest
+
+from aws_solutions.core.config import Config
+
+
+def test_botocore_config_from_env(monkeypatch):
+    monkeypatch.setenv("AWS_SOLUTIONS_MAX_POOL_CONNECTIONS", "50")
+    monkeypatch.setenv("AWS_SOLUTIONS_RETRY_MODE", "adaptive")
+    monkeypatch.setenv("AWS_SOLUTIONS_MAX_ATTEMPTS", "5")
+    monkeypatch.setenv("AWS_SOLUTIONS_TCP_KEEPALIVE", "TRUE")
+
+    config = Config().botocore_config
+
+    assert config.max_pool_connections == 50
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 5}
+    assert config.tcp_keepalive is True
+    assert config.user_agent_extra == "AwsSolution/SO9999test/v99.99.99"
+
+
+def test_botocore_config_defaults(monkeypatch):
+    for name in ["MAX_POOL_CONNECTIONS", "RETRY_MODE", "MAX_ATTEMPTS", "CONNECT_TIMEOUT", "READ_TIMEOUT", "TCP_KEEPALIVE"]:
+        monkeypatch.delenv(f"AWS_SOLUTIONS_{name}", raising=False)
+
+    config = Config().botocore_config
+
+    # botocore's own defaults apply to the settings that are not configured
+    assert config.max_pool_connections == 10
+    assert config.retries is None
+    assert (config.connect_timeout, config.read_timeout) == (60, 60)
+    assert config.tcp_keepalive is None
+    assert config.user_agent_extra == "AwsSolution/SO9999test/v99.99.99"
+
+
+def test_botocore_config_partial_retries(monkeypatch):
+    monkeypatch.delenv("AWS_SOLUTIONS_RETRY_MODE", raising=False)
+    monkeypatch.setenv("AWS_SOLUTIONS_MAX_ATTEMPTS", "5")
+
+    assert Config().botocore_config.retries == {"total_max_attempts": 5}
+
+
+@pytest.mark.parametrize("name,value", [
+    ("AWS_SOLUTIONS_MAX_POOL_CONNECTIONS", "many"),
+    ("AWS_SOLUTIONS_MAX_ATTEMPTS", "-1"),
+    ("AWS_SOLUTIONS_CONNECT_TIMEOUT", "1.5"),
+    ("AWS_SOLUTIONS_READ_TIMEOUT", ""),
+    ("AWS_SOLUTIONS_RETRY_MODE", "fast"),
+    ("AWS_SOLUTIONS_TCP_KEEPALIVE", "yes"),
+    ("SOLUTION_ID", "S01234"),
+    ("SOLUTION_VERSION", "1.0.0"),
+])
+def test_invalid_env_values_are_rejected(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+
+    with pytest.raises(ValueError, match=name):
+        Config().botocore_config
+
+
+def test_botocore_config_override_is_merged():
+    config = Config()
+    version = config.botocore_config_version
+
+    config.botocore_config = botocore.config.Config(read_timeout=5)
+
+    assert config.botocore_config.read_timeout == 5
+    assert config.botocore_config.max_pool_connections == 10
+    assert config.botocore_config_version == version + 1
@@ -0,0 +1,96 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import botocore.config
+import pytest
+
+import aws_solutions.core
+from aws_solutions.core import helpers
+from aws_solutions.core.helpers import EnvironmentVariableError, get_service_client, get_service_resource
+
+
+@pytest.fixture(autouse=True)
+def empty_caches(monkeypatch):
+    monkeypatch.setattr(helpers, "_helpers_service_clients", {})
+    monkeypatch.setattr(helpers, "_helpers_service_resources", {})
+    monkeypatch.setattr(helpers, "_helpers_botocore_config_version", aws_solutions.core.config.botocore_config_version)
+
+
+def test_same_key_same_instance():
+    assert get_service_client("s3") is get_service_client("s3")
+    # the caller's region and the solution's config are the default key
+    assert get_service_client("s3", region_name="us-east-1") is get_service_client("s3")
+    assert get_service_resource("dynamodb") is get_service_resource("dynamodb")
+    assert get_service_client("s3", config=botocore.config.Config(read_timeout=5)) is get_service_client(
+        "s3", config=botocore.config.Config(read_timeout=5)
+    )
+
+
+def test_separate_keys_per_region_and_config():
+    default = get_service_client("s3")
+    other_region = get_service_client("s3", region_name="eu-west-1")
+    other_config = get_service_client("s3", config=botocore.config.Config(read_timeout=5))
+    another_config = get_service_client("s3", config=botocore.config.Config(read_timeout=10))
+
+    assert len({id(default), id(other_region), id(other_config), id(another_config)}) == 4
+    assert other_region.meta.region_name == "eu-west-1"
+    assert other_config.meta.config.read_timeout == 5
+    assert another_config.meta.config.read_timeout == 10
+    # clients and resources are cached apart
+    assert get_service_resource("s3") is not default
+
+
+def test_config_change_rebuilds_services(monkeypatch):
+    client = get_service_client("s3")
+    config_version = helpers._helpers_botocore_config_version + 1
+    monkeypatch.setattr(aws_solutions.core.config, "botocore_config_version", config_version)
+
+    assert get_service_client("s3") is not client
+
+
+def test_concurrent_first_calls(monkeypatch):
+    session = MagicMock()
+
+    def create_client(service_name, **kwargs):
+        # widen the window between the cache miss and the cache write
+        time.sleep(0.01)
+        return object()
+
+    session.client.side_effect = create_client
+    monkeypatch.setattr(helpers, "_session", session)
+    barrier = threading.Barrier(8)
+    clients = []
+
+    def first_call():
+        barrier.wait()
+        clients.append(get_service_client("sqs"))
+
+    threads = [threading.Thread(target=first_call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(clients) == 8
+    assert len({id(client) for client in clients}) == 1
+    session.client.assert_called_once()
+
+
+def test_missing_region(monkeypatch):
+    monkeypatch.delenv("AWS_REGION")
+    with pytest.raises(EnvironmentVariableError):
+        get_service_client("s3")
@@ -0,0 +1,85 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import os
+from unittest.mock import patch
+
+import boto3
+import pytest
+from botocore.config import Config
+from moto import mock_s3
+
+from aws_solutions.cdk.helpers.s3_sync import MiB, S3Sync
+
+BUCKET = "dist-bucket-us-east-1"
+PREFIX = "solution/v1.0.0"
+
+
+@pytest.fixture()
+def s3_client():
+    with mock_s3():
+        # moto does not decode the aws-chunked bodies botocore sends with the checksums it adds by default
+        client = boto3.client("s3", "us-east-1", config=Config(request_checksum_calculation="when_required"))
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.fixture()
+def assets(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "solution.template").write_text('{"Resources": {}}')
+    (tmp_path / f"{'a' * 64}.zip").write_bytes(os.urandom(1024))
+    (tmp_path / "nested" / "large.zip").write_bytes(os.urandom(6 * MiB))
+    return tmp_path
+
+
+def sync(s3_client, assets, **kwargs):
+    return S3Sync(s3_client, multipart_threshold=5 * MiB, multipart_chunksize=5 * MiB, **kwargs).sync(
+        assets, f"s3://{BUCKET}/{PREFIX}"
+    )
+
+
+def test_sync_uploads_missing_objects(s3_client, assets):
+    report = sync(s3_client, assets)
+
+    assert (report.uploaded, report.skipped, report.failed) == (3, 0, [])
+    assert report.uploaded_bytes == sum(path.stat().st_size for path in assets.rglob("*") if path.is_file())
+    keys = [remote["Key"] for remote in s3_client.list_objects_v2(Bucket=BUCKET)["Contents"]]
+    assert sorted(keys) == sorted([f"{PREFIX}/nested/large.zip", f"{PREFIX}/solution.template", f"{PREFIX}/{'a' * 64}.zip"])
+
+    large = s3_client.head_object(Bucket=BUCKET, Key=f"{PREFIX}/nested/large.zip")
+    assert large["ETag"].strip('"').endswith("-2")
+    assert large["Metadata"]["sha256"] == S3Sync(s3_client).digest(assets / "nested" / "large.zip").sha256
+
+
+def test_sync_skips_unchanged_objects_by_etag(s3_client, assets):
+    sync(s3_client, assets)
+    (assets / "solution.template").write_text('{"Resources": {"Changed": {}}}')
+
+    with patch.object(s3_client, "head_object", wraps=s3_client.head_object) as head_object:
+        report = sync(s3_client, assets)
+
+    assert (report.uploaded, report.skipped) == (1, 2)
+    head_object.assert_not_called()
+    body = s3_client.get_object(Bucket=BUCKET, Key=f"{PREFIX}/solution.template")["Body"].read()
+    assert body == b'{"Resources": {"Changed": {}}}'
+
+
+def test_sync_skips_unchanged_objects_by_metadata(s3_client, assets):
+    sync(s3_client, assets)
+
+    # uploaded in 5 MiB parts, the large object's ETag does not match the single part ETag of this sync
+    report = S3Sync(s3_client, multipart_threshold=8 * MiB).sync(assets, f"s3://{BUCKET}/{PREFIX}")
+
+    assert (report.uploaded, report.skipped) == (0, 3)
+    assert report.skipped_bytes == 6 * MiB + 1024 + len('{"Resources": {}}')
@@ -0,0 +1,121 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import importlib
+import sys
+from pathlib import Path
+
+import aws_cdk as cdk
+import aws_cdk.aws_s3_assets as s3_assets
+import pytest
+
+from aws_solutions.cdk.aws_lambda.python.function import FileDigestCache
+from aws_solutions.cdk.helpers.fingerprints import (
+    FINGERPRINTS_FILE,
+    INCREMENTAL_SYNTH_CONTEXT,
+    SourceModules,
+    StackFingerprints,
+)
+
+
+class AssetStack(cdk.Stack):
+    asset_path: Path = None
+
+    def __init__(self, scope, construct_id):
+        super().__init__(scope, construct_id)
+        s3_assets.Asset(self, "Asset", path=str(self.asset_path))
+
+
+@pytest.fixture
+def asset(tmp_path, monkeypatch) -> Path:
+    path = tmp_path / "asset"
+    path.mkdir()
+    (path / "handler.py").write_text("def handler(event, context): pass")
+    monkeypatch.setattr(AssetStack, "asset_path", path)
+    return path
+
+
+def synth(outdir: Path, context=None) -> StackFingerprints:
+    context = context or {}
+    app = cdk.App(outdir=str(outdir), context=context)
+    fingerprints = StackFingerprints(app.outdir, context)
+    if not fingerprints.unchanged("AssetStack", AssetStack):
+        fingerprints.add(AssetStack(app, "AssetStack"), AssetStack)
+    fingerprints.save(app.synth())
+    return fingerprints
+
+
+def test_source_modules(tmp_path, monkeypatch):
+    package = tmp_path / "fingerprinted"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "stack.py").write_text("import json\nfrom . import constructs\n\nclass Stack:\n    pass\n")
+    (package / "constructs.py").write_text("VALUE = 1\n")
+    (package / "unused.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    stack = importlib.import_module("fingerprinted.stack")
+    importlib.import_module("fingerprinted.unused")
+
+    try:
+        digests = SourceModules(FileDigestCache()).digests(stack.Stack)
+        assert sorted(digests) == ["fingerprinted", "fingerprinted.constructs", "fingerprinted.stack"]
+
+        (package / "constructs.py").write_text("VALUE = 22\n")
+        changed = SourceModules(FileDigestCache()).digests(stack.Stack)
+        assert [name for name in digests if digests[name] != changed[name]] == ["fingerprinted.constructs"]
+    finally:
+        for name in [name for name in sys.modules if name.startswith("fingerprinted")]:
+            del sys.modules[name]
+
+
+def test_unchanged_stack_is_reused(tmp_path, asset):
+    outdir = tmp_path / "cdk.out"
+    assert not synth(outdir).reused
+    assert (outdir / FINGERPRINTS_FILE).exists()
+
+    fingerprints = synth(outdir)
+    assert list(fingerprints.reused) == ["AssetStack"]
+    assembly = cdk.cx_api.CloudAssembly(str(outdir))
+    assert assembly.get_stack_by_name("AssetStack").template
+
+
+def test_changed_asset_is_synthesized(tmp_path, asset):
+    outdir = tmp_path / "cdk.out"
+    synth(outdir)
+    (asset / "handler.py").write_text("def handler(event, context): return 1")
+    assert not synth(outdir).reused
+    assert list(synth(outdir).reused) == ["AssetStack"]
+
+
+def test_changed_context_is_synthesized(tmp_path, asset):
+    outdir = tmp_path / "cdk.out"
+    synth(outdir, {"VALUE": "1"})
+    assert not synth(outdir, {"VALUE": "2"}).reused
+
+
+def test_missing_artifacts_are_synthesized(tmp_path, asset):
+    outdir = tmp_path / "cdk.out"
+    synth(outdir)
+    (outdir / "AssetStack.template.json").unlink()
+    assert not synth(outdir).reused
+    assert (outdir / "AssetStack.template.json").exists()
+
+
+@pytest.mark.parametrize(
+    "context",
+    [{INCREMENTAL_SYNTH_CONTEXT: False}, {"SOLUTIONS_ASSETS_REGIONAL": "regional", "SOLUTIONS_ASSETS_GLOBAL": "global"}],
+)
+def test_incremental_synth_disabled(tmp_path, asset, context):
+    outdir = tmp_path / "cdk.out"
+    synth(outdir, context)
+    assert not synth(outdir, context).reused
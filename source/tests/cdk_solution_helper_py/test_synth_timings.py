@@ -0,0 +1,58 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import aws_cdk as cdk
+import pytest
+
+from aws_solutions.cdk.helpers.timings import SynthTimings
+from aws_solutions.cdk.synthesizers import SolutionStackSubstitions
+
+
+@pytest.fixture(autouse=True)
+def timings():
+    SynthTimings.reset()
+    yield
+    SynthTimings.reset()
+
+
+def test_phases_add_up_across_threads():
+    @SynthTimings.timed("bundling")
+    def bundle(_):
+        pass
+
+    with patch("aws_solutions.cdk.helpers.timings.time.perf_counter", side_effect=[0.0, 1.5] * 4):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            list(executor.map(bundle, range(4)))
+
+    assert SynthTimings.snapshot() == {"bundling": {"seconds": 6.0, "count": 4}}
+
+
+def test_phase_is_recorded_when_it_raises():
+    with pytest.raises(ValueError):
+        with SynthTimings.phase("template_substitution"):
+            raise ValueError("missing substitution")
+
+    assert SynthTimings.snapshot()["template_substitution"]["count"] == 1
+
+
+def test_synthesizer_records_its_phases(tmp_path):
+    app = cdk.App(outdir=str(tmp_path), context={"SOLUTION_NAME": "solution"})
+    stack = cdk.Stack(app, "Stack", synthesizer=SolutionStackSubstitions(generate_bootstrap_version_rule=False))
+    stack.synthesizer.bind(stack)
+    cdk.CfnOutput(stack, "Name", value="%%SOLUTION_NAME%%")
+    app.synth()
+
+    assert set(SynthTimings.snapshot()) == {"stack_synthesis", "template_substitution", "template_customization"}
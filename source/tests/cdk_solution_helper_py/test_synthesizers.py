@@ -0,0 +1,124 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import aws_cdk as cdk
+import pytest
+
+from aws_solutions.cdk.synthesizers import (
+    ARCHIVE_DATE_TIME,
+    CloudFormationTemplate,
+    SolutionStackSubstitions,
+    archive_directory,
+)
+
+
+@pytest.fixture
+def cloud_assembly(tmp_path) -> Path:
+    asset = tmp_path / "asset.1234"
+    (asset / "python" / "package").mkdir(parents=True)
+    (asset / "python" / "package" / "__init__.py").write_text("VALUE = 1")
+    (asset / "handler.py").write_text("def handler(event, context): pass")
+    (asset / "bin").mkdir()
+    (asset / "bin" / "tool").write_text("#!/bin/sh")
+    (asset / "bin" / "tool").chmod(0o775)
+    yield tmp_path
+    CloudFormationTemplate._archive_cache.clear()
+
+
+def template(cloud_assembly: Path, name: str) -> CloudFormationTemplate:
+    contents = {
+        "Metadata": {"aws:solutions:templatename": f"{name}.template"},
+        "Resources": {
+            "Layer": {"Type": "AWS::Lambda::LayerVersion", "Properties": {"Content": {"S3Key": "1234.zip"}}},
+            "Function": {"Type": "AWS::Lambda::Function", "Properties": {"Code": {"S3Key": "1234.zip"}}},
+        },
+    }
+    assets = {"files": {"1234": {"source": {"path": "asset.1234", "packaging": "zip"}}}}
+    path = cloud_assembly / f"{name}.template.json"
+    path.write_text(json.dumps(contents))
+    return CloudFormationTemplate(path, contents, assets)
+
+
+def s3_key(resource) -> str:
+    properties = resource["Properties"].get("Code") or resource["Properties"]["Content"]
+    return properties["S3Key"]["Fn::Join"][1][1]
+
+
+def test_archive_directory_is_reproducible(cloud_assembly, tmp_path):
+    asset = cloud_assembly / "asset.1234"
+    archive_directory(asset, tmp_path / "first.zip")
+    os.utime(asset / "handler.py", (0, 0))
+    (asset / "python" / "package" / "__init__.py").chmod(0o600)
+    archive_directory(asset, tmp_path / "second.zip")
+    assert (tmp_path / "first.zip").read_bytes() == (tmp_path / "second.zip").read_bytes()
+
+    with zipfile.ZipFile(tmp_path / "first.zip") as archive:
+        assert archive.namelist() == ["handler.py", "bin/tool", "python/package/__init__.py"]
+        assert {info.date_time for info in archive.infolist()} == {ARCHIVE_DATE_TIME}
+        assert [info.external_attr >> 16 & 0o777 for info in archive.infolist()] == [0o644, 0o755, 0o644]
+
+
+def test_patch_lambda_archives_each_asset_once(cloud_assembly):
+    templates = [template(cloud_assembly, "first"), template(cloud_assembly, "second")]
+    for cfn_template in templates:
+        cfn_template.patch_lambda()
+
+    keys = {s3_key(resource) for cfn_template in templates for resource in cfn_template.contents["Resources"].values()}
+    assert len(keys) == 1
+    archive_name = keys.pop()
+    assert [path.name for path in cloud_assembly.glob("*.zip")] == [archive_name]
+    assert [path.name for cfn_template in templates for path in cfn_template.assets_regional] == [archive_name] * 2
+
+
+def test_substitute_replaces_keys_and_values(cloud_assembly):
+    cfn_template = template(cloud_assembly, "first")
+    cfn_template.contents["Mappings"] = {
+        "%%KEY%%": {"Prefix": "%%SOLUTION_NAME%%/%%VERSION%%", "List": ["%%VERSION%%", 1, None]}
+    }
+    lookups = []
+
+    def context(placeholder):
+        lookups.append(placeholder)
+        return {"KEY": "Key", "SOLUTION_NAME": "solution", "VERSION": "v1.0.0"}.get(placeholder)
+
+    assert cfn_template.substitute(context) == set()
+    assert cfn_template.contents["Mappings"] == {"Key": {"Prefix": "solution/v1.0.0", "List": ["v1.0.0", 1, None]}}
+    assert sorted(lookups) == ["KEY", "SOLUTION_NAME", "VERSION", "VERSION"]
+
+
+def test_synthesize_reports_all_missing_substitutions(tmp_path):
+    app = cdk.App(outdir=str(tmp_path), context={"SOLUTION_NAME": "solution"})
+    stack = cdk.Stack(app, "Stack", synthesizer=SolutionStackSubstitions(generate_bootstrap_version_rule=False))
+    stack.synthesizer.bind(stack)
+    cdk.CfnOutput(stack, "Name", value="%%SOLUTION_NAME%%")
+    cdk.CfnOutput(stack, "Version", value="%%SOLUTION_VERSION%%")
+    cdk.CfnOutput(stack, "Bucket", value="%%BUCKET_NAME%%")
+
+    # the ValueError raised by the synthesizer reaches python through jsii as a RuntimeError
+    with pytest.raises(RuntimeError, match="substitution for BUCKET_NAME, SOLUTION_VERSION via"):
+        app.synth()
+
+
+def test_synthesize_substitutes_parameters(tmp_path):
+    app = cdk.App(outdir=str(tmp_path), context={"SOLUTION_NAME": "solution"})
+    stack = cdk.Stack(app, "Stack", synthesizer=SolutionStackSubstitions(generate_bootstrap_version_rule=False))
+    stack.synthesizer.bind(stack)
+    cdk.CfnOutput(stack, "Name", value="%%SOLUTION_NAME%%")
+
+    template = app.synth().get_stack_artifact("Stack").template
+    assert template["Outputs"]["Name"]["Value"] == "solution"
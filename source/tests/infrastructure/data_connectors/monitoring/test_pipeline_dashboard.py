@@ -0,0 +1,122 @@
+# ######################################################################################################################
+#  Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.                                                  #
+#                                                                                                                      #
+#  Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance      #
+#  with the License. You may obtain a copy of the License at                                                           #
+#                                                                                                                      #
+#   http://www.apache.org/licenses/LICENSE-2.0                                                                         #
+#                                                                                                                      #
+#  Unless required by applicable law or agreed to in writing, software distributed under the License is distributed    #
+#  on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for   #
+#  the specific language governing permissions and limitations under the License.                                      #
+# ######################################################################################################################
+
+import json
+from pathlib import Path
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_lambda as lambda_
+from aws_cdk import aws_sns as sns
+from aws_cdk import aws_sqs as sqs
+from aws_cdk import aws_stepfunctions as sfn
+from aws_cdk.assertions import Match, Template
+from aws_solutions.cdk import CDKSolution
+from aws_solutions.cdk.stack import SolutionStack
+from data_connectors.monitoring.pipeline_dashboard import PIPELINE_STAGES, PipelineDashboard
+
+
+@pytest.fixture(scope="module")
+def mock_solution():
+    path = Path(__file__).parent / ".." / "cdk.json"
+    return CDKSolution(cdk_json_path=path)
+
+
+def synth_stack(mock_solution, with_queue):
+    app = cdk.App(context=mock_solution.context.context)
+    stack = SolutionStack(app, "TestPipelineDashboard", description="Empty Stack for Testing",
+                          template_filename="test-pipeline-dashboard.template")
+    queue = sqs.Queue(stack, "Queue") if with_queue else None
+    PipelineDashboard(stack, "PipelineDashboard", connector_name="UnitTestConnector",
+                      run_duration_slo_in_minutes=45, queue=queue,
+                      queue_age_slo_in_minutes=15 if with_queue else None,
+                      alarm_topic=sns.Topic(stack, "AlarmTopic"))
+    # created after the dashboard, as the connector stacks do
+    lambda_.Function(stack, "LateFunction", runtime=lambda_.Runtime.PYTHON_3_9, handler="index.handler",
+                     code=lambda_.Code.from_inline("def handler(event, context): pass"))
+    sfn.StateMachine(stack, "LateStateMachine", definition=sfn.Pass(stack, "Pass"))
+    return Template.from_stack(stack)
+
+
+@pytest.fixture(scope="module")
+def synth_template(mock_solution):
+    yield synth_stack(mock_solution, with_queue=True)
+
+
+def dashboard_body(template):
+    dashboards = template.find_resources("AWS::CloudWatch::Dashboard")
+    assert len(dashboards) == 1
+    return json.dumps(next(iter(dashboards.values()))["Properties"]["DashboardBody"])
+
+
+def test_queue_age_alarm(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "Threshold": 15,
+            "ComparisonOperator": "GreaterThanThreshold",
+            "Metrics": Match.array_with([
+                Match.object_like({"Expression": "age / 60"}),
+                Match.object_like({"MetricStat": Match.object_like({
+                    "Metric": Match.object_like({"MetricName": "ApproximateAgeOfOldestMessage"}),
+                })}),
+            ]),
+        },
+    )
+
+
+def test_run_duration_alarm(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "Threshold": 45,
+            "Metrics": Match.array_with([
+                Match.object_like({"Expression": "run / 60000"}),
+                Match.object_like({"MetricStat": Match.object_like({
+                    "Metric": Match.object_like({
+                        "Namespace": "DataConnectorsForAWSCleanRooms",
+                        "MetricName": "DataBrewRunLatency",
+                    }),
+                })}),
+            ]),
+        },
+    )
+
+
+def test_alarms_notify_the_alarm_topic(synth_template):
+    alarms = synth_template.find_resources("AWS::CloudWatch::Alarm")
+    assert len(alarms) == 2
+    topic = next(iter(synth_template.find_resources("AWS::SNS::Topic")))
+    for alarm in alarms.values():
+        assert alarm["Properties"]["AlarmActions"] == [{"Ref": topic}]
+
+
+def test_dashboard_includes_resources_created_later(synth_template):
+    body = dashboard_body(synth_template)
+    for metric_name in ["ApproximateAgeOfOldestMessage", "ApproximateNumberOfMessagesVisible",
+                        "Duration", "Throttles", "ConcurrentExecutions", "ExecutionTime", "ExecutionsFailed"]:
+        assert metric_name in body
+    assert "LateFunction" in body
+    assert "LateStateMachine" in body
+
+
+def test_dashboard_includes_pipeline_latency(synth_template):
+    body = dashboard_body(synth_template)
+    for stage in PIPELINE_STAGES:
+        assert f"{stage}Latency" in body
+
+
+def test_no_queue(mock_solution):
+    template = synth_stack(mock_solution, with_queue=False)
+    template.resource_count_is("AWS::CloudWatch::Alarm", 1)
+    assert "ApproximateAgeOfOldestMessage" not in dashboard_body(template)
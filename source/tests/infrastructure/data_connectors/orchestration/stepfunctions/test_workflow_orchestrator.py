@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 import aws_cdk as cdk
 import pytest
@@ -66,8 +67,48 @@ def test_invoke_lambda_run_brew_jobs_creation(synth_template):
     )
     states_definition = str(states_definition_capture.as_object()['Fn::Join'][1])
 
-    payload = "\"Payload\":{\"task_token.$\":\"$$.Task.Token\",\"brew_job_name\":\"UnitTestRecipeJob\"}"
+    payload = "\"Payload\":{\"task_token.$\":\"$$.Task.Token\",\"brew_job_name\":\"UnitTestRecipeJob\","
     assert payload in states_definition
 
+    run_timing = ("\"run_timing\":{\"workflow_start_time.$\":\"$$.Execution.StartTime\","
+                  "\"first_upload_time.$\":\"$.first_upload_time\","
+                  "\"last_upload_time.$\":\"$.dynamodb_last_file_uploaded_time.Item.timestamp_str.S\"}")
+    assert run_timing in states_definition
+
+    trace_context = ("\"trace_context\":{\"execution_id.$\":\"$$.Execution.Id\","
+                     "\"correlation_id.$\":\"$.trace_context.correlation_id\"}")
+    assert trace_context in states_definition
+
     on_catch = "\"Catch\":[{\"ErrorEquals\":[\"States.TaskFailed\"],\"Next\":\"DataBrew Job Launch Fail Notification\"}]"
     assert on_catch in states_definition
+
+
+def states_definition(synth_template) -> dict:
+    """The workflow definition, with the tokens of the definition replaced by TOKEN"""
+    definition_capture = Capture()
+    synth_template.has_resource_properties("AWS::StepFunctions::StateMachine", {"DefinitionString": definition_capture})
+    parts = definition_capture.as_object()["Fn::Join"][1]
+    return json.loads("".join(part if isinstance(part, str) else "TOKEN" for part in parts))
+
+
+@pytest.mark.parametrize("name,path", [
+    ("First Upload Time", "$.first_upload_time"),
+    ("Correlation Id", "$.trace_context.correlation_id"),
+])
+def test_optional_workflow_input_is_defaulted(synth_template, name, path):
+    states = states_definition(synth_template)["States"]
+
+    check = states[f"Check {name}"]
+    assert check["Choices"] == [{"Not": {"Variable": path, "IsPresent": True}, "Next": f"Default {name}"}]
+    assert check["Default"] == states[f"Default {name}"]["Next"]
+    assert states[f"Default {name}"]["Result"] == ""
+    assert states[f"Default {name}"]["ResultPath"] == path
+
+
+def test_optional_workflow_input_is_defaulted_first(synth_template):
+    definition = states_definition(synth_template)
+
+    # both values are defaulted before any state reads them
+    assert definition["StartAt"] == "Check First Upload Time"
+    assert definition["States"]["Check First Upload Time"]["Default"] == "Check Correlation Id"
+    assert definition["States"]["Check Correlation Id"]["Default"] == "DynamoDB Get File Expected Uploading Finish Time"
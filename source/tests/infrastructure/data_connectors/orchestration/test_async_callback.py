@@ -52,6 +52,7 @@ def test_lambda_dbb_function_creation(synth_template):
             "Handler": "lambda_function.handler",
             "Description":
                 "This function read dynamodb table and send token back to step function",
+            "TracingConfig": {"Mode": "Active"},
             "Role": {
                 "Fn::GetAtt": [role_definition_capture, "Arn"]
             },
@@ -69,6 +70,10 @@ def test_lambda_dbb_function_creation(synth_template):
         "AWS::IAM::Policy", {
             "PolicyDocument": {
                 "Statement": [{
+                    # active tracing
+                    "Action": ["xray:PutTraceSegments", "xray:PutTelemetryRecords"],
+                    "Effect": "Allow",
+                }, {
                     "Action": [
                         "dynamodb:BatchWriteItem", "dynamodb:PutItem",
                         "dynamodb:UpdateItem", "dynamodb:DeleteItem",
@@ -86,6 +91,10 @@ def test_lambda_dbb_function_creation(synth_template):
         "AWS::IAM::Policy", {
             "PolicyDocument": {
                 "Statement": [{
+                    # active tracing
+                    "Action": ["xray:PutTraceSegments", "xray:PutTelemetryRecords"],
+                    "Effect": "Allow",
+                }, {
                     "Action": [
                         "dynamodb:BatchGetItem", "dynamodb:GetRecords",
                         "dynamodb:GetShardIterator", "dynamodb:Query",
@@ -94,6 +103,11 @@ def test_lambda_dbb_function_creation(synth_template):
                     ],
                     "Effect":
                         "Allow",
+                }, {
+                    # the callback completes the pipeline latency record of the run
+                    "Action": "dynamodb:PutItem",
+                    "Effect":
+                        "Allow",
                 }],
                 "Version":
                     "2012-10-17"
@@ -15,7 +15,7 @@ from pathlib import Path
 
 import aws_cdk as cdk
 import pytest
-from aws_cdk.assertions import Template, Capture
+from aws_cdk.assertions import Template, Capture, Match
 
 from aws_solutions.cdk import CDKSolution
 from data_connectors.base_connector_stack import BaseConnectorStack
@@ -89,3 +89,29 @@ def test_sns_notification_topic(synth_template):
             }
         }
     )
+
+
+def test_sns_notification_topic_key_allows_alarms(synth_template):
+    # CloudWatch cannot use the AWS managed key of SNS to publish alarms
+    synth_template.has_resource_properties(
+        "AWS::SNS::Topic",
+        {"KmsMasterKeyId": {"Fn::GetAtt": [Match.string_like_regexp("^SnsNotifyTopicKey"), "Arn"]}}
+    )
+    synth_template.has_resource_properties(
+        "AWS::KMS::Key",
+        {
+            "EnableKeyRotation": True,
+            "KeyPolicy": {
+                "Statement": Match.array_with([
+                    Match.object_like({
+                        "Principal": {"AWS": "*"},
+                        "Condition": {"StringEquals": Match.object_like({"kms:CallerAccount": {"Ref": "AWS::AccountId"}})},
+                    }),
+                    Match.object_like({
+                        "Principal": {"Service": "cloudwatch.amazonaws.com"},
+                        "Action": ["kms:Decrypt", "kms:GenerateDataKey*"],
+                    }),
+                ])
+            },
+        }
+    )
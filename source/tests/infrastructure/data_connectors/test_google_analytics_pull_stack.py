@@ -12,12 +12,13 @@
 # ######################################################################################################################
 
 from data_connectors.google_analytics_pull_stack import GoogleAnalyticsPullStack
+import json
 from pathlib import Path
 
 import aws_cdk as cdk
 from aws_solutions.cdk import CDKSolution
 import pytest
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Template, Match
 
 
 @pytest.fixture(scope="module")
@@ -34,6 +35,7 @@ def synth_template(mock_solution):
         GoogleAnalyticsPullStack.name,
         description=GoogleAnalyticsPullStack.description,
         template_filename=GoogleAnalyticsPullStack.template_filename,
+        synthesizer=mock_solution.synthesizer
     )
     synth_template = Template.from_stack(stack)
     yield synth_template
@@ -50,3 +52,141 @@ def test_create_schema_provider_parameter(synth_template):
             ]
         }
     )
+
+
+def test_google_analytics_connector_profile_and_flow(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::AppFlow::ConnectorProfile",
+        {
+            "ConnectorType": "Googleanalytics",
+            "ConnectionMode": "Public",
+        }
+    )
+    synth_template.has_resource_properties(
+        "AWS::AppFlow::Flow",
+        {
+            "SourceFlowConfig": {
+                "ConnectorType": "Googleanalytics",
+                "SourceConnectorProperties": {
+                    "GoogleAnalytics": {"Object": {"Ref": "GoogleAnalyticsObjectName"}}
+                }
+            },
+            "TriggerConfig": {"TriggerType": "OnDemand"},
+        }
+    )
+
+
+def test_shard_checkpoint_table(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::DynamoDB::Table",
+        {
+            "KeySchema": [{"AttributeName": "shard_id", "KeyType": "HASH"}],
+        }
+    )
+
+
+def test_shard_functions(synth_template):
+    for handler in ["plan_shards_handler", "start_shard_handler", "complete_shard_handler"]:
+        synth_template.has_resource_properties(
+            "AWS::Lambda::Function",
+            {
+                "Handler": f"shard_flow.{handler}",
+                "Environment": {
+                    "Variables": Match.object_like({
+                        "SHARD_SIZE_IN_DAYS": {"Ref": "ShardSizeInDays"},
+                        "BACKFILL_START_DATE": {"Ref": "BackfillStartDate"},
+                    })
+                }
+            }
+        )
+
+
+def test_shards_run_with_bounded_concurrency(synth_template):
+    state_machines = synth_template.find_resources("AWS::StepFunctions::StateMachine")
+    definitions = [
+        "".join(part if isinstance(part, str) else "" for part in
+                state_machine["Properties"]["DefinitionString"]["Fn::Join"][1])
+        for state_machine in state_machines.values()
+    ]
+    shard_workflow = next(definition for definition in definitions if '"Run Shards"' in definition)
+    assert '"Type":"Map"' in shard_workflow
+    assert '"MaxConcurrency":5' in shard_workflow
+    assert '"ItemsPath":"$.plan.shards"' in shard_workflow
+    assert '"Find Failed Shards"' in shard_workflow
+
+
+def test_shard_flow_run_polling_is_bounded(synth_template):
+    state_machines = synth_template.find_resources("AWS::StepFunctions::StateMachine")
+    definitions = [
+        json.loads("".join(part if isinstance(part, str) else "TOKEN" for part in
+                           state_machine["Properties"]["DefinitionString"]["Fn::Join"][1]))
+        for state_machine in state_machines.values()
+    ]
+    shard_workflow = next(definition for definition in definitions if "Run Shards" in definition["States"])
+    states = shard_workflow["States"]["Run Shards"]["Iterator"]["States"]["Run Shard"]["Branches"][0]["States"]
+
+    find_flow_run = states["Find Shard Flow Run"]
+    for index, choice in enumerate(find_flow_run["Choices"]):
+        assert {"Variable": f"$.flow_run.executions[{index}].ExecutionId",
+                "StringEqualsPath": "$.execution_id"} in choice["And"]
+    assert find_flow_run["Default"] == "Check Shard Flow Run Poll Attempts"
+    assert states["Check Shard Flow Run Status"]["Default"] == "Check Shard Flow Run Poll Attempts"
+    assert states[states["Check Shard Flow Run Poll Attempts"]["Choices"][0]["Next"]]["Type"] == "Fail"
+    assert states["Complete Shard"]["Parameters"]["status.$"] == "$.flow_run.execution.ExecutionStatus"
+
+
+def test_failed_shard_is_reported(synth_template):
+    state_machines = synth_template.find_resources("AWS::StepFunctions::StateMachine")
+    definitions = [
+        json.loads("".join(part if isinstance(part, str) else "TOKEN" for part in
+                           state_machine["Properties"]["DefinitionString"]["Fn::Join"][1]))
+        for state_machine in state_machines.values()
+    ]
+    shard_workflow = next(definition for definition in definitions if "Run Shards" in definition["States"])
+    iterator = shard_workflow["States"]["Run Shards"]["Iterator"]
+
+    # any error of a shard's steps (including its polling timing out) is caught for that shard only
+    assert iterator["StartAt"] == "Run Shard"
+    catch = iterator["States"]["Run Shard"]["Catch"]
+    assert catch == [{"ErrorEquals": ["States.ALL"], "ResultPath": "$.error", "Next": "Delete Failed Shard Flow"}]
+    assert iterator["States"]["Shard Result"]["InputPath"] == "$[0]"
+
+    delete_shard_flow = iterator["States"]["Delete Failed Shard Flow"]
+    assert delete_shard_flow["Resource"].endswith(":states:::aws-sdk:appflow:deleteFlow")
+    assert delete_shard_flow["Next"] == "Shard Failed"
+    assert delete_shard_flow["Catch"][0]["Next"] == "Shard Failed"
+    shard_failed = iterator["States"]["Shard Failed"]
+    assert shard_failed["Parameters"]["status"] == "Failed"
+    assert shard_failed["End"] is True
+
+
+def test_pipeline_dashboard(synth_template):
+    # there is no S3 notification queue to alarm on, only the DataBrew run duration SLO
+    synth_template.resource_count_is("AWS::CloudWatch::Alarm", 1)
+    dashboards = synth_template.find_resources("AWS::CloudWatch::Dashboard")
+    body = str(next(iter(dashboards.values()))["Properties"]["DashboardBody"])
+    for function_id in ["PlanShardsFunction", "StartShardFunction", "CompleteShardFunction"]:
+        assert function_id in body
+
+
+def test_dataset_reads_every_shard_prefix(synth_template):
+    synth_template.has_parameter("InboundDataUploadType", {"AllowedValues": ["Incremental"]})
+    dataset = next(iter(synth_template.find_resources("AWS::DataBrew::Dataset").values()))
+    key = dataset["Properties"]["Input"]["S3InputDefinition"]["Key"]
+    assert key["Fn::Join"][1][-1] == "shards/<.*>"
+
+
+def test_shard_functions_may_remove_shard_output(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with([
+                    Match.object_like({
+                        "Action": "s3:DeleteObject",
+                        "Resource": {"Fn::Join": ["", Match.array_with([Match.string_like_regexp("-flow/shards/\\*$")])]},
+                    })
+                ])
+            }
+        }
+    )
@@ -74,3 +74,23 @@ def test_create_workflow(synth_template):
                 ]
             },
         })
+
+
+def test_lambda_functions_have_metrics_dimensions(synth_template):
+    functions = synth_template.find_resources("AWS::Lambda::Function")
+    assert functions
+    for logical_id, function in functions.items():
+        # the S3 bucket notifications handler is a plain CfnFunction provided by CDK
+        if logical_id.startswith("BucketNotificationsHandler"):
+            continue
+        variables = function["Properties"]["Environment"]["Variables"]
+        assert variables["CONNECTOR_NAME"] == "S3PushStack"
+        assert variables["STACK_NAME"] == {"Ref": "AWS::StackName"}
+
+
+def test_pipeline_dashboard(synth_template):
+    synth_template.resource_count_is("AWS::CloudWatch::Dashboard", 1)
+    # queue age and DataBrew run duration SLOs
+    synth_template.resource_count_is("AWS::CloudWatch::Alarm", 2)
+    synth_template.has_parameter("QueueAgeAlarmThreshold", {"Type": "Number", "Default": 30})
+    synth_template.has_parameter("RunDurationAlarmThreshold", {"Type": "Number", "Default": 60})
@@ -11,6 +11,7 @@
 #  the specific language governing permissions and limitations under the License.                                      #
 # ######################################################################################################################
 
+import json
 from pathlib import Path
 
 import aws_cdk as cdk
@@ -56,6 +57,12 @@ def test_lambda_appflow_policies(synth_template):
             "Properties": {
                 "PolicyDocument": {
                     "Statement":[
+                        {
+                            # active tracing
+                            "Action": ["xray:PutTraceSegments", "xray:PutTelemetryRecords"],
+                            "Effect": "Allow",
+                            "Resource": "*"
+                        },
                         {
                             "Action": [
                                 "appflow:CreateConnectorProfile",
@@ -80,7 +87,8 @@ def test_lambda_appflow_policies(synth_template):
                                 "secretsmanager:CreateSecret",
                                 "secretsManager:PutResourcePolicy",
                                 "secretsmanager:PutSecretValue",
-                                "secretsmanager:GetSecretValue"
+                                "secretsmanager:GetSecretValue",
+                                "secretsmanager:DescribeSecret"
                             ],
                             "Effect": "Allow",
                             "Resource": secret_manager_resource_capture
@@ -102,3 +110,68 @@ def test_lambda_appflow_policies(synth_template):
             },
         }
     )
+
+
+def test_appflow_launch_workflow_waits_for_flow_run(synth_template):
+    synth_template.resource_count_is("AWS::StepFunctions::StateMachine", 1)
+    states_definition_capture = Capture()
+    synth_template.has_resource_properties(
+        "AWS::StepFunctions::StateMachine",
+        {
+            "DefinitionString": states_definition_capture,
+        }
+    )
+    states_definition = str(states_definition_capture.as_object()['Fn::Join'][1])
+
+    assert "appflow:describeFlowExecutionRecords" in states_definition
+    assert "\"Next\":\"Check Automatic Transform\"" in states_definition
+    assert "\"input_location.$\"" in states_definition
+
+
+def states_definition(synth_template) -> dict:
+    """The states of the workflow, with the tokens of the definition replaced by TOKEN"""
+    definition_capture = Capture()
+    synth_template.has_resource_properties("AWS::StepFunctions::StateMachine", {"DefinitionString": definition_capture})
+    parts = definition_capture.as_object()["Fn::Join"][1]
+    return json.loads("".join(part if isinstance(part, str) else "TOKEN" for part in parts))["States"]
+
+
+def test_appflow_launch_workflow_polls_started_flow_run(synth_template):
+    states = states_definition(synth_template)
+
+    # the run started by the execution is found among the latest runs by its execution id
+    find_flow_run = states["Find Flow Run"]
+    for index, choice in enumerate(find_flow_run["Choices"]):
+        assert {"Variable": f"$.flow_run.executions[{index}].ExecutionId",
+                "StringEqualsPath": "$.appflow.execution_id"} in choice["And"]
+        assert states[choice["Next"]]["InputPath"] == f"$.flow_run.executions[{index}]"
+    assert len(find_flow_run["Choices"]) == states["Describe Flow Run"]["Parameters"]["MaxResults"]
+
+    # polling is bounded - every way back into the loop counts an attempt, and the attempts run out in a Fail state
+    poll_attempts = states["Check Flow Run Poll Attempts"]
+    assert find_flow_run["Default"] == "Check Flow Run Poll Attempts"
+    assert states["Check Flow Run Status"]["Default"] == "Check Flow Run Poll Attempts"
+    assert states[poll_attempts["Choices"][0]["Next"]]["Type"] == "Fail"
+    assert poll_attempts["Default"] == "Count Flow Run Poll"
+    assert states["Count Flow Run Poll"]["Next"] == "Wait For Flow Run"
+
+
+def test_no_s3_notification_debouncing(synth_template):
+    synth_template.resource_count_is("AWS::SQS::Queue", 0)
+    synth_template.resource_count_is("Custom::S3BucketNotifications", 0)
+
+
+def test_data_extension_extract_function(synth_template):
+    synth_template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "data_extension_extract.event_handler",
+            "Timeout": 900,
+        }
+    )
+    synth_template.has_resource_properties(
+        "AWS::DynamoDB::Table",
+        {
+            "KeySchema": [{"AttributeName": "extract_id", "KeyType": "HASH"}],
+        }
+    )